@@ -0,0 +1,712 @@
+"""
+Backends de almacenamiento del planificador 'Raquel & Alba'.
+El repositorio carga y guarda los datos a través de uno de estos backends:
+    - AlmacenamientoJSON: los archivos de data/ de siempre (el historial de
+      reservas va en el diario append-only data/reservas.jsonl).
+    - AlmacenamientoSQLite: una base sqlite3 con tablas e índices, donde
+      confirmar una boda es una sola transacción que solo toca las filas
+      que cambian (bloques, versiones, cliente y reserva).
+Se elige con la variable de entorno PLANNER_ALMACENAMIENTO ('json' o 'sqlite').
+
+Varios operadores pueden trabajar a la vez: lugares, personal e items llevan
+un número de 'version' que sube con cada boda que los usa. Al confirmar se
+compara (con el archivo bloqueado o dentro de la transacción) la versión que
+vio la sesión con la guardada; si alguien los cambió mientras tanto, la boda
+no se guarda y se informa exactamente qué cambió (ConflictoReserva).
+
+El stock ya no se descuenta de 'cantidad' (ver libro_stock.py): los datos de
+antes se migran solos la primera vez que se cargan.
+"""
+import contextlib
+import json
+import os
+import sqlite3
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import funciones_generales as fg
+from bloques import bloques_de_cotizacion, crear_bloque
+from cache_catalogos import CacheCatalogos
+from instrumentacion import contar, medido
+from diario_reservas import DiarioReservas
+from historial import AgregadosReservas, nombre_cliente
+from libro_stock import migrar_inventario, tipo_de
+
+COLECCIONES = ['lugares', 'personal', 'inventario', 'clientes', 'reservas']
+CATALOGOS = ['lugares', 'personal', 'inventario', 'clientes']
+
+
+class ConflictoReserva(Exception):
+    """
+    La boda dependía de un lugar, personal, stock o ID de cliente que otro
+    operador cambió desde que se cargaron los datos. Nada quedó guardado.
+
+    Atributos:
+        conflictos (list): Un mensaje por cada recurso que cambió.
+    """
+    def __init__(self, conflictos):
+        super().__init__("\n".join(conflictos))
+        self.conflictos = conflictos
+
+
+class BloqueoArchivo:
+    """Bloqueo exclusivo entre procesos sobre un archivo (fcntl en Linux/Mac, msvcrt en Windows)."""
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._archivo = None
+
+    def tomar(self):
+        self._archivo = open(self.ruta, 'a+')
+        if fcntl is not None:
+            fcntl.flock(self._archivo, fcntl.LOCK_EX)
+        else:
+            self._archivo.seek(0)
+            msvcrt.locking(self._archivo.fileno(), msvcrt.LK_LOCK, 1)
+
+    def soltar(self):
+        if fcntl is not None:
+            fcntl.flock(self._archivo, fcntl.LOCK_UN)
+        else:
+            self._archivo.seek(0)
+            msvcrt.locking(self._archivo.fileno(), msvcrt.LK_UNLCK, 1)
+        self._archivo.close()
+        self._archivo = None
+
+    @property
+    def tomado(self):
+        """True si este mismo objeto ya tiene el bloqueo (no es reentrante)."""
+        return self._archivo is not None
+
+    def __enter__(self):
+        self.tomar()
+        return self
+
+    def __exit__(self, *error):
+        self.soltar()
+
+
+def version(recurso):
+    """Versión de un lugar/trabajador/item (los JSON antiguos no la tienen: 0)."""
+    return recurso.get('version', 0) if recurso else 0
+
+
+def _conflicto(tipo, nombre, vista, actual):
+    return (f"{tipo} '{nombre}' fue modificado por otra reserva "
+            f"(esta sesión vio la versión {vista}, ahora es la {actual}).")
+
+
+def _subir_versiones(repo, cotizacion):
+    """Tras guardar, la sesión queda viendo las versiones nuevas de lo que usó."""
+    recursos = [repo.lugar(cotizacion['id_lugar'])]
+    recursos += [repo.persona(p.id_personal) for p in cotizacion['personal_contratado']]
+    recursos += [repo.item(i.id_item_reserva) for i in cotizacion['items_pedidos']]
+    for r in recursos:
+        if r is not None:
+            r['version'] = version(r) + 1
+
+
+class Almacenamiento:
+    """Interfaz común de los backends (cargar datos y registrar confirmaciones)."""
+    @medido('datos')
+    def cargar(self):
+        """Devuelve {'lugares': [...], 'personal': [...], ...} con el formato de los JSON."""
+        return {nombre: self.cargar_coleccion(nombre) for nombre in COLECCIONES}
+
+    def cargar_coleccion(self, nombre):
+        """Devuelve solo una colección (el Repositorio carga cada una recién cuando la usa)."""
+        raise NotImplementedError
+
+    def cargar_derivado(self, nombre, colecciones, construir):
+        """
+        Algo que se arma a partir de ciertas colecciones (ej: el índice de
+        disponibilidad). Por defecto se arma siempre con construir(); el
+        backend JSON lo guarda en su caché hasta que cambie alguna colección.
+        """
+        return construir()
+
+    @medido('datos')
+    def registrar_confirmacion(self, repo, cotizacion, cliente, reserva):
+        """
+        Persiste una boda confirmada (los datos en memoria ya están actualizados).
+        Antes de guardarla le pone en reserva['numero'] su número de orden en el
+        historial (1, 2, ...), tomado con el historial bloqueado: dos sesiones a
+        la vez nunca reciben el mismo (es el número de su ticket y su factura).
+        """
+        raise NotImplementedError
+
+    def iterar_reservas(self):
+        """Recorre el historial de reservas de a una (sin cargarlo entero)."""
+        raise NotImplementedError
+
+    def agregados(self):
+        """Totales acumulados del historial (AgregadosReservas), sin recorrerlo."""
+        raise NotImplementedError
+
+    def iniciar_lote(self):
+        """Aviso de que vienen muchas confirmaciones seguidas (por defecto no hace nada)."""
+
+    @medido('datos')
+    def terminar_lote(self, repo):
+        """Fin de la carga masiva: se escribe lo que haya quedado pendiente."""
+
+
+class AlmacenamientoJSON(Almacenamiento):
+    """
+    Guarda cada colección en su archivo data/<nombre>.json.
+
+    Cada confirmación toma el bloqueo data/.planner.lock, vuelve a leer los
+    catálogos del disco, compara versiones y aplica solo los cambios de esa
+    boda sobre lo leído: nunca pisa lo que guardó otro operador.
+
+    Los JSON ya interpretados quedan en la caché binaria data/.cache (ver
+    cache_catalogos.py); PLANNER_CACHE=0 la desactiva.
+    """
+    def __init__(self, carpeta='data', cache=None):
+        self.carpeta = carpeta
+        self._bloqueo = BloqueoArchivo(f"{carpeta}/.planner.lock")
+        self.diario = DiarioReservas(f"{carpeta}/reservas.jsonl", self.ruta('reservas'), self._bloqueo)
+        if cache is None:
+            cache = os.environ.get('PLANNER_CACHE', '1') != '0'
+        self.cache = CacheCatalogos(carpeta, activa=cache)
+        self._agregados = None
+        self._lote = None  # catálogos del disco mientras dura una carga masiva
+
+    def ruta(self, nombre):
+        return f"{self.carpeta}/{nombre}.json"
+
+    @medido('datos')
+    def cargar_coleccion(self, nombre):
+        if nombre == 'reservas':
+            return self.cache.leer(nombre, self.diario.ruta, lambda: list(self.diario.leer()))
+        ruta = self.ruta(nombre)
+        if nombre == 'inventario':
+            return self.cache.leer(nombre, ruta, self._leer_inventario)
+        return self.cache.leer(nombre, ruta, lambda: fg.ensure_file_exist(ruta, []))
+
+    def _leer_inventario(self):
+        """inventario.json; si es de antes del libro de stock se migra una vez y se guarda."""
+        ruta = self.ruta('inventario')
+        inventario = fg.ensure_file_exist(ruta, [])
+        if all(i.get('tipo') for i in inventario):
+            return inventario
+        # En una carga masiva el bloqueo ya es de esta sesión
+        with contextlib.nullcontext() if self._bloqueo.tomado else self._bloqueo:
+            inventario = fg.ensure_file_exist(ruta, [])
+            if migrar_inventario(inventario, self.diario.leer()):
+                contenido = json.dumps(inventario, indent=4, ensure_ascii=False)
+                DiarioReservas.escribir_atomico(ruta, [contenido])
+        return inventario
+
+    def cargar_derivado(self, nombre, colecciones, construir):
+        rutas = tuple(self.diario.ruta if c == 'reservas' else self.ruta(c) for c in colecciones)
+        return self.cache.leer(nombre, rutas, construir)
+
+    @medido('datos')
+    def registrar_confirmacion(self, repo, cotizacion, cliente, reserva):
+        # En una carga masiva el bloqueo ya está tomado y los catálogos del disco
+        # ya están en memoria: se escriben una sola vez al final del lote.
+        if self._lote is not None:
+            self._aplicar_confirmacion(self._lote, repo, cotizacion, cliente)
+            reserva['numero'] = self.agregados().cantidad + 1
+            self.agregados().agregar(reserva)
+            self.diario.agregar(reserva)
+            _subir_versiones(repo, cotizacion)
+            return
+
+        with self._bloqueo:
+            datos = self._leer_catalogos()
+            self._aplicar_confirmacion(datos, repo, cotizacion, cliente)
+            self._guardar_catalogos(datos)
+            # Otro proceso pudo haber agregado reservas: los totales se releen
+            self._agregados = None
+            agregados = self.agregados()
+            reserva['numero'] = agregados.cantidad + 1
+            self.diario.agregar(reserva)
+            agregados.agregar(reserva)
+            self._guardar_agregados(agregados)
+        _subir_versiones(repo, cotizacion)
+
+    def _leer_catalogos(self):
+        return {nombre: self.cargar_coleccion(nombre) for nombre in CATALOGOS}
+
+    def _guardar_catalogos(self, datos):
+        for nombre in CATALOGOS:
+            contenido = json.dumps(datos[nombre], indent=4, ensure_ascii=False)
+            DiarioReservas.escribir_atomico(self.ruta(nombre), [contenido])
+            # Lo recién escrito ya está interpretado: la próxima lectura no vuelve a parsear
+            self.cache.guardar(nombre, self.ruta(nombre), datos[nombre])
+
+    @staticmethod
+    def _aplicar_confirmacion(datos, repo, cotizacion, cliente):
+        """
+        Compara las versiones del disco con las que vio la sesión (repo) y, si
+        ninguna cambió, aplica la boda sobre los datos del disco.
+        """
+        lugares = {l['id_lugar']: l for l in datos['lugares']}
+        personal = {p['id_personal']: p for p in datos['personal']}
+        items = {i['id_item']: i for i in datos['inventario']}
+        conflictos = []
+
+        lugar = lugares.get(cotizacion['id_lugar'])
+        visto = version(repo.lugar(cotizacion['id_lugar']))
+        if lugar is None or version(lugar) != visto:
+            conflictos.append(_conflicto("El lugar", cotizacion['nombre_lugar'], visto, version(lugar)))
+        for p in cotizacion['personal_contratado']:
+            actual, visto = personal.get(p.id_personal), version(repo.persona(p.id_personal))
+            if actual is None or version(actual) != visto:
+                conflictos.append(_conflicto("El trabajador", p.nombre, visto, version(actual)))
+        for i in cotizacion['items_pedidos']:
+            actual, visto = items.get(i.id_item_reserva), version(repo.item(i.id_item_reserva))
+            if actual is None or version(actual) != visto:
+                conflictos.append(_conflicto("El item", i.nombre, visto, version(actual)))
+        if any(c.get('id_cliente') == cliente['id_cliente'] for c in datos['clientes']):
+            conflictos.append(f"El ID de cliente {cliente['id_cliente']} ya fue registrado por otra sesión.")
+        if conflictos:
+            contar('conflictos.version')
+            raise ConflictoReserva(conflictos)
+
+        bloques = bloques_de_cotizacion(cotizacion)
+        recursos = [lugar] + [personal[p.id_personal] for p in cotizacion['personal_contratado']]
+        for r in recursos:
+            r.setdefault('fechas_ocupadas', []).extend(dict(b) for b in bloques)
+            r['version'] = version(r) + 1
+        # 'cantidad' no cambia: lo que toma la boda queda en el libro de stock
+        for i in cotizacion['items_pedidos']:
+            actual = items[i.id_item_reserva]
+            actual['version'] = version(actual) + 1
+        datos['clientes'].append(cliente)
+
+    def iniciar_lote(self):
+        self._bloqueo.tomar()
+        self._lote = self._leer_catalogos()
+        self._agregados = None
+
+    @medido('datos')
+    def terminar_lote(self, repo):
+        try:
+            self._guardar_catalogos(self._lote)
+            self._guardar_agregados(self.agregados())
+        finally:
+            self._lote = None
+            self._bloqueo.soltar()
+
+    def iterar_reservas(self):
+        return self.diario.leer()
+
+    def agregados(self):
+        """
+        Los totales se guardan en agregados_reservas.json junto con el tamaño que
+        tenía el diario; si el diario cambió por fuera (o no hay archivo) se
+        recalculan una vez recorriendo el historial.
+        """
+        if self._agregados is None:
+            guardado = fg.ensure_file_exist(self.ruta('agregados_reservas'), {})
+            if guardado and guardado.get('tam_diario') == os.path.getsize(self.diario.ruta):
+                self._agregados = AgregadosReservas.from_dict(guardado['totales'])
+            else:
+                self._guardar_agregados(AgregadosReservas.desde_reservas(self.diario.leer()))
+        return self._agregados
+
+    def _guardar_agregados(self, agregados):
+        self._agregados = agregados
+        fg.write_json(self.ruta('agregados_reservas'), {
+            'tam_diario': os.path.getsize(self.diario.ruta),
+            'totales': agregados.to_dict(),
+        })
+
+
+# Los montos van sin tipo declarado para que sqlite los guarde tal cual
+# (1500 sigue siendo entero y 85.0 sigue siendo decimal al exportar a JSON).
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS lugares (
+    id_lugar INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    capacidad INTEGER NOT NULL,
+    precio NOT NULL,
+    servicios_incluidos TEXT NOT NULL DEFAULT '[]',
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS bloques_lugar (
+    id_lugar INTEGER NOT NULL,
+    fecha TEXT NOT NULL,
+    inicio TEXT,
+    fin TEXT,
+    fecha_fin TEXT,
+    montaje INTEGER NOT NULL DEFAULT 0,
+    desmontaje INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_bloques_lugar ON bloques_lugar (id_lugar, fecha);
+CREATE TABLE IF NOT EXISTS personal (
+    id_personal INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    oficio TEXT,
+    categoria TEXT,
+    sueldo NOT NULL,
+    experiencia TEXT,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_personal_categoria ON personal (categoria);
+CREATE TABLE IF NOT EXISTS bloques_personal (
+    id_personal INTEGER NOT NULL,
+    fecha TEXT NOT NULL,
+    inicio TEXT,
+    fin TEXT,
+    fecha_fin TEXT,
+    montaje INTEGER NOT NULL DEFAULT 0,
+    desmontaje INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_bloques_personal ON bloques_personal (id_personal, fecha);
+CREATE TABLE IF NOT EXISTS inventario (
+    id_item INTEGER PRIMARY KEY,
+    categoria TEXT,
+    nombre TEXT NOT NULL,
+    cantidad INTEGER NOT NULL,
+    precio_unidad NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0,
+    tipo TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_inventario_categoria ON inventario (categoria);
+CREATE TABLE IF NOT EXISTS clientes (
+    id_cliente INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    email TEXT,
+    invitados INTEGER,
+    presupuesto
+);
+CREATE TABLE IF NOT EXISTS reservas (
+    id_reserva INTEGER PRIMARY KEY AUTOINCREMENT,
+    fecha TEXT,
+    cliente TEXT,
+    id_lugar INTEGER,
+    estado TEXT,
+    total_final,
+    comision,
+    datos TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reservas_fecha ON reservas (fecha);
+CREATE INDEX IF NOT EXISTS idx_reservas_cliente ON reservas (cliente);
+CREATE TABLE IF NOT EXISTS agregados (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    datos TEXT NOT NULL
+);
+"""
+# Columnas que se sumaron después de crear el esquema: (tabla, columna, definición)
+COLUMNAS_NUEVAS = [(tabla, 'version', 'INTEGER NOT NULL DEFAULT 0')
+                   for tabla in ('lugares', 'personal', 'inventario')]
+COLUMNAS_NUEVAS += [(tabla, columna, definicion)
+                    for tabla in ('bloques_lugar', 'bloques_personal')
+                    for columna, definicion in (('fecha_fin', 'TEXT'),
+                                                ('montaje', 'INTEGER NOT NULL DEFAULT 0'),
+                                                ('desmontaje', 'INTEGER NOT NULL DEFAULT 0'))]
+COLUMNAS_NUEVAS += [('inventario', 'tipo', 'TEXT')]
+# Columnas de un bloque en bloques_lugar / bloques_personal (después del ID)
+COLUMNAS_BLOQUE = "fecha, inicio, fin, fecha_fin, montaje, desmontaje"
+INSERTAR_BLOQUE_LUGAR = f"INSERT INTO bloques_lugar (id_lugar, {COLUMNAS_BLOQUE}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+INSERTAR_BLOQUE_PERSONAL = (f"INSERT INTO bloques_personal (id_personal, {COLUMNAS_BLOQUE})"
+                            " VALUES (?, ?, ?, ?, ?, ?, ?)")
+
+
+class AlmacenamientoSQLite(Almacenamiento):
+    """
+    Backend sobre sqlite3 (librería estándar).
+
+    Si la base no existe se crea y se llena con los JSON de 'carpeta_json',
+    así el cambio de backend no pierde datos. Las confirmaciones abren la
+    transacción con BEGIN IMMEDIATE (un escritor a la vez) y cada fila usada
+    se actualiza con "WHERE version = la que vio la sesión".
+    """
+    def __init__(self, ruta='data/planner.db', carpeta_json='data'):
+        nueva = not os.path.exists(ruta)
+        self.ruta = ruta
+        self._agregados = None
+        self.conexion = sqlite3.connect(ruta, timeout=10, isolation_level='IMMEDIATE')
+        self.conexion.row_factory = sqlite3.Row
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.executescript(ESQUEMA)
+        self._agregar_columnas_nuevas()
+        if nueva and carpeta_json:
+            self.importar_json(carpeta_json)
+        self._migrar_stock()
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def _agregar_columnas_nuevas(self):
+        """Bases creadas antes de las versiones o del montaje de los bloques: se agregan las columnas."""
+        for tabla, columna, definicion in COLUMNAS_NUEVAS:
+            columnas = [f['name'] for f in self.conexion.execute(f"PRAGMA table_info({tabla})")]
+            if columna not in columnas:
+                with self.conexion as c:
+                    c.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {definicion}")
+
+    def _migrar_stock(self):
+        """Items de antes del libro de stock (sin 'tipo'): se les devuelve lo que pidió el historial."""
+        if not self.conexion.execute("SELECT 1 FROM inventario WHERE tipo IS NULL LIMIT 1").fetchone():
+            return
+        with self.conexion as c:
+            inventario = [dict(f) for f in c.execute("SELECT id_item, categoria, cantidad, tipo FROM inventario"
+                                                     " WHERE tipo IS NULL")]
+            migrar_inventario(inventario, self.iterar_reservas())
+            c.executemany("UPDATE inventario SET cantidad = ?, tipo = ? WHERE id_item = ?",
+                          [(i['cantidad'], i['tipo'], i['id_item']) for i in inventario])
+
+    # --- LECTURA ---
+    @medido('datos')
+    def cargar_coleccion(self, nombre):
+        c = self.conexion
+        if nombre == 'lugares':
+            bloques_lug = _agrupar_bloques(c.execute(
+                f"SELECT id_lugar AS id, {COLUMNAS_BLOQUE} FROM bloques_lugar ORDER BY rowid"))
+            lugares = []
+            for f in c.execute("SELECT * FROM lugares ORDER BY id_lugar"):
+                lugares.append({
+                    'id_lugar': f['id_lugar'], 'nombre': f['nombre'],
+                    'capacidad': f['capacidad'], 'precio': f['precio'],
+                    'servicios_incluidos': json.loads(f['servicios_incluidos']),
+                    'fechas_ocupadas': bloques_lug.get(f['id_lugar'], []),
+                    'version': f['version'],
+                })
+            return lugares
+        if nombre == 'personal':
+            bloques_per = _agrupar_bloques(c.execute(
+                f"SELECT id_personal AS id, {COLUMNAS_BLOQUE} FROM bloques_personal ORDER BY rowid"))
+            personal = []
+            for f in c.execute("SELECT * FROM personal ORDER BY id_personal"):
+                p = dict(f)
+                p['fechas_ocupadas'] = bloques_per.get(f['id_personal'], [])
+                personal.append(p)
+            return personal
+        if nombre == 'inventario':
+            return [dict(f) for f in c.execute("SELECT * FROM inventario ORDER BY id_item")]
+        if nombre == 'clientes':
+            return [dict(f) for f in c.execute("SELECT * FROM clientes ORDER BY rowid")]
+        if nombre == 'reservas':
+            return list(self.iterar_reservas())
+        raise ValueError(f"Colección desconocida: {nombre}")
+
+    def iterar_reservas(self):
+        for f in self.conexion.execute("SELECT datos FROM reservas ORDER BY id_reserva"):
+            yield json.loads(f['datos'])
+
+    def agregados(self):
+        if self._agregados is None:
+            fila = self.conexion.execute("SELECT datos FROM agregados WHERE id = 1").fetchone()
+            if fila:
+                self._agregados = AgregadosReservas.from_dict(json.loads(fila['datos']))
+            else:
+                with self.conexion as c:
+                    self._guardar_agregados(c, AgregadosReservas.desde_reservas(self.iterar_reservas()))
+        return self._agregados
+
+    def _guardar_agregados(self, c, agregados):
+        self._agregados = agregados
+        c.execute("INSERT OR REPLACE INTO agregados VALUES (1, ?)",
+                  (json.dumps(agregados.to_dict(), ensure_ascii=False),))
+
+    # --- ESCRITURA ---
+    @medido('datos')
+    def registrar_confirmacion(self, repo, cotizacion, cliente, reserva):
+        """Todo o nada: si algo falla no queda ni el bloqueo ni la nueva versión de nada."""
+        bloques = [_fila_bloque(b) for b in bloques_de_cotizacion(cotizacion)]
+        self.agregados()  # que la fila de totales exista antes de abrir la transacción
+        try:
+            with self.conexion as c:
+                conflictos = self._comparar_y_actualizar(c, repo, cotizacion, cliente)
+                if conflictos:
+                    contar('conflictos.version')
+                    raise ConflictoReserva(conflictos)  # el 'with' deshace todo
+                # Con la base ya tomada (BEGIN IMMEDIATE) los totales se releen: otro
+                # proceso pudo haber sumado reservas y el número tiene que ser el siguiente
+                fila = c.execute("SELECT datos FROM agregados WHERE id = 1").fetchone()
+                agregados = AgregadosReservas.from_dict(json.loads(fila['datos']))
+                reserva['numero'] = agregados.cantidad + 1
+                self._escribir_confirmacion(c, cotizacion, bloques, cliente, reserva)
+                agregados.agregar(reserva)
+                self._guardar_agregados(c, agregados)
+        except Exception:
+            # Los totales en memoria pudieron quedar a medias: se releen de la base
+            self._agregados = None
+            raise
+        _subir_versiones(repo, cotizacion)
+
+    @staticmethod
+    def _comparar_y_actualizar(c, repo, cotizacion, cliente):
+        """
+        Compare-and-swap de cada fila que usa la boda: sube la versión solo si
+        sigue siendo la que vio la sesión. Devuelve los conflictos.
+        """
+        conflictos = []
+
+        def actual(tabla, llave, id_recurso):
+            fila = c.execute(f"SELECT version FROM {tabla} WHERE {llave} = ?", (id_recurso,)).fetchone()
+            return fila['version'] if fila else None
+
+        visto = version(repo.lugar(cotizacion['id_lugar']))
+        cur = c.execute("UPDATE lugares SET version = version + 1 WHERE id_lugar = ? AND version = ?",
+                        (cotizacion['id_lugar'], visto))
+        if cur.rowcount == 0:
+            conflictos.append(_conflicto("El lugar", cotizacion['nombre_lugar'], visto,
+                                         actual('lugares', 'id_lugar', cotizacion['id_lugar'])))
+        for p in cotizacion['personal_contratado']:
+            visto = version(repo.persona(p.id_personal))
+            cur = c.execute("UPDATE personal SET version = version + 1 WHERE id_personal = ? AND version = ?",
+                            (p.id_personal, visto))
+            if cur.rowcount == 0:
+                conflictos.append(_conflicto("El trabajador", p.nombre, visto,
+                                             actual('personal', 'id_personal', p.id_personal)))
+        for i in cotizacion['items_pedidos']:
+            visto = version(repo.item(i.id_item_reserva))
+            cur = c.execute("UPDATE inventario SET version = version + 1 WHERE id_item = ? AND version = ?",
+                            (i.id_item_reserva, visto))
+            if cur.rowcount == 0:
+                conflictos.append(_conflicto("El item", i.nombre, visto,
+                                             actual('inventario', 'id_item', i.id_item_reserva)))
+        if c.execute("SELECT 1 FROM clientes WHERE id_cliente = ?", (cliente['id_cliente'],)).fetchone():
+            conflictos.append(f"El ID de cliente {cliente['id_cliente']} ya fue registrado por otra sesión.")
+        return conflictos
+
+    def _escribir_confirmacion(self, c, cotizacion, bloques, cliente, reserva):
+        # Los items ya subieron de versión en _comparar_y_actualizar ('cantidad' no cambia)
+        self._insertar_cliente(c, cliente)
+        c.executemany(INSERTAR_BLOQUE_LUGAR, [(cotizacion['id_lugar'],) + b for b in bloques])
+        c.executemany(INSERTAR_BLOQUE_PERSONAL,
+                      [(p.id_personal,) + b for p in cotizacion['personal_contratado'] for b in bloques])
+        self._insertar_reserva(c, reserva)
+
+    def importar_json(self, carpeta='data'):
+        """Reemplaza el contenido de la base con los archivos JSON de la carpeta."""
+        datos = AlmacenamientoJSON(carpeta).cargar()
+        with self.conexion as c:
+            for tabla in ['lugares', 'bloques_lugar', 'personal', 'bloques_personal',
+                          'inventario', 'clientes', 'reservas']:
+                c.execute(f"DELETE FROM {tabla}")
+            for lug in datos['lugares']:
+                c.execute("INSERT INTO lugares (id_lugar, nombre, capacidad, precio, servicios_incluidos,"
+                          " version) VALUES (?, ?, ?, ?, ?, ?)",
+                          (lug['id_lugar'], lug['nombre'], lug['capacidad'], lug['precio'],
+                           json.dumps(lug.get('servicios_incluidos', []), ensure_ascii=False),
+                           version(lug)))
+                c.executemany(INSERTAR_BLOQUE_LUGAR,
+                              [(lug['id_lugar'],) + _fila_bloque(b)
+                               for b in lug.get('fechas_ocupadas', [])])
+            for p in datos['personal']:
+                c.execute("INSERT INTO personal (id_personal, nombre, oficio, categoria, sueldo,"
+                          " experiencia, version) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                          (p['id_personal'], p['nombre'], p.get('oficio'), p.get('categoria'),
+                           p['sueldo'], p.get('experiencia'), version(p)))
+                c.executemany(INSERTAR_BLOQUE_PERSONAL,
+                              [(p['id_personal'],) + _fila_bloque(b)
+                               for b in p.get('fechas_ocupadas', [])])
+            c.executemany("INSERT INTO inventario (id_item, categoria, nombre, cantidad, precio_unidad,"
+                          " version, tipo) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                          [(i['id_item'], i.get('categoria'), i['nombre'], i['cantidad'],
+                            i['precio_unidad'], version(i), tipo_de(i)) for i in datos['inventario']])
+            for cli in datos['clientes']:
+                self._insertar_cliente(c, cli)
+            for r in datos['reservas']:
+                self._insertar_reserva(c, r)
+            self._guardar_agregados(c, AgregadosReservas.desde_reservas(datos['reservas']))
+
+    def exportar_json(self, carpeta='data'):
+        """Escribe el contenido de la base como los archivos JSON de siempre."""
+        destino = AlmacenamientoJSON(carpeta)
+        for nombre, lista in self.cargar().items():
+            if nombre == 'reservas':
+                destino.diario.reescribir(lista)
+            else:
+                fg.write_json(destino.ruta(nombre), lista)
+
+    @staticmethod
+    def _insertar_cliente(c, cliente):
+        c.execute("INSERT INTO clientes VALUES (?, ?, ?, ?, ?)",
+                  (cliente['id_cliente'], cliente['nombre'], cliente.get('email'),
+                   cliente.get('invitados'), cliente.get('presupuesto')))
+
+    @staticmethod
+    def _insertar_reserva(c, reserva):
+        c.execute("INSERT INTO reservas (fecha, cliente, id_lugar, estado, total_final, comision, datos)"
+                  " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                  (reserva.get('fecha'), nombre_cliente(reserva), reserva.get('id_lugar'),
+                   reserva.get('estado'),
+                   reserva.get('total_final'), reserva.get('comision'),
+                   json.dumps(reserva, ensure_ascii=False)))
+
+
+def _fila_bloque(bloque):
+    # Las fechas sueltas (datos antiguos) se guardan sin horario
+    if isinstance(bloque, str):
+        return (bloque, None, None, None, 0, 0)
+    return (bloque.get('fecha'), bloque.get('inicio', bloque.get('hora_inicio')),
+            bloque.get('fin', bloque.get('hora_fin')), bloque.get('fecha_fin'),
+            bloque.get('montaje', 0), bloque.get('desmontaje', 0))
+
+
+def _agrupar_bloques(filas):
+    grupos = {}
+    for f in filas:
+        if f['inicio'] is None:
+            bloque = f['fecha']
+        else:
+            bloque = crear_bloque(f['fecha'], f['inicio'], f['fin'], f['fecha_fin'], f['montaje'], f['desmontaje'])
+        grupos.setdefault(f['id'], []).append(bloque)
+    return grupos
+
+
+class AlmacenamientoMemoria(Almacenamiento):
+    """
+    Datos ya cargados, sin archivo detrás. Sirve para armar copias de solo
+    lectura del catálogo (por ejemplo en los procesos que cotizan en paralelo).
+    Además de las colecciones, 'datos' puede traer derivados ya armados (ej:
+    'libro_stock'), que se usan tal cual en vez de volver a construirlos.
+    """
+    def __init__(self, datos):
+        self.datos = datos
+
+    def cargar_coleccion(self, nombre):
+        return self.datos.get(nombre, [])
+
+    def cargar_derivado(self, nombre, colecciones, construir):
+        if nombre in self.datos:
+            return self.datos[nombre]
+        return construir()
+
+    @medido('datos')
+    def registrar_confirmacion(self, repo, cotizacion, cliente, reserva):
+        reserva['numero'] = len(repo.reservas) + 1
+
+    def iterar_reservas(self):
+        return iter(self.datos.get('reservas', []))
+
+    def agregados(self):
+        return AgregadosReservas.desde_reservas(self.iterar_reservas())
+
+
+def crear_almacenamiento(tipo=None, carpeta='data'):
+    """Crea el backend indicado (o el de PLANNER_ALMACENAMIENTO; JSON por defecto)."""
+    tipo = (tipo or os.environ.get('PLANNER_ALMACENAMIENTO', 'json')).lower()
+    if tipo == 'sqlite':
+        return AlmacenamientoSQLite(f"{carpeta}/planner.db", carpeta)
+    if tipo == 'json':
+        return AlmacenamientoJSON(carpeta)
+    raise ValueError(f"Tipo de almacenamiento desconocido: {tipo}")
+
+
+if __name__ == "__main__":
+    # Uso: python almacenamiento.py importar|exportar  (entre data/*.json y data/planner.db)
+    import sys
+    accion = sys.argv[1] if len(sys.argv) > 1 else ''
+    if accion not in ('importar', 'exportar'):
+        print("Uso: python almacenamiento.py importar|exportar")
+        sys.exit(1)
+    base = AlmacenamientoSQLite('data/planner.db', carpeta_json=None)
+    if accion == 'importar':
+        base.importar_json('data')
+        print("✅ JSON importados a data/planner.db")
+    else:
+        base.exportar_json('data')
+        print("✅ data/planner.db exportada a los JSON")
+    base.cerrar()
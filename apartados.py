@@ -0,0 +1,210 @@
+"""
+Apartados temporales (holds) del planificador 'Raquel & Alba'.
+Mientras un cliente arma su boda, el lugar, el personal y las unidades de
+inventario que va eligiendo quedan apartados a su nombre por unos minutos:
+nadie más que cotice en el mismo proceso puede tomarlos, y si el cliente
+abandona, el apartado vence solo. Un hilo barrendero duerme hasta el
+próximo vencimiento (montículo ordenado por hora de vencimiento) y los
+quita; las consultas además ignoran los vencidos aunque el barrendero
+todavía no haya pasado.
+"""
+import heapq
+import itertools
+import threading
+import time
+
+from bloques import chocan, crear_bloque, dias_de_intervalo, intervalos_de
+
+# Tipo de recurso de los apartados de inventario (lugar y personal usan los
+# de disponibilidad: las claves son (tipo, id) en los tres casos)
+ITEM = "item"
+
+# Segundos que dura un apartado si no se renueva (15 minutos)
+TTL_APARTADO = 15 * 60
+
+
+class Apartado:
+    """
+    Un recurso apartado a nombre de un dueño (cliente o sesión).
+
+    Atributos:
+        recurso (tuple): (tipo, id) del lugar, trabajador o item.
+        intervalos (list): (inicio, fin) en minutos de época; en los items solo
+            los que se alquilan (vacío: cuenta para cualquier día).
+        cantidad (int): Unidades apartadas (solo items).
+        vence (float): Momento (time.monotonic) en que deja de valer.
+    """
+    __slots__ = ('id_apartado', 'dueno', 'recurso', 'intervalos', 'cantidad', 'vence')
+
+    def __init__(self, id_apartado, dueno, recurso, intervalos, cantidad, vence):
+        self.id_apartado = id_apartado
+        self.dueno = dueno
+        self.recurso = recurso
+        self.intervalos = intervalos
+        self.cantidad = cantidad
+        self.vence = vence
+
+    def choca(self, intervalos):
+        return any(chocan(a, b) for a in self.intervalos for b in intervalos)
+
+    def toca_dias(self, dias):
+        """True si el apartado cuenta en alguno de esos días (sin días o sin intervalos, siempre)."""
+        if not dias or not self.intervalos:
+            return True
+        return any(dia in dias for iv in self.intervalos for dia in dias_de_intervalo(*iv))
+
+
+class GestorApartados:
+    """
+    Apartados vigentes por recurso, con vencimiento automático.
+
+    Todas las operaciones toman el mismo candado: se puede cotizar desde
+    varios hilos a la vez (por ejemplo en el modo servidor).
+    """
+    def __init__(self, ttl=TTL_APARTADO, reloj=time.monotonic):
+        self.ttl = ttl
+        self.reloj = reloj
+        self._apartados = {}    # id -> Apartado
+        self._por_recurso = {}  # (tipo, id) -> {id_apartado}
+        self._por_dueno = {}    # dueño -> {id_apartado}
+        self._vencimientos = []  # montículo de (vence, id_apartado)
+        self._ids = itertools.count(1)
+        self._candado = threading.Condition()
+        self._barrendero = None
+
+    # --- APARTAR / SOLTAR ---
+    def apartar(self, dueno, recurso, fecha=None, h_ini=None, h_fin=None, cantidad=0, stock=None,
+                bloques=None):
+        """
+        Aparta un lugar o trabajador en un horario (fecha, h_ini, h_fin, o varios
+        'bloques' con montaje y sesiones, ver bloques.py) o unas unidades de un
+        item (cantidad, sin pasarse del 'stock' sumando lo apartado; si el item
+        se alquila por horario, solo lo apartado para esos mismos días).
+        No revisa reservas ya confirmadas: eso lo hace quien llama
+        (Repositorio.apartar_*), esto solo evita que dos cotizaciones en curso
+        tomen lo mismo.
+
+        Returns:
+            tuple: (id_apartado, "") o (None, motivo) si choca con el apartado de otro.
+        """
+        if bloques is None:
+            bloques = [crear_bloque(fecha, h_ini, h_fin)] if fecha else []
+        intervalos = intervalos_de(bloques)
+        with self._candado:
+            if stock is None and intervalos and not self._libre(recurso, intervalos, dueno):
+                return None, "Está apartado por otro cliente que está cotizando en este momento."
+            if stock is not None:
+                dias = {dia for iv in intervalos for dia in dias_de_intervalo(*iv)}
+                apartadas = sum(a.cantidad for a in self._vigentes(recurso, self.reloj()) if a.toca_dias(dias))
+                if apartadas + cantidad > stock:
+                    return None, f"Stock insuficiente: quedan {stock - apartadas} sin apartar."
+            id_apartado = next(self._ids)
+            apartado = Apartado(id_apartado, dueno, recurso, intervalos, cantidad, self.reloj() + self.ttl)
+            self._apartados[id_apartado] = apartado
+            self._por_recurso.setdefault(recurso, set()).add(id_apartado)
+            self._por_dueno.setdefault(dueno, set()).add(id_apartado)
+            self._programar(apartado)
+        return id_apartado, ""
+
+    def soltar(self, id_apartado):
+        """Quita un apartado (si ya venció o no existe, no hace nada)."""
+        with self._candado:
+            self._quitar(id_apartado)
+
+    def liberar(self, dueno, tipos=None):
+        """Quita todos los apartados de un dueño (o solo los de esos tipos de recurso)."""
+        with self._candado:
+            for id_apartado in list(self._por_dueno.get(dueno, ())):
+                if tipos is None or self._apartados[id_apartado].recurso[0] in tipos:
+                    self._quitar(id_apartado)
+
+    def renovar(self, dueno):
+        """Vuelve a dar el TTL completo a los apartados de un dueño que sigue cotizando."""
+        with self._candado:
+            vence = self.reloj() + self.ttl
+            for id_apartado in self._por_dueno.get(dueno, ()):
+                apartado = self._apartados[id_apartado]
+                apartado.vence = vence
+                self._programar(apartado)
+
+    # --- CONSULTAS ---
+    def esta_libre(self, recurso, fecha, h_ini, h_fin, dueno=None):
+        """True si ningún apartado vigente de otro dueño choca con ese horario."""
+        return self.bloques_libres(recurso, [crear_bloque(fecha, h_ini, h_fin)], dueno)
+
+    def bloques_libres(self, recurso, bloques, dueno=None):
+        """Como esta_libre, para todos los bloques de una boda (ver bloques.py)."""
+        if recurso not in self._por_recurso:
+            return True
+        intervalos = intervalos_de(bloques)
+        with self._candado:
+            return self._libre(recurso, intervalos, dueno)
+
+    def cantidad_apartada(self, recurso, dueno=None, dias=None):
+        """
+        Unidades de un item apartadas por los demás dueños (apartados vigentes);
+        con 'dias' (ordinales), solo las apartadas para alguno de esos días.
+        """
+        if recurso not in self._por_recurso:
+            return 0
+        ahora = self.reloj()
+        dias = set(dias) if dias else None
+        with self._candado:
+            return sum(a.cantidad for a in self._vigentes(recurso, ahora)
+                       if a.dueno != dueno and a.toca_dias(dias))
+
+    def de_dueno(self, dueno):
+        """Apartados vigentes de un dueño."""
+        ahora = self.reloj()
+        with self._candado:
+            return [self._apartados[i] for i in self._por_dueno.get(dueno, ())
+                    if self._apartados[i].vence > ahora]
+
+    def __len__(self):
+        return len(self._apartados)
+
+    def _libre(self, recurso, intervalos, dueno):
+        return not any(a.dueno != dueno and a.choca(intervalos)
+                       for a in self._vigentes(recurso, self.reloj()))
+
+    def _vigentes(self, recurso, ahora):
+        return [a for a in map(self._apartados.get, self._por_recurso.get(recurso, ()))
+                if a.vence > ahora]
+
+    def _quitar(self, id_apartado):
+        apartado = self._apartados.pop(id_apartado, None)
+        if apartado is None:
+            return
+        # Las entradas del montículo se dejan: el barrendero descarta las que ya no existen
+        for indice, clave in ((self._por_recurso, apartado.recurso), (self._por_dueno, apartado.dueno)):
+            ids = indice[clave]
+            ids.discard(id_apartado)
+            if not ids:
+                del indice[clave]
+
+    # --- BARRENDERO ---
+    def _programar(self, apartado):
+        heapq.heappush(self._vencimientos, (apartado.vence, apartado.id_apartado))
+        if self._barrendero is None:
+            self._barrendero = threading.Thread(target=self._barrer, name="barrendero-apartados",
+                                                daemon=True)
+            self._barrendero.start()
+        elif self._vencimientos[0][1] == apartado.id_apartado:
+            self._candado.notify()  # vence antes que todo lo demás: despertarlo
+
+    def _barrer(self):
+        with self._candado:
+            while True:
+                espera = None
+                while self._vencimientos:
+                    vence, id_apartado = self._vencimientos[0]
+                    apartado = self._apartados.get(id_apartado)
+                    if apartado is None or apartado.vence != vence:
+                        heapq.heappop(self._vencimientos)  # soltado o renovado
+                    elif vence <= self.reloj():
+                        heapq.heappop(self._vencimientos)
+                        self._quitar(id_apartado)
+                    else:
+                        espera = vence - self.reloj()
+                        break
+                self._candado.wait(espera)
@@ -0,0 +1,356 @@
+"""
+API de reservas sin terminal para 'Raquel & Alba'.
+Permite crear bodas desde código o en lote (un archivo JSONL con una
+solicitud por línea, por ejemplo las que manda una agencia asociada),
+pasando por las mismas validaciones que el asistente interactivo.
+
+Formato de una solicitud:
+    {
+        "cliente": {"id_cliente": 2001, "nombre": "Maria Lopez Garcia",
+                    "email": "marialopez@gmail.com", "invitados": 120,
+                    "presupuesto": 30000},
+        "fecha": "15/05/2027", "h_inicio": "14:00", "h_fin": "20:00",
+        "id_lugar": 10,
+        "personal": [100, 106],
+        "items": [{"id_item": 506, "cantidad": 100}, {"id_item": 508, "cantidad": 12}]
+    }
+
+Opcionales, para bodas de varios días o que necesitan armar el salón:
+    "sesiones": [{"fecha": "14/05/2027", "inicio": "20:00", "fin": "23:30"},
+                 {"fecha": "16/05/2027", "inicio": "11:00", "fin": "14:00"}],
+    "montaje": 120, "desmontaje": 60
+El lugar y el personal quedan tomados en todas las sesiones, cada una con el
+montaje y desmontaje (en minutos) de la boda salvo que traiga los suyos.
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import funciones_generales as fg
+from almacenamiento import AlmacenamientoMemoria, ConflictoReserva
+from bloques import bloques_de_cotizacion
+from instrumentacion import contar, medido
+from cotizacion_viva import CotizacionViva
+from modulos import Cliente
+
+# Orden en que se confirman las cotizaciones de un lote cuando compiten por
+# el mismo lugar, personal o stock: por llegada (línea del archivo) o primero
+# las de mayor total (a igual total, la que llegó antes).
+ORDENES_LOTE = ('llegada', 'valor')
+
+# Por debajo de esta cantidad de solicitudes por proceso no vale la pena
+# repartir: el costo de enviar datos a otro proceso supera al de cotizar.
+MIN_POR_PROCESO = 200
+
+
+def _leer_cliente(datos, repo):
+    """Arma el Cliente de la solicitud o devuelve (None, error)."""
+    try:
+        id_cliente = int(datos['id_cliente'])
+        nombre = str(datos['nombre']).strip()
+        correo = str(datos['email']).lower().strip()
+        invitados = int(datos['invitados'])
+        presupuesto = float(datos['presupuesto'])
+    except (KeyError, TypeError, ValueError):
+        return None, "Datos del cliente incompletos o con formato incorrecto."
+
+    error = (fg.validar_id_cliente(id_cliente, repo) or fg.validar_nombre_cliente(nombre)
+             or fg.validar_correo(correo) or fg.validar_invitados(invitados)
+             or fg.validar_presupuesto(presupuesto))
+    if error:
+        return None, error
+    return Cliente(id_cliente, nombre.title(), correo, invitados, presupuesto), ""
+
+
+def _leer_programa(solicitud):
+    """Sesiones extra, montaje y desmontaje de la solicitud: (sesiones, montaje, desmontaje, error)."""
+    montaje, desmontaje = solicitud.get('montaje', 0), solicitud.get('desmontaje', 0)
+    error = fg.validar_montaje(montaje) or fg.validar_montaje(desmontaje)
+    if error:
+        return None, 0, 0, error
+    sesiones = solicitud.get('sesiones') or []
+    if not isinstance(sesiones, list) or len(sesiones) > fg.MAX_SESIONES:
+        return None, 0, 0, f"Las sesiones van en una lista de hasta {fg.MAX_SESIONES}."
+    for sesion in sesiones:
+        error = fg.validar_sesion(sesion)
+        if error:
+            return None, 0, 0, error
+    campos = ('fecha', 'inicio', 'fin', 'fecha_fin', 'montaje', 'desmontaje')
+    sesiones = [{c: s[c] for c in campos if s.get(c) not in (None, '')} for s in sesiones]
+    return sesiones, montaje, desmontaje, ""
+
+
+@medido('cotizacion')
+def cotizar(solicitud, repo, dueno=None):
+    """
+    Valida una solicitud contra el catálogo y arma su cotización, sin reservar nada.
+    Lo apartado por otras cotizaciones en curso cuenta como ocupado (lo del
+    mismo 'dueno', no).
+
+    Returns:
+        tuple: (cotizacion, cliente, "") si todo está bien o (None, None, error).
+    """
+    cliente, error = _leer_cliente(solicitud.get('cliente') or {}, repo)
+    if error:
+        return None, None, error
+
+    # --- FECHA Y HORARIO ---
+    fecha_str = str(solicitud.get('fecha', ''))
+    h_ini = str(solicitud.get('h_inicio', ''))
+    h_fin = str(solicitud.get('h_fin', ''))
+    _, error = fg.validar_fecha_evento(fecha_str)
+    error = error or fg.validar_horario(h_ini, h_fin)
+    if error:
+        return None, None, error
+    sesiones, montaje, desmontaje, error = _leer_programa(solicitud)
+    if error:
+        return None, None, error
+    # Todo lo que la boda ocupa (horario principal y sesiones, con montaje)
+    bloques = bloques_de_cotizacion({'fecha': fecha_str, 'h_inicio': h_ini, 'h_fin': h_fin,
+                                     'sesiones': sesiones, 'montaje': montaje, 'desmontaje': desmontaje})
+
+    # --- LUGAR ---
+    lugar = repo.lugar(solicitud.get('id_lugar'))
+    if lugar is None:
+        return None, None, f"El lugar {solicitud.get('id_lugar')} no existe."
+    if lugar['capacidad'] < cliente.invitados:
+        return None, None, f"'{lugar['nombre']}' no tiene capacidad para {cliente.invitados} invitados."
+    if not repo.lugar_libre(lugar['id_lugar'], fecha_str, h_ini, h_fin, dueno, bloques):
+        return None, None, f"'{lugar['nombre']}' ya está ocupado el {fecha_str} en ese horario."
+    if not fg.can_select_lugar(cliente.presupuesto, lugar['precio']):
+        return None, None, f"PRESUPUESTO INSUFICIENTE. El salón cuesta ${lugar['precio']:,.2f}"
+    cotizacion_viva = CotizacionViva(cliente, fecha_str, h_ini, h_fin, lugar, sesiones, montaje, desmontaje)
+
+    # --- PERSONAL ---
+    for id_p in solicitud.get('personal', []):
+        dict_p = repo.persona(id_p)
+        if dict_p is None:
+            return None, None, f"El trabajador {id_p} no existe."
+        if cotizacion_viva.tiene_persona(id_p):
+            return None, None, f"{dict_p['nombre']} está repetido en el equipo."
+        if not repo.persona_libre(id_p, fecha_str, h_ini, h_fin, dueno, bloques):
+            return None, None, f"{dict_p['nombre']} no está disponible el {fecha_str}."
+        if not cotizacion_viva.alcanza(dict_p['sueldo']):
+            return None, None, f"PRESUPUESTO INSUFICIENTE para contratar a {dict_p['nombre']}."
+        cotizacion_viva.agregar_personal(dict_p)
+
+    # --- INVENTARIO (se suman las líneas repetidas del mismo item) ---
+    cantidades = {}
+    for linea in solicitud.get('items', []):
+        try:
+            id_item, cant = int(linea['id_item']), int(linea['cantidad'])
+        except (KeyError, TypeError, ValueError):
+            return None, None, "Item con formato incorrecto (se espera id_item y cantidad)."
+        if cant <= 0:
+            return None, None, f"La cantidad del item {id_item} debe ser mayor que cero."
+        cantidades[id_item] = cantidades.get(id_item, 0) + cant
+
+    for id_item, cant in cantidades.items():
+        item = repo.item(id_item)
+        if item is None:
+            return None, None, f"El item {id_item} no existe."
+        stock = repo.stock_disponible(id_item, dueno, bloques=bloques)
+        if stock < cant:
+            return None, None, f"Stock insuficiente de '{item['nombre']}' ({stock} disponibles)."
+        if not cotizacion_viva.alcanza(item['precio_unidad'] * cant):
+            return None, None, f"Presupuesto insuficiente para '{item['nombre']}' x{cant}."
+        cotizacion_viva.agregar_item(item, cant)
+
+    # --- VALIDACIONES DE LOGÍSTICA (todas las reglas del asistente de una vez) ---
+    es_valido, mensaje = fg.val_restricc(
+        cotizacion_viva.personal, cotizacion_viva.items, lugar, cliente.invitados, repo.reglas
+    )
+    if not es_valido:
+        return None, None, mensaje
+
+    return cotizacion_viva.como_dict(), cliente, ""
+
+
+@medido('confirmacion')
+def reservar(solicitud, repo, dueno=None):
+    """
+    Valida una solicitud y, si cumple todo, confirma la boda en el repositorio.
+    Si se indica 'dueno', puede usar lo que ese dueño tenía apartado, y sus
+    apartados se sueltan al terminar (se haya guardado o no).
+
+    Returns:
+        dict: {'ok': True, 'cliente', 'fecha', 'total_final'} o {'ok': False, 'error'}.
+    """
+    cotizacion, cliente, error = cotizar(solicitud, repo, dueno)
+    if error:
+        contar('solicitudes.rechazadas')
+        return {'ok': False, 'error': error.strip()}
+
+    cotizacion['estado'] = 'Aprobado'
+    try:
+        repo.confirmar_reserva(cotizacion, cliente.to_dict(), avisar=False)
+    except ConflictoReserva as conflicto:
+        return {'ok': False, 'error': f"Conflicto: {conflicto}", 'conflictos': conflicto.conflictos}
+    finally:
+        if dueno is not None:
+            repo.apartados.liberar(dueno)
+    return {
+        'ok': True,
+        'cliente': cliente.nombre,
+        'fecha': cotizacion['fecha'],
+        'total_final': cotizacion['total_final'],
+    }
+
+
+def verificar_conflictos(cotizacion, cliente, repo):
+    """
+    Revisa una cotización ya armada contra el estado actual del repositorio:
+    lo que cambió desde que se cotizó (otra boda del lote tomó el lugar, el
+    personal, el stock o el ID de cliente). Devuelve "" o el motivo del conflicto.
+    """
+    if repo.existe_cliente(cliente.id_cliente):
+        return f"Conflicto: el ID de cliente {cliente.id_cliente} ya fue registrado."
+    fecha, h_ini, h_fin = cotizacion['fecha'], cotizacion['h_inicio'], cotizacion['h_fin']
+    bloques = bloques_de_cotizacion(cotizacion)
+    if not repo.lugar_libre(cotizacion['id_lugar'], fecha, h_ini, h_fin, bloques=bloques):
+        return f"Conflicto: '{cotizacion['nombre_lugar']}' ya fue reservado para el {fecha}."
+    for p in cotizacion['personal_contratado']:
+        if not repo.persona_libre(p.id_personal, fecha, h_ini, h_fin, bloques=bloques):
+            return f"Conflicto: {p.nombre} ya fue asignado a otra boda el {fecha}."
+    for i in cotizacion['items_pedidos']:
+        if repo.stock_disponible(i.id_item_reserva, bloques=bloques) < i.cantidad_requerida:
+            return f"Conflicto: ya no alcanza el stock de '{i.nombre}'."
+    return ""
+
+
+# --- COTIZACIÓN EN PARALELO ---
+# Cada proceso arma su propio Repositorio de solo lectura una única vez
+# (al arrancar) y luego solo recibe solicitudes y devuelve cotizaciones.
+_repo_proceso = None
+
+
+def _iniciar_proceso(datos):
+    global _repo_proceso
+    from repositorio import Repositorio
+    _repo_proceso = Repositorio(almacenamiento=AlmacenamientoMemoria(datos))
+
+
+def _cotizar_en_proceso(solicitud):
+    return cotizar(solicitud, _repo_proceso)
+
+
+def cotizar_todas(solicitudes, repo, procesos=None):
+    """
+    Cotiza una lista de solicitudes contra una foto del catálogo actual.
+    Con procesos > 1 se reparte en un ProcessPoolExecutor; el resultado es el
+    mismo que cotizando en serie (mismo orden, mismas validaciones).
+
+    Returns:
+        list: Una tupla (cotizacion, cliente, error) por solicitud.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    procesos = min(procesos, len(solicitudes) // MIN_POR_PROCESO)
+    if procesos <= 1:
+        return [cotizar(s, repo) for s in solicitudes]
+
+    # El historial no se copia a los procesos, pero sí el libro de stock ya
+    # armado con él: sin lo que toman las bodas confirmadas, un proceso daría
+    # por libre stock que en serie falta.
+    datos = {'lugares': repo.lugares, 'personal': repo.personal,
+             'inventario': repo.inventario, 'clientes': repo.clientes,
+             'libro_stock': repo.libro}
+    trozo = max(1, len(solicitudes) // (procesos * 4))
+    with ProcessPoolExecutor(procesos, initializer=_iniciar_proceso, initargs=(datos,)) as pool:
+        return list(pool.map(_cotizar_en_proceso, solicitudes, chunksize=trozo))
+
+
+@medido('confirmacion')
+def procesar_lote(lineas, repo, procesos=1, orden='llegada'):
+    """
+    Procesa solicitudes en formato JSONL (una por línea) en dos fases:
+        1. Cotización (validaciones y precios), en paralelo si procesos > 1.
+        2. Confirmación, de a una y en el orden elegido ('llegada' o 'valor'):
+           si dos solicitudes compiten por el mismo recurso gana la primera
+           según ese orden y la otra queda rechazada por conflicto.
+
+    Returns:
+        tuple: (resultados, estadisticas). Cada resultado lleva el número de línea
+        y la lista sale en el orden del archivo.
+    """
+    if orden not in ORDENES_LOTE:
+        raise ValueError(f"Orden desconocido: {orden}")
+    inicio = time.perf_counter()
+
+    resultados = {}
+    solicitudes, numeros = [], []
+    for numero, linea in enumerate(lineas, 1):
+        linea = linea.strip()
+        if not linea:
+            continue
+        try:
+            solicitudes.append(json.loads(linea))
+            numeros.append(numero)
+        except json.JSONDecodeError:
+            resultados[numero] = {'ok': False, 'error': "Línea con JSON inválido.", 'linea': numero}
+
+    cotizadas = cotizar_todas(solicitudes, repo, procesos)
+    fin_cotizacion = time.perf_counter()
+
+    pendientes = []
+    for numero, (cotizacion, cliente, error) in zip(numeros, cotizadas):
+        if error:
+            resultados[numero] = {'ok': False, 'error': error.strip(), 'linea': numero}
+        else:
+            pendientes.append((numero, cotizacion, cliente))
+    if orden == 'valor':
+        pendientes.sort(key=lambda p: (-p[1]['total_final'], p[0]))
+
+    with repo.lote():
+        for numero, cotizacion, cliente in pendientes:
+            error = verificar_conflictos(cotizacion, cliente, repo)
+            if error:
+                resultados[numero] = {'ok': False, 'error': error, 'linea': numero}
+                continue
+            cotizacion['estado'] = 'Aprobado'
+            try:
+                repo.confirmar_reserva(cotizacion, cliente.to_dict(), avisar=False)
+            except ConflictoReserva as conflicto:
+                resultados[numero] = {'ok': False, 'error': f"Conflicto: {conflicto}", 'linea': numero}
+                continue
+            resultados[numero] = {
+                'ok': True, 'cliente': cliente.nombre, 'fecha': cotizacion['fecha'],
+                'total_final': cotizacion['total_final'], 'linea': numero,
+            }
+
+    resultados = [resultados[n] for n in sorted(resultados)]
+    segundos = time.perf_counter() - inicio
+    confirmadas = sum(1 for r in resultados if r['ok'])
+    estadisticas = {
+        'procesadas': len(resultados),
+        'confirmadas': confirmadas,
+        'rechazadas': len(resultados) - confirmadas,
+        'segundos': segundos,
+        'segundos_cotizacion': fin_cotizacion - inicio,
+        'por_segundo': len(resultados) / segundos if segundos > 0 else 0.0,
+    }
+    return resultados, estadisticas
+
+
+def importar_reservas(ruta, repo, ruta_reporte=None, procesos=1, orden='llegada'):
+    """Procesa un archivo JSONL, imprime el resultado de cada línea y las estadísticas."""
+    with open(ruta, 'r', encoding='utf-8') as f:
+        resultados, estadisticas = procesar_lote(f, repo, procesos, orden)
+
+    for r in resultados:
+        if r['ok']:
+            print(f"Línea {r['linea']}: ✅ {r['cliente']} - {r['fecha']} (${r['total_final']:,.2f})")
+        else:
+            print(f"Línea {r['linea']}: ❌ {r['error']}")
+
+    if ruta_reporte:
+        with open(ruta_reporte, 'w', encoding='utf-8') as f:
+            for r in resultados:
+                f.write(json.dumps(r, ensure_ascii=False) + '\n')
+
+    print("-" * 40)
+    print(f"Procesadas: {estadisticas['procesadas']} | Confirmadas: {estadisticas['confirmadas']} "
+          f"| Rechazadas: {estadisticas['rechazadas']}")
+    print(f"Tiempo: {estadisticas['segundos']:.2f}s ({estadisticas['por_segundo']:.1f} solicitudes/s, "
+          f"cotización {estadisticas['segundos_cotizacion']:.2f}s)")
+    return estadisticas
@@ -0,0 +1,319 @@
+"""
+Benchmarks de los caminos calientes del planificador 'Raquel & Alba'.
+Para cada escala genera datos sintéticos (datos_sinteticos.py), mide las
+funciones que usa el asistente en cada paso y una boda completa de punta a
+punta (validar, cotizar y guardar en disco), y deja los resultados en un
+JSON. Con --comparar se contrasta contra una corrida anterior y se marcan
+las rutas que se volvieron más lentas.
+
+Uso: python benchmark.py [--escalas chica mediana] [--salida resultados.json] [--comparar anterior.json]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import api_reservas as api
+import funciones_generales as fg
+import planilla_personal
+from almacenamiento import AlmacenamientoJSON, AlmacenamientoMemoria, AlmacenamientoSQLite
+from datos_sinteticos import escribir_datos, generar_datos
+from modulos import Cliente, ItemReserva, Personal
+from repositorio import Repositorio
+
+# nombre -> (lugares, personal, items, reservas históricas)
+ESCALAS = {
+    'chica': (50, 200, 300, 500),
+    'mediana': (300, 1000, 2000, 5000),
+    'grande': (1000, 5000, 10000, 30000),
+}
+REPETICIONES = 50
+# Una ruta es regresión si su mediana empeora más que esto respecto a la corrida anterior
+UMBRAL_REGRESION = 0.20
+
+
+def _medir(funcion, argumentos, repeticiones):
+    """Corre funcion(*argumentos[i]) 'repeticiones' veces (rotando argumentos) y resume los tiempos."""
+    tiempos = []
+    for n in range(repeticiones):
+        args = argumentos[n % len(argumentos)]
+        inicio = time.perf_counter()
+        funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+    return _resumir(tiempos)
+
+
+def _resumir(tiempos):
+    tiempos = sorted(tiempos)
+    return {
+        'repeticiones': len(tiempos),
+        'mediana_ms': round(statistics.median(tiempos) * 1000, 4),
+        'media_ms': round(statistics.fmean(tiempos) * 1000, 4),
+        'min_ms': round(tiempos[0] * 1000, 4),
+        'p95_ms': round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))] * 1000, 4),
+    }
+
+
+def _consultas(datos, rng, cantidad=20):
+    """Fechas y horarios de prueba: la mitad en días con bodas (ocupación real), la mitad al azar."""
+    ocupadas = [(r['fecha'], r['h_inicio'], r['h_fin']) for r in datos['reservas']]
+    consultas = rng.sample(ocupadas, min(cantidad // 2, len(ocupadas)))
+    anio = datetime.date.today().year + 1
+    while len(consultas) < cantidad:
+        dia = datetime.date(anio, 1, 1) + datetime.timedelta(days=rng.randrange(365))
+        consultas.append((dia.strftime("%d/%m/%Y"), "14:00", "22:00"))
+    return consultas
+
+
+def _boda_de_prueba(repo, rng):
+    """Un equipo y pedido típicos (con sillas, mesas y sonido) para validar y cotizar."""
+    lugar = rng.choice(repo.lugares)
+    personal = [Personal.desde_catalogo(p)
+                for p in (rng.choice(repo.personal_por_categoria(c))
+                          for c in ('fotografia', 'musica', 'seguridad'))]
+    items = []
+    for categoria, cantidad in (('mobiliario', 100), ('catering', 120), ('tecnologia', 1)):
+        item = rng.choice(repo.inventario_por_categoria(categoria))
+        items.append(ItemReserva.desde_catalogo(item, cantidad))
+    return lugar, personal, items
+
+
+def _solicitud(repo, rng, id_cliente, invitados=100):
+    """
+    Arma una solicitud que pasa todas las reglas para una fecha al azar (o None
+    si no encontró lugar libre): sillas y mesas suficientes y seguridad si hay piscina.
+    """
+    anio = datetime.date.today().year + 1
+    for _ in range(20):
+        fecha = (datetime.date(anio, 1, 1) + datetime.timedelta(days=rng.randrange(365))).strftime("%d/%m/%Y")
+        libres = [l for l in repo.lugares
+                  if l['capacidad'] >= invitados and repo.lugar_libre(l['id_lugar'], fecha, "14:00", "22:00")]
+        if libres:
+            break
+    else:
+        return None
+    lugar = rng.choice(libres)
+    personal = [p['id_personal'] for p in repo.personal_disponible('fotografia', fecha, "14:00", "22:00")[:1]]
+    if repo.reglas.etiquetas_lugar(lugar) & {'piscina'}:
+        personal += [p['id_personal'] for p in repo.personal_disponible('seguridad', fecha, "14:00", "22:00")[:1]]
+
+    items = []
+    for palabra, cantidad in (("silla", int(invitados * 0.8)), ("mesa", max(1, invitados // 10))):
+        con_stock = [i for i in repo.inventario_por_categoria('mobiliario')
+                     if palabra in i['nombre'].lower() and repo.stock_disponible(i['id_item'], fecha=fecha) >= cantidad]
+        if not con_stock:
+            return None
+        items.append({'id_item': rng.choice(con_stock)['id_item'], 'cantidad': cantidad})
+
+    nombre = rng.choice(["Maria", "Lucia", "Pablo", "Javier"])
+    return {
+        'cliente': {'id_cliente': id_cliente, 'nombre': f"{nombre} Benchmark Prueba",
+                    'email': f"{nombre.lower()}.prueba{id_cliente}@gmail.com",
+                    'invitados': invitados, 'presupuesto': 500000},
+        'fecha': fecha, 'h_inicio': "14:00", 'h_fin': "22:00", 'id_lugar': lugar['id_lugar'],
+        'personal': personal, 'items': items,
+    }
+
+
+def _solicitudes_planilla(repo, rng, cantidad, dias=4):
+    """
+    Un fin de semana largo cargado: 'cantidad' bodas repartidas en pocos días y
+    horarios que se pisan, cada una con fotografía, música y barman (y seguridad
+    si el lugar tiene piscina, que la agrega la planilla).
+    """
+    anio = datetime.date.today().year + 1
+    fechas = [(datetime.date(anio, 1, 1) + datetime.timedelta(days=rng.randrange(365))).strftime("%d/%m/%Y")
+              for _ in range(dias)]
+    solicitudes = []
+    for n in range(cantidad):
+        h_ini = rng.choice(["11:00", "13:00", "16:00", "19:00"])
+        solicitudes.append({
+            'cliente': {'id_cliente': 20000 + n}, 'fecha': rng.choice(fechas), 'h_inicio': h_ini,
+            'h_fin': f"{int(h_ini[:2]) + 6:02d}:00", 'id_lugar': rng.choice(repo.lugares)['id_lugar'],
+            'roles': ['fotografia', 'musica', 'barman'],
+        })
+    return solicitudes
+
+
+def _medir_bodas(repo, rng, cantidad, primer_id):
+    """
+    Guarda 'cantidad' bodas distintas (validar, cotizar, confirmar y escribir en
+    disco) midiendo solo api.reservar: la solicitud se arma antes, con el stock actual.
+    """
+    tiempos = []
+    for n in range(cantidad):
+        solicitud = _solicitud(repo, rng, primer_id + n)
+        if solicitud is None:
+            continue
+        inicio = time.perf_counter()
+        resultado = api.reservar(solicitud, repo)
+        tiempos.append(time.perf_counter() - inicio)
+        if not resultado['ok']:
+            raise RuntimeError(f"La boda de prueba no se pudo guardar: {resultado['error']}")
+    return _resumir(tiempos)
+
+
+def _primera_consulta(repo, fecha, h_ini, h_fin):
+    return fg.get_lugares_disponibles(fecha, repo.lugares, h_ini, h_fin, 100, repo.indice)
+
+
+def medir_escala(nombre, tamano, repeticiones=REPETICIONES, semilla=0):
+    """Genera los datos de una escala y mide cada camino caliente. Devuelve un dict serializable."""
+    rng = random.Random(semilla)
+    inicio = time.perf_counter()
+    datos = generar_datos(*tamano, semilla=semilla)
+    generacion = time.perf_counter() - inicio
+    repo = Repositorio(almacenamiento=AlmacenamientoMemoria(datos)).precargar()
+    consultas = _consultas(datos, rng)
+    resultados = {}
+
+    # --- DISPONIBILIDAD ---
+    historial = [{'fecha': r['fecha'], 'hora_inicio': r['h_inicio'], 'hora_fin': r['h_fin']}
+                 for r in datos['reservas']]
+    resultados['hay_conflicto_horario'] = _medir(
+        fg.hay_conflicto_horario, [(historial,) + c for c in consultas], repeticiones)
+    resultados['get_lugares_disponibles'] = _medir(
+        fg.get_lugares_disponibles,
+        [(f, repo.lugares, i, e, 100, repo.indice) for f, i, e in consultas], repeticiones)
+    resultados['get_lugares_disponibles_sin_indice'] = _medir(
+        fg.get_lugares_disponibles,
+        [(f, repo.lugares, i, e, 100) for f, i, e in consultas], max(1, repeticiones // 10))
+    categorias = ['fotografia', 'estetica', 'musica', 'barman']
+    resultados['get_personal_disponible'] = _medir(
+        fg.get_personal_disponible,
+        [(categorias[n % 4], repo.personal, f, repo.indice, i, e) for n, (f, i, e) in enumerate(consultas)],
+        repeticiones)
+    resultados['get_personal_disponible_indexado'] = _medir(
+        repo.personal_disponible,
+        [(categorias[n % 4], f, i, e) for n, (f, i, e) in enumerate(consultas)], repeticiones)
+    # Las mismas consultas una y otra vez (como el asistente tras un ID mal tipeado): caché de consultas
+    resultados['lugares_disponibles_repetida'] = _medir(
+        repo.lugares_disponibles, [(f, i, e, 100) for f, i, e in consultas], repeticiones)
+
+    # --- VALIDACIÓN Y COTIZACIÓN ---
+    bodas = [_boda_de_prueba(repo, rng) for _ in range(10)]
+    resultados['val_restricc'] = _medir(
+        fg.val_restricc, [(p, i, l, 100, repo.reglas) for l, p, i in bodas], repeticiones)
+    cliente = Cliente(9999, "Cliente Benchmark", "cliente.benchmark@gmail.com", 100, 500000)
+    resultados['build_cotizacion'] = _medir(
+        fg.build_cotizacion,
+        [(cliente, l, p, i, f, h_i, h_f) for (l, p, i), (f, h_i, h_f) in zip(bodas, consultas)],
+        repeticiones)
+
+    # Planilla de personal de muchas bodas a la vez (flujo de costo mínimo)
+    resultados['planilla_personal'] = _medir(
+        planilla_personal.planificar_personal,
+        [(repo, _solicitudes_planilla(repo, rng, len(repo.lugares) * 2))], max(1, repeticiones // 10))
+
+    # --- PERSISTENCIA Y BODA COMPLETA (en carpetas temporales) ---
+    bodas_disco = max(1, repeticiones // 5)
+    with tempfile.TemporaryDirectory() as carpeta:
+        escribir_datos(datos, carpeta)
+        cargas = max(1, repeticiones // 10)
+        resultados['cargar_json_sin_cache'] = _medir(
+            lambda: Repositorio(almacenamiento=AlmacenamientoJSON(carpeta, cache=False)).precargar(),
+            [()], cargas)
+        Repositorio(almacenamiento=AlmacenamientoJSON(carpeta)).precargar()  # deja la caché armada
+        resultados['cargar_json'] = _medir(
+            lambda: Repositorio(almacenamiento=AlmacenamientoJSON(carpeta)).precargar(), [()], cargas)
+        # Arranque real del asistente: solo lo que pide la primera consulta de lugares
+        f, i, e = consultas[0]
+        resultados['primera_consulta_json'] = _medir(
+            lambda: _primera_consulta(Repositorio(almacenamiento=AlmacenamientoJSON(carpeta)), f, i, e),
+            [()], cargas)
+        # La base SQLite se arma desde los JSON, que ya tienen las bodas del primer backend
+        for backend, primer_id in (('json', 9000), ('sqlite', 9500)):
+            if backend == 'json':
+                almacen = AlmacenamientoJSON(carpeta)
+            else:
+                almacen = AlmacenamientoSQLite(os.path.join(carpeta, "planner.db"), carpeta)
+            repo_disco = Repositorio(almacenamiento=almacen).precargar()
+            resultados[f'boda_completa_{backend}'] = _medir_bodas(repo_disco, rng, bodas_disco, primer_id)
+            if backend == 'sqlite':
+                almacen.cerrar()
+
+    return {
+        'tamano': dict(zip(('lugares', 'personal', 'items', 'reservas'), tamano)),
+        'reservas_generadas': len(datos['reservas']),
+        'generacion_s': round(generacion, 3),
+        'resultados': resultados,
+    }
+
+
+def correr(escalas, repeticiones=REPETICIONES, semilla=0):
+    """Corre las escalas indicadas y devuelve el informe completo."""
+    informe = {
+        'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        'semilla': semilla,
+        'repeticiones': repeticiones,
+        'escalas': {},
+    }
+    for nombre in escalas:
+        print(f"⏱️  Escala '{nombre}' {ESCALAS[nombre]}...")
+        informe['escalas'][nombre] = medir_escala(nombre, ESCALAS[nombre], repeticiones, semilla)
+    return informe
+
+
+def comparar(actual, anterior, umbral=UMBRAL_REGRESION):
+    """
+    Compara la mediana de cada ruta con la de una corrida anterior.
+
+    Returns:
+        tuple: (líneas de texto para mostrar, cantidad de regresiones).
+    """
+    lineas, regresiones = [], 0
+    for escala, datos in actual['escalas'].items():
+        previos = anterior.get('escalas', {}).get(escala, {}).get('resultados', {})
+        for ruta, medida in datos['resultados'].items():
+            if ruta not in previos or not previos[ruta]['mediana_ms']:
+                continue
+            razon = medida['mediana_ms'] / previos[ruta]['mediana_ms']
+            marca = ""
+            if razon > 1 + umbral:
+                marca, regresiones = "  ⚠️ más lento", regresiones + 1
+            elif razon < 1 - umbral:
+                marca = "  ✅ más rápido"
+            lineas.append(f"{escala:<8} {ruta:<36} {previos[ruta]['mediana_ms']:>10.3f} -> "
+                          f"{medida['mediana_ms']:>10.3f} ms  (x{razon:.2f}){marca}")
+    return lineas, regresiones
+
+
+def imprimir_informe(informe):
+    for escala, datos in informe['escalas'].items():
+        print(f"\n=== {escala.upper()} {datos['tamano']} (datos generados en {datos['generacion_s']}s) ===")
+        print(f"{'RUTA':<36} {'MEDIANA ms':>12} {'P95 ms':>12}")
+        for ruta, medida in datos['resultados'].items():
+            print(f"{ruta:<36} {medida['mediana_ms']:>12.3f} {medida['p95_ms']:>12.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks del planificador Raquel & Alba")
+    parser.add_argument('--escalas', nargs='*', choices=list(ESCALAS), default=['chica', 'mediana'])
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--salida', default="resultados_benchmark.json")
+    parser.add_argument('--comparar', help="JSON de una corrida anterior")
+    args = parser.parse_args()
+
+    informe = correr(args.escalas, args.repeticiones, args.semilla)
+    imprimir_informe(informe)
+    with open(args.salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, indent=4, ensure_ascii=False)
+    print(f"\n💾 Resultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            lineas, regresiones = comparar(informe, json.load(f))
+        print("\n=== COMPARACIÓN CON LA CORRIDA ANTERIOR ===")
+        print("\n".join(lineas) or "No hay rutas en común para comparar.")
+        if regresiones:
+            print(f"\n⚠️ {regresiones} ruta(s) más lentas que la corrida anterior.")
+            sys.exit(1)
@@ -0,0 +1,241 @@
+"""
+Modelo único de bloques horarios del planificador 'Raquel & Alba'.
+Todo horario ocupado (la boda, la cena de ensayo del día anterior, el brunch
+del día siguiente, un apartado) se lleva a un intervalo [inicio, fin) en
+minutos contados desde el 01/01/2000 ("minutos de época"). Con eso, cruzar la
+medianoche, los eventos de varios días y los tiempos de montaje y desmontaje
+son la misma cuenta, y ver si dos horarios chocan es comparar enteros: las
+fechas y horas se interpretan una sola vez, al armar el intervalo.
+
+En los JSON los bloques se siguen guardando legibles, como siempre:
+    {"fecha": "15/05/2027", "inicio": "18:00", "fin": "02:00"}
+con estas llaves opcionales (solo se escriben si se usan):
+    "fecha_fin": "17/05/2027"            el bloque termina ese día a la hora 'fin'
+    "montaje": 120, "desmontaje": 60     minutos antes y después en que el
+                                         recurso también queda tomado
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from functools import lru_cache
+
+FORMATO_FECHA = "%d/%m/%Y"
+MINUTOS_DIA = 24 * 60
+# Día (ordinal) desde el que se cuentan los minutos de época
+EPOCA = date(2000, 1, 1).toordinal()
+
+
+def hora_a_minutos(hora):
+    """Convierte 'HH:MM' en minutos desde la medianoche (ej: '17:30' -> 1050)."""
+    horas, minutos = hora.split(":")
+    return int(horas) * 60 + int(minutos)
+
+
+@lru_cache(maxsize=4096)
+def fecha_a_dia(fecha_str):
+    """Convierte 'DD/MM/AAAA' en un número de día (ordinal) para poder sumar días."""
+    return datetime.strptime(fecha_str, FORMATO_FECHA).toordinal()
+
+
+def minuto_epoca(dia, minutos=0):
+    """Minutos de época del día ordinal 'dia' a esa hora (en minutos desde la medianoche)."""
+    return (dia - EPOCA) * MINUTOS_DIA + minutos
+
+
+def dia_de_minuto(minuto):
+    """Día ordinal al que pertenece un minuto de época."""
+    return EPOCA + minuto // MINUTOS_DIA
+
+
+def intervalo(fecha, h_ini, h_fin, fecha_fin=None, montaje=0, desmontaje=0):
+    """
+    Intervalo (inicio, fin) en minutos de época de un horario, ya con el
+    montaje y el desmontaje. Sin 'fecha_fin', una hora de fin menor o igual a
+    la de inicio cruza la medianoche (ej: 22:00-02:00).
+
+    Raises:
+        ValueError: Fecha u hora mal escrita, o 'fecha_fin' que termina antes de empezar.
+    """
+    dia = fecha_a_dia(fecha)
+    inicio = minuto_epoca(dia, hora_a_minutos(h_ini))
+    if fecha_fin:
+        fin = minuto_epoca(fecha_a_dia(fecha_fin), hora_a_minutos(h_fin))
+        if fin <= inicio:
+            raise ValueError(f"El bloque del {fecha} termina antes de empezar.")
+    else:
+        fin = minuto_epoca(dia, hora_a_minutos(h_fin))
+        if fin <= inicio:
+            fin += MINUTOS_DIA
+    return inicio - montaje, fin + desmontaje
+
+
+def intervalo_de_bloque(bloque):
+    """
+    Intervalo de un bloque tal como está guardado (None si no tiene fecha).
+    Acepta las llaves 'inicio'/'fin' (las que escribe procesar_confirmacion_boda),
+    las antiguas 'hora_inicio'/'hora_fin', las de una reserva ('h_inicio'/'h_fin')
+    y también una fecha suelta o un bloque sin horas (días completos).
+    """
+    if isinstance(bloque, str):
+        inicio = minuto_epoca(fecha_a_dia(bloque))
+        return inicio, inicio + MINUTOS_DIA
+    if not isinstance(bloque, dict) or not bloque.get('fecha'):
+        return None
+
+    h_ini = bloque.get('inicio', bloque.get('hora_inicio', bloque.get('h_inicio')))
+    h_fin = bloque.get('fin', bloque.get('hora_fin', bloque.get('h_fin')))
+    montaje = int(bloque.get('montaje') or 0)
+    desmontaje = int(bloque.get('desmontaje') or 0)
+    if not h_ini or not h_fin:
+        inicio = minuto_epoca(fecha_a_dia(bloque['fecha']))
+        fin = minuto_epoca(fecha_a_dia(bloque.get('fecha_fin') or bloque['fecha']) + 1)
+        return inicio - montaje, fin + desmontaje
+    return intervalo(bloque['fecha'], h_ini, h_fin, bloque.get('fecha_fin'), montaje, desmontaje)
+
+
+def crear_bloque(fecha, inicio, fin, fecha_fin=None, montaje=0, desmontaje=0):
+    """Bloque con el formato de los JSON (las llaves opcionales solo si se usan)."""
+    bloque = {"fecha": fecha, "inicio": inicio, "fin": fin}
+    if fecha_fin:
+        bloque["fecha_fin"] = fecha_fin
+    if montaje:
+        bloque["montaje"] = montaje
+    if desmontaje:
+        bloque["desmontaje"] = desmontaje
+    return bloque
+
+
+def bloques_de_cotizacion(cotizacion):
+    """
+    Bloques que ocupa una boda (lugar y personal): el horario principal más
+    sus 'sesiones' (cena de ensayo, brunch...). Cada uno lleva el montaje y
+    desmontaje de la boda, salvo que la sesión traiga los suyos.
+    """
+    montaje = cotizacion.get('montaje', 0)
+    desmontaje = cotizacion.get('desmontaje', 0)
+    bloques = [crear_bloque(cotizacion['fecha'], cotizacion['h_inicio'], cotizacion['h_fin'],
+                            montaje=montaje, desmontaje=desmontaje)]
+    for sesion in cotizacion.get('sesiones', ()):
+        bloques.append(crear_bloque(sesion['fecha'], sesion['inicio'], sesion['fin'], sesion.get('fecha_fin'),
+                                    sesion.get('montaje', montaje), sesion.get('desmontaje', desmontaje)))
+    return bloques
+
+
+def intervalos_de(bloques):
+    """Intervalos de una lista de bloques (los que no tienen fecha se ignoran)."""
+    return [iv for iv in map(intervalo_de_bloque, bloques) if iv is not None]
+
+
+def dias_de_intervalo(inicio, fin):
+    """Días ordinales que toca el intervalo [inicio, fin)."""
+    return range(dia_de_minuto(inicio), dia_de_minuto(fin - 1) + 1)
+
+
+def chocan(a, b):
+    """True si dos intervalos (inicio, fin) se pisan (tocarse en un extremo no cuenta)."""
+    return a[0] < b[1] and b[0] < a[1]
+
+
+class Agenda:
+    """
+    Intervalos ocupados de un recurso, en arrays de enteros de 32 bits.
+
+    Atributos:
+        _ini_crudos, _fin_crudos (array): Los intervalos tal como se agregaron,
+            ordenados por inicio (aunque se pisen: ver intervalos()).
+        _inicios, _fines (array): Cobertura: los mismos intervalos fusionados
+            y ordenados, sin solaparse. Es lo que se consulta con bisect.
+        _desordenada (bool): Hubo agregar(rearmar=False) sin su rearmar().
+    """
+    __slots__ = ('_ini_crudos', '_fin_crudos', '_inicios', '_fines', '_desordenada')
+
+    def __init__(self):
+        self._ini_crudos = array('i')
+        self._fin_crudos = array('i')
+        self._inicios = array('i')
+        self._fines = array('i')
+        self._desordenada = False
+
+    def agregar(self, inicio, fin, rearmar=True):
+        """
+        Suma un intervalo: se inserta en orden y solo se fusiona con los
+        tramos de la cobertura que toca. Con rearmar=False (carga en lote) se
+        agrega al final y se ordena todo junto en un rearmar() final.
+        """
+        if not rearmar:
+            self._ini_crudos.append(inicio)
+            self._fin_crudos.append(fin)
+            self._desordenada = True
+            return
+        if self._desordenada:
+            self.rearmar()
+        pos = bisect_right(self._ini_crudos, inicio)
+        self._ini_crudos.insert(pos, inicio)
+        self._fin_crudos.insert(pos, fin)
+        # Tramos que se pisan o se tocan con [inicio, fin]: de 'primero' a 'ultimo' - 1
+        inicios, fines = self._inicios, self._fines
+        primero = bisect_left(fines, inicio)
+        ultimo = bisect_right(inicios, fin)
+        if primero < ultimo:
+            inicio = min(inicio, inicios[primero])
+            fin = max(fin, fines[ultimo - 1])
+        inicios[primero:ultimo] = array('i', (inicio,))
+        fines[primero:ultimo] = array('i', (fin,))
+
+    def rearmar(self):
+        """Ordena los intervalos crudos y vuelve a fusionar toda la cobertura."""
+        pares = sorted(zip(self._ini_crudos, self._fin_crudos))
+        self._ini_crudos = array('i', (inicio for inicio, _ in pares))
+        self._fin_crudos = array('i', (fin for _, fin in pares))
+        self._inicios, self._fines = _fusionar(self._ini_crudos, self._fin_crudos)
+        self._desordenada = False
+
+    def choca(self, inicio, fin):
+        """True si [inicio, fin) pisa algo ocupado."""
+        # Último tramo que empieza antes de que termine el pedido: como la
+        # cobertura no se solapa, es el único que puede seguir abierto.
+        pos = bisect_left(self._inicios, fin)
+        return pos > 0 and self._fines[pos - 1] > inicio
+
+    def desfases_libres(self, inicio, fin, paso, ultimo, cuantos):
+        """
+        Los primeros 'cuantos' k de 1..ultimo en que [inicio + k*paso, fin + k*paso)
+        no choca, en una sola pasada por la cobertura: cada tramo (s, e) tapa
+        los k con (s - fin)/paso < k < (e - inicio)/paso, y los libres son los
+        huecos entre esos rangos.
+        """
+        inicios, fines = self._inicios, self._fines
+        libres = []
+        siguiente = 1  # primer k que ningún tramo anterior tapa
+        pos = bisect_right(fines, inicio + paso)  # los tramos que terminan antes no tapan nada
+        while pos < len(inicios) and siguiente <= ultimo:
+            primero_tapado = (inicios[pos] - fin) // paso + 1
+            if primero_tapado > ultimo:
+                break
+            for k in range(siguiente, primero_tapado):
+                libres.append(k)
+                if len(libres) == cuantos:
+                    return libres
+            siguiente = max(siguiente, -((inicio - fines[pos]) // paso))
+            pos += 1
+        libres.extend(range(siguiente, min(ultimo, siguiente + cuantos - len(libres) - 1) + 1))
+        return libres
+
+    def intervalos(self):
+        """Los intervalos agregados, en orden."""
+        return sorted(zip(self._ini_crudos, self._fin_crudos))
+
+    def __len__(self):
+        return len(self._ini_crudos)
+
+
+def _fusionar(inicios_crudos, fines_crudos):
+    """Cobertura (inicios, fines) de intervalos ordenados por inicio; los que se tocan se unen."""
+    inicios, fines = array('i'), array('i')
+    for inicio, fin in zip(inicios_crudos, fines_crudos):
+        if fines and inicio <= fines[-1]:
+            fines[-1] = max(fines[-1], fin)
+        else:
+            inicios.append(inicio)
+            fines.append(fin)
+    return inicios, fines
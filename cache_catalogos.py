@@ -0,0 +1,119 @@
+"""
+Caché binaria de los catálogos del planificador 'Raquel & Alba'.
+Interpretar los JSON (y el diario de reservas) es lo más lento de arrancar
+con catálogos grandes. La primera vez que se lee una colección se guarda ya
+interpretada con pickle en data/.cache/<nombre>.pickle, junto con la firma
+del archivo de origen (fecha de modificación, tamaño e inodo). Las corridas
+siguientes cargan el pickle directamente mientras la firma coincida; si el
+JSON cambió (otra sesión, una edición a mano) la copia se descarta sola y se
+vuelve a armar.
+
+Lo mismo vale para lo que se arma a partir de varios archivos (el índice de
+disponibilidad sale de lugares.json y personal.json): la copia guarda la
+firma de todos y se usa solo si ninguno cambió.
+
+La carpeta .cache es local y la escribe el propio programa: nunca se
+comparte ni se copia de otro lado (pickle ejecuta código al cargar).
+"""
+import gc
+import os
+import pickle
+
+from instrumentacion import contar
+
+CARPETA_CACHE = '.cache'
+# Forma de lo guardado: se sube cuando cambian las clases que van en la caché
+# (ej: el índice de disponibilidad), así las copias viejas se descartan solas
+FORMATO = 4
+
+
+def firma(ruta):
+    """(mtime_ns, tamaño, inodo) del archivo, o None si no existe."""
+    try:
+        estado = os.stat(ruta)
+    except FileNotFoundError:
+        return None
+    return (estado.st_mtime_ns, estado.st_size, estado.st_ino)
+
+
+def firma_de(origen):
+    """Firma de una ruta o de una tupla de rutas (None si falta alguna)."""
+    if isinstance(origen, str):
+        return firma(origen)
+    firmas = tuple(firma(ruta) for ruta in origen)
+    return None if None in firmas else firmas
+
+
+def _cargar_pickle(archivo):
+    # Cargar crea cientos de miles de listas y tuplas que viven toda la sesión:
+    # con el recolector pausado no las recorre una y otra vez mientras aparecen
+    estaba_activo = gc.isenabled()
+    gc.disable()
+    try:
+        return pickle.load(archivo)
+    finally:
+        if estaba_activo:
+            gc.enable()
+
+
+class CacheCatalogos:
+    """
+    Copias pickle de colecciones ya interpretadas, una por archivo de origen.
+
+    Atributos:
+        carpeta (str): Donde se guardan los .pickle (data/.cache).
+        activa (bool): False la desactiva (se lee siempre el JSON).
+    """
+    def __init__(self, carpeta_datos='data', activa=True):
+        self.carpeta = os.path.join(carpeta_datos, CARPETA_CACHE)
+        self.activa = activa
+
+    def ruta(self, nombre):
+        return os.path.join(self.carpeta, f"{nombre}.pickle")
+
+    def leer(self, nombre, ruta_origen, interpretar):
+        """
+        Devuelve la colección 'nombre': desde la caché si sigue vigente para
+        'ruta_origen' (una ruta o una tupla de rutas) o, si no, llamando a
+        interpretar() y guardando el resultado.
+        """
+        actual = firma_de(ruta_origen)
+        if self.activa and actual is not None:
+            try:
+                with open(self.ruta(nombre), 'rb') as f:
+                    guardada, datos = _cargar_pickle(f)
+                if guardada == (FORMATO, actual):
+                    contar('cache.aciertos')
+                    return datos
+            except (OSError, EOFError, ValueError, pickle.UnpicklingError, AttributeError, ImportError):
+                pass  # no hay copia o quedó dañada: se vuelve a armar
+        contar('cache.fallos')
+        datos = interpretar()
+        # Si el archivo cambió mientras se leía, no se sabe qué versión quedó: no se guarda
+        if actual is not None and firma_de(ruta_origen) == actual:
+            self._escribir(nombre, actual, datos)
+        return datos
+
+    def guardar(self, nombre, ruta_origen, datos):
+        """Guarda 'datos' como la versión vigente de 'ruta_origen' (ej: recién escrita)."""
+        actual = firma_de(ruta_origen)
+        if actual is not None:
+            self._escribir(nombre, actual, datos)
+
+    def _escribir(self, nombre, actual, datos):
+        if not self.activa:
+            return
+        temporal = f"{self.ruta(nombre)}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.carpeta, exist_ok=True)
+            with open(temporal, 'wb') as f:
+                pickle.dump(((FORMATO, actual), datos), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporal, self.ruta(nombre))
+        except OSError:
+            pass  # sin permiso de escritura: se sigue sin caché
+
+    def invalidar(self, nombre):
+        try:
+            os.remove(self.ruta(nombre))
+        except FileNotFoundError:
+            pass
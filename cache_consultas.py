@@ -0,0 +1,95 @@
+"""
+Caché de consultas de disponibilidad del planificador 'Raquel & Alba'.
+El asistente vuelve a pedir los salones libres en cada vuelta del paso del
+lugar (incluso después de un ID mal tipeado) y el personal libre de un mismo
+oficio y fecha en cada vuelta de la contratación. Acá se recuerdan esas
+respuestas, con las más viejas saliendo primero (LRU) cuando se llena.
+
+Cada respuesta anota los días de los que depende. Al confirmar una
+boda solo se descartan las que ese cambio puede alterar: las de lugares con
+capacidad para ese salón y las del oficio de ese trabajador, y en ambos casos
+solo si incluyen el día tocado. Los apartados no se guardan en la caché (dependen
+de quién pregunta y vencen con el reloj): se descuentan después, sobre la
+respuesta recordada, que es corta.
+"""
+from collections import OrderedDict
+
+from instrumentacion import contar
+
+# Respuestas que se recuerdan como máximo
+MAX_CONSULTAS = 256
+
+
+class CacheConsultas:
+    """
+    Respuestas recientes de disponibilidad con desalojo LRU.
+
+    Las llaves son tuplas que empiezan con el tipo de consulta:
+        (LUGARES, fecha, h_ini, h_fin, invitados, horizonte, criterio)
+        (PERSONAL, categoria, fecha, h_ini, h_fin)
+    """
+    LUGARES = "lugares"
+    PERSONAL = "personal"
+
+    def __init__(self, maximo=MAX_CONSULTAS):
+        self.maximo = maximo
+        self._entradas = OrderedDict()  # llave -> (respuesta, primer_dia, ultimo_dia)
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.invalidadas = 0
+
+    def obtener(self, llave, calcular, primer_dia, ultimo_dia):
+        """
+        Devuelve la respuesta recordada para 'llave' o la calcula con calcular()
+        y la guarda, anotando que depende de los días [primer_dia, ultimo_dia].
+        """
+        entrada = self._entradas.get(llave)
+        if entrada is not None:
+            self._entradas.move_to_end(llave)
+            self.aciertos += 1
+            contar('consultas.aciertos')
+            return entrada[0]
+        self.fallos += 1
+        contar('consultas.fallos')
+        respuesta = calcular()
+        self._entradas[llave] = (respuesta, primer_dia, ultimo_dia)
+        if len(self._entradas) > self.maximo:
+            self._entradas.popitem(last=False)
+            self.desalojos += 1
+        return respuesta
+
+    def invalidar_lugar(self, capacidad, dias):
+        """Un salón con esa capacidad cambió en esos días (ordinales)."""
+        self._invalidar(lambda llave: llave[0] == self.LUGARES and llave[4] <= capacidad, dias)
+
+    def invalidar_personal(self, categoria, dias):
+        """
+        Un trabajador de esa categoría (normalizada) cambió en esos días. También
+        caen las búsquedas parciales que la incluyen (ej: 'foto' -> 'fotografia').
+        """
+        self._invalidar(lambda llave: llave[0] == self.PERSONAL and llave[1] in categoria, dias)
+
+    def _invalidar(self, afecta, dias):
+        viejas = [llave for llave, (_, primero, ultimo) in self._entradas.items()
+                  if afecta(llave) and any(primero <= d <= ultimo for d in dias)]
+        for llave in viejas:
+            del self._entradas[llave]
+        self.invalidadas += len(viejas)
+        contar('consultas.invalidadas', len(viejas))
+
+    def limpiar(self):
+        """Olvida todas las respuestas (ej: al recargar los datos); las estadísticas siguen."""
+        self._entradas.clear()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            'entradas': len(self._entradas), 'maximo': self.maximo,
+            'aciertos': self.aciertos, 'fallos': self.fallos,
+            'tasa_aciertos': round(self.aciertos / consultas, 3) if consultas else 0.0,
+            'desalojos': self.desalojos, 'invalidadas': self.invalidadas,
+        }
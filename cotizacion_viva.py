@@ -0,0 +1,248 @@
+"""
+Cotización viva del planificador 'Raquel & Alba'.
+Es la única fuente de precios: el asistente, build_cotizacion, el ticket y
+el optimizador calculan subtotal, comisión, impuestos y total con las tasas
+de acá. La cotización mantiene el subtotal al día a medida que se agregan,
+quitan o cambian lugar, personal e items (cada cambio es O(1), sin volver a
+sumar todo), y anota cada cambio en un registro para poder deshacer una
+ronda entera (por ejemplo una categoría que no cumplió las reglas) o probar
+variantes ("¿y si cambio el DJ por la banda?") sin copiar nada.
+"""
+from contextlib import contextmanager
+
+from modulos import ItemReserva, Personal
+
+# Comisión de Raquel & Alba sobre el subtotal
+COMISION = 0.10
+# Impuestos sobre el subtotal (0: los precios del catálogo ya los incluyen)
+IMPUESTOS = 0.0
+
+
+def totales(subtotal):
+    """
+    Returns:
+        tuple: (comision, impuestos, total) de un subtotal con las tasas vigentes.
+    """
+    comision = subtotal * COMISION
+    impuestos = subtotal * IMPUESTOS
+    return comision, impuestos, subtotal + comision + impuestos
+
+
+class CotizacionViva:
+    """
+    Cotización en armado con sus totales siempre al día.
+
+    Atributos:
+        cliente (Cliente): Quien contrata (su presupuesto define el restante).
+        lugar (dict): Lugar elegido (registro de lugares.json) o None.
+        subtotal (float): Lugar + sueldos + items, sin comisión ni impuestos.
+        sesiones (list): Bloques extra de la boda (cena de ensayo, brunch...), ver bloques.py.
+        montaje, desmontaje (int): Minutos antes y después de cada bloque en que
+            lugar y personal también quedan tomados.
+    """
+    __slots__ = ('cliente', 'fecha', 'h_inicio', 'h_fin', 'sesiones', 'montaje', 'desmontaje',
+                 'lugar', 'subtotal', '_personal', '_items', '_registro', '_rondas')
+
+    def __init__(self, cliente, fecha, h_inicio, h_fin, lugar=None, sesiones=(), montaje=0, desmontaje=0):
+        self.cliente = cliente
+        self.fecha = fecha
+        self.h_inicio = h_inicio
+        self.h_fin = h_fin
+        self.sesiones = list(sesiones)
+        self.montaje = montaje
+        self.desmontaje = desmontaje
+        self.lugar = None
+        self.subtotal = 0.0
+        self._personal = {}  # id_personal -> Personal (en orden de contratación)
+        self._items = {}     # id_item -> ItemReserva (las líneas del mismo item se suman)
+        self._registro = []  # (diccionario o None, clave, valor anterior, subtotal anterior)
+        self._rondas = []    # posición del registro donde empezó cada ronda abierta
+        if lugar is not None:
+            self.poner_lugar(lugar)
+
+    # --- TOTALES ---
+    @property
+    def comision(self):
+        return self.subtotal * COMISION
+
+    @property
+    def impuestos(self):
+        return self.subtotal * IMPUESTOS
+
+    @property
+    def total(self):
+        return totales(self.subtotal)[2]
+
+    @property
+    def restante(self):
+        """Presupuesto del cliente que queda sin gastar (sobre el subtotal)."""
+        return self.cliente.presupuesto - self.subtotal
+
+    def alcanza(self, costo):
+        return costo <= self.restante
+
+    @property
+    def personal(self):
+        return list(self._personal.values())
+
+    @property
+    def items(self):
+        return list(self._items.values())
+
+    def tiene_persona(self, id_personal):
+        return id_personal in self._personal
+
+    # --- CAMBIOS (todos O(1)) ---
+    def poner_lugar(self, lugar):
+        """Elige (o cambia) el lugar; None lo quita."""
+        anterior = self.lugar
+        self._anotar(None, 'lugar', anterior)
+        self.subtotal += (lugar['precio'] if lugar else 0) - (anterior['precio'] if anterior else 0)
+        self.lugar = lugar
+
+    def agregar_personal(self, persona):
+        """Agrega un trabajador (Personal o registro de personal.json); si ya estaba no hace nada."""
+        if isinstance(persona, dict):
+            persona = Personal.desde_catalogo(persona)
+        if persona.id_personal in self._personal:
+            return
+        self._poner(self._personal, persona.id_personal, persona, persona.sueldo)
+
+    def quitar_personal(self, id_personal):
+        persona = self._personal.get(id_personal)
+        if persona is not None:
+            self._poner(self._personal, id_personal, None, -persona.sueldo)
+
+    def agregar_item(self, item, cantidad=None):
+        """
+        Agrega unidades de un item (ItemReserva, o registro de inventario.json
+        más la cantidad). Si el item ya estaba, se suman a esa línea.
+        """
+        if isinstance(item, dict):
+            item = ItemReserva.desde_catalogo(item, cantidad)
+        actual = self._items.get(item.id_item_reserva)
+        if actual is not None:
+            self.cambiar_cantidad(item.id_item_reserva, actual.cantidad_requerida + item.cantidad_requerida)
+            return
+        self._poner(self._items, item.id_item_reserva, item, item.calcular_subtotal())
+
+    def cambiar_cantidad(self, id_item, cantidad):
+        """Cambia las unidades de una línea (0 la quita)."""
+        actual = self._items[id_item]
+        if cantidad <= 0:
+            self.quitar_item(id_item)
+            return
+        nuevo = ItemReserva(id_item, actual.nombre, actual.precio_unidad, cantidad)
+        self._poner(self._items, id_item, nuevo, nuevo.calcular_subtotal() - actual.calcular_subtotal())
+
+    def quitar_item(self, id_item):
+        actual = self._items.get(id_item)
+        if actual is not None:
+            self._poner(self._items, id_item, None, -actual.calcular_subtotal())
+
+    def _poner(self, diccionario, clave, valor, diferencia):
+        self._anotar(diccionario, clave, diccionario.get(clave))
+        if valor is None:
+            del diccionario[clave]
+        else:
+            # Las líneas que cambian de cantidad conservan su lugar en el orden
+            diccionario[clave] = valor
+        self.subtotal += diferencia
+
+    def _anotar(self, diccionario, clave, anterior):
+        if self._rondas:
+            self._registro.append((diccionario, clave, anterior, self.subtotal))
+
+    # --- RONDAS (deshacer) ---
+    def iniciar_ronda(self):
+        """Desde acá, los cambios se pueden deshacer juntos. Las rondas se pueden anidar."""
+        self._rondas.append(len(self._registro))
+
+    def cerrar_ronda(self):
+        """Da por buenos los cambios de la ronda (quedan en la ronda de afuera, si hay)."""
+        inicio = self._rondas.pop()
+        if not self._rondas:
+            del self._registro[inicio:]
+
+    def deshacer_ronda(self):
+        """Vuelve todo (y el subtotal exacto) a como estaba al iniciar la ronda."""
+        inicio = self._rondas.pop()
+        while len(self._registro) > inicio:
+            diccionario, clave, anterior, subtotal = self._registro.pop()
+            if diccionario is None:
+                self.lugar = anterior
+            elif anterior is None:
+                del diccionario[clave]
+            else:
+                diccionario[clave] = anterior
+            self.subtotal = subtotal
+
+    @contextmanager
+    def ronda(self):
+        """with cot.ronda(): ... — se cierra si termina bien y se deshace si hay una excepción."""
+        self.iniciar_ronda()
+        try:
+            yield self
+        except BaseException:
+            self.deshacer_ronda()
+            raise
+        self.cerrar_ronda()
+
+    # --- VARIANTES ---
+    def probar(self, cambio):
+        """
+        Aplica 'cambio' (función que recibe la cotización), toma el resumen y
+        lo deshace: la cotización queda exactamente como estaba.
+        """
+        self.iniciar_ronda()
+        try:
+            cambio(self)
+            return self.resumen()
+        finally:
+            self.deshacer_ronda()
+
+    def comparar(self, variantes):
+        """
+        Args:
+            variantes (dict): nombre -> función que modifica la cotización.
+
+        Returns:
+            dict: nombre -> resumen, más 'actual' con la cotización sin cambios.
+        """
+        resultado = {'actual': self.resumen()}
+        for nombre, cambio in variantes.items():
+            resultado[nombre] = self.probar(cambio)
+        return resultado
+
+    def resumen(self):
+        comision, impuestos, total = totales(self.subtotal)
+        return {'subtotal': self.subtotal, 'comision': comision, 'impuestos': impuestos,
+                'total_final': total, 'restante': self.restante}
+
+    # --- SALIDA ---
+    def como_dict(self):
+        """La cotización con el formato de siempre (la que guarda el historial)."""
+        comision, impuestos, total = totales(self.subtotal)
+        cotizacion = {
+            'id_lugar': self.lugar['id_lugar'],
+            'nombre_lugar': self.lugar['nombre'],
+            'cliente': self.cliente.nombre,
+            'fecha': self.fecha,
+            'h_inicio': self.h_inicio,
+            'h_fin': self.h_fin,
+            'personal_contratado': self.personal,
+            'items_pedidos': self.items,
+            'subtotal': self.subtotal,
+            'comision': comision,
+            'impuestos': impuestos,
+            'total_final': total,
+            'estado': 'Pendiente',
+        }
+        # Solo las bodas que los usan llevan sesiones y montaje (el resto queda como siempre)
+        if self.sesiones:
+            cotizacion['sesiones'] = [dict(s) for s in self.sesiones]
+        if self.montaje:
+            cotizacion['montaje'] = self.montaje
+        if self.desmontaje:
+            cotizacion['desmontaje'] = self.desmontaje
+        return cotizacion
@@ -0,0 +1,225 @@
+"""
+Generador de datos sintéticos para 'Raquel & Alba'.
+Arma catálogos del tamaño que se pida (lugares, personal, inventario) con
+los mismos oficios y categorías que los datos reales, y un historial de
+bodas pasadas repartidas como en la realidad: sobre todo sábados, más en
+primavera y verano, de tarde, y algunas que cruzan la medianoche. Cada boda
+del historial deja sus bloques ocupados en el lugar y el personal, así las
+consultas de disponibilidad trabajan con una ocupación creíble.
+
+Uso: python datos_sinteticos.py carpeta [--lugares N] [--personal M] [--items K] [--reservas R]
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+
+from cotizacion_viva import totales
+from disponibilidad import LUGAR, PERSONAL, IndiceDisponibilidad
+from libro_stock import CONSUMIBLE, tipo_de
+
+# categoría -> oficios (los de data/personal.json)
+OFICIOS = {
+    'fotografia': ["Fotografa", "Fotografo de Bodas"],
+    'planificador': ["Planificadora", "Wedding Planner"],
+    'estetica': ["Maquillaje y Peinado"],
+    'musica': ["DJ / Animador de Eventos", "Agrupacion Musical de Jazz",
+               "Banda de Versatilidad / Rock", "Musica Regional / Mariachi"],
+    'oficiante': ["Maestro de Ceremonias"],
+    'flores': ["Maestro Florista y Paisajista", "Diseñador de Centros y Ramos"],
+    'iluminacion': ["Técnico de Iluminación Ambiental (Arquitectural)"],
+    'barman': ["Sommelier / Barman especializado"],
+    'seguridad': ["Seguridad y Valet Parking"],
+}
+EXPERIENCIAS = ["Alta (Senior)", "Media", "Junior"]
+
+# categoría -> (nombre, precio mínimo, precio máximo)
+ITEMS = {
+    'catering': [("Banquete de Gala", 60, 120), ("Estacion de Quesos", 25, 45), ("Menu Vegetariano", 40, 80)],
+    'bebida': [("Vino Tinto Reserva", 12, 30), ("Champagne Brut", 35, 60), ("Barra Libre Cocteleria", 20, 45)],
+    'postre': [("Pastel de Bodas", 300, 600), ("Mesa de Dulces", 10, 25), ("Estacion de Crepas", 15, 30)],
+    'mobiliario': [("Sillas Tiffany", 3, 8), ("Mesas Redondas", 30, 60), ("Vajilla Porcelana", 5, 10)],
+    'tecnologia': [("Equipo de Sonido Profesional", 200, 500), ("Proyector + Pantalla", 60, 120)],
+    'decoracion': [("Centros de Mesa de Flores", 30, 70), ("Guirnalda de Luces LED", 25, 50),
+                   ("Arco de Flores Naturales", 250, 450), ("Lamparas Colgantes Vintage", 20, 40)],
+}
+SERVICIOS = ["Estacionamiento", "Aire acondicionado central", "Pergola de ceremonias", "Jardin",
+             "Terraza", "Suite nupcial", "Piscina climatizada", "Pista de baile"]
+PREFIJOS_LUGAR = ["Hacienda", "Jardin", "Salon", "Quinta", "Casona", "Finca", "Terraza"]
+NOMBRES = ["Maria", "Lucia", "Carmen", "Sofia", "Elena", "Paula", "Daniel", "Pablo", "Javier", "Andres"]
+APELLIDOS = ["Garcia", "Lopez", "Martinez", "Rodriguez", "Sanchez", "Romero", "Navarro", "Moreno"]
+
+# Peso de cada mes (1-12) y de cada día de la semana (0 = lunes) al repartir las bodas
+PESO_MES = [2, 2, 3, 5, 9, 10, 9, 8, 9, 6, 3, 3]
+PESO_DIA = [1, 1, 1, 2, 8, 20, 6]
+
+
+def _fecha(dia):
+    return datetime.date.fromordinal(dia).strftime("%d/%m/%Y")
+
+
+def _horario_boda(rng):
+    """Inicio entre 11:00 y 19:00, de 5 a 9 horas (las tardías cruzan la medianoche)."""
+    inicio = rng.choice(range(11 * 60, 19 * 60 + 1, 30))
+    fin = (inicio + rng.choice(range(5 * 60, 9 * 60 + 1, 30))) % (24 * 60)
+    return f"{inicio // 60:02d}:{inicio % 60:02d}", f"{fin // 60:02d}:{fin % 60:02d}"
+
+
+def _dias_del_anio(anio, rng, cantidad):
+    """Días ordinales al azar con la estacionalidad de PESO_MES y PESO_DIA."""
+    inicio = datetime.date(anio, 1, 1).toordinal()
+    dias = list(range(inicio, datetime.date(anio, 12, 31).toordinal() + 1))
+    pesos = []
+    for d in dias:
+        fecha = datetime.date.fromordinal(d)
+        pesos.append(PESO_MES[fecha.month - 1] * PESO_DIA[fecha.weekday()])
+    return rng.choices(dias, weights=pesos, k=cantidad)
+
+
+def generar_datos(lugares=50, personal=200, items=300, reservas=500, semilla=0, anio=None):
+    """
+    Devuelve {'lugares', 'personal', 'inventario', 'clientes', 'reservas'} con el
+    formato de los JSON. La misma semilla da siempre los mismos datos.
+    """
+    rng = random.Random(semilla)
+    anio = anio or datetime.date.today().year + 1
+
+    lista_lugares = []
+    for n in range(lugares):
+        servicios = rng.sample(SERVICIOS, rng.randint(1, 4))
+        nombre = f"{rng.choice(PREFIJOS_LUGAR)} {rng.choice(APELLIDOS)} {n}"
+        lista_lugares.append({
+            'id_lugar': 10 + n, 'nombre': nombre,
+            'capacidad': rng.choice(range(60, 501, 20)),
+            'precio': rng.choice(range(800, 6001, 100)),
+            'servicios_incluidos': servicios, 'fechas_ocupadas': [],
+        })
+
+    categorias = list(OFICIOS)
+    lista_personal = []
+    for n in range(personal):
+        categoria = categorias[n % len(categorias)] if n < len(categorias) else rng.choice(categorias)
+        lista_personal.append({
+            'id_personal': 100 + n,
+            'nombre': f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}",
+            'oficio': rng.choice(OFICIOS[categoria]), 'categoria': categoria,
+            'sueldo': rng.choice(range(200, 1501, 50)),
+            'experiencia': rng.choice(EXPERIENCIAS), 'fechas_ocupadas': [],
+        })
+
+    cats_items = list(ITEMS)
+    inventario = []
+    for n in range(items):
+        categoria = cats_items[n % len(cats_items)]
+        nombre, minimo, maximo = rng.choice(ITEMS[categoria])
+        item = {
+            'id_item': 500 + n, 'categoria': categoria, 'nombre': f"{nombre} {n}",
+            'cantidad': rng.randint(20, 600), 'precio_unidad': round(rng.uniform(minimo, maximo), 1),
+        }
+        item['tipo'] = tipo_de(item)
+        inventario.append(item)
+
+    # Clientes con IDs desde 1000 (se dejan IDs libres para nuevas bodas)
+    clientes = []
+    for n in range(min(reservas, 5000)):
+        nombre, apellido = rng.choice(NOMBRES), rng.choice(APELLIDOS)
+        clientes.append({
+            'id_cliente': 1000 + n, 'nombre': f"{nombre} {apellido} {rng.choice(APELLIDOS)}",
+            'email': f"{nombre.lower()}.{apellido.lower()}{n}@gmail.com",
+            'invitados': rng.choice(range(40, 301, 10)), 'presupuesto': rng.choice(range(8000, 80001, 1000)),
+        })
+
+    lista_reservas = _historial(rng, anio, reservas, lista_lugares, lista_personal, inventario, clientes)
+    return {'lugares': lista_lugares, 'personal': lista_personal, 'inventario': inventario,
+            'clientes': clientes, 'reservas': lista_reservas}
+
+
+def _historial(rng, anio, cantidad, lugares, personal, inventario, clientes):
+    """
+    Bodas pasadas: cada una toma un lugar y personal libres y deja sus bloques
+    ocupados. Lo consumible que pidieron se repone (se suma a 'cantidad'), así
+    el inventario arranca con el stock que se generó para cada item.
+    """
+    indice = IndiceDisponibilidad()
+    por_categoria = {}
+    for p in personal:
+        por_categoria.setdefault(p['categoria'], []).append(p)
+    items_cat = {}
+    for i in inventario:
+        items_cat.setdefault(i['categoria'], []).append(i)
+
+    reservas = []
+    for dia in _dias_del_anio(anio, rng, cantidad):
+        fecha = _fecha(dia)
+        h_ini, h_fin = _horario_boda(rng)
+        bloque = {"fecha": fecha, "inicio": h_ini, "fin": h_fin}
+        cliente = rng.choice(clientes) if clientes else {'nombre': "Cliente Historico", 'invitados': 100}
+
+        # Unos pocos intentos: en temporada alta un sábado puede estar lleno
+        lugar = None
+        for candidato in rng.sample(lugares, min(5, len(lugares))):
+            if indice.esta_libre((LUGAR, candidato['id_lugar']), fecha, h_ini, h_fin):
+                lugar = candidato
+                break
+        if lugar is None:
+            continue
+
+        equipo = []
+        for categoria in rng.sample(list(por_categoria), min(rng.randint(2, 5), len(por_categoria))):
+            for p in rng.sample(por_categoria[categoria], min(3, len(por_categoria[categoria]))):
+                if indice.esta_libre((PERSONAL, p['id_personal']), fecha, h_ini, h_fin):
+                    equipo.append(p)
+                    break
+
+        pedidos = []
+        for categoria in rng.sample(list(items_cat), min(3, len(items_cat))):
+            item = rng.choice(items_cat[categoria])
+            pedidos.append({'id_item_reserva': item['id_item'], 'nombre': item['nombre'],
+                            'precio_unidad': item['precio_unidad'],
+                            'cantidad_requerida': rng.randint(1, cliente['invitados'])})
+            if item['tipo'] == CONSUMIBLE:
+                item['cantidad'] += pedidos[-1]['cantidad_requerida']
+
+        for recurso, dueno in [((LUGAR, lugar['id_lugar']), lugar)] + \
+                              [((PERSONAL, p['id_personal']), p) for p in equipo]:
+            indice.agregar_bloque(recurso, bloque)
+            dueno['fechas_ocupadas'].append(dict(bloque))
+
+        subtotal = (lugar['precio'] + sum(p['sueldo'] for p in equipo)
+                    + sum(i['precio_unidad'] * i['cantidad_requerida'] for i in pedidos))
+        comision, impuestos, total = totales(subtotal)
+        reservas.append({
+            'id_lugar': lugar['id_lugar'], 'nombre_lugar': lugar['nombre'],
+            'cliente': cliente['nombre'], 'fecha': fecha, 'h_inicio': h_ini, 'h_fin': h_fin,
+            'personal_contratado': [
+                {'id_personal': p['id_personal'], 'nombre': p['nombre'], 'oficio': p['oficio'],
+                 'sueldo': p['sueldo'], 'experiencia': p['experiencia'], 'fechas_ocupadas': []}
+                for p in equipo],
+            'items_pedidos': pedidos,
+            'subtotal': subtotal, 'comision': comision, 'impuestos': impuestos, 'total_final': total,
+            'estado': 'Aprobado',
+        })
+    return reservas
+
+
+def escribir_datos(datos, carpeta):
+    """Guarda los datos como data/*.json (reservas en reservas.json, el diario se arma solo)."""
+    os.makedirs(carpeta, exist_ok=True)
+    for nombre, contenido in datos.items():
+        with open(os.path.join(carpeta, f"{nombre}.json"), 'w', encoding='utf-8') as f:
+            json.dump(contenido, f, indent=4, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos del planificador")
+    parser.add_argument('carpeta')
+    parser.add_argument('--lugares', type=int, default=50)
+    parser.add_argument('--personal', type=int, default=200)
+    parser.add_argument('--items', type=int, default=300)
+    parser.add_argument('--reservas', type=int, default=500)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args()
+    escribir_datos(generar_datos(args.lugares, args.personal, args.items, args.reservas, args.semilla),
+                   args.carpeta)
+    print(f"✅ Datos sintéticos guardados en {args.carpeta}/")
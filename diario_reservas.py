@@ -0,0 +1,175 @@
+"""
+Diario de reservas (append-only) del planificador 'Raquel & Alba'.
+Cada boda confirmada se agrega como una línea JSON al final de
+data/reservas.jsonl (con fsync), sin volver a leer ni reescribir el
+historial completo. De vez en cuando se compacta el diario y se deja una
+copia en data/reservas.json (el formato de siempre) como snapshot; cuántas
+bodas tenía el diario en esa compactación queda anotado en
+data/reservas.compactacion.json, así la cuenta sigue entre sesiones.
+"""
+import contextlib
+import json
+import os
+
+from instrumentacion import contar, medido
+
+# Se compacta cuando lo agregado desde la última compactación supera este
+# mínimo y además la mitad del historial (costo amortizado constante).
+COMPACTAR_MIN = 100
+
+
+class DiarioReservas:
+    """
+    Historial de reservas en formato JSON Lines.
+
+    Atributos:
+        ruta (str): Archivo del diario (.jsonl).
+        ruta_snapshot (str): Archivo JSON con la copia completa del historial.
+        ruta_estado (str): Archivo JSON con las líneas del diario en la última
+            compactación (o migración).
+
+    Args:
+        bloqueo: Opcional, el bloqueo entre procesos de los que escriben el
+            diario (ver almacenamiento.BloqueoArchivo). Migrar o recortar el
+            final se hace con él tomado, para no pisar una boda que otro
+            proceso esté agregando en ese momento.
+    """
+    def __init__(self, ruta='data/reservas.jsonl', ruta_snapshot='data/reservas.json', bloqueo=None):
+        self.ruta = ruta
+        self.ruta_snapshot = ruta_snapshot
+        self.ruta_estado = os.path.splitext(ruta)[0] + '.compactacion.json'
+        self._total = None
+        with bloqueo if bloqueo is not None else contextlib.nullcontext():
+            # Un diario vacío (ej: recién creado por otra copia) tampoco tiene el
+            # historial: si no se migra, la próxima compactación pisaría el snapshot
+            if not os.path.exists(ruta) or os.path.getsize(ruta) == 0:
+                self._migrar()
+            else:
+                self._reparar_final()
+
+    def _migrar(self):
+        """Primera vez (o diario vacío): pasa el reservas.json (lista JSON) al diario."""
+        reservas = []
+        if os.path.exists(self.ruta_snapshot):
+            with open(self.ruta_snapshot, 'r', encoding='utf-8') as f:
+                reservas = json.load(f) or []
+        # Sin nada que pasar, un diario vacío que ya existe queda como está
+        if reservas or not os.path.exists(self.ruta):
+            self.escribir_atomico(self.ruta, _lineas(reservas))
+        self._total = len(reservas)
+        self._anotar_compactacion()
+
+    def _reparar_final(self):
+        """
+        Si el programa se cortó a mitad de una escritura, la última línea queda
+        incompleta (sin salto de línea): se recorta para no arrastrar basura.
+        """
+        with open(self.ruta, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            tam = f.tell()
+            if tam == 0:
+                return
+            f.seek(tam - 1)
+            if f.read(1) == b'\n':
+                return
+            # Buscamos hacia atrás el último salto de línea completo
+            pos = tam - 1
+            while pos > 0:
+                inicio = max(0, pos - 4096)
+                f.seek(inicio)
+                trozo = f.read(pos - inicio)
+                corte = trozo.rfind(b'\n')
+                if corte != -1:
+                    pos = inicio + corte + 1
+                    break
+                pos = inicio
+            f.truncate(pos)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def leer(self):
+        """Recorre las reservas una por una sin cargar el archivo completo."""
+        with open(self.ruta, 'r', encoding='utf-8') as f:
+            for linea in f:
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    yield json.loads(linea)
+                except json.JSONDecodeError:
+                    # Línea dañada (corte de luz, edición manual): se salta
+                    continue
+
+    @medido('datos')
+    def agregar(self, reserva):
+        """Agrega una reserva al final del diario y espera a que llegue al disco."""
+        linea = json.dumps(reserva, ensure_ascii=False) + '\n'
+        with open(self.ruta, 'a', encoding='utf-8') as f:
+            f.write(linea)
+            f.flush()
+            os.fsync(f.fileno())
+
+        if self._total is None:
+            self._total = self._contar()
+        else:
+            self._total += 1
+        # Lo agregado se cuenta contra lo anotado en disco, no contra lo de esta
+        # sesión: muchas sesiones de una boda cada una también compactan
+        if self._total - self._lineas_compactadas() >= max(COMPACTAR_MIN, self._total // 2):
+            self.compactar()
+
+    def reescribir(self, reservas):
+        """Reemplaza todo el historial (por ejemplo al exportar desde SQLite)."""
+        reservas = list(reservas)
+        self.escribir_atomico(self.ruta, _lineas(reservas))
+        self._total = len(reservas)
+        self._escribir_snapshot(reservas)
+        self._anotar_compactacion()
+
+    @medido('datos')
+    def compactar(self):
+        """
+        Reescribe el diario sin líneas dañadas y actualiza el snapshot
+        reservas.json. Ambas escrituras son atómicas (archivo temporal + replace).
+        """
+        reservas = list(self.leer())
+        self.escribir_atomico(self.ruta, _lineas(reservas))
+        self._escribir_snapshot(reservas)
+        self._total = len(reservas)
+        self._anotar_compactacion()
+        contar('diario.compactaciones')
+
+    def _escribir_snapshot(self, reservas):
+        contenido = json.dumps(reservas, indent=4, ensure_ascii=False)
+        self.escribir_atomico(self.ruta_snapshot, [contenido])
+
+    def _anotar_compactacion(self):
+        self.escribir_atomico(self.ruta_estado, [json.dumps({'lineas': self._total})])
+
+    def _lineas_compactadas(self):
+        """Líneas del diario en la última compactación (0 si nunca se anotó)."""
+        try:
+            with open(self.ruta_estado, 'r', encoding='utf-8') as f:
+                return json.load(f).get('lineas', 0)
+        except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+            return 0
+
+    def _contar(self):
+        with open(self.ruta, 'rb') as f:
+            return sum(trozo.count(b'\n') for trozo in iter(lambda: f.read(1 << 16), b''))
+
+    @staticmethod
+    def escribir_atomico(ruta, trozos):
+        # Temporal propio de cada proceso: dos que escriben a la vez no se pisan el archivo a medias
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            for trozo in trozos:
+                f.write(trozo)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, ruta)
+
+
+def _lineas(reservas):
+    for r in reservas:
+        yield json.dumps(r, ensure_ascii=False) + '\n'
@@ -0,0 +1,83 @@
+"""
+Índice de disponibilidad para lugares y personal.
+Guarda los bloques ocupados de cada recurso ya convertidos a intervalos en
+minutos de época (ver bloques.py), fusionados y ordenados, para responder
+"¿está libre este recurso en este horario?" con una búsqueda binaria sobre
+enteros en vez de recorrer y re-parsear toda la lista.
+"""
+from bloques import (MINUTOS_DIA, Agenda, fecha_a_dia, intervalo, intervalo_de_bloque, intervalos_de,
+                     minuto_epoca)
+
+# Tipos de recurso que guarda el índice (la clave es (tipo, id))
+LUGAR = "lugar"
+PERSONAL = "personal"
+
+
+class IndiceDisponibilidad:
+    """
+    Agenda de cada recurso con algo ocupado, por clave (tipo, id).
+
+    Cada agenda guarda los intervalos tal cual se reservaron (los que lee la
+    matriz de ocupación) y su cobertura fusionada en arrays de enteros, que es
+    lo que se consulta con bisect en O(log n). Lugares y personal usan
+    exactamente el mismo modelo, con montaje, desmontaje, medianoche y
+    eventos de varios días incluidos.
+    """
+    def __init__(self):
+        self._agendas = {}
+
+    @classmethod
+    def desde_catalogo(cls, lista_lugares, lista_personal=()):
+        """Construye el índice a partir de las listas cargadas de los JSON."""
+        indice = cls()
+        recursos = [((LUGAR, lug['id_lugar']), lug) for lug in lista_lugares]
+        recursos += [((PERSONAL, p.get('id_personal')), p) for p in lista_personal if isinstance(p, dict)]
+        for recurso, registro in recursos:
+            intervalos = intervalos_de(registro.get('fechas_ocupadas', []))
+            if not intervalos:
+                continue
+            # Se juntan todos los intervalos y la cobertura se arma una sola vez
+            agenda = indice._agendas[recurso] = Agenda()
+            for inicio, fin in intervalos:
+                agenda.agregar(inicio, fin, rearmar=False)
+            agenda.rearmar()
+        return indice
+
+    def agregar_bloque(self, recurso, bloque):
+        """Registra un bloque ocupado ({'fecha','inicio','fin'}, ver bloques.py) para el recurso."""
+        iv = intervalo_de_bloque(bloque)
+        if iv is not None:
+            self._agendas.setdefault(recurso, Agenda()).agregar(*iv)
+
+    def libre_en(self, recurso, inicio, fin):
+        """True si el recurso no tiene nada en [inicio, fin) (minutos de época)."""
+        agenda = self._agendas.get(recurso)
+        return agenda is None or not agenda.choca(inicio, fin)
+
+    def desfases_libres(self, recurso, inicio, fin, dias_horizonte, cuantos):
+        """
+        Primeros 'cuantos' desfases (1..dias_horizonte días) en que el horario
+        [inicio, fin) corrido esos días queda libre, en una sola pasada.
+        """
+        agenda = self._agendas.get(recurso)
+        if agenda is None:
+            return list(range(1, min(cuantos, dias_horizonte) + 1))
+        return agenda.desfases_libres(inicio, fin, MINUTOS_DIA, dias_horizonte, cuantos)
+
+    def bloques_libres(self, recurso, bloques):
+        """True si el recurso está libre en todos esos bloques (con su montaje y desmontaje)."""
+        return all(self.libre_en(recurso, *iv) for iv in intervalos_de(bloques))
+
+    def esta_libre(self, recurso, fecha_str, h_ini, h_fin):
+        """True si el recurso no tiene ningún bloque que choque con ese horario."""
+        return self.libre_en(recurso, *intervalo(fecha_str, h_ini, h_fin))
+
+    def dia_libre(self, recurso, fecha_str):
+        """True si el recurso no tiene nada reservado en todo el día."""
+        inicio = minuto_epoca(fecha_a_dia(fecha_str))
+        return self.libre_en(recurso, inicio, inicio + MINUTOS_DIA)
+
+    def intervalos(self, recurso):
+        """Intervalos ocupados del recurso (minutos de época), en orden."""
+        agenda = self._agendas.get(recurso)
+        return agenda.intervalos() if agenda is not None else []
@@ -0,0 +1,356 @@
+"""
+Tickets y facturas del planificador 'Raquel & Alba'.
+Antes cada boda escribía su ticket línea por línea en un único
+ticket_boda.txt, que la boda siguiente pisaba, y no había forma de volver a
+sacar el de una boda pasada. Ahora cada documento sale de una plantilla que
+se compila una sola vez (el texto ya partido en tramos fijos y campos), se
+arma entero en memoria y se escribe con una sola llamada, en archivos
+propios de cada boda:
+
+    tickets/<numero>_<AAAA-MM-DD>_<cliente>.ticket.txt    .ticket.html
+    tickets/<numero>_<AAAA-MM-DD>_<cliente>.factura.txt   .factura.html
+
+El número es el orden de la boda en el historial: lo pone el backend al
+guardarla (reserva['numero']), así dos sesiones a la vez no comparten
+factura. Cada boda escrita agrega una línea a tickets/.huellas.jsonl con la
+huella (SHA-1) de sus datos y de las plantillas. Regenerar todo el historial
+reparte las bodas entre varios procesos, no vuelve a armar las que no
+cambiaron (y cuyos archivos siguen ahí) y deja ese archivo compactado, con
+una línea por boda.
+"""
+import hashlib
+import html
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from string import Formatter
+
+from cotizacion_viva import COMISION, IMPUESTOS
+from historial import nombre_cliente
+from indice_personal import normalizar
+from instrumentacion import contar, medido
+
+CARPETA_DOCUMENTOS = 'tickets'
+ARCHIVO_HUELLAS = '.huellas.jsonl'
+# Con menos bodas pendientes que esto por proceso no conviene repartir
+MIN_POR_PROCESO = 200
+MESES = ("enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto",
+         "septiembre", "octubre", "noviembre", "diciembre")
+
+
+class Crudo(str):
+    """Texto ya armado (ej: las filas de una tabla HTML) que no se vuelve a escapar."""
+
+
+class Plantilla:
+    """
+    Texto con campos {nombre} o {nombre:formato} (como str.format), partido en
+    tramos al crearla: render() solo junta los tramos con los valores.
+
+    Atributos:
+        texto (str): La plantilla original.
+        escapar (callable): Se aplica a los valores de texto (ej: html.escape).
+    """
+    __slots__ = ('texto', 'escapar', '_tramos')
+
+    def __init__(self, texto, escapar=None):
+        self.texto = texto
+        self.escapar = escapar
+        self._tramos = [(literal, campo, formato) for literal, campo, formato, _ in Formatter().parse(texto)]
+
+    def render(self, datos):
+        partes = []
+        for literal, campo, formato in self._tramos:
+            partes.append(literal)
+            if campo is not None:
+                valor = datos[campo]
+                if self.escapar is not None and isinstance(valor, str) and not isinstance(valor, Crudo):
+                    valor = self.escapar(valor)
+                partes.append(format(valor, formato))
+        return ''.join(partes)
+
+
+class Documento:
+    """
+    Un documento en un formato: la plantilla del cuerpo y una plantilla por
+    cada lista de filas del contexto (personal, items...). Cada lista se arma
+    con su plantilla y entra al cuerpo en el campo del mismo nombre.
+    """
+    __slots__ = ('extension', 'cuerpo', 'filas')
+
+    def __init__(self, extension, cuerpo, filas=None, escapar=None):
+        self.extension = extension
+        self.cuerpo = Plantilla(cuerpo, escapar)
+        self.filas = {nombre: Plantilla(texto, escapar) for nombre, texto in (filas or {}).items()}
+
+    def render(self, contexto):
+        datos = dict(contexto)
+        for nombre, plantilla in self.filas.items():
+            datos[nombre] = Crudo(''.join(plantilla.render(fila) for fila in contexto[nombre]))
+        return self.cuerpo.render(datos)
+
+    def fuentes(self):
+        return [self.cuerpo.texto] + [p.texto for p in self.filas.values()]
+
+
+# --- PLANTILLAS ---
+_LINEA = "-" * 42 + "\n"
+_DOBLE = "=" * 42 + "\n"
+
+_TICKET_TXT = Documento('ticket.txt', (
+    _DOBLE + "          TICKET DE RESERVA - BODA        \n" + _DOBLE + "\n"
+    "CLIENTE: {cliente}\n"
+    "EMAIL: {email}\n"
+    "FECHA DEL EVENTO: {fecha_larga} ({horario})\n"
+    + _LINEA + "\n"
+    "LUGAR SELECCIONADO: {lugar}\n"
+    "SERVICIOS DE CORTESÍA (INCLUIDOS EN EL LUGAR):\n"
+    "{servicios}"
+    "COSTO LUGAR: ${precio_lugar:,.2f}\n\n"
+    "PERSONAL CONTRATADO:\n"
+    "{personal}"
+    "\nSERVICIOS ADICIONALES:\n"
+    "{items}"
+    "\n" + _LINEA +
+    "SUBTOTAL: ${subtotal:,.2f}\n"
+    "COMISIÓN ({tasa_comision:.0%}): ${comision:,.2f}\n"
+    "{impuestos}"
+    "TOTAL FINAL: ${total:,.2f}\n"
+    + _LINEA +
+    "\n¡Gracias por confiar en nosotros!\n"
+), {
+    'servicios': "   🎁 {servicio:.<30} $0.00\n",
+    'personal': "- {nombre} ({oficio} - Nivel: {experiencia}): ${sueldo:,.2f}\n",
+    'items': "- {nombre} (x{cantidad}): ${importe:,.2f}\n",
+    'impuestos': "IMPUESTOS ({tasa:.0%}): ${monto:,.2f}\n",
+})
+
+_FACTURA_TXT = Documento('factura.txt', (
+    _DOBLE + "        RAQUEL & ALBA - FACTURA {factura}\n" + _DOBLE +
+    "Cliente: {cliente} <{email}>\n"
+    "Evento: boda del {fecha} ({horario}) en {lugar}\n"
+    "Estado: {estado}\n"
+    + _LINEA +
+    "{concepto:<24}{cant:>4}{unit:>14}\n".format(concepto="CONCEPTO", cant="CANT", unit="IMPORTE") +
+    _LINEA +
+    "{lineas}"
+    + _LINEA +
+    "{etiqueta_subtotal:<28}${subtotal:>13,.2f}\n"
+    "{etiqueta_comision:<28}${comision:>13,.2f}\n"
+    "{impuestos}"
+    "{etiqueta_total:<28}${total:>13,.2f}\n"
+), {
+    'lineas': "{concepto:<24.24}{cantidad:>4}  ${importe:>11,.2f}\n",
+    'impuestos': "{etiqueta:<28}${monto:>13,.2f}\n",
+})
+
+_ESTILO = ("body{{font-family:sans-serif;max-width:640px;margin:2em auto}}"
+           "table{{width:100%;border-collapse:collapse}}td,th{{padding:4px;border-bottom:1px solid #ddd}}"
+           "td.n,th.n{{text-align:right}}")
+
+_TICKET_HTML = Documento('ticket.html', (
+    "<!DOCTYPE html>\n<html lang=\"es\"><head><meta charset=\"utf-8\">"
+    "<title>Ticket {numero} - {cliente}</title><style>" + _ESTILO + "</style></head><body>\n"
+    "<h1>Ticket de reserva - Boda</h1>\n"
+    "<p><b>Cliente:</b> {cliente} ({email})<br><b>Fecha:</b> {fecha_larga} ({horario})<br>"
+    "<b>Lugar:</b> {lugar} (${precio_lugar:,.2f})</p>\n"
+    "<h2>Servicios de cortesía</h2>\n<ul>{servicios}</ul>\n"
+    "<h2>Personal contratado</h2>\n<table>{personal}</table>\n"
+    "<h2>Servicios adicionales</h2>\n<table>{items}</table>\n"
+    "<table><tr><td>Subtotal</td><td class=\"n\">${subtotal:,.2f}</td></tr>"
+    "<tr><td>Comisión ({tasa_comision:.0%})</td><td class=\"n\">${comision:,.2f}</td></tr>{impuestos}"
+    "<tr><th>Total final</th><th class=\"n\">${total:,.2f}</th></tr></table>\n"
+    "<p>¡Gracias por confiar en nosotros!</p>\n</body></html>\n"
+), {
+    'servicios': "<li>{servicio}</li>",
+    'personal': "<tr><td>{nombre}</td><td>{oficio} - {experiencia}</td><td class=\"n\">${sueldo:,.2f}</td></tr>",
+    'items': "<tr><td>{nombre}</td><td class=\"n\">x{cantidad}</td><td class=\"n\">${importe:,.2f}</td></tr>",
+    'impuestos': "<tr><td>Impuestos ({tasa:.0%})</td><td class=\"n\">${monto:,.2f}</td></tr>",
+}, escapar=html.escape)
+
+_FACTURA_HTML = Documento('factura.html', (
+    "<!DOCTYPE html>\n<html lang=\"es\"><head><meta charset=\"utf-8\">"
+    "<title>Factura {factura}</title><style>" + _ESTILO + "</style></head><body>\n"
+    "<h1>Raquel &amp; Alba - Factura {factura}</h1>\n"
+    "<p><b>Cliente:</b> {cliente} ({email})<br><b>Evento:</b> boda del {fecha} ({horario}) en {lugar}<br>"
+    "<b>Estado:</b> {estado}</p>\n"
+    "<table><tr><th>Concepto</th><th class=\"n\">Cant.</th><th class=\"n\">Importe</th></tr>{lineas}"
+    "<tr><td>{etiqueta_subtotal}</td><td></td><td class=\"n\">${subtotal:,.2f}</td></tr>"
+    "<tr><td>{etiqueta_comision}</td><td></td><td class=\"n\">${comision:,.2f}</td></tr>{impuestos}"
+    "<tr><th>{etiqueta_total}</th><th></th><th class=\"n\">${total:,.2f}</th></tr></table>\n"
+    "</body></html>\n"
+), {
+    'lineas': "<tr><td>{concepto}</td><td class=\"n\">{cantidad}</td><td class=\"n\">${importe:,.2f}</td></tr>",
+    'impuestos': "<tr><td>{etiqueta}</td><td></td><td class=\"n\">${monto:,.2f}</td></tr>",
+}, escapar=html.escape)
+
+DOCUMENTOS = (_TICKET_TXT, _TICKET_HTML, _FACTURA_TXT, _FACTURA_HTML)
+# Si cambia cualquier plantilla, cambian todas las huellas y se regenera todo
+HUELLA_PLANTILLAS = hashlib.sha1("\0".join(t for d in DOCUMENTOS for t in d.fuentes()).encode()).hexdigest()
+
+
+# --- CONTEXTO ---
+def contexto(reserva, numero, lugar=None, cliente=None):
+    """
+    Datos planos de una boda para las plantillas. 'lugar' y 'cliente' son los
+    del catálogo (servicios de cortesía y email); el precio del lugar sale de
+    la propia reserva, así el documento muestra lo que se cobró entonces.
+    """
+    lugar, cliente = lugar or {}, cliente or {}
+    dia, mes, anio = (int(parte) for parte in reserva['fecha'].split('/'))
+    personal = [{'nombre': p.get('nombre', ''), 'oficio': p.get('oficio', ''),
+                 'experiencia': p.get('experiencia', ''), 'sueldo': p.get('sueldo', 0) or 0}
+                for p in reserva.get('personal_contratado', [])]
+    items = [{'nombre': i.get('nombre', ''), 'cantidad': i.get('cantidad_requerida', 0),
+              'importe': (i.get('precio_unidad', 0) or 0) * i.get('cantidad_requerida', 0)}
+             for i in reserva.get('items_pedidos', [])]
+    subtotal = reserva.get('subtotal', 0) or 0
+    precio_lugar = subtotal - sum(p['sueldo'] for p in personal) - sum(i['importe'] for i in items)
+    impuestos = reserva.get('impuestos', 0) or 0
+    nombre_lugar = reserva.get('nombre_lugar') or lugar.get('nombre', '')
+
+    lineas = [{'concepto': f"Lugar: {nombre_lugar}", 'cantidad': 1, 'importe': precio_lugar}]
+    lineas += [{'concepto': p['nombre'], 'cantidad': 1, 'importe': p['sueldo']} for p in personal]
+    lineas += [{'concepto': i['nombre'], 'cantidad': i['cantidad'], 'importe': i['importe']} for i in items]
+    return {
+        'numero': numero, 'factura': f"F-{numero:06d}",
+        'cliente': nombre_cliente(reserva), 'email': cliente.get('email') or "sin email",
+        'fecha': reserva['fecha'], 'fecha_larga': f"{dia:02d} de {MESES[mes - 1]} de {anio}",
+        'fecha_iso': f"{anio:04d}-{mes:02d}-{dia:02d}",
+        'horario': f"{reserva.get('h_inicio', '')} a {reserva.get('h_fin', '')}",
+        'lugar': nombre_lugar, 'precio_lugar': precio_lugar, 'estado': reserva.get('estado', ''),
+        'servicios': [{'servicio': s} for s in lugar.get('servicios_incluidos', [])],
+        'personal': personal, 'items': items, 'lineas': lineas,
+        'subtotal': subtotal, 'comision': reserva.get('comision', 0) or 0, 'tasa_comision': COMISION,
+        'impuestos': [{'tasa': IMPUESTOS, 'monto': impuestos,
+                       'etiqueta': f"Impuestos ({IMPUESTOS:.0%})"}] if impuestos else [],
+        'total': reserva.get('total_final', 0) or 0,
+        'etiqueta_subtotal': "Subtotal", 'etiqueta_comision': f"Comisión ({COMISION:.0%})",
+        'etiqueta_total': "TOTAL",
+    }
+
+
+def huella(datos):
+    """SHA-1 del contexto de una boda junto con el de las plantillas."""
+    texto = json.dumps(datos, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(f"{HUELLA_PLANTILLAS}\0{texto}".encode()).hexdigest()
+
+
+def nombre_base(datos):
+    """Nombre común de los archivos de una boda (ej: '000042_2027-05-15_maria-lopez-garcia')."""
+    cliente = "-".join("".join(c if c.isalnum() else " " for c in normalizar(datos['cliente'])).split())
+    return f"{datos['numero']:06d}_{datos['fecha_iso']}_{cliente or 'cliente'}"
+
+
+# --- ESCRITURA ---
+def escribir_documentos(datos, carpeta=CARPETA_DOCUMENTOS):
+    """Arma los documentos de una boda y los escribe (cada archivo con una sola escritura)."""
+    base = os.path.join(carpeta, nombre_base(datos))
+    rutas = []
+    for documento in DOCUMENTOS:
+        ruta = f"{base}.{documento.extension}"
+        with open(ruta, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(documento.render(datos))
+        rutas.append(ruta)
+    return rutas
+
+
+def _escribir_en_proceso(pedido):
+    datos, carpeta = pedido
+    return len(escribir_documentos(datos, carpeta))
+
+
+def _rutas_de(datos, carpeta):
+    base = os.path.join(carpeta, nombre_base(datos))
+    return [f"{base}.{documento.extension}" for documento in DOCUMENTOS]
+
+
+def _leer_huellas(carpeta):
+    """numero -> huella; si una boda se escribió varias veces vale la última línea."""
+    huellas = {}
+    try:
+        with open(os.path.join(carpeta, ARCHIVO_HUELLAS), 'r', encoding='utf-8') as f:
+            for linea in f:
+                try:
+                    numero, firma = json.loads(linea)
+                except (ValueError, TypeError):
+                    continue  # línea cortada o editada a mano: esa boda se vuelve a escribir
+                huellas[numero] = firma
+    except FileNotFoundError:
+        pass
+    return huellas
+
+
+def _anotar_huella(carpeta, numero, firma):
+    """Una línea al final del archivo de huellas (escritura corta en modo append)."""
+    with open(os.path.join(carpeta, ARCHIVO_HUELLAS), 'a', encoding='utf-8') as f:
+        f.write(json.dumps([numero, firma]) + '\n')
+
+
+def _compactar_huellas(carpeta, huellas):
+    """Reescribe el archivo de huellas con una línea por boda."""
+    ruta = os.path.join(carpeta, ARCHIVO_HUELLAS)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        f.write(''.join(json.dumps([numero, firma]) + '\n' for numero, firma in sorted(huellas.items())))
+    os.replace(temporal, ruta)
+
+
+@medido('ticket')
+def generar_documentos(repo, reserva, cliente=None, carpeta=CARPETA_DOCUMENTOS):
+    """
+    Ticket y factura de una boda recién confirmada (la reserva como quedó en el
+    historial, con el 'numero' que le dio el backend).
+
+    Returns:
+        list: Rutas de los archivos escritos.
+    """
+    os.makedirs(carpeta, exist_ok=True)
+    datos = contexto(reserva, reserva['numero'], repo.lugar(reserva.get('id_lugar')), cliente)
+    rutas = escribir_documentos(datos, carpeta)
+    _anotar_huella(carpeta, datos['numero'], huella(datos))
+    contar('documentos.escritos', len(rutas))
+    return rutas
+
+
+@medido('ticket')
+def regenerar_historial(repo, carpeta=CARPETA_DOCUMENTOS, procesos=None, forzar=False):
+    """
+    Vuelve a sacar el ticket y la factura de todas las bodas del historial.
+    Las que no cambiaron desde la última vez (misma huella y archivos en su
+    lugar) se saltean, salvo con 'forzar'. Con muchas pendientes se reparten
+    entre 'procesos' procesos (None = todos los núcleos).
+
+    Returns:
+        dict: bodas, generadas, omitidas, archivos y segundos.
+    """
+    inicio = time.perf_counter()
+    os.makedirs(carpeta, exist_ok=True)
+    huellas = {} if forzar else _leer_huellas(carpeta)
+    clientes = {c.get('nombre', '').lower(): c for c in repo.clientes}
+
+    pendientes, bodas = [], 0
+    for posicion, reserva in enumerate(repo.almacenamiento.iterar_reservas(), start=1):
+        bodas += 1
+        # Las reservas de antes de numerarlas al guardar llevan su posición en el historial
+        numero = reserva.get('numero') or posicion
+        datos = contexto(reserva, numero, repo.lugar(reserva.get('id_lugar')),
+                         clientes.get(nombre_cliente(reserva).lower()))
+        firma = huella(datos)
+        if huellas.get(numero) == firma and all(map(os.path.exists, _rutas_de(datos, carpeta))):
+            continue
+        huellas[numero] = firma
+        pendientes.append((datos, carpeta))
+
+    procesos = min(procesos or os.cpu_count() or 1, len(pendientes) // MIN_POR_PROCESO)
+    if procesos <= 1:
+        archivos = sum(map(_escribir_en_proceso, pendientes))
+    else:
+        trozo = max(1, len(pendientes) // (procesos * 4))
+        with ProcessPoolExecutor(procesos) as pool:
+            archivos = sum(pool.map(_escribir_en_proceso, pendientes, chunksize=trozo))
+    _compactar_huellas(carpeta, huellas)
+    contar('documentos.escritos', archivos)
+    return {'bodas': bodas, 'generadas': len(pendientes), 'omitidas': bodas - len(pendientes),
+            'archivos': archivos, 'segundos': round(time.perf_counter() - inicio, 3)}
@@ -1,13 +1,27 @@
 """Este programa contiene las funciones generales del sistema"""
-from datetime import datetime,timedelta
+from datetime import datetime, timedelta
 import json
 import os
+import re
+from cotizacion_viva import CotizacionViva, totales
+from bloques import (MINUTOS_DIA, bloques_de_cotizacion, chocan, fecha_a_dia, intervalo,
+                     intervalo_de_bloque, minuto_epoca)
+from disponibilidad import IndiceDisponibilidad, LUGAR, PERSONAL
+import historial
+from indice_personal import normalizar
+from instrumentacion import contar, medido, medir
+from motor_reglas import MOTOR
+from motor_sugerencias import DIAS_HORIZONTE, buscar_fechas_alternativas
+from pantalla import limpiar_pantalla  # el resto del sistema la llama como fg.limpiar_pantalla
 
 
 def write_json(ruta,data):
-    with open(ruta,'w',encoding='utf-8') as f:
-        json.dump(data,f,indent=4,ensure_ascii=False)
+    # Una ruta por archivo ('datos.write_json.inventario'): así se ve cuál reescritura pesa
+    with medir(f"datos.write_json.{os.path.splitext(os.path.basename(ruta))[0]}"):
+        with open(ruta,'w',encoding='utf-8') as f:
+            json.dump(data,f,indent=4,ensure_ascii=False)
 
+@medido('datos')
 def ensure_file_exist(ruta,data_inicial):
     if os.path.exists(ruta):
         with open(ruta,'r',encoding='utf-8') as f:
@@ -27,34 +41,39 @@ def buscar_elemento_id(id_buscado, list_elements, llave_id):
             return element
     return None
 
+@medido('disponibilidad')
 def hay_conflicto_horario(lista_reservas, fecha_nueva, h_ini_nueva, h_fin_nueva):
+    # El horario nuevo se interpreta una sola vez (cruza la medianoche si fin <= inicio)
+    nuevo = intervalo(fecha_nueva, h_ini_nueva, h_fin_nueva)
     for reserva in lista_reservas:
         # PRIMERO: Nos aseguramos de que 'reserva' sea un diccionario
         if not isinstance(reserva, dict):
             continue
 
-        if reserva.get('fecha') == fecha_nueva:
-            # Extraemos horas y convertimos a objetos time para comparar
-            formato = "%H:%M"
-            h_ini_ex = datetime.strptime(reserva['hora_inicio'], formato).time()
-            h_fin_ex = datetime.strptime(reserva['hora_fin'], formato).time()
+        # Acepta 'inicio'/'fin', 'hora_inicio'/'hora_fin' o 'h_inicio'/'h_fin';
+        # una boda del día anterior que termina de madrugada también choca
+        existente = intervalo_de_bloque(reserva)
+        if existente is not None and chocan(nuevo, existente):
+            contar('conflictos.horario')
+            return True # ¡Hay choque!
+    return False
 
-            nueva_ini = datetime.strptime(h_ini_nueva, formato).time()
-            nueva_fin = datetime.strptime(h_fin_nueva, formato).time()
 
-            # Lógica de colisión de intervalos
-            if (nueva_ini < h_fin_ex) and (nueva_fin > h_ini_ex):
-                return True # ¡Hay choque!
-    return False
+def normalizar_texto(texto):
+    """Pasa a minúsculas, quita espacios de los bordes y las tildes (ej: 'Estética' -> 'estetica')."""
+    return normalizar(texto)
 
+@medido('disponibilidad')
+def get_personal_disponible(tipo_buscado, lista_personal, fecha, indice=None, h_ini=None, h_fin=None,
+                            indice_personal=None):
+    # Con el índice de personal (el del repositorio) la búsqueda ya está resuelta
+    if indice_personal is not None:
+        return indice_personal.disponibles(tipo_buscado, fecha, indice, h_ini, h_fin)
 
-def get_personal_disponible(tipo_buscado, lista_personal, fecha):
     disponibles = []
 
     # 1. NORMALIZACIÓN DE LA BÚSQUEDA
-    busqueda = (tipo_buscado.lower().strip()
-                .replace("ú", "u").replace("í", "i").replace("á", "a")
-                .replace("é", "e").replace("ó", "o"))
+    busqueda = normalizar_texto(tipo_buscado)
 
     for p in lista_personal:
         # Escudo por si el elemento no es un diccionario
@@ -62,51 +81,59 @@ def get_personal_disponible(tipo_buscado, lista_personal, fecha):
             continue
 
         # 2. OBTENER CATEGORÍA (Priorizando 'categoria' que es la de tu JSON)
-        oficio = p.get('categoria', p.get('oficio', '')).lower()
-        oficio = (oficio.replace("ú", "u").replace("í", "i").replace("á", "a")
-                        .replace("é", "e").replace("ó", "o"))
+        oficio = normalizar_texto(p.get('categoria', p.get('oficio', '')))
 
         # Si el oficio coincide con lo que buscamos (ej: "barman" en "barman")
         if busqueda in oficio:
 
             # 3. FILTRO DE FECHA (El único que necesitas ahora)
             # Si la fecha de la boda está en la lista de días ocupados, NO está disponible
-            fechas_bloqueadas = p.get('fechas_ocupadas', [])
-
-            if fecha not in fechas_bloqueadas:
+            # Con índice se consulta el horario (o el día completo si no hay horas)
+            if indice is not None:
+                recurso = (PERSONAL, p.get('id_personal'))
+                if h_ini and h_fin:
+                    libre = indice.esta_libre(recurso, fecha, h_ini, h_fin)
+                else:
+                    libre = indice.dia_libre(recurso, fecha)
+            else:
+                # Sin índice se comparan los bloques guardados (con horario si se pidió uno)
+                if h_ini and h_fin:
+                    pedido = intervalo(fecha, h_ini, h_fin)
+                else:
+                    inicio = minuto_epoca(fecha_a_dia(fecha))
+                    pedido = (inicio, inicio + MINUTOS_DIA)
+                ocupados = map(intervalo_de_bloque, p.get('fechas_ocupadas', []))
+                libre = not any(iv is not None and chocan(pedido, iv) for iv in ocupados)
+
+            if libre:
                 # Si no está en la lista negra, ¡pasa el filtro!
                 disponibles.append(p)
 
     return disponibles
 
-def get_lugares_disponibles(fecha_str, lista_lugares, h_ini, h_fin, invitados):
+@medido('disponibilidad')
+def get_lugares_disponibles(fecha_str, lista_lugares, h_ini, h_fin, invitados, indice=None,
+                            dias_horizonte=DIAS_HORIZONTE, criterio='cercania'):
+    # Sin índice armamos uno temporal (el asistente pasa el suyo ya construido)
+    if indice is None:
+        indice = IndiceDisponibilidad.desde_catalogo(lista_lugares)
+
     # 1. Intento original
     disponibles = []
     for lugar in lista_lugares:
         if lugar['capacidad'] >= invitados:
-            if not hay_conflicto_horario(lugar['fechas_ocupadas'], fecha_str, h_ini, h_fin):
+            if indice.esta_libre((LUGAR, lugar['id_lugar']), fecha_str, h_ini, h_fin):
                 disponibles.append(lugar)
 
     # 2. Si hay disponibles, los retornamos normal
     if disponibles:
         return disponibles, None # None significa que no hubo necesidad de sugerencias
 
-    # 3. SI NO HAY: Buscamos sugerencias (Motor Inteligente)
-    sugerencias = []
-    fecha_obj = datetime.strptime(fecha_str, "%d/%m/%Y")
-
-    # Buscamos en los próximos 3 días
-    for i in range(1, 4):
-        nueva_fecha_obj = fecha_obj + timedelta(days=i)
-        nueva_fecha_str = nueva_fecha_obj.strftime("%d/%m/%Y")
-
-        for lugar in lista_lugares:
-            if lugar['capacidad'] >= invitados:
-                if not hay_conflicto_horario(lugar['fechas_ocupadas'], nueva_fecha_str, h_ini, h_fin):
-                    sugerencias.append({
-                        "nombre": lugar['nombre'],
-                        "fecha": nueva_fecha_str
-                    })
+    # 3. SI NO HAY: Buscamos sugerencias (Motor Inteligente) en los próximos días
+    sugerencias = buscar_fechas_alternativas(
+        fecha_str, lista_lugares, h_ini, h_fin, invitados, indice,
+        dias_horizonte, criterio
+    )
 
     return [], sugerencias
 
@@ -130,41 +157,25 @@ def calcular_costo_inventario(lista_items):
 def calculate_total(costo_inv: float,
                     costo_pers:float,
                     costo_lug:float,):
-    
-    costo_total = costo_inv + costo_pers + costo_lug
-    extras = costo_total*0.26 #suma 0,10 de costo_wedding planner y 0,16 de impuestos
-    return costo_total + extras
+    # Mismas tasas que la cotización (comisión e impuestos de cotizacion_viva)
+    return totales(costo_inv + costo_pers + costo_lug)[2]
 
+@medido('cotizacion')
 def build_cotizacion(cliente, lug_elegido, sel_pers, lista_items, fecha, h_inicio, h_fin):
-    # 1. CÁLCULO DE COSTOS BASE
-    costo_inv = calcular_costo_inventario(lista_items)
-    costo_pers = sum(p.sueldo for p in sel_pers)
-    costo_lug = lug_elegido['precio']
-
-    # 2. CÁLCULOS FINANCIEROS
-    subtotal = costo_inv + costo_lug + costo_pers
-    comision_val = subtotal * 0.10  # 10% de Wedding Planner
-    total_final = subtotal + comision_val # <--- AQUÍ: Sumar la comisión al total
-
-    # 3. ESTRUCTURA FINAL
-    cotizacion_final = {
-        'id_lugar': lug_elegido['id_lugar'],
-        'nombre_lugar': lug_elegido['nombre'],
-        'cliente': cliente.nombre,
-        'fecha': fecha,
-        'h_inicio': h_inicio,
-        'h_fin': h_fin,
-        'personal_contratado': sel_pers, 
-        'items_pedidos': lista_items,
-        'subtotal': subtotal,
-        'comision': comision_val,
-        'total_final': total_final, # Asegúrate de que este nombre coincida con el ticket
-        'estado': 'Pendiente'
-    }
-    return cotizacion_final
-
-def approve_cotizacion(cotizacion, lista_lugares, lista_personal,lista_inventario):
-    """Evita reservas accidentales, avisa si se gaurda la cot o no con bool"""
+    # Se arma de una vez una cotización viva (la que lleva los totales)
+    cotizacion = CotizacionViva(cliente, fecha, h_inicio, h_fin, lug_elegido)
+    for p in sel_pers:
+        cotizacion.agregar_personal(p)
+    for item in lista_items:
+        cotizacion.agregar_item(item)
+    return cotizacion.como_dict()
+
+def approve_cotizacion(cotizacion, apartados=None, dueno=None):
+    """
+    Evita reservas accidentales, avisa si se guarda la cot o no con bool.
+    Hasta confirmar no hay nada bloqueado en las listas, solo apartados: al
+    rechazar se sueltan los del dueño (nunca bloques de otras bodas).
+    """
     print(f"RESUMEN DE COTIZACIÓN PARA: {cotizacion['cliente']}")
     print(f"TOTAL A PAGAR: ${cotizacion['total_final']}")
 
@@ -175,138 +186,65 @@ def approve_cotizacion(cotizacion, lista_lugares, lista_personal,lista_inventari
         print("Boda aprobada oficialmente.")
         return True
     else:
-        print("Cotización rechazada. Liberando recursos...")
-        # AQUÍ RESOLVEMOS EL DETALLE:
-        liberar_recursos(cotizacion, lista_lugares, lista_personal,lista_inventario)
+        print("Cotización rechazada. Liberando recursos apartados...")
+        if apartados is not None:
+            apartados.liberar(dueno)
         return False
 
-def procesar_confirmacion_boda(cotizacion, lista_lugares, lista_personal, lista_inventario):
-    # este es el bloque horario que se guardará en los archivos
-    bloque = {
-        "fecha": cotizacion['fecha'],
-        "inicio": cotizacion['h_inicio'],
-        "fin": cotizacion['h_fin']
-    }
+@medido('confirmacion')
+def procesar_confirmacion_boda(cotizacion, lista_lugares, lista_personal, libro=None, indice=None,
+                               avisar=True):
+    # estos son los bloques horarios que se guardarán en los archivos: el
+    # horario principal y las sesiones extra, con su montaje/desmontaje
+    bloques = bloques_de_cotizacion(cotizacion)
 
     # 1. Bloqueamos el lugar
-    for lug in lista_lugares:
-        if lug['id_lugar'] == cotizacion['id_lugar']:
+    with medir('confirmacion.bloquear_lugar'):
+        lug = buscar_elemento_id(cotizacion['id_lugar'], lista_lugares, 'id_lugar')
+        if lug:
             if 'fechas_ocupadas' not in lug:
                 lug['fechas_ocupadas'] = []
-            lug['fechas_ocupadas'].append(bloque)
+            for bloque in bloques:
+                lug['fechas_ocupadas'].append(dict(bloque))
+                if indice is not None:
+                    indice.agregar_bloque((LUGAR, lug['id_lugar']), bloque)
 
     # 2. Bloqueamos al personal
-    for p_contratado in cotizacion['personal_contratado']:
-        for p_total in lista_personal:
+    with medir('confirmacion.bloquear_personal'):
+        # Diccionario por ID para no recorrer toda la lista por cada contratado
+        personal_por_id = {p.get('id_personal'): p for p in lista_personal if isinstance(p, dict)}
+        for p_contratado in cotizacion['personal_contratado']:
             # p_contratado es OBJETO (usa punto .id_personal)
             # p_total es DICCIONARIO (usa corchetes ['id_personal'])
-            if p_total.get('id_personal') == p_contratado.id_personal:
+            p_total = personal_por_id.get(p_contratado.id_personal)
+            if p_total:
                 if 'fechas_ocupadas' not in p_total:
                     p_total['fechas_ocupadas'] = []
-                p_total['fechas_ocupadas'].append(bloque)
+                for bloque in bloques:
+                    p_total['fechas_ocupadas'].append(dict(bloque))
+                    if indice is not None:
+                        indice.agregar_bloque((PERSONAL, p_total['id_personal']), bloque)
 
-    # 3. DESCUENTO DE INVENTARIO
-    for item in cotizacion['items_pedidos']:
-        for inv in lista_inventario:
-            if inv['id_item'] == item.id_item_reserva:
-                inv['cantidad'] -= item.cantidad_requerida
+    # 3. INVENTARIO: se anota en el libro de stock por día ('cantidad' no se toca)
+    if libro is not None:
+        with medir('confirmacion.libro_stock'):
+            libro.reservar(cotizacion)
 
-    print("¡SISTEMA ACTUALIZADO! Todos los recursos han sido bloqueados.")
+    if avisar:
+        print("¡SISTEMA ACTUALIZADO! Todos los recursos han sido bloqueados.")
 
-def limpiar_pantalla():
-    # 'nt' es para Windows, 'posix' para Mac o Linux
-    if os.name == 'nt':
-        os.system('cls')
-    else:
-        os.system('clear')
-
-def guardar_reserva_json(cotizacion):
-
-    nombre_archivo = 'data/reservas.json'
-
-    historial = ensure_file_exist(nombre_archivo, [])
+def serializar_reserva(cotizacion):
+    """Copia la cotización convirtiendo personal e items (objetos) a diccionarios."""
     boda_para_guardar = cotizacion.copy()
 
     boda_para_guardar['personal_contratado'] = [
-        vars(p) if hasattr(p, '__dict__') else p for p in cotizacion['personal_contratado']
+        p.to_dict() if hasattr(p, 'to_dict') else p for p in cotizacion['personal_contratado']
     ]
     # Convertimos los objetos de servicios a diccionarios
     boda_para_guardar['items_pedidos'] = [
-        vars(s) if hasattr(s, '__dict__') else s for s in cotizacion['items_pedidos']
+        s.to_dict() if hasattr(s, 'to_dict') else s for s in cotizacion['items_pedidos']
     ]
-
-    historial.append(boda_para_guardar)
-    write_json(nombre_archivo, historial)
-    print("✅ Boda guardada en el historial de reservas.")
-
-    print("✅ La boda se guardó correctamente en el historial.")
-
-def liberar_recursos(cotizacion, lista_lugares, lista_personal, lista_inventario):
-    fecha_boda = cotizacion['fecha']
-
-
-    lugar = buscar_elemento_id(cotizacion['id_lugar'], lista_lugares, 'id_lugar')
-    if lugar:
-        lugar['fechas_ocupadas'] = [f for f in lugar['fechas_ocupadas'] if f['fecha'] != fecha_boda]
-
-
-    for p_contratado in cotizacion['personal_contratado']:
-
-        id_a_liberar = getattr(p_contratado, 'id_personal', None) or p_contratado.get('id_personal')
-
-        p_maestro = buscar_elemento_id(id_a_liberar, lista_personal, 'id_personal')
-
-        if p_maestro:
-
-            p_maestro['fechas_ocupadas'] = [f for f in p_maestro.get('fechas_ocupadas', []) 
-                                            if f.get('fecha') != fecha_boda]
-
-    for servicio in cotizacion['items_pedidos']:
-        for item_inv in lista_inventario:
-            if item_inv['id_item'] == servicio.id_item_reserva:
-                item_inv['cantidad'] += servicio.cantidad_requerida
-
-def generar_ticket(cliente, lugar, personal, servicios, subtotal, comision, total, fecha_boda):
-    with open("ticket_boda.txt", "w", encoding="utf-8") as f:
-        f.write("==========================================\n")
-        f.write("          TICKET DE RESERVA - BODA        \n")
-        f.write("==========================================\n\n")
-
-        # Uso de 'cliente' y 'fecha_boda'
-        f.write(f"CLIENTE: {cliente.nombre}\n")
-        f.write(f"EMAIL: {cliente.email}\n")
-        f.write(f"FECHA DEL EVENTO: {fecha_boda.strftime('%d de %B de %Y')}\n")
-        f.write("------------------------------------------\n\n")
-
-        # Uso de 'lugar'
-        f.write(f"LUGAR SELECCIONADO: {lugar['nombre']}\n")
-        f.write(f"LUGAR SELECCIONADO: {lugar['nombre']}\n")
-        f.write("SERVICIOS DE CORTESÍA (INCLUIDOS EN EL LUGAR):\n")
-        
-        # Accedemos a la lista del diccionario lugar
-        for s in lugar.get('servicios_incluidos', []):
-            f.write(f"   🎁 {s:.<30} $0.00\n") 
-        f.write(f"COSTO LUGAR: ${lugar['precio']}\n\n")
-
-        # Uso de 'personal'
-        f.write("PERSONAL CONTRATADO:\n")
-        for p in personal:
-            # Aquí 'p' es un objeto de la clase Personal
-            f.write(f"- {p.nombre} ({p.oficio} - Nivel: {p.experiencia}): ${p.sueldo}\n")
-
-        # Uso de 'servicios'
-        f.write("\nSERVICIOS ADICIONALES:\n")
-        for item in servicios:
-            # Aquí 'item' es un objeto ItemReserva
-            f.write(f"- {item.nombre} (x{item.cantidad_requerida}): ${item.calcular_subtotal()}\n")
-
-        f.write("\n------------------------------------------\n")
-        # Uso de 'subtotal', 'comision' y 'total'
-        f.write(f"SUBTOTAL: ${subtotal:.2f}\n")
-        f.write(f"COMISIÓN (10%): ${comision:.2f}\n")
-        f.write(f"TOTAL FINAL: ${total:.2f}\n")
-        f.write("------------------------------------------\n")
-        f.write("\n¡Gracias por confiar en nosotros!")
+    return boda_para_guardar
 
 def can_select_lugar(presupuesto_cliente, precio_lugar):
 
@@ -334,79 +272,311 @@ def imprimir_tabla_personal(lista_disponibles):
         print(f"{idx:<5} | {nom:<22} | {exp:<18} | ${sue:<10}")
     print("-" * 65)
 
-def ver_historial():
-    # Limpiamos antes de mostrar para que se vea ordenado
-    limpiar_pantalla() 
-    print("==========================================")
-    print("      HISTORIAL DE BODAS REGISTRADAS      ")
-    print("==========================================\n")
-
-    # Cargamos el archivo
-    reservas = ensure_file_exist('data/reservas.json', [])
-    ganancia_total_empresa = 0
-
-    if not reservas:
-        print("⚠️ No se encontraron bodas registradas en el historial.")
-    else:
-        # Recorremos cada reserva guardada
-        for i, boda in enumerate(reservas, 1):
-            # En tu código anterior usaste to_dict() para el cliente
-            # Asegúrate de extraer el nombre correctamente si es un diccionario
-            cliente_data = boda.get('cliente', {})
-            nombre_cliente = cliente_data.get('nombre', 'Desconocido') if isinstance(cliente_data, dict) else cliente_data
-
-            total = boda.get('total_final', 0)
-            comision = boda.get('comision', 0)
-            ganancia_total_empresa += comision
-
-            print(f"{i}. CLIENTE: {nombre_cliente}")
-            print(f"   TOTAL: ${total:,.2f} | COMISIÓN EMPRESA: ${comision:,.2f}")
-
-            cant_servicios = len(boda.get('servicios', []))
-            print(f"   SERVICIOS: {cant_servicios} contratados")
-            print("-" * 40)
-
-        # Resumen final de ganancias
-        print(f"\n💰 GANANCIA TOTAL ACUMULADA: ${ganancia_total_empresa:,.2f}")
-
-    # --- EL INPUT QUE NECESITABAS ---
-    print("\n" + "="*40)
-    input("Presione Enter para volver al menú principal...")
-
-def val_restricc(personal_contratado, servicios_elegidos, lugar_seleccionado, num_invitados):
-    # Extraemos los oficios y nombres de servicios de forma limpia
-    oficios_p = [p.oficio.lower().strip() for p in personal_contratado]
-    nombres_s = [s.nombre.lower().strip() for s in servicios_elegidos]
-    nombre_lug = lugar_seleccionado['nombre'].lower()
-
-    # 1 y 2. VALIDACIÓN DE MOBILIARIO (Sillas y Mesas)
-    cant_sillas = sum(s.cantidad_requerida for s in servicios_elegidos if "silla" in s.nombre.lower())
-    sillas_min = int(num_invitados * 0.8)
-    if cant_sillas < sillas_min:
-        return False, f"Mobiliario insuficiente: Tiene {cant_sillas} sillas para {num_invitados} invitados (Mín. {sillas_min})."
-
-    cant_mesas = sum(s.cantidad_requerida for s in servicios_elegidos if "mesa" in s.nombre.lower())
-    mesas_min = int(num_invitados / 10)
-    if num_invitados > 0 and cant_mesas < mesas_min:
-        return False, f"Mobiliario insuficiente: Tiene {cant_mesas} mesas para {num_invitados} invitados (Mín. {mesas_min})."
-
-    # 3. COHERENCIA DE BARRA
-    if any("cocteleria" in s or "barra libre" in s for s in nombres_s):
-        # Cambio: Buscamos si la palabra barman  existe dentro de algún oficio
-        if not any("barman" in o for o in oficios_p):
-            return False, "La 'Barra Libre' requiere contratar personal de 'Barman' o 'Sommelier'."
-
-    # 4. AUDIO PROFESIONAL
-    necesita_audio = any(m in s for s in nombres_s for m in ["dj", "rock", "banda", "mariachi"])
-    tiene_equipo = any("sonido" in s or "parlante" in s for s in nombres_s)
-    if necesita_audio and not tiene_equipo:
-        return False, "Música detectada: Es obligatorio incluir 'Equipo de Sonido Profesional'."
-
-    # 5. PISCINA Y SEGURIDAD (Aquí es donde estaba el fallo)
-    tiene_piscina = "piscina" in nombre_lug or any("piscina" in serv.lower() for serv in lugar_seleccionado.get('servicios_incluidos', []))
-    if tiene_piscina:
-        # Cambio profesional: Usamos "any" con búsqueda parcial para evitar errores de texto
-        if not any("seguridad" in o for o in oficios_p):
-            return False, f"El lugar '{lugar_seleccionado['nombre']}' tiene piscina y requiere personal de 'Seguridad'."
-
-    return True, ""
+def _pedir_filtros_historial():
+    """Pregunta los filtros del historial (Enter deja cada uno sin usar)."""
+    print("\n--- FILTROS (Enter para omitir) ---")
+    filtros = {}
+    desde = input("Desde la fecha (DD/MM/AAAA): ").strip()
+    hasta = input("Hasta la fecha (DD/MM/AAAA): ").strip()
+    lugar = input("ID del lugar: ").strip()
+    cliente = input("Nombre del cliente (o parte): ").strip()
+    estado = input("Estado (Aprobado/Pendiente): ").strip()
+    try:
+        if desde:
+            datetime.strptime(desde, "%d/%m/%Y")
+            filtros['desde'] = desde
+        if hasta:
+            datetime.strptime(hasta, "%d/%m/%Y")
+            filtros['hasta'] = hasta
+    except ValueError:
+        print("⚠️ Fecha con formato incorrecto, se ignora el filtro de fechas.")
+        filtros.pop('desde', None)
+    if lugar.isdigit():
+        filtros['id_lugar'] = int(lugar)
+    if cliente:
+        filtros['cliente'] = cliente
+    if estado:
+        filtros['estado'] = estado
+    return filtros
+
+def _imprimir_desglose(agregados):
+    """Muestra la comisión por mes, por lugar y lo pagado a cada trabajador."""
+    print("\n📅 COMISIÓN POR MES:")
+    for mes in sorted(agregados.comision_por_mes):
+        print(f"   {mes}: ${agregados.comision_por_mes[mes]:,.2f}")
+    print("\n🏛️  POR LUGAR:")
+    for datos in agregados.por_lugar.values():
+        print(f"   {datos['nombre']:<25} | {datos['bodas']:>4} bodas | "
+              f"Ingresos ${datos['ingresos']:,.2f} | Comisión ${datos['comision']:,.2f}")
+    print("\n👥 POR PERSONAL:")
+    for datos in agregados.por_personal.values():
+        print(f"   {datos['nombre']:<25} | {datos['bodas']:>4} bodas | Sueldos ${datos['sueldos']:,.2f}")
+
+def ver_historial(almacenamiento, tamano_pagina=10):
+    filtros = {}
+    while True:
+        # Limpiamos antes de mostrar para que se vea ordenado
+        limpiar_pantalla()
+        print("==========================================")
+        print("      HISTORIAL DE BODAS REGISTRADAS      ")
+        print("==========================================\n")
+
+        # El resumen sale de los totales acumulados, no de recorrer el historial
+        agregados = almacenamiento.agregados()
+        if agregados.cantidad == 0:
+            print("⚠️ No se encontraron bodas registradas en el historial.")
+            print("\n" + "="*40)
+            input("Presione Enter para volver al menú principal...")
+            return
+
+        print(f"💍 BODAS: {agregados.cantidad} | INGRESOS: ${agregados.ingresos:,.2f}")
+        print(f"💰 GANANCIA TOTAL ACUMULADA: ${agregados.comision:,.2f}")
+        if filtros:
+            print(f"🔎 Filtros activos: {filtros}")
+        print("-" * 40)
+
+        # Recorremos el historial de a una página (sin cargarlo entero)
+        reservas = historial.filtrar_reservas(almacenamiento.iterar_reservas(), **filtros)
+        paginas = historial.paginar(reservas, tamano_pagina)
+        pagina = next(paginas, None)
+        numero = 0
+        op = None
+        while pagina:
+            for boda in pagina:
+                numero += 1
+                total = boda.get('total_final', 0)
+                comision = boda.get('comision', 0)
+
+                print(f"{numero}. CLIENTE: {historial.nombre_cliente(boda)} | FECHA: {boda.get('fecha', '?')}")
+                print(f"   LUGAR: {boda.get('nombre_lugar', '?')} | ESTADO: {boda.get('estado', '?')}")
+                print(f"   TOTAL: ${total:,.2f} | COMISIÓN EMPRESA: ${comision:,.2f}")
+
+                cant_servicios = len(boda.get('items_pedidos', boda.get('servicios', [])))
+                print(f"   SERVICIOS: {cant_servicios} contratados")
+                print("-" * 40)
+
+            # Solo se lee la página siguiente si el usuario la pide
+            pagina = next(paginas, None)
+            if pagina:
+                op = input("\nEnter = más | F = filtrar | D = desglose | 0 = volver: ").strip().lower()
+                if op in ('f', 'd', '0'):
+                    break
+
+        if op not in ('f', 'd', '0'):
+            if numero == 0:
+                print("⚠️ Ninguna boda coincide con los filtros.")
+            op = input("\nFin del historial. F = filtrar | D = desglose | Enter = volver: ").strip().lower()
+
+        if op == 'f':
+            filtros = _pedir_filtros_historial()
+        elif op == 'd':
+            _imprimir_desglose(agregados)
+            input("\nPresione Enter para continuar...")
+        else:
+            return
+
+@medido('validacion')
+def val_restricc(personal_contratado, servicios_elegidos, lugar_seleccionado, num_invitados, motor=None):
+    """
+    Validación final de logística: revisa todas las reglas de negocio (ver
+    motor_reglas.REGLAS) en una sola pasada.
+
+    Returns:
+        tuple: (True, "") o (False, mensajes de todas las reglas incumplidas, uno por línea).
+    """
+    errores = (motor or MOTOR).evaluar(
+        personal_contratado, servicios_elegidos, lugar_seleccionado, num_invitados
+    )
+    return not errores, "\n".join(errores)
+
+# --- VALIDACIONES DE DATOS DE ENTRADA ---
+# Cada función devuelve "" si el dato es válido o el mensaje de error a mostrar,
+# así las usan igual el asistente interactivo y la carga masiva de reservas.
+
+def validar_id_cliente(id_cliente, repo):
+    if not 1000 <= id_cliente <= 10000:
+        return "⚠️ Error: El ID debe estar entre 1000 y 10000."
+    if repo.existe_cliente(id_cliente):
+        return "❌ Este ID ya existe. Use uno diferente."
+    return ""
+
+def validar_nombre_cliente(nombre):
+    if not nombre:
+        return "⚠️ El nombre no puede estar vacío."
+
+    # Preparación para validaciones
+    palabras = nombre.lower().split()
+    solo_letras = nombre.replace(" ", "")
+
+    # A. Evitar palabras repetidas (ej: "pedro pedro pedro")
+    repetida = any(palabras.count(p) > 2 for p in palabras)
+
+    # B. Evitar "disparates" (Regex para 5 o más consonantes seguidas)
+    tiene_basura = re.search(r'[^aeiouáéíóúü\s]{5,}', nombre.lower())
+    letras_locas = re.search(r'(.)\1{3,}', nombre.lower())
+
+    # --- VALIDACIÓN ÚNICA (ORDENADA) ---
+    if len(nombre) < 8:
+        return "⚠️ Nombre demasiado corto (mín. 8 caracteres)."
+    if not solo_letras.isalpha():
+        return "⚠️ Solo se permiten letras y espacios."
+    if repetida:
+        return "⚠️ Nombre inválido: demasiadas palabras repetidas."
+    if tiene_basura:
+        return "⚠️ El nombre parece inválido (letras aleatorias detectadas)."
+    if letras_locas:
+        return "⚠️ El nombre contiene demasiadas letras repetidas seguidas."
+    return ""
+
+def validar_correo(correo):
+    if " " in correo:
+        return "❌ El correo no puede contener espacios."
+    if not correo.endswith("@gmail.com"):
+        return "❌ Debe ser una dirección válida que termine en @gmail.com"
+
+    usuario = correo.split('@')[0]
+    # 1. Detectar símbolos repetidos (ej: "......" o "------")
+    simbolos_repetidos = re.search(r'[\._-]{2,}', usuario)
+    # 2. Detectar si empieza o termina con un símbolo (inválido en Gmail)
+    borde_invalido = (
+        usuario.startswith(('.', '-', '_')) or
+        usuario.endswith(('.', '-', '_'))
+    )
+    # 3. Detectar caracteres no permitidos ( puntos, guiones y guiones bajos)
+    caracteres_prohibidos = re.search(r'[^a-z0-9\._-]', usuario)
+    # 4. Tu validación de "basura" (consonantes seguidas)
+    es_basura = re.search(r'[^aeiou0-9]{5,}', usuario)
+
+    if len(usuario) < 4:
+        return "❌ El nombre de usuario del correo es muy corto (mín. 4 caracteres)."
+    if simbolos_repetidos:
+        return "❌ El correo no puede tener puntos o guiones seguidos."
+    if borde_invalido:
+        return "❌ El correo no puede empezar ni terminar con símbolos."
+    if caracteres_prohibidos:
+        return "❌ El correo contiene caracteres no permitidos."
+    if es_basura:
+        return "❌ El correo parece generado aleatoriamente (basura)."
+    return ""
+
+def validar_invitados(invitados):
+    if invitados < 0:
+        return ("\n❌ ERROR: La cantidad de invitados no puede ser negativa.\n"
+                "   Por favor, ingrese un número real (sin signos de menos).")
+    if invitados < 30:
+        return ("⚠️ Lo sentimos. El mínimo aceptado para que la "
+                "logística sea viable es de 30 personas.")
+    if invitados > 350:
+        return "⚠️ Cantidad excedida. El límite de nuestros salones es 350 invitados."
+    return ""
+
+def validar_presupuesto(presupuesto):
+    # 1. Filtro de números negativos (La muela de coherencia)
+    if presupuesto < 0:
+        return ("\n❌ ERROR: El presupuesto no puede ser negativo.\n"
+                "   Por favor, ingrese un monto real (sin signos de menos).")
+    # 2. Filtro de presupuesto insuficiente
+    if presupuesto < 4000:
+        return ("\n❌ PRESUPUESTO INSUFICIENTE: El mínimo para iniciar es de $4000.\n"
+                "   Nuestros estándares de calidad requieren una inversión mayor.")
+    # 3. Filtro de presupuesto exagerado (El límite de "billonarios")
+    if presupuesto > 1000000:
+        return ("\n🧐 ¡WOW!: Ese es un presupuesto digno de la Realeza.\n"
+                "   Por seguridad, el límite para cotizaciones automáticas es de $1,000,000.\n"
+                "   Si es más rico que eso, contacte a Raquel directamente por teléfono. 😉")
+    return ""
+
+def validar_fecha_evento(fecha_str):
+    """Devuelve (fecha_date, "") si es válida o (None, mensaje de error)."""
+    hoy = datetime.now().date()
+    try:
+        fecha_boda = datetime.strptime(fecha_str, "%d/%m/%Y").date()
+    except ValueError:
+        return None, "⚠️ Formato incorrecto. Debe ser día/mes/año (ej: 15/05/2026)"
+    if fecha_boda < hoy:
+        return None, "❌ No puedes elegir una fecha pasada. ¡Planificamos el futuro!"
+    # Validar el límite de 2 años (Evita el año 2100)
+    limite_futuro = hoy + timedelta(days=730) # 2 años aprox.
+    if fecha_boda > limite_futuro:
+        return None, ("⚠️ Error: No aceptamos reservas con más de 2 años de antelación.\n"
+                      f"El límite máximo es: {limite_futuro.strftime('%d/%m/%Y')}")
+    return fecha_boda, ""
+
+def validar_hora(hora):
+    # VALIDACIONES ESTRICTAS: exactamente 5 caracteres (00:00) y un solo ':' en la posición 2
+    if not (len(hora) == 5 and hora[2] == ":" and hora.count(":") == 1):
+        return ("⚠️ Formato incorrecto. Use estrictamente HH:MM (5 caracteres y un solo ':').\n"
+                "Ejemplo: Para las 3 de la tarde, escriba 15:00")
+    try:
+        datetime.strptime(hora, "%H:%M")
+    except ValueError:
+        return "❌ Hora inexistente. Use el rango 00:00 - 23:59."
+    return ""
+
+def duracion_evento(h_ini, h_fin):
+    """Minutos entre inicio y fin; si el fin es menor se entiende que cruza la medianoche."""
+    t_ini = datetime.strptime(h_ini, "%H:%M")
+    t_fin = datetime.strptime(h_fin, "%H:%M")
+    if t_fin < t_ini:
+        t_fin = t_fin + timedelta(days=1)
+    return (t_fin - t_ini).total_seconds() / 60
+
+def validar_horario(h_ini, h_fin):
+    """Valida ambas horas y la duración mínima de 2 horas."""
+    error = validar_hora(h_ini) or validar_hora(h_fin)
+    if error:
+        return error
+    if h_ini == h_fin:
+        return "❌ La hora de fin no puede ser igual a la de inicio."
+    minutos_reales = duracion_evento(h_ini, h_fin)
+    if minutos_reales < 120:
+        return (f"❌ Duración insuficiente. Mínimo 2 horas "
+                f"(Su evento dura: {minutos_reales:.0f} min).")
+    return ""
+
+# Tope de montaje o desmontaje por bloque (12 horas) y de sesiones extra por boda
+MAX_MONTAJE = 12 * 60
+MAX_SESIONES = 6
+
+def validar_montaje(minutos):
+    """Minutos de montaje/desmontaje: entero entre 0 y 12 horas."""
+    if isinstance(minutos, bool) or not isinstance(minutos, int) or not 0 <= minutos <= MAX_MONTAJE:
+        return f"❌ El montaje y desmontaje van en minutos, de 0 a {MAX_MONTAJE}."
+    return ""
+
+def validar_sesion(sesion):
+    """
+    Valida una sesión extra de la boda (cena de ensayo, brunch...):
+    {"fecha", "inicio", "fin"} y opcionales "fecha_fin", "montaje", "desmontaje".
+    """
+    if not isinstance(sesion, dict):
+        return "❌ Cada sesión debe tener fecha, inicio y fin."
+    fecha, inicio, fin = str(sesion.get('fecha', '')), str(sesion.get('inicio', '')), str(sesion.get('fin', ''))
+    _, error = validar_fecha_evento(fecha)
+    error = error or validar_hora(inicio) or validar_hora(fin)
+    if not error and sesion.get('fecha_fin'):
+        _, error = validar_fecha_evento(str(sesion['fecha_fin']))
+    for llave in ('montaje', 'desmontaje'):
+        error = error or (validar_montaje(sesion[llave]) if llave in sesion else "")
+    if error:
+        return f"Sesión del {fecha}: {error}"
+    try:
+        intervalo(fecha, inicio, fin, sesion.get('fecha_fin'))
+    except ValueError:
+        return f"Sesión del {fecha}: ❌ termina antes de empezar."
+    if not sesion.get('fecha_fin') and inicio == fin:
+        return f"Sesión del {fecha}: ❌ La hora de fin no puede ser igual a la de inicio."
+    return ""
+
+@medido('validacion')
+def val_categoria(cat, servicios, personal_contratado, num_invitados, motor=None):
+    """
+    Validaciones de logística de una categoría del inventario (las reglas de
+    motor_reglas.REGLAS asociadas a esa categoría).
+
+    Returns:
+        list: Mensajes de error (vacía si la categoría cumple).
+    """
+    return (motor or MOTOR).evaluar(
+        personal_contratado, servicios, None, num_invitados, categoria=cat
+    )
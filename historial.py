@@ -0,0 +1,134 @@
+"""
+Motor de reportes del historial de bodas para 'Raquel & Alba'.
+Recorre las reservas de forma perezosa (con filtros y paginación) y
+mantiene totales acumulados que se actualizan con cada boda confirmada,
+para que el resumen del historial no tenga que recorrer todo el archivo.
+"""
+from itertools import islice
+
+from bloques import fecha_a_dia
+
+
+def nombre_cliente(reserva):
+    """Nombre del cliente de una reserva (en datos antiguos podía ser un diccionario)."""
+    cliente = reserva.get('cliente', '')
+    if isinstance(cliente, dict):
+        return cliente.get('nombre', 'Desconocido')
+    return cliente or 'Desconocido'
+
+
+def filtrar_reservas(reservas, desde=None, hasta=None, id_lugar=None, cliente=None, estado=None):
+    """
+    Filtra un iterable de reservas sin cargarlo entero en memoria.
+
+    Args:
+        desde, hasta (str): Rango de fechas del evento 'DD/MM/AAAA' (inclusive).
+        id_lugar (int): Solo bodas en ese lugar.
+        cliente (str): Texto contenido en el nombre del cliente (sin mayúsculas).
+        estado (str): 'Aprobado', 'Pendiente', etc. (sin distinguir mayúsculas).
+    """
+    dia_desde = fecha_a_dia(desde) if desde else None
+    dia_hasta = fecha_a_dia(hasta) if hasta else None
+    cliente = cliente.lower() if cliente else None
+    estado = estado.lower() if estado else None
+
+    for r in reservas:
+        if dia_desde is not None or dia_hasta is not None:
+            try:
+                dia = fecha_a_dia(r.get('fecha', ''))
+            except ValueError:
+                continue
+            if dia_desde is not None and dia < dia_desde:
+                continue
+            if dia_hasta is not None and dia > dia_hasta:
+                continue
+        if id_lugar is not None and r.get('id_lugar') != id_lugar:
+            continue
+        if cliente and cliente not in nombre_cliente(r).lower():
+            continue
+        if estado and str(r.get('estado', '')).lower() != estado:
+            continue
+        yield r
+
+
+def paginar(reservas, tamano=10):
+    """Agrupa un iterable en páginas (listas) de 'tamano' elementos, a pedido."""
+    it = iter(reservas)
+    while True:
+        pagina = list(islice(it, tamano))
+        if not pagina:
+            return
+        yield pagina
+
+
+def _mes(fecha):
+    # 'DD/MM/AAAA' -> 'AAAA-MM'
+    partes = str(fecha).split('/')
+    if len(partes) != 3:
+        return 'sin fecha'
+    return f"{partes[2]}-{partes[1]}"
+
+
+class AgregadosReservas:
+    """
+    Totales del historial que se actualizan de a una reserva (O(1) por boda).
+
+    Atributos:
+        cantidad (int): Bodas registradas.
+        ingresos (float): Suma de 'total_final'.
+        comision (float): Suma de la comisión de la empresa.
+        comision_por_mes (dict): 'AAAA-MM' -> comisión de las bodas de ese mes.
+        por_lugar (dict): id_lugar -> {'nombre', 'bodas', 'ingresos', 'comision'}.
+        por_personal (dict): id_personal -> {'nombre', 'bodas', 'sueldos'}.
+    """
+    def __init__(self):
+        self.cantidad = 0
+        self.ingresos = 0.0
+        self.comision = 0.0
+        self.comision_por_mes = {}
+        self.por_lugar = {}
+        self.por_personal = {}
+
+    @classmethod
+    def desde_reservas(cls, reservas):
+        """Recalcula todo desde cero (solo cuando no hay totales guardados)."""
+        agregados = cls()
+        for r in reservas:
+            agregados.agregar(r)
+        return agregados
+
+    def agregar(self, reserva):
+        total = reserva.get('total_final', 0) or 0
+        comision = reserva.get('comision', 0) or 0
+        self.cantidad += 1
+        self.ingresos += total
+        self.comision += comision
+
+        mes = _mes(reserva.get('fecha', ''))
+        self.comision_por_mes[mes] = self.comision_por_mes.get(mes, 0) + comision
+
+        # Las llaves van como texto para que el JSON guardado sea igual al de memoria
+        lug = self.por_lugar.setdefault(str(reserva.get('id_lugar')), {
+            'nombre': reserva.get('nombre_lugar', ''), 'bodas': 0, 'ingresos': 0.0, 'comision': 0.0
+        })
+        lug['bodas'] += 1
+        lug['ingresos'] += total
+        lug['comision'] += comision
+
+        for p in reserva.get('personal_contratado', []):
+            datos = self.por_personal.setdefault(str(p.get('id_personal')), {
+                'nombre': p.get('nombre', ''), 'bodas': 0, 'sueldos': 0.0
+            })
+            datos['bodas'] += 1
+            datos['sueldos'] += p.get('sueldo', 0) or 0
+
+    def to_dict(self):
+        """Convierte los totales a diccionario para guardarlos en JSON."""
+        return vars(self)
+
+    @classmethod
+    def from_dict(cls, datos):
+        agregados = cls()
+        for llave, valor in datos.items():
+            setattr(agregados, llave, valor)
+        return agregados
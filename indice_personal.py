@@ -0,0 +1,123 @@
+"""
+Índice de búsqueda de personal para 'Raquel & Alba'.
+Se arma una vez al cargar los datos: categorías ya normalizadas (sin tildes
+ni mayúsculas) apuntando a los IDs de su personal, los días ocupados de cada
+trabajador en un conjunto, y el personal de cada categoría ya ordenado por
+experiencia y sueldo. Buscar "estética para el 15/05/2027" cuesta lo que
+mide el resultado, sin normalizar ni recorrer todo el personal.
+"""
+import unicodedata
+from functools import lru_cache
+
+from bloques import dias_de_intervalo, fecha_a_dia, intervalo, intervalo_de_bloque
+from disponibilidad import PERSONAL
+
+
+@lru_cache(maxsize=4096)
+def normalizar(texto):
+    """
+    Minúsculas, sin espacios en los bordes y sin tildes (ej: 'Estética ' -> 'estetica').
+    Las categorías y niveles de experiencia se repiten mucho: se recuerda el resultado.
+    """
+    descompuesto = unicodedata.normalize('NFKD', str(texto).lower().strip())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def puntos_experiencia(texto):
+    """Nivel de experiencia del trabajador: 3 alto, 2 medio, 1 el resto."""
+    texto = normalizar(texto or '')
+    if "alt" in texto:
+        return 3
+    if "medi" in texto:
+        return 2
+    return 1
+
+
+class IndicePersonal:
+    """
+    Atributos:
+        por_categoria (dict): categoría normalizada -> IDs del personal, del más
+            experimentado al menos (a igual experiencia, el de menor sueldo).
+    """
+    def __init__(self, lista_personal=()):
+        self._personal = {}
+        self._dias_ocupados = {}
+        self.por_categoria = {}
+        # Al armarlo de una vez cada categoría se ordena una sola vez al final
+        for p in lista_personal:
+            self.agregar(p, ordenar=False)
+        for ids in self.por_categoria.values():
+            ids.sort(key=self._orden)
+
+    def agregar(self, persona, ordenar=True):
+        """Indexa un trabajador nuevo (o vuelve a indexarlo si ya estaba)."""
+        id_p = persona['id_personal']
+        if id_p in self._personal:
+            self._sacar_de_categoria(id_p)
+        self._personal[id_p] = persona
+        ids = self.por_categoria.setdefault(self.categoria_de(persona), [])
+        ids.append(id_p)
+        if ordenar:
+            ids.sort(key=self._orden)
+        self.actualizar_ocupacion(persona)
+
+    def _sacar_de_categoria(self, id_p):
+        ids = self.por_categoria.get(self.categoria_de(self._personal[id_p]), [])
+        if id_p in ids:
+            ids.remove(id_p)
+
+    @staticmethod
+    def categoria_de(persona):
+        """Categoría normalizada de un trabajador (la llave de por_categoria)."""
+        return normalizar(persona.get('categoria', persona.get('oficio', '')))
+
+    def _orden(self, id_p):
+        p = self._personal[id_p]
+        return -puntos_experiencia(p.get('experiencia')), p.get('sueldo', 0)
+
+    def actualizar_ocupacion(self, persona):
+        """
+        Recalcula los días ocupados de un trabajador desde sus 'fechas_ocupadas'
+        (se llama al confirmar una boda; solo mira sus propios bloques).
+        """
+        dias = set()
+        for bloque in persona.get('fechas_ocupadas', []):
+            try:
+                iv = intervalo_de_bloque(bloque)
+            except ValueError:
+                continue  # fecha mal escrita en el JSON: no bloquea nada
+            if iv is not None:
+                dias.update(dias_de_intervalo(*iv))
+        self._dias_ocupados[persona['id_personal']] = dias
+
+    def ids_de(self, categoria):
+        """
+        IDs de una categoría (ya ordenados). Si no coincide exacta, se buscan las
+        categorías que la contienen (ej: 'foto' -> 'fotografia'), como antes.
+        """
+        busqueda = normalizar(categoria)
+        if busqueda in self.por_categoria:
+            return self.por_categoria[busqueda]
+        ids = []
+        for cat, ids_cat in self.por_categoria.items():
+            if busqueda in cat:
+                ids.extend(ids_cat)
+        ids.sort(key=self._orden)
+        return ids
+
+    def de_categoria(self, categoria):
+        """Trabajadores de una categoría (diccionarios del catálogo)."""
+        return [self._personal[i] for i in self.ids_de(categoria)]
+
+    def disponibles(self, categoria, fecha, indice=None, h_ini=None, h_fin=None):
+        """
+        Trabajadores de la categoría libres en la fecha. Con índice y horario se
+        revisa el horario exacto; si no, basta con que el día no esté ocupado.
+        """
+        if indice is not None and h_ini and h_fin:
+            inicio, fin = intervalo(fecha, h_ini, h_fin)
+            return [self._personal[i] for i in self.ids_de(categoria)
+                    if indice.libre_en((PERSONAL, i), inicio, fin)]
+        dia = fecha_a_dia(fecha)
+        return [self._personal[i] for i in self.ids_de(categoria)
+                if dia not in self._dias_ocupados.get(i, ())]
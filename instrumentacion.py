@@ -0,0 +1,200 @@
+"""
+Instrumentación opcional del planificador 'Raquel & Alba'.
+Cuando está activa, cada carga y guardado de datos, consulta de
+disponibilidad, validación y ticket registra cuánto tardó, y algunos
+eventos (conflictos, bodas confirmadas) suman contadores. El resumen da
+llamadas, total y latencias p50/p95/p99 por ruta.
+
+Se activa con la variable de entorno PLANNER_DIAGNOSTICO=1 o desde la
+opción "Diagnóstico" del menú. Con PLANNER_PERFIL=sesion.prof además se
+perfila toda la sesión con cProfile y se guarda el reporte pstats al salir.
+Apagada, cada función medida solo paga una comprobación de un booleano.
+"""
+import functools
+import io
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# Muestras que se guardan por ruta para los percentiles (después se reemplazan
+# al azar, así una sesión larga no crece sin límite y la muestra sigue pareja)
+MAX_MUESTRAS = 10000
+
+
+_activo = False
+_candado = threading.Lock()
+_tiempos = {}    # ruta -> [llamadas, total_s, max_s, muestras]
+_contadores = {}
+_perfil = None
+_ruta_perfil = None
+
+
+def activar(valor=True):
+    global _activo
+    _activo = valor
+
+
+def esta_activo():
+    return _activo
+
+
+def reiniciar():
+    """Borra los tiempos y contadores juntados hasta ahora."""
+    with _candado:
+        _tiempos.clear()
+        _contadores.clear()
+
+
+def registrar(ruta, segundos):
+    """Suma una medición a la ruta (ej: 'disponibilidad.get_lugares_disponibles')."""
+    with _candado:
+        datos = _tiempos.get(ruta)
+        if datos is None:
+            datos = _tiempos[ruta] = [0, 0.0, 0.0, []]
+        datos[0] += 1
+        datos[1] += segundos
+        datos[2] = max(datos[2], segundos)
+        muestras = datos[3]
+        if len(muestras) < MAX_MUESTRAS:
+            muestras.append(segundos)
+        else:
+            posicion = random.randrange(datos[0])
+            if posicion < MAX_MUESTRAS:
+                muestras[posicion] = segundos
+
+
+def contar(nombre, cantidad=1):
+    """Suma a un contador (solo si la instrumentación está activa)."""
+    if not _activo:
+        return
+    with _candado:
+        _contadores[nombre] = _contadores.get(nombre, 0) + cantidad
+
+
+def medido(categoria):
+    """
+    Decorador: mide cada llamada como '<categoria>.<función>' (para métodos,
+    '<categoria>.<Clase>.<método>').
+    """
+    def decorador(funcion):
+        ruta = f"{categoria}.{funcion.__qualname__}"
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not _activo:
+                return funcion(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                registrar(ruta, time.perf_counter() - inicio)
+        return envoltura
+    return decorador
+
+
+@contextmanager
+def medir(ruta):
+    """Mide un bloque de código: with medir('guardado.catalogos'): ..."""
+    if not _activo:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(ruta, time.perf_counter() - inicio)
+
+
+def _percentil(ordenadas, p):
+    return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p))]
+
+
+def resumen():
+    """
+    Returns:
+        dict: {'rutas': [{ruta, llamadas, total_ms, media_ms, p50_ms, p95_ms, p99_ms, max_ms}],
+               'contadores': {nombre: valor}}. Las rutas van de la que más tiempo sumó a la que menos.
+    """
+    with _candado:
+        copia = {ruta: (n, total, maximo, sorted(muestras))
+                 for ruta, (n, total, maximo, muestras) in _tiempos.items()}
+        contadores = dict(_contadores)
+    rutas = []
+    for ruta, (n, total, maximo, muestras) in copia.items():
+        rutas.append({
+            'ruta': ruta, 'llamadas': n,
+            'total_ms': round(total * 1000, 3), 'media_ms': round(total / n * 1000, 3),
+            'p50_ms': round(_percentil(muestras, 0.50) * 1000, 3),
+            'p95_ms': round(_percentil(muestras, 0.95) * 1000, 3),
+            'p99_ms': round(_percentil(muestras, 0.99) * 1000, 3),
+            'max_ms': round(maximo * 1000, 3),
+        })
+    rutas.sort(key=lambda r: r['total_ms'], reverse=True)
+    return {'rutas': rutas, 'contadores': contadores}
+
+
+def imprimir_resumen():
+    datos = resumen()
+    if not datos['rutas'] and not datos['contadores']:
+        print("Todavía no hay mediciones (¿está activa la instrumentación?).")
+        return
+    print(f"\n{'RUTA':<52} {'LLAMADAS':>8} {'TOTAL ms':>10} {'P50':>8} {'P95':>8} {'P99':>8}")
+    print("-" * 98)
+    for r in datos['rutas']:
+        print(f"{r['ruta']:<52} {r['llamadas']:>8} {r['total_ms']:>10.1f} "
+              f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}")
+    if datos['contadores']:
+        print("\nCONTADORES:")
+        for nombre, valor in sorted(datos['contadores'].items()):
+            print(f"   {nombre:<40} {valor}")
+
+
+# --- PERFIL CON cProfile ---
+def iniciar_perfil(ruta="sesion.prof"):
+    """Empieza a perfilar todo lo que corre en el hilo principal hasta detener_perfil()."""
+    global _perfil, _ruta_perfil
+    if _perfil is not None:
+        return
+    import cProfile  # solo si se perfila (no demora el arranque)
+    _perfil, _ruta_perfil = cProfile.Profile(), ruta
+    _perfil.enable()
+
+
+def detener_perfil(lineas=25):
+    """
+    Deja de perfilar, guarda el archivo pstats y devuelve el reporte de las
+    funciones con más tiempo acumulado (o "" si no se estaba perfilando).
+    """
+    global _perfil
+    if _perfil is None:
+        return ""
+    import pstats
+    _perfil.disable()
+    _perfil.dump_stats(_ruta_perfil)
+    texto = io.StringIO()
+    pstats.Stats(_perfil, stream=texto).sort_stats('cumulative').print_stats(lineas)
+    _perfil = None
+    return f"Perfil guardado en {_ruta_perfil}\n{texto.getvalue()}"
+
+
+def perfilando():
+    return _perfil is not None
+
+
+def configurar_desde_entorno():
+    """Lee PLANNER_DIAGNOSTICO y PLANNER_PERFIL (se llama al arrancar main)."""
+    if os.environ.get('PLANNER_DIAGNOSTICO', '').lower() in ('1', 'si', 'true'):
+        activar()
+    if os.environ.get('PLANNER_PERFIL'):
+        activar()
+        iniciar_perfil(os.environ['PLANNER_PERFIL'])
+
+
+def cerrar_sesion():
+    """Al salir: guarda el perfil si había uno y muestra el resumen si hubo mediciones."""
+    if perfilando():
+        print(detener_perfil())
+    if _activo and _tiempos:
+        imprimir_resumen()
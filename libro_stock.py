@@ -0,0 +1,189 @@
+"""
+Libro de stock del planificador 'Raquel & Alba'.
+Antes, confirmar una boda le restaba a 'cantidad' lo pedido para siempre: 40
+sillas alquiladas para mayo no volvían nunca, aunque la boda de junio pudiera
+usarlas. Ahora 'cantidad' es lo que el negocio tiene, y lo que cada boda toma
+se anota acá, por item y por día:
+
+- Lo que se alquila y vuelve (mobiliario, tecnología, decoración) solo está
+  tomado los días de la boda, con sus sesiones y su montaje (ver bloques.py).
+- Lo que se consume (catering, bebida, postre) se descuenta para siempre.
+
+Cada item reutilizable guarda un árbol de Fenwick (suma por prefijos) sobre
+los días: reservar del día a al b suma +q en a y -q en b+1, así que "unidades
+en uso el día d" es la suma del prefijo hasta d, en O(log n) por consulta sin
+importar cuántas bodas se pisen. El árbol es disperso (un diccionario): solo
+ocupa memoria en los nodos que alguna reserva tocó.
+"""
+from bloques import EPOCA, bloques_de_cotizacion, dias_de_intervalo, fecha_a_dia, intervalos_de
+
+# Categorías que se consumen en la boda (el resto se alquila y vuelve)
+CONSUMIBLES = ('catering', 'bebida', 'postre')
+CONSUMIBLE = "consumible"
+REUTILIZABLE = "reutilizable"
+
+# Días que cubre cada árbol, contados desde el 01/01/2000 (hasta el año 2179)
+DIAS_LIBRO = 1 << 16
+
+
+def tipo_de(item):
+    """'consumible' o 'reutilizable': la llave 'tipo' del item o, si no la tiene, según su categoría."""
+    tipo = item.get('tipo')
+    if tipo in (CONSUMIBLE, REUTILIZABLE):
+        return tipo
+    return CONSUMIBLE if item.get('categoria') in CONSUMIBLES else REUTILIZABLE
+
+
+def lineas_de(reserva):
+    """Pares (id_item, cantidad) de una reserva, con los items como objetos o diccionarios."""
+    for item in reserva.get('items_pedidos', ()):
+        if isinstance(item, dict):
+            yield item.get('id_item_reserva'), item.get('cantidad_requerida', 0)
+        else:
+            yield item.id_item_reserva, item.cantidad_requerida
+
+
+def dias_de_reserva(reserva):
+    """Días ordinales que ocupa una boda (sesiones y montaje incluidos), en orden."""
+    try:
+        intervalos = intervalos_de(bloques_de_cotizacion(reserva))
+    except (KeyError, ValueError):
+        # Reserva vieja o incompleta: se toma al menos el día de la boda
+        try:
+            return [fecha_a_dia(reserva['fecha'])]
+        except (KeyError, TypeError, ValueError):
+            return []
+    return sorted({dia for iv in intervalos for dia in dias_de_intervalo(*iv)})
+
+
+def tramos(dias):
+    """Agrupa días ordenados en tramos consecutivos [(primero, ultimo), ...]."""
+    resultado = []
+    for dia in dias:
+        if resultado and dia == resultado[-1][1] + 1:
+            resultado[-1] = (resultado[-1][0], dia)
+        else:
+            resultado.append((dia, dia))
+    return resultado
+
+
+def migrar_inventario(inventario, reservas):
+    """
+    Inventario de antes del libro: su 'cantidad' ya tenía restado todo lo que
+    pidieron las bodas del historial. Se lo devuelve y cada item queda marcado
+    con su 'tipo', así la migración pasa una sola vez.
+
+    Returns:
+        bool: True si cambió algo (hay que guardar el inventario).
+    """
+    pendientes = {item['id_item']: item for item in inventario if not item.get('tipo')}
+    if not pendientes:
+        return False
+    for reserva in reservas:
+        for id_item, cantidad in lineas_de(reserva):
+            if id_item in pendientes:
+                pendientes[id_item]['cantidad'] += cantidad
+    for item in pendientes.values():
+        item['tipo'] = tipo_de(item)
+    return True
+
+
+class _Fenwick:
+    """Árbol de Fenwick disperso sobre posiciones 0..DIAS_LIBRO-1."""
+    __slots__ = ('_nodos',)
+
+    def __init__(self):
+        self._nodos = {}
+
+    def sumar(self, pos, valor):
+        nodos = self._nodos
+        pos += 1
+        while pos <= DIAS_LIBRO:
+            nodos[pos] = nodos.get(pos, 0) + valor
+            pos += pos & -pos
+
+    def prefijo(self, pos):
+        """Suma de las posiciones 0..pos."""
+        nodos = self._nodos
+        pos = min(pos + 1, DIAS_LIBRO)
+        total = 0
+        while pos > 0:
+            total += nodos.get(pos, 0)
+            pos -= pos & -pos
+        return total
+
+
+class LibroStock:
+    """
+    Unidades tomadas por las bodas confirmadas, por item y por día.
+
+    Atributos:
+        _tipos (dict): id_item -> 'consumible' o 'reutilizable'.
+        _en_uso (dict): id_item -> _Fenwick con +q/-q en los bordes de cada
+            tramo de días (reutilizables) o +q el día de la boda (consumibles).
+        _consumido (dict): id_item -> total consumido (consumibles).
+    """
+    def __init__(self, tipos=None):
+        self._tipos = dict(tipos or {})
+        self._en_uso = {}
+        self._consumido = {}
+
+    @classmethod
+    def desde_reservas(cls, reservas, inventario):
+        """Arma el libro con el historial (reservas como diccionarios) y los tipos del inventario."""
+        libro = cls({item['id_item']: tipo_de(item) for item in inventario})
+        for reserva in reservas:
+            libro.reservar(reserva)
+        return libro
+
+    def tipo(self, id_item):
+        return self._tipos.get(id_item, REUTILIZABLE)
+
+    def es_consumible(self, id_item):
+        return self.tipo(id_item) == CONSUMIBLE
+
+    def poner_tipo(self, id_item, tipo):
+        """Registra el tipo de un item nuevo del inventario."""
+        self._tipos[id_item] = tipo
+
+    # --- ESCRITURA ---
+    def reservar(self, reserva):
+        """Anota lo que toma una boda (cotización con objetos o reserva guardada)."""
+        dias = dias_de_reserva(reserva)
+        if not dias:
+            return
+        rangos = tramos(dias)
+        for id_item, cantidad in lineas_de(reserva):
+            if id_item is None or not cantidad:
+                continue
+            arbol = self._en_uso.get(id_item)
+            if arbol is None:
+                arbol = self._en_uso[id_item] = _Fenwick()
+            if self.es_consumible(id_item):
+                arbol.sumar(dias[0] - EPOCA, cantidad)
+                self._consumido[id_item] = self._consumido.get(id_item, 0) + cantidad
+                continue
+            for primero, ultimo in rangos:
+                arbol.sumar(primero - EPOCA, cantidad)
+                arbol.sumar(ultimo + 1 - EPOCA, -cantidad)
+
+    # --- CONSULTAS ---
+    def en_uso(self, id_item, dia):
+        """
+        Unidades tomadas el día 'dia' (ordinal): las que están alquiladas ese día
+        o, si el item se consume, todo lo consumido por bodas hasta ese día.
+        """
+        arbol = self._en_uso.get(id_item)
+        return arbol.prefijo(dia - EPOCA) if arbol is not None else 0
+
+    def reservado(self, id_item, dias=None):
+        """
+        Unidades que no se pueden volver a dar en esos días: el máximo en uso
+        entre ellos si el item se alquila, o todo lo consumido si se consume
+        (sin 'dias', el total consumido o 0).
+        """
+        if self.es_consumible(id_item):
+            return self._consumido.get(id_item, 0)
+        if not dias or id_item not in self._en_uso:
+            return 0
+        return max(self.en_uso(id_item, dia) for dia in dias)
@@ -1,39 +1,219 @@
 """
 Módulo principal del planificador de bodas para 'Raquel & Alba'.
-Gestiona el menú de inicio, la configuración de idioma (locale) 
-y el arranque de los módulos de planificación y registro.
+Gestiona el menú de inicio y el arranque de los módulos de planificación y
+registro. Para que el menú aparezca enseguida, los módulos de cada opción se
+importan recién cuando se elige.
 """
-import locale
-import funciones_generales as fg
-import planear_boda as pb # Importamos el otro archivo
-
-# --- CONFIGURACIÓN DE IDIOMA ---
-try:
-    # Intento para Windows
-    locale.setlocale(locale.LC_TIME, 'spanish')
-except locale.Error:
+import argparse
+import instrumentacion
+from pantalla import limpiar_pantalla
+
+def leer_argumentos(argv=None):
+    """Sin argumentos se abre el menú; 'importar-reservas' carga un lote JSONL."""
+    parser = argparse.ArgumentParser(description="Planificador de bodas Raquel & Alba")
+    sub = parser.add_subparsers(dest='comando')
+    imp = sub.add_parser('importar-reservas', help="Confirma bodas desde un archivo JSONL")
+    imp.add_argument('archivo', help="Una solicitud JSON por línea (ver api_reservas.py)")
+    imp.add_argument('--reporte', help="Guarda el resultado de cada línea en este JSONL")
+    imp.add_argument('--procesos', type=int, default=1,
+                     help="Procesos para cotizar en paralelo (0 = todos los núcleos)")
+    imp.add_argument('--orden', choices=['llegada', 'valor'], default='llegada',
+                     help="Quién gana si dos solicitudes piden el mismo recurso")
+
+    paq = sub.add_parser('paquetes', help="Sugiere los mejores paquetes completos para un pedido")
+    paq.add_argument('--invitados', type=int, required=True)
+    paq.add_argument('--fecha', required=True, help="DD/MM/AAAA")
+    paq.add_argument('--inicio', default="14:00", help="HH:MM")
+    paq.add_argument('--fin', default="22:00", help="HH:MM")
+    paq.add_argument('--presupuesto', type=float, required=True)
+    paq.add_argument('--personal', nargs='*', default=[], help="Categorías (ej: fotografia musica)")
+    paq.add_argument('--items', nargs='*', default=[],
+                     help="categoria=cantidad o categoria=invitados (ej: catering=invitados)")
+    paq.add_argument('--top', type=int, default=3)
+    paq.add_argument('--criterio', choices=['precio', 'calidad'], default='precio')
+
+    pla = sub.add_parser('planilla', help="Reparte el personal entre muchas bodas a la vez")
+    pla.add_argument('archivo', help="Solicitudes JSONL (ver api_reservas.py) con 'roles' a cubrir")
+    pla.add_argument('--desde', help="Solo bodas desde esta fecha (DD/MM/AAAA)")
+    pla.add_argument('--hasta', help="Solo bodas hasta esta fecha (DD/MM/AAAA)")
+    pla.add_argument('--criterio', choices=['precio', 'calidad'], default='precio')
+    pla.add_argument('--salida', help="Guarda las solicitudes con el personal asignado (para importar-reservas)")
+
+    ocu = sub.add_parser('ocupacion', help="Mapa de calor, temporada alta y quiebres de stock previstos")
+    ocu.add_argument('--grupo', choices=['lugar', 'personal', 'item'], default='lugar')
+    ocu.add_argument('--categoria', help="Oficio (personal) o categoría del inventario (item)")
+    ocu.add_argument('--desde', help="DD/MM/AAAA (por defecto, un año antes de --hasta)")
+    ocu.add_argument('--hasta', help="DD/MM/AAAA (por defecto, hoy más el horizonte)")
+    ocu.add_argument('--hoy', help="Fecha desde la que se pronostica (DD/MM/AAAA, por defecto hoy)")
+    ocu.add_argument('--horizonte', type=int, default=180, help="Días hacia adelante del pronóstico de stock")
+
+    doc = sub.add_parser('documentos', help="Regenera tickets y facturas de todo el historial")
+    doc.add_argument('--carpeta', default="tickets", help="Carpeta de salida")
+    doc.add_argument('--procesos', type=int, default=0,
+                     help="Procesos para armar los documentos (0 = todos los núcleos)")
+    doc.add_argument('--forzar', action='store_true',
+                     help="Vuelve a escribir también los documentos que no cambiaron")
+
+    srv = sub.add_parser('servidor', help="Atiende la API HTTP/JSON local (ver servidor.py)")
+    srv.add_argument('--host', default="127.0.0.1")
+    srv.add_argument('--puerto', type=int, default=8080)
+
+    carga = sub.add_parser('carga', help="Prueba de carga contra el servidor")
+    carga.add_argument('--host', default="127.0.0.1")
+    carga.add_argument('--puerto', type=int, default=8080)
+    carga.add_argument('--local', action='store_true',
+                       help="Levanta un servidor de prueba propio con una copia en memoria de los datos")
+    carga.add_argument('--clientes', type=int, default=50, help="Conexiones simultáneas")
+    carga.add_argument('--peticiones', type=int, default=2000, help="Peticiones en total")
+    return parser.parse_args(argv)
+
+def menu_diagnostico():
+    """Tiempos por operación (p50/p95/p99), contadores y perfil de la sesión."""
+    while True:
+        limpiar_pantalla()
+        estado = "ACTIVA" if instrumentacion.esta_activo() else "APAGADA"
+        perfil = "detener" if instrumentacion.perfilando() else "iniciar"
+        print(f"=== DIAGNÓSTICO (medición {estado}) ===\n"
+              f" 1. Ver tiempos y contadores\n"
+              f" 2. {'Apagar' if instrumentacion.esta_activo() else 'Activar'} la medición\n"
+              f" 3. {perfil.capitalize()} perfil cProfile (sesion.prof)\n"
+              f" 4. Borrar mediciones\n 5. Volver")
+        op = input("Seleccione: ")
+        if op == "1":
+            instrumentacion.imprimir_resumen()
+        elif op == "2":
+            instrumentacion.activar(not instrumentacion.esta_activo())
+            continue
+        elif op == "3":
+            if instrumentacion.perfilando():
+                print(instrumentacion.detener_perfil())
+            else:
+                instrumentacion.activar()
+                instrumentacion.iniciar_perfil()
+                print("🔎 Perfilando: use el planificador y vuelva aquí para ver el reporte.")
+        elif op == "4":
+            instrumentacion.reiniciar()
+            print("🧹 Mediciones borradas.")
+        elif op == "5":
+            return
+        else:
+            print(f"⚠️ '{op}' no es una opción válida.")
+        input("Presione Enter para continuar...")
+
+def main(argv=None):
+    """
+    Función de entrada. Con PLANNER_DIAGNOSTICO=1 (o PLANNER_PERFIL=archivo)
+    mide la sesión y muestra el resumen al terminar.
+    """
+    args = leer_argumentos(argv)
+    instrumentacion.configurar_desde_entorno()
     try:
-        # Intento para Linux/Mac
-        locale.setlocale(locale.LC_TIME, 'es_ES.UTF-8')
-    except locale.Error:
-        # Si falla ambos, usará el sistema por defecto (inglés)
-        pass
+        ejecutar(args)
+    finally:
+        instrumentacion.cerrar_sesion()
 
-def main():
+def ejecutar(args):
     """
-    Función de entrada que controla el bucle principal de la aplicación.
+    Controla el bucle principal de la aplicación (o el subcomando pedido).
     """
+    if args.comando == 'importar-reservas':
+        import api_reservas
+        from repositorio import Repositorio
+        api_reservas.importar_reservas(
+            args.archivo, Repositorio(), args.reporte, args.procesos or None, args.orden
+        )
+        return
+    if args.comando == 'paquetes':
+        import optimizador_paquetes as op
+        from repositorio import Repositorio
+        items = dict(par.split('=', 1) for par in args.items)
+        preferencias = {'personal': args.personal, 'items': items}
+        paquetes = op.optimizar_paquetes(
+            Repositorio(), args.invitados, args.fecha, args.inicio, args.fin,
+            args.presupuesto, preferencias, args.top, args.criterio
+        )
+        op.imprimir_paquetes(paquetes)
+        return
+    if args.comando == 'planilla':
+        import json
+        import planilla_personal as pp
+        from bloques import fecha_a_dia
+        from repositorio import Repositorio
+        with open(args.archivo, 'r', encoding='utf-8') as f:
+            solicitudes = [json.loads(linea) for linea in f if linea.strip()]
+        desde = fecha_a_dia(args.desde) if args.desde else None
+        hasta = fecha_a_dia(args.hasta) if args.hasta else None
+        solicitudes = [s for s in solicitudes
+                       if (desde is None or fecha_a_dia(s['fecha']) >= desde)
+                       and (hasta is None or fecha_a_dia(s['fecha']) <= hasta)]
+        bodas, estadisticas = pp.planificar_personal(Repositorio(), solicitudes, args.criterio)
+        pp.imprimir_planilla(bodas, estadisticas)
+        if args.salida:
+            with open(args.salida, 'w', encoding='utf-8') as f:
+                for boda in bodas:
+                    if not boda['error']:
+                        f.write(json.dumps(pp.con_personal(boda), ensure_ascii=False) + '\n')
+        return
+    if args.comando == 'ocupacion':
+        import ocupacion
+        from bloques import fecha_a_dia
+        from repositorio import Repositorio
+        dia = {nombre: fecha_a_dia(valor) if valor else None
+               for nombre, valor in (('desde', args.desde), ('hasta', args.hasta), ('hoy', args.hoy))}
+        ocupacion.imprimir_tablero(ocupacion.tablero(
+            Repositorio(), args.grupo, args.categoria, dia['desde'], dia['hasta'], dia['hoy'], args.horizonte
+        ))
+        return
+    if args.comando == 'documentos':
+        import json
+        import documentos
+        from repositorio import Repositorio
+        resultado = documentos.regenerar_historial(
+            Repositorio(), args.carpeta, args.procesos or None, args.forzar
+        )
+        print(json.dumps(resultado, indent=4, ensure_ascii=False))
+        return
+    if args.comando == 'servidor':
+        import asyncio
+        import servidor
+        from repositorio import Repositorio
+        try:
+            asyncio.run(servidor.servir(Repositorio().precargar(), args.host, args.puerto))
+        except KeyboardInterrupt:
+            print("\n👋 Servidor detenido.")
+        return
+    if args.comando == 'carga':
+        import asyncio
+        import json
+        import servidor
+        if args.local:
+            from almacenamiento import AlmacenamientoMemoria
+            from repositorio import Repositorio
+            datos = Repositorio().almacenamiento.cargar()
+            prueba = servidor.probar_carga_local(
+                Repositorio(almacenamiento=AlmacenamientoMemoria(datos)), args.clientes, args.peticiones
+            )
+        else:
+            prueba = servidor.probar_carga(args.host, args.puerto, args.clientes, args.peticiones)
+        print(json.dumps(asyncio.run(prueba), indent=4, ensure_ascii=False))
+        return
+
     while True:
-        fg.limpiar_pantalla()
-        print("=== MENU RAQUEL & ALBA PLANNER ===\n 1.💍 Nueva boda\n 2.📜 Ver Historial\n 3.🚪 Salir")
+        limpiar_pantalla()
+        print("=== MENU RAQUEL & ALBA PLANNER ===\n 1.💍 Nueva boda\n 2.📜 Ver Historial\n 3.📊 Diagnóstico\n 4.🚪 Salir")
 
         op = input("Seleccione: ")
 
         if op == "1":
+            import planear_boda as pb # Importamos el otro archivo
             pb.ejecutar_registro_boda() # Llamamos a la función del otro archivo
         elif op == "2":
-            fg.ver_historial()
+            import funciones_generales as fg
+            from almacenamiento import crear_almacenamiento
+            fg.ver_historial(crear_almacenamiento())
         elif op == "3":
+            menu_diagnostico()
+        elif op == "4":
             break
         else:
             # ESTO evita que el programa se quede "tieso"
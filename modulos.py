@@ -1,3 +1,22 @@
+"""
+Modelo de dominio del planificador 'Raquel & Alba'.
+Las clases usan __slots__: sin el __dict__ por instancia cada objeto ocupa
+bastante menos memoria y sus atributos se leen más rápido, lo que se nota al
+armar miles de cotizaciones (optimizador, lotes, benchmarks). to_dict()
+devuelve un diccionario nuevo con los campos en el orden de __slots__.
+
+Los registros del catálogo (lugares, personal, inventario) siguen siendo
+diccionarios: todo el programa y los dos almacenamientos los leen así, y
+una copia en columnas (precios, stock, sueldos) solo duplicaba en memoria lo
+que ya estaba en ellos. Lo que crece con el historial sí va en arrays de
+enteros: los bloques ocupados (bloques.Agenda) y la matriz de ocupación.
+"""
+
+
+def _a_dict(objeto):
+    return {campo: getattr(objeto, campo) for campo in objeto.__slots__}
+
+
 class Cliente:
     """
     Representa al cliente que contrata la boda y almacena sus preferencias básicas.
@@ -9,6 +28,8 @@ class Cliente:
         invitados (int): Cantidad estimada de asistentes al evento.
         presupuesto (float): Monto máximo que el cliente está dispuesto a gastar.
     """
+    __slots__ = ('id_cliente', 'nombre', 'email', 'invitados', 'presupuesto')
+
     def __init__(self, id_cliente, nombre, email,invitados,presupuesto):
         self.id_cliente = id_cliente
         self.nombre = nombre
@@ -18,7 +39,7 @@ class Cliente:
 
     def to_dict(self):
         """Convierte los atributos de la instancia en un diccionario para exportación JSON."""
-        return vars(self)
+        return _a_dict(self)
 
 class Lugar:
     """
@@ -33,6 +54,8 @@ class Lugar:
         fechas_ocupadas (list): Lista de fechas (strings o datetime) no disponibles.
         inventario (dict): Registro de mobiliario disponible (sillas, mesas, etc.).
     """
+    __slots__ = ('id_lugar', 'nombre', 'capacidad', 'costo', 'servicios', 'fechas_ocupadas', 'inventario')
+
     def __init__(self, id_lugar, nombre, capacidad, costo, servicios, fechas_ocupadas, inventario):
         self.id_lugar = id_lugar
         self.nombre = nombre
@@ -44,7 +67,7 @@ class Lugar:
 
     def to_dict(self):
         """Convierte los datos del lugar a formato diccionario."""
-        return vars(self)
+        return _a_dict(self)
 
 class Personal:
     """
@@ -57,6 +80,8 @@ class Personal:
         sueldo (float): Pago por evento o jornada.
         fechas_ocupadas (list): Registro de fechas en las que el trabajador ya está comprometido.
     """
+    __slots__ = ('id_personal', 'nombre', 'oficio', 'sueldo', 'experiencia', 'fechas_ocupadas')
+
     def __init__(self, id_personal, nombre, oficio, sueldo, experiencia, fechas_ocupadas=None):
         self.id_personal = id_personal
         self.nombre = nombre
@@ -65,9 +90,15 @@ class Personal:
         self.experiencia = experiencia #alta, media, junior
         self.fechas_ocupadas = fechas_ocupadas if fechas_ocupadas else []
 
+    @classmethod
+    def desde_catalogo(cls, registro):
+        """Crea el contratado a partir del registro de personal.json (sin sus fechas ocupadas)."""
+        return cls(registro['id_personal'], registro['nombre'], registro['oficio'],
+                   registro['sueldo'], registro.get('experiencia', 'Estándar'))
+
     def to_dict(self):
         """Convierte los datos del personal a formato diccionario."""
-        return vars(self)
+        return _a_dict(self)
 
 class ItemReserva:
     """
@@ -76,6 +107,8 @@ class ItemReserva:
     Esta clase actúa como un vínculo entre el catálogo general y una boda específica,
     permitiendo calcular costos según la demanda (ej. 100 platos de comida).
     """
+    __slots__ = ('id_item_reserva', 'nombre', 'precio_unidad', 'cantidad_requerida')
+
     def __init__(self, id_item, nombre, precio_unidad, cantidad_requerida):
         self.id_item_reserva = id_item
         self.nombre = nombre
@@ -91,12 +124,19 @@ class ItemReserva:
         """
         return self.precio_unidad * self.cantidad_requerida
 
+    @classmethod
+    def desde_catalogo(cls, registro, cantidad):
+        """Crea la línea de la reserva a partir del registro de inventario.json."""
+        return cls(registro['id_item'], registro['nombre'], registro['precio_unidad'], cantidad)
+
     def to_dict(self):
         """Convierte el item de reserva a diccionario."""
-        return vars(self)
+        return _a_dict(self)
 
 class Cotizacion:
     """Objeto que agrupa todos los elementos de una boda para generar el presupuesto final."""
+    __slots__ = ('id_cot', 'cliente', 'lugar', 'personal', 'items', 'fecha', 'total')
+
     def __init__(self, id_cot, cliente, lugar, lista_personal, lista_items, fecha):
         self.id_cot = id_cot
         self.cliente = cliente
@@ -113,6 +153,8 @@ class ItemCatalogo:
     Funciona como el contenedor principal que relaciona al cliente, el lugar, 
     el staff y los servicios de catering o música en una fecha determinada.
     """
+    __slots__ = ('id_item', 'nombre', 'precio', 'descripcion', 'categoria')
+
     def __init__(self, id_item, nombre, precio, descripcion, categoria):
         self.id_item = id_item
         self.nombre = nombre
@@ -122,4 +164,4 @@ class ItemCatalogo:
 
     def to_dict(self):
         """Convierte el item del catálogo a formato diccionario."""
-        return vars(self)
\ No newline at end of file
+        return _a_dict(self)
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""
+Motor de reglas de negocio del planificador 'Raquel & Alba'.
+Las reglas (las de siempre más las del Informe Técnico) se escriben como
+datos en REGLAS y se compilan una vez:
+    - cada lugar, trabajador e item del catálogo recibe sus etiquetas
+      ('silla', 'dj', 'piscina', ...) según las palabras de ETIQUETAS,
+    - cada regla se convierte en una función que mira solo el conteo de
+      etiquetas de la boda.
+Validar una boda es entonces una sola pasada por su personal e items, y se
+devuelven todas las reglas que no se cumplen de una vez.
+"""
+from collections import Counter
+
+from indice_personal import normalizar
+
+# etiqueta -> {tipo de recurso: palabras que la activan}. Se busca en el nombre
+# del item, en el oficio y la categoría del trabajador y en el nombre y los
+# servicios del lugar (sin mayúsculas ni tildes).
+ETIQUETAS = {
+    'silla': {'item': ("silla",)},
+    'mesa': {'item': ("mesa",)},
+    'barra_libre': {'item': ("cocteleria", "barra libre")},
+    'musica_contratada': {'item': ("dj", "rock", "banda", "mariachi")},
+    'sonido': {'item': ("sonido", "parlante", "altavoz")},
+    'flores': {'item': ("flor",)},
+    'luces': {'item': ("luz", "foco", "iluminacion", "lampara")},
+    'barman': {'personal': ("barman",)},
+    'seguridad': {'personal': ("seguridad",)},
+    'dj': {'personal': ("dj",)},
+    'banda_rock': {'personal': ("rock",)},
+    'mariachi': {'personal': ("mariachi",), 'item': ("mariachi",)},
+    'violin': {'personal': ("violin",), 'item': ("violin",)},
+    'maestro_ceremonias': {'personal': ("maestro de ceremonias", "oficiante")},
+    'florista': {'personal': ("florista", "flores")},
+    'iluminador': {'personal': ("iluminacion",)},
+    'piscina': {'lugar': ("piscina",)},
+    'palacio_cristal': {'lugar': ("palacio de cristal",)},
+}
+
+# Tipos de regla:
+#   'minimo':   cantidad de la etiqueta >= max(al_menos, int(invitados * por_invitado))
+#   'requiere': si aparece 'si', tiene que aparecer 'entonces'
+#   'excluye':  'si' y 'no' no pueden aparecer juntas
+# 'categoria' indica en qué paso del asistente se revisa la regla (las que no
+# tienen se revisan en la validación final; la validación final revisa todas).
+REGLAS = [
+    {'tipo': 'minimo', 'etiqueta': 'silla', 'por_invitado': 0.8, 'al_menos': 0,
+     'categoria': 'mobiliario',
+     'mensaje': "Mobiliario insuficiente: Tiene {cantidad} sillas para {invitados} invitados (Mín. {minimo})."},
+    {'tipo': 'minimo', 'etiqueta': 'mesa', 'por_invitado': 0.1, 'al_menos': 1,
+     'categoria': 'mobiliario',
+     'mensaje': "Mobiliario insuficiente: Tiene {cantidad} mesas para {invitados} invitados (Mín. {minimo})."},
+    {'tipo': 'requiere', 'si': 'dj', 'entonces': 'sonido', 'categoria': 'tecnologia',
+     'mensaje': "Tiene DJ pero falta equipo de sonido."},
+    {'tipo': 'requiere', 'si': 'florista', 'entonces': 'flores', 'categoria': 'decoracion',
+     'mensaje': "Falta comprar flores para el florista."},
+    {'tipo': 'requiere', 'si': 'iluminador', 'entonces': 'luces', 'categoria': 'decoracion',
+     'mensaje': "Falta iluminación para el especialista."},
+    {'tipo': 'requiere', 'si': 'barra_libre', 'entonces': 'barman',
+     'mensaje': "La 'Barra Libre' requiere contratar personal de 'Barman' o 'Sommelier'."},
+    {'tipo': 'requiere', 'si': 'musica_contratada', 'entonces': 'sonido',
+     'mensaje': "Música detectada: Es obligatorio incluir 'Equipo de Sonido Profesional'."},
+    {'tipo': 'requiere', 'si': 'piscina', 'entonces': 'seguridad',
+     'mensaje': "El lugar '{lugar}' tiene piscina y requiere personal de 'Seguridad'."},
+    {'tipo': 'excluye', 'si': 'mariachi', 'no': 'palacio_cristal',
+     'mensaje': "No se permiten Mariachis en '{lugar}' (el cristal satura el sonido por eco)."},
+    {'tipo': 'excluye', 'si': 'dj', 'no': 'banda_rock',
+     'mensaje': "No se puede contratar un DJ y una Banda de Rock en la misma boda."},
+    {'tipo': 'requiere', 'si': 'violin', 'entonces': 'maestro_ceremonias',
+     'mensaje': "El 'Solo de Violín' requiere un Maestro de Ceremonias."},
+]
+
+def _campo(recurso, *nombres):
+    """Lee un dato tanto de un diccionario del catálogo como de un objeto (Personal, ItemReserva)."""
+    for nombre in nombres:
+        valor = recurso.get(nombre) if isinstance(recurso, dict) else getattr(recurso, nombre, None)
+        if valor is not None:
+            return valor
+    return None
+
+
+def _compilar_regla(regla):
+    """Devuelve una función (conteo, invitados, nombre_lugar) -> mensaje o None."""
+    tipo, mensaje = regla['tipo'], regla['mensaje']
+    if tipo == 'minimo':
+        etiqueta, factor, al_menos = regla['etiqueta'], regla['por_invitado'], regla.get('al_menos', 0)
+
+        def evaluar(conteo, invitados, lugar):
+            minimo = max(al_menos, int(invitados * factor))
+            if conteo[etiqueta] < minimo:
+                return mensaje.format(cantidad=conteo[etiqueta], minimo=minimo,
+                                      invitados=invitados, lugar=lugar)
+            return None
+    elif tipo == 'requiere':
+        si, entonces = regla['si'], regla['entonces']
+
+        def evaluar(conteo, invitados, lugar):
+            if conteo[si] and not conteo[entonces]:
+                return mensaje.format(invitados=invitados, lugar=lugar)
+            return None
+    elif tipo == 'excluye':
+        si, no = regla['si'], regla['no']
+
+        def evaluar(conteo, invitados, lugar):
+            if conteo[si] and conteo[no]:
+                return mensaje.format(invitados=invitados, lugar=lugar)
+            return None
+    else:
+        raise ValueError(f"Tipo de regla desconocido: {tipo}")
+    return evaluar
+
+
+class MotorReglas:
+    """
+    Reglas compiladas más el índice de etiquetas del catálogo.
+
+    Atributos:
+        por_etiqueta (dict): (tipo, etiqueta) -> IDs del catálogo que la tienen
+            (ej: ('personal', 'barman') -> [107, 113]).
+        requisitos (dict): etiqueta -> etiquetas que exige (reglas 'requiere').
+        exclusiones (dict): etiqueta -> etiquetas con las que no puede ir (reglas 'excluye').
+    """
+    def __init__(self, reglas=REGLAS, etiquetas=ETIQUETAS):
+        self.reglas = list(reglas)
+        self._evaluadores = [(r.get('categoria'), _compilar_regla(r)) for r in self.reglas]
+        # tipo -> [(etiqueta, palabras)], normalizadas igual que los textos del catálogo
+        self._palabras = {}
+        for etiqueta, por_tipo in etiquetas.items():
+            for tipo, palabras in por_tipo.items():
+                self._palabras.setdefault(tipo, []).append((etiqueta, tuple(map(normalizar, palabras))))
+        self._por_id = {'lugar': {}, 'personal': {}, 'item': {}}
+        self._por_texto = {}
+        self.por_etiqueta = {}
+        # Lo que exige cada etiqueta según las reglas 'requiere' y con qué no puede
+        # ir según las 'excluye' (para el optimizador)
+        self.requisitos = {}
+        self.exclusiones = {}
+        for r in self.reglas:
+            if r['tipo'] == 'requiere':
+                self.requisitos.setdefault(r['si'], []).append(r['entonces'])
+            elif r['tipo'] == 'excluye':
+                self.exclusiones.setdefault(r['si'], set()).add(r['no'])
+                self.exclusiones.setdefault(r['no'], set()).add(r['si'])
+
+    @classmethod
+    def desde_catalogo(cls, lugares, personal, inventario):
+        """Crea el motor y etiqueta de una vez todo el catálogo."""
+        motor = cls()
+        motor.compilar(lugares, personal, inventario)
+        return motor
+
+    def compilar(self, lugares=(), personal=(), inventario=()):
+        for l in lugares:
+            self._registrar('lugar', l['id_lugar'], self._etiquetar('lugar', self._texto_lugar(l)))
+        for p in personal:
+            self._registrar('personal', p['id_personal'], self._etiquetar('personal', self._texto_personal(p)))
+        for i in inventario:
+            self._registrar('item', i['id_item'], self._etiquetar('item', i['nombre']))
+
+    def _registrar(self, tipo, id_recurso, etiquetas):
+        self._por_id[tipo][id_recurso] = etiquetas
+        for e in etiquetas:
+            self.por_etiqueta.setdefault((tipo, e), []).append(id_recurso)
+
+    @staticmethod
+    def _texto_lugar(lugar):
+        return " ".join([_campo(lugar, 'nombre') or ''] + list(_campo(lugar, 'servicios_incluidos') or []))
+
+    @staticmethod
+    def _texto_personal(persona):
+        return f"{_campo(persona, 'oficio') or ''} {_campo(persona, 'categoria') or ''}"
+
+    def _etiquetar(self, tipo, texto):
+        clave = (tipo, texto)
+        if clave not in self._por_texto:
+            texto_norm = normalizar(texto)
+            self._por_texto[clave] = frozenset(
+                etiqueta for etiqueta, palabras in self._palabras.get(tipo, [])
+                if any(p in texto_norm for p in palabras)
+            )
+        return self._por_texto[clave]
+
+    # --- ETIQUETAS DE UN RECURSO (del índice; si no está, se calculan y se recuerdan) ---
+    def etiquetas_lugar(self, lugar):
+        etiquetas = self._por_id['lugar'].get(_campo(lugar, 'id_lugar'))
+        return etiquetas if etiquetas is not None else self._etiquetar('lugar', self._texto_lugar(lugar))
+
+    def etiquetas_personal(self, persona):
+        etiquetas = self._por_id['personal'].get(_campo(persona, 'id_personal'))
+        return etiquetas if etiquetas is not None else self._etiquetar('personal', self._texto_personal(persona))
+
+    def etiquetas_item(self, item):
+        etiquetas = self._por_id['item'].get(_campo(item, 'id_item', 'id_item_reserva'))
+        return etiquetas if etiquetas is not None else self._etiquetar('item', _campo(item, 'nombre') or '')
+
+    def conteo(self, personal, items, lugar):
+        """
+        Una pasada por la boda: cuántas veces aparece cada etiqueta (los items
+        cuentan por unidades pedidas, el personal y el lugar de a uno).
+        """
+        conteo = Counter()
+        for p in personal:
+            conteo.update(self.etiquetas_personal(p))
+        for i in items:
+            cantidad = _campo(i, 'cantidad_requerida') or 0
+            for e in self.etiquetas_item(i):
+                conteo[e] += cantidad
+        if lugar:
+            conteo.update(self.etiquetas_lugar(lugar))
+        return conteo
+
+    def evaluar(self, personal, items, lugar, invitados, categoria=None, conteo=None):
+        """
+        Revisa las reglas de una boda (solo las de 'categoria' si se indica).
+
+        Returns:
+            list: Mensajes de todas las reglas que no se cumplen (vacía si todo está bien).
+        """
+        if conteo is None:
+            conteo = self.conteo(personal, items, lugar)
+        nombre_lugar = _campo(lugar, 'nombre') if lugar else ''
+        errores = []
+        for cat, regla in self._evaluadores:
+            if categoria is not None and cat != categoria:
+                continue
+            mensaje = regla(conteo, invitados, nombre_lugar)
+            if mensaje:
+                errores.append(mensaje)
+        return errores
+
+
+# Motor por defecto (sin catálogo compilado: etiqueta a pedido y recuerda por texto)
+MOTOR = MotorReglas()
@@ -0,0 +1,64 @@
+"""
+Motor de sugerencias de fechas alternativas para 'Raquel & Alba'.
+Cuando no hay lugares libres en la fecha pedida, revisa los próximos días
+(90 por defecto, hasta los 730 que admite el asistente): para cada lugar
+recorre una sola vez los tramos ocupados de su agenda en el horizonte y
+saca de ahí los días en que el horario pedido (corrido un día por vez)
+entra libre. Devuelve las mejores opciones ordenadas por cercanía, precio o
+capacidad.
+"""
+from datetime import date
+
+from bloques import fecha_a_dia, intervalo
+from disponibilidad import LUGAR
+
+DIAS_HORIZONTE = 90
+LIMITE_SUGERENCIAS = 5
+
+# Llave de orden para cada criterio (menor es mejor)
+CRITERIOS = {
+    'cercania': lambda s: (s['dias_diferencia'], s['precio']),
+    'precio': lambda s: (s['precio'], s['dias_diferencia']),
+    'capacidad': lambda s: (s['capacidad'] - s['invitados'], s['dias_diferencia']),
+}
+
+
+def buscar_fechas_alternativas(fecha_str, lista_lugares, h_ini, h_fin, invitados, indice,
+                               dias_horizonte=DIAS_HORIZONTE, criterio='cercania',
+                               limite=LIMITE_SUGERENCIAS):
+    """
+    Busca lugares libres en los 'dias_horizonte' días siguientes a la fecha pedida.
+
+    Returns:
+        list: Hasta 'limite' sugerencias ordenadas según el criterio ('cercania',
+        'precio' o 'capacidad'), cada una con id_lugar, nombre, fecha, precio,
+        capacidad y dias_diferencia.
+    """
+    if criterio not in CRITERIOS:
+        raise ValueError(f"Criterio de orden desconocido: {criterio}")
+
+    dia_base = fecha_a_dia(fecha_str)
+    inicio, fin = intervalo(fecha_str, h_ini, h_fin)
+    # Por cercanía interesan varias fechas de cada lugar; por precio o capacidad
+    # basta la más próxima, porque esos datos no cambian de un día a otro.
+    por_lugar = limite if criterio == 'cercania' else 1
+    candidatos = []
+
+    for lugar in lista_lugares:
+        if lugar['capacidad'] < invitados:
+            continue
+
+        recurso = (LUGAR, lugar['id_lugar'])
+        for desfase in indice.desfases_libres(recurso, inicio, fin, dias_horizonte, por_lugar):
+            candidatos.append({
+                "id_lugar": lugar['id_lugar'],
+                "nombre": lugar['nombre'],
+                "fecha": date.fromordinal(dia_base + desfase).strftime("%d/%m/%Y"),
+                "precio": lugar['precio'],
+                "capacidad": lugar['capacidad'],
+                "invitados": invitados,
+                "dias_diferencia": desfase,
+            })
+
+    candidatos.sort(key=CRITERIOS[criterio])
+    return candidatos[:limite]
@@ -0,0 +1,479 @@
+"""
+Ocupación y pronósticos del planificador 'Raquel & Alba'.
+Una matriz fecha × recurso armada con el historial de reservas y los bloques
+ocupados: cada lugar, trabajador e item con actividad tiene una fila (un
+array de enteros, una columna por día) con los minutos ocupados (lugares y
+personal) o las unidades en uso o consumidas (items). Cada grupo (todos los
+lugares, el personal de un oficio, los items de una categoría) lleva además
+su fila de totales por día: recursos ocupados o unidades. De ahí salen el
+mapa de calor, la temporada alta y el pronóstico de quiebres de stock.
+
+La matriz se arma una vez (y queda en la caché de data/.cache) y después
+cada boda que se confirma solo suma sus propios días.
+Para el pronóstico cada item lleva además su total de unidades y, de los
+días ya pasados, cuántos días usó cada cantidad por mes y día de la semana:
+el tablero mira solo esos conteos y los días del horizonte, no el historial.
+"""
+import math
+from array import array
+from datetime import date
+from statistics import mean, pstdev
+
+from apartados import ITEM
+from bloques import FORMATO_FECHA, MINUTOS_DIA, bloques_de_cotizacion, dias_de_intervalo, intervalos_de, minuto_epoca
+from disponibilidad import LUGAR, PERSONAL
+from indice_personal import IndicePersonal, normalizar
+from libro_stock import CONSUMIBLE, dias_de_reserva, lineas_de, tipo_de
+
+# Días que se agregan de una vez cuando la matriz tiene que crecer
+CRECIMIENTO = 366
+# Días hacia adelante del pronóstico de stock
+HORIZONTE = 180
+# Percentil de los días parecidos de otros años que se toma como demanda esperada
+PERCENTIL = 0.9
+# Tonos del mapa de calor, de libre a lleno
+TONOS = "·░▒▓█"
+# Items por categoría que se listan en la terminal (los más próximos)
+MAX_LISTADO = 10
+DIAS_SEMANA = ("Lun", "Mar", "Mié", "Jue", "Vie", "Sáb", "Dom")
+MESES = ("Ene", "Feb", "Mar", "Abr", "May", "Jun", "Jul", "Ago", "Sep", "Oct", "Nov", "Dic")
+
+
+def _fecha(dia):
+    return date.fromordinal(dia).strftime(FORMATO_FECHA)
+
+
+def _tono(valor):
+    if valor is None:
+        return " "
+    return TONOS[min(math.ceil(valor * (len(TONOS) - 1)), len(TONOS) - 1)]
+
+
+def _llave(dia):
+    """(mes, día de la semana) de un día ordinal: los días 'parecidos' de otros años."""
+    fecha = date.fromordinal(dia)
+    return fecha.month, fecha.weekday()
+
+
+def _percentil(dias_por_valor, total, p):
+    """
+    Percentil p de 'total' valores de los que solo se pasan los distintos de
+    cero, como {valor: cuántos días lo tuvieron}.
+    """
+    if not total:
+        return 0
+    posicion = max(math.ceil(p * total) - 1, 0) - (total - sum(dias_por_valor.values()))
+    if posicion < 0:
+        return 0
+    for valor in sorted(dias_por_valor):
+        posicion -= dias_por_valor[valor]
+        if posicion < 0:
+            return valor
+    return 0
+
+
+class MatrizOcupacion:
+    """
+    Ocupación por día de cada recurso y de cada grupo.
+
+    Atributos:
+        inicio (int): Día ordinal de la primera columna (None si está vacía).
+        dias (int): Columnas de todas las filas (crece de a CRECIMIENTO días).
+        primero, ultimo (int): Primer y último día con algo anotado.
+        filas (dict): (tipo, id) -> array('i') con minutos (lugar, personal)
+            o unidades (item) por día.
+        grupos (dict): (tipo, categoria) -> array('i') con los recursos
+            ocupados (lugar, personal) o las unidades (item) del grupo por día.
+        capacidad (dict): (tipo, categoria) -> recursos del grupo o unidades
+            que se alquilan (None si todo el grupo se consume).
+        totales (dict): (ITEM, id) -> unidades de la fila sumadas.
+        usos (dict): (ITEM, id) -> {(mes, día de la semana): {unidades: días}}
+            de los días anteriores a 'corte' en que el item se usó.
+        corte (int): Primer día que todavía no entra en 'usos'.
+    """
+    def __init__(self):
+        self.inicio = None
+        self.dias = 0
+        self.primero = self.ultimo = None
+        self.filas = {}
+        self.grupos = {}
+        self.capacidad = {}
+        self.totales = {}
+        self.usos = {}
+        self.corte = None
+        self._demanda = {}  # (ITEM, id) -> (vigencia, demanda esperada por día del horizonte, máximo)
+        self._grupo = {}  # (tipo, id) -> (tipo, categoria)
+        self._tipos = {}  # id_item -> 'consumible' o 'reutilizable'
+
+    @classmethod
+    def desde_catalogo(cls, lugares, personal, inventario, reservas, indice=None):
+        """
+        Arma la matriz con los bloques de lugares y personal (ya convertidos a
+        intervalos si se pasa el IndiceDisponibilidad) y los items del historial.
+        """
+        matriz = cls()
+        recursos = [((LUGAR, lug['id_lugar']), None, lug) for lug in lugares]
+        recursos += [((PERSONAL, p['id_personal']), IndicePersonal.categoria_de(p), p)
+                     for p in personal if isinstance(p, dict)]
+        for recurso, categoria, _ in recursos:
+            matriz.agregar_recurso(recurso, categoria)
+        for item in inventario:
+            matriz.agregar_item(item)
+
+        for recurso, _, registro in recursos:
+            if indice is not None:
+                intervalos = indice.intervalos(recurso)
+            else:
+                intervalos = intervalos_de(registro.get('fechas_ocupadas', []))
+            for inicio, fin in intervalos:
+                matriz._sumar_intervalo(recurso, inicio, fin)
+        for reserva in reservas:
+            matriz._sumar_items(reserva)
+        matriz.mover_corte(date.today().toordinal())
+        return matriz
+
+    def agregar_recurso(self, recurso, categoria):
+        """Suma un lugar o trabajador a su grupo (para la capacidad del grupo)."""
+        grupo = (recurso[0], categoria)
+        self._grupo[recurso] = grupo
+        self.capacidad[grupo] = (self.capacidad.get(grupo) or 0) + 1
+
+    def agregar_item(self, item):
+        """Suma un item del inventario a su categoría (solo lo que se alquila cuenta como capacidad)."""
+        recurso, grupo = (ITEM, item['id_item']), (ITEM, item.get('categoria'))
+        tipo = self._tipos[item['id_item']] = tipo_de(item)
+        self._grupo[recurso] = grupo
+        self.capacidad.setdefault(grupo, None)
+        if tipo != CONSUMIBLE:
+            self.capacidad[grupo] = (self.capacidad[grupo] or 0) + item.get('cantidad', 0)
+
+    # --- ACTUALIZACIÓN INCREMENTAL ---
+    def registrar(self, cotizacion):
+        """Suma una boda recién confirmada (cotización con objetos o reserva guardada)."""
+        intervalos = intervalos_de(bloques_de_cotizacion(cotizacion))
+        recursos = [(LUGAR, cotizacion['id_lugar'])]
+        recursos += [(PERSONAL, getattr(p, 'id_personal', None) or p.get('id_personal'))
+                     for p in cotizacion['personal_contratado']]
+        for recurso in recursos:
+            for inicio, fin in intervalos:
+                self._sumar_intervalo(recurso, inicio, fin)
+        self._sumar_items(cotizacion)
+
+    def _sumar_intervalo(self, recurso, inicio, fin):
+        dias = dias_de_intervalo(inicio, fin)
+        self._asegurar(dias[0], dias[-1])
+        fila = self._fila(self.filas, recurso)
+        grupo = self._grupo.get(recurso)
+        ocupados = self._fila(self.grupos, grupo) if grupo else None
+        for dia in dias:
+            desde = minuto_epoca(dia)
+            columna = dia - self.inicio
+            # El grupo cuenta recursos ocupados: cambia solo si el día estaba libre
+            if ocupados is not None and not fila[columna]:
+                ocupados[columna] += 1
+            fila[columna] += min(fin, desde + MINUTOS_DIA) - max(inicio, desde)
+
+    def _sumar_items(self, reserva):
+        dias = dias_de_reserva(reserva)
+        if not dias:
+            return
+        self._asegurar(dias[0], dias[-1])
+        for id_item, cantidad in lineas_de(reserva):
+            if id_item is None or not cantidad:
+                continue
+            recurso = (ITEM, id_item)
+            fila = self._fila(self.filas, recurso)
+            grupo = self._grupo.get(recurso)
+            unidades = self._fila(self.grupos, grupo) if grupo else None
+            # Lo que se consume se cuenta el día de la boda; lo que se alquila, todos sus días
+            contados = dias[:1] if self._tipos.get(id_item) == CONSUMIBLE else dias
+            for dia in contados:
+                columna = dia - self.inicio
+                antes = fila[columna]
+                fila[columna] += cantidad
+                if unidades is not None:
+                    unidades[columna] += cantidad
+                if self.corte is not None and dia < self.corte:
+                    self._mover_uso(recurso, dia, antes, fila[columna])
+            self.totales[recurso] = self.totales.get(recurso, 0) + cantidad * len(contados)
+
+    def _mover_uso(self, recurso, dia, antes, despues):
+        """Un día ya pasado del item cambió de 'antes' a 'despues' unidades."""
+        self._demanda.pop(recurso, None)
+        por_valor = self.usos.setdefault(recurso, {}).setdefault(_llave(dia), {})
+        if antes:
+            por_valor[antes] -= 1
+            if not por_valor[antes]:
+                del por_valor[antes]
+        if despues:
+            por_valor[despues] = por_valor.get(despues, 0) + 1
+
+    def mover_corte(self, dia):
+        """
+        Deja en 'usos' exactamente los días anteriores a 'dia'. Solo recorre los
+        días entre el corte anterior y el nuevo (en uso normal, los que pasaron
+        desde la última consulta).
+        """
+        if self.corte is None:
+            self.corte = dia if self.inicio is None else min(self.inicio, dia)
+        desde, hasta = sorted((self.corte, dia))
+        if self.inicio is not None and desde < hasta:
+            signo = 1 if dia > self.corte else -1
+            primera = max(desde - self.inicio, 0)
+            for recurso, fila in self.filas.items():
+                if recurso[0] != ITEM:
+                    continue
+                for columna, valor in enumerate(fila[primera:max(hasta - self.inicio, 0)], primera):
+                    if valor:
+                        desde_valor, hasta_valor = (0, valor) if signo > 0 else (valor, 0)
+                        self._mover_uso(recurso, self.inicio + columna, desde_valor, hasta_valor)
+        self.corte = dia
+
+    def _fila(self, tabla, llave):
+        fila = tabla.get(llave)
+        if fila is None:
+            fila = tabla[llave] = array('i', [0]) * self.dias
+        return fila
+
+    def _asegurar(self, primero, ultimo):
+        """Agranda todas las filas para que entren los días [primero, ultimo]."""
+        if self.inicio is None:
+            self.inicio = primero
+        if primero < self.inicio:
+            extra = max(self.inicio - primero, CRECIMIENTO)
+            ceros = array('i', [0]) * extra
+            for tabla in (self.filas, self.grupos):
+                for llave, fila in tabla.items():
+                    tabla[llave] = ceros + fila
+            self.inicio -= extra
+            self.dias += extra
+        if ultimo >= self.inicio + self.dias:
+            extra = max(ultimo - self.inicio - self.dias + 1, CRECIMIENTO)
+            ceros = array('i', [0]) * extra
+            for tabla in (self.filas, self.grupos):
+                for fila in tabla.values():
+                    fila.extend(ceros)
+            self.dias += extra
+        self.primero = primero if self.primero is None else min(self.primero, primero)
+        self.ultimo = ultimo if self.ultimo is None else max(self.ultimo, ultimo)
+
+    # --- CONSULTAS ---
+    def categorias(self, tipo):
+        """Categorías con recursos de ese tipo (None para los lugares)."""
+        return sorted((g[1] for g in self.capacidad if g[0] == tipo), key=lambda c: c or "")
+
+    def serie(self, llave, desde, hasta, tabla=None):
+        """Valores por día de una fila de grupo (o de 'tabla') entre esos días ordinales, ambos incluidos."""
+        fila = (self.grupos if tabla is None else tabla).get(llave)
+        if fila is None:
+            return [0] * (hasta - desde + 1)
+        return [fila[columna] if 0 <= columna < self.dias else 0
+                for columna in range(desde - self.inicio, hasta - self.inicio + 1)]
+
+    def utilizacion(self, grupo, desde, hasta):
+        """
+        Fracción ocupada por día (0 a 1): recursos ocupados sobre los del grupo
+        o unidades alquiladas sobre las que hay. Si el grupo se consume, el
+        consumo de cada día sobre el del día de más consumo.
+        """
+        serie = self.serie(grupo, desde, hasta)
+        capacidad = self.capacidad.get(grupo) or max(serie, default=0) or 1
+        return [min(valor / capacidad, 1.0) for valor in serie]
+
+    def mapa_calor(self, grupo, desde, hasta):
+        """
+        Utilización por semana (de lunes a domingo) entre esos días.
+
+        Returns:
+            list: (fecha del lunes, [7 valores de 0 a 1, None fuera del rango]).
+        """
+        lunes = desde - date.fromordinal(desde).weekday()
+        valores = self.utilizacion(grupo, lunes, hasta)
+        semanas = []
+        for inicio in range(lunes, hasta + 1, 7):
+            semana = [valores[dia - lunes] if desde <= dia <= hasta else None for dia in range(inicio, inicio + 7)]
+            semanas.append((_fecha(inicio), semana))
+        return semanas
+
+    def temporada_alta(self, grupo, desde=None, hasta=None):
+        """
+        Utilización media de cada mes y de cada día de la semana en todo el
+        historial (o entre esos días). Un mes es de temporada alta si supera la
+        media de los meses en más de una desviación estándar.
+        """
+        desde = self.primero if desde is None else desde
+        hasta = self.ultimo if hasta is None else hasta
+        if desde is None or hasta < desde:
+            return {'meses': [], 'dias_semana': [], 'umbral': 0.0}
+        por_mes, por_dia = {}, {}
+        for dia, valor in zip(range(desde, hasta + 1), self.utilizacion(grupo, desde, hasta)):
+            fecha = date.fromordinal(dia)
+            por_mes.setdefault(fecha.month, []).append(valor)
+            por_dia.setdefault(fecha.weekday(), []).append(valor)
+        medias = {mes: mean(valores) for mes, valores in por_mes.items()}
+        umbral = mean(medias.values()) + pstdev(medias.values())
+        return {
+            'meses': [{'mes': MESES[mes - 1], 'utilizacion': round(u, 3), 'alta': u > umbral and u > 0}
+                      for mes, u in sorted(medias.items())],
+            'dias_semana': [{'dia': DIAS_SEMANA[d], 'utilizacion': round(mean(v), 3)}
+                            for d, v in sorted(por_dia.items())],
+            'umbral': round(umbral, 3),
+        }
+
+    def quiebres_de_stock(self, inventario, hoy=None, horizonte=HORIZONTE):
+        """
+        Items que se van a quedar sin stock en los próximos 'horizonte' días,
+        por categoría del inventario.
+        - Lo que se consume: con lo que queda y el consumo diario del último año,
+          el día en que se acaba.
+        - Lo que se alquila: cada día se espera lo ya reservado o, si es más, lo
+          que se usó en un día parecido (mismo mes y día de la semana) de antes
+          (percentil PERCENTIL); el primer día en que eso llega al stock.
+
+        Returns:
+            dict: categoria -> [{'id_item', 'nombre', 'tipo', 'cantidad', 'fecha', ...}] por fecha.
+        """
+        hoy = date.today().toordinal() if hoy is None else hoy
+        self.mover_corte(hoy)
+        dias_por_llave = {}
+        if self.primero is not None:
+            for dia in range(self.primero, hoy):
+                llave = _llave(dia)
+                dias_por_llave[llave] = dias_por_llave.get(llave, 0) + 1
+        futuro = [(dia, _llave(dia)) for dia in range(hoy, hoy + horizonte + 1)]
+
+        quiebres = {}
+        for item in inventario:
+            recurso = (ITEM, item['id_item'])
+            if recurso not in self.filas:
+                continue  # nunca se pidió: no hay demanda que proyectar
+            if self._tipos.get(item['id_item'], tipo_de(item)) == CONSUMIBLE:
+                riesgo = self._quiebre_consumible(recurso, item['cantidad'], hoy, horizonte)
+            else:
+                riesgo = self._quiebre_alquiler(recurso, item['cantidad'], dias_por_llave, futuro)
+            if riesgo is not None:
+                riesgo = dict(id_item=item['id_item'], nombre=item.get('nombre', ''),
+                              tipo=self._tipos.get(item['id_item'], tipo_de(item)),
+                              cantidad=item['cantidad'], **riesgo)
+                quiebres.setdefault(item.get('categoria'), []).append(riesgo)
+        for lista in quiebres.values():
+            lista.sort(key=lambda r: r['dia'])
+        return quiebres
+
+    def _tramo(self, fila, desde, hasta):
+        """Valores de la fila entre esos días ordinales (desde incluido, hasta no)."""
+        return fila[max(desde - self.inicio, 0):max(hasta - self.inicio, 0)]
+
+    def _quiebre_consumible(self, recurso, cantidad, hoy, horizonte):
+        restante = cantidad - self.totales.get(recurso, 0)  # incluye lo ya reservado para bodas futuras
+        consumo = sum(self._tramo(self.filas[recurso], hoy - 365, hoy)) / 365
+        if restante > 0 and not consumo:
+            return None
+        dias = 0 if restante <= 0 else math.ceil(restante / consumo)
+        if dias > horizonte:
+            return None
+        return {'dia': hoy + dias, 'fecha': _fecha(hoy + dias), 'restante': max(restante, 0),
+                'consumo_diario': round(consumo, 2)}
+
+    def _esperados(self, recurso, dias_por_llave, futuro):
+        """
+        Lo que se usó en los días parecidos de antes (percentil PERCENTIL) para
+        cada día del horizonte, y su máximo. Se recuerda hasta que cambie el
+        corte, el primer día del historial o un día pasado del item.
+        """
+        vigencia = (self.primero, self.corte, len(futuro))
+        guardado = self._demanda.get(recurso)
+        if guardado is None or guardado[0] != vigencia:
+            usos = self.usos.get(recurso, {})
+            por_llave = {llave: _percentil(usos.get(llave, {}), total, PERCENTIL)
+                         for llave, total in dias_por_llave.items()}
+            guardado = self._demanda[recurso] = (vigencia, [por_llave.get(llave, 0) for _, llave in futuro],
+                                                   max(por_llave.values(), default=0))
+        return guardado[1], guardado[2]
+
+    def _quiebre_alquiler(self, recurso, cantidad, dias_por_llave, futuro):
+        esperados, mayor = self._esperados(recurso, dias_por_llave, futuro)
+        reservados = self.serie(recurso, futuro[0][0], futuro[-1][0], self.filas)
+        if mayor < cantidad and max(reservados) < cantidad:
+            return None
+        primero, en_riesgo, faltante = None, 0, 0
+        for (dia, _), reservado, esperado in zip(futuro, reservados, esperados):
+            if reservado > esperado:
+                esperado = reservado
+            if esperado >= cantidad:
+                if primero is None:
+                    primero = (dia, reservado)
+                en_riesgo += 1
+                faltante = max(faltante, esperado - cantidad)
+        if primero is None:
+            return None
+        return {'dia': primero[0], 'fecha': _fecha(primero[0]), 'reservado': primero[1],
+                'dias_en_riesgo': en_riesgo, 'faltante': faltante}
+
+
+def tablero(repo, tipo=LUGAR, categoria=None, desde=None, hasta=None, hoy=None, horizonte=HORIZONTE):
+    """
+    Todo lo que muestra el tablero de una vez (lo usan main.py y el servidor):
+    mapa de calor y temporada alta del grupo pedido y quiebres de stock de
+    todo el inventario. Sin 'desde'/'hasta' se muestra el año que termina
+    'horizonte' días después de 'hoy'.
+    """
+    matriz = repo.ocupacion
+    hoy = date.today().toordinal() if hoy is None else hoy
+    hasta = hoy + horizonte if hasta is None else hasta
+    desde = hasta - 364 if desde is None else desde
+    if tipo == PERSONAL and categoria:
+        categoria = normalizar(categoria)
+    grupo = (tipo, None if tipo == LUGAR else categoria)
+    return {
+        'grupo': grupo, 'capacidad': matriz.capacidad.get(grupo),
+        'desde': _fecha(desde), 'hasta': _fecha(hasta),
+        'mapa': matriz.mapa_calor(grupo, desde, hasta),
+        'temporada': matriz.temporada_alta(grupo),
+        'quiebres': matriz.quiebres_de_stock(repo.inventario, hoy, horizonte),
+    }
+
+
+def imprimir_tablero(datos):
+    """Muestra el tablero en la terminal: mapa de calor (semanas en columnas), temporada y quiebres."""
+    tipo, categoria = datos['grupo']
+    print(f"\n{'=' * 60}\n{'OCUPACIÓN Y PRONÓSTICO'.center(60)}\n{'=' * 60}")
+    print(f"Grupo: {tipo}{f' / {categoria}' if categoria else ''} "
+          f"(capacidad {datos['capacidad'] if datos['capacidad'] is not None else 'consumible'}) "
+          f"| {datos['desde']} a {datos['hasta']}")
+
+    semanas = datos['mapa']
+    encabezado, libre = [" "] * len(semanas), 0
+    for n, (lunes, _) in enumerate(semanas):
+        mes = int(lunes[3:5])
+        if n >= libre and (n == 0 or mes != int(semanas[n - 1][0][3:5])):
+            etiqueta = MESES[mes - 1][:len(semanas) - n]
+            encabezado[n:n + len(etiqueta)] = etiqueta
+            libre = n + len(etiqueta) + 1
+    print(f"\n     {''.join(encabezado)}")
+    for d, nombre in enumerate(DIAS_SEMANA):
+        print(f"{nombre}  {''.join(_tono(semana[d]) for _, semana in semanas)}")
+    print(f"     ({TONOS[0]} libre ... {TONOS[-1]} lleno)")
+
+    temporada = datos['temporada']
+    if temporada['meses']:
+        altos = [m['mes'] for m in temporada['meses'] if m['alta']]
+        print("\n📈 Utilización media por mes: " +
+              "  ".join(f"{m['mes']} {m['utilizacion']:.0%}" for m in temporada['meses']))
+        print("   Por día: " + "  ".join(f"{d['dia']} {d['utilizacion']:.0%}" for d in temporada['dias_semana']))
+        print(f"   Temporada alta: {', '.join(altos) if altos else 'sin meses destacados'}")
+
+    print(f"\n{'QUIEBRES DE STOCK PREVISTOS'.center(60)}\n{'-' * 60}")
+    if not datos['quiebres']:
+        print("✅ Ningún item se queda sin stock en el horizonte.")
+    for cat, riesgos in sorted(datos['quiebres'].items(), key=lambda par: par[0] or ""):
+        print(f"\n[{str(cat).upper()}]")
+        for r in riesgos[:MAX_LISTADO]:
+            if r['tipo'] == CONSUMIBLE:
+                detalle = f"quedan {r['restante']} (consumo {r['consumo_diario']}/día)"
+            else:
+                detalle = (f"{r['dias_en_riesgo']} días en riesgo, faltarían {r['faltante']} "
+                           f"(ya reservadas {r['reservado']})")
+            print(f"  {r['fecha']} | {r['id_item']:<6} {r['nombre'][:28]:<28} | stock {r['cantidad']} | {detalle}")
+        if len(riesgos) > MAX_LISTADO:
+            print(f"  ... y {len(riesgos) - MAX_LISTADO} items más")
@@ -0,0 +1,547 @@
+"""
+Optimizador de paquetes de boda para 'Raquel & Alba'.
+En vez de elegir lugar, personal e inventario de a un paso (y enterarse al
+final por val_restricc de que faltaba algo), arma paquetes completos que ya
+cumplen todas las reglas del negocio (motor_reglas):
+    - 80% de sillas y 1 mesa cada 10 invitados (con el stock que haya),
+    - lo que exija cada regla 'requiere' (barman si hay barra libre, equipo
+      de sonido si hay música, seguridad si el lugar tiene piscina, ...),
+y devuelve los mejores 'k' dentro del presupuesto.
+
+La búsqueda es un branch-and-bound: las opciones de cada decisión van
+ordenadas y se corta una rama en cuanto su cota (lo gastado más lo mínimo que
+falta) ya no puede mejorar al peor de los 'k' paquetes guardados. Las reglas
+se adelantan a la búsqueda: las opciones que exigen algo que no hay (ej: un
+iluminador sin ninguna lámpara con stock) ni se prueban, las que chocan con
+lo ya elegido (DJ y banda de rock) se saltean en la rama, y lo que exige
+el paquete y todavía no tiene entra en la cota (el acompañante más barato o
+el recargo de elegirlo en una decisión que sigue, lo que sea menos).
+"""
+import heapq
+from collections import Counter
+from itertools import count
+
+import funciones_generales as fg
+from cotizacion_viva import totales
+from instrumentacion import medido
+from indice_personal import puntos_experiencia
+from modulos import ItemReserva, Personal
+
+CRITERIOS = ('precio', 'calidad')
+
+# Rondas de acompañantes: un acompañante podría exigir a su vez otro recurso
+RONDAS_ACOMPANANTES = 3
+
+
+def _cubrir_cantidad(items, cantidad, stock, usado):
+    """
+    Reparte 'cantidad' unidades entre los items (sillas o mesas) empezando por
+    el más barato: es la forma más económica de cubrir un mínimo con stock limitado.
+    'stock' da las unidades libres de cada item (sin las apartadas por otros) y
+    'usado' (id_item -> unidades) lo que ya tomó el paquete; se le suma lo elegido.
+    Devuelve [(item, unidades)] o None si no alcanza el stock entre todos.
+    """
+    elegidos, falta = [], cantidad
+    for item in sorted(items, key=lambda i: i['precio_unidad']):
+        if falta <= 0:
+            break
+        usar = min(falta, stock(item) - usado.get(item['id_item'], 0))
+        if usar > 0:
+            elegidos.append((item, usar))
+            usado[item['id_item']] = usado.get(item['id_item'], 0) + usar
+            falta -= usar
+    return elegidos if falta <= 0 else None
+
+
+class _Opcion:
+    """
+    Una alternativa dentro de una decisión (un trabajador o un item con su cantidad).
+
+    Atributos:
+        etiquetas (frozenset): Las que le da el motor de reglas.
+        exige (frozenset): Etiquetas que piden sus reglas 'requiere' y que no tiene ella misma.
+        choca (frozenset): Etiquetas con las que no puede ir (reglas 'excluye').
+    """
+    __slots__ = ('costo', 'puntos', 'persona', 'item', 'cantidad', 'etiquetas', 'exige', 'choca')
+
+    def __init__(self, costo, puntos, persona=None, item=None, cantidad=0):
+        self.costo = costo
+        self.puntos = puntos
+        self.persona = persona
+        self.item = item
+        self.cantidad = cantidad
+        self.etiquetas = self.exige = self.choca = frozenset()
+
+
+class OptimizadorPaquetes:
+    """
+    Arma los mejores paquetes para un pedido.
+
+    Args:
+        repo (Repositorio): Catálogo e índice de disponibilidad.
+        criterio (str): 'precio' (el más barato primero) o 'calidad' (más
+            puntos de experiencia del personal pedido; a igualdad, el más barato).
+    """
+    def __init__(self, repo, criterio='precio'):
+        if criterio not in CRITERIOS:
+            raise ValueError(f"Criterio desconocido: {criterio}")
+        self.repo = repo
+        self.criterio = criterio
+
+    def optimizar(self, invitados, fecha, h_ini, h_fin, presupuesto, preferencias=None, k=3):
+        """
+        Args:
+            preferencias (dict): Opcional.
+                'personal': categorías a contratar, una persona por cada una
+                    (ej: ['fotografia', 'musica']).
+                'items': {categoria: cantidad}; la cantidad puede ser un número
+                    o 'invitados' (ej: {'catering': 'invitados', 'decoracion': 4}).
+                'lugares': IDs de lugar permitidos (por defecto todos).
+
+        Returns:
+            list: Hasta 'k' paquetes, del mejor al peor. Cada paquete es un dict con
+            'lugar', 'personal' (dicts del catálogo), 'items' ([(item, cantidad)]),
+            'subtotal', 'comision', 'total_final' y 'puntos'.
+        """
+        preferencias = preferencias or {}
+        self._pedido = (invitados, fecha, h_ini, h_fin, presupuesto)
+        self._k = k
+        self._mejores = []   # heap con el peor de los k arriba
+        self._orden = count()
+        self._cache_personal = {}
+        self._cache_acompanante = {}
+        self._cache_stock = {}
+        self._cache_costo = {}
+        self._cubribles = None
+
+        # Ordenadas, así una categoría repetida queda en decisiones seguidas
+        cats_personal = sorted(fg.normalizar_texto(c) for c in preferencias.get('personal', []))
+        decisiones_items = self._decisiones_items(preferencias.get('items', {}), invitados)
+        # Lo que toma el mobiliario fijo ya no está para las preferencias ni los acompañantes
+        usado_fijo = {}
+        fijos = self._mobiliario(invitados, usado_fijo)
+        if decisiones_items is None or fijos is None:
+            return []
+        motor = self.repo.reglas
+        etiquetas_fijas = [motor.etiquetas_item(i) for i, _ in fijos]
+        if any(not self._exige(e) <= self._cubrible() for e in etiquetas_fijas):
+            return []
+        costo_fijo = sum(i['precio_unidad'] * c for i, c in fijos)
+
+        permitidos = set(preferencias.get('lugares', [])) or None
+        lugares = [l for l in self.repo.lugares
+                   if l['capacidad'] >= invitados
+                   and (permitidos is None or l['id_lugar'] in permitidos)
+                   and self.repo.lugar_libre(l['id_lugar'], fecha, h_ini, h_fin)]
+        lugares.sort(key=lambda l: l['precio'])
+
+        # Las decisiones y sus cotas no dependen del lugar: se arman una sola vez
+        decisiones = [self._decision_personal(c) for c in cats_personal] + decisiones_items
+        if any(not opciones for opciones, _, _ in decisiones):
+            return []
+        cotas = self._cotas(decisiones)
+        for lugar in lugares:
+            base = lugar['precio'] + costo_fijo
+            if self.criterio == 'precio' and self._lleno() and base + cotas[0][0] >= -self._mejores[0][0]:
+                break  # los lugares que siguen son más caros: no pueden mejorar
+            etiquetas_lugar = motor.etiquetas_lugar(lugar)
+            if not self._exige(etiquetas_lugar) <= self._cubrible():
+                continue  # ej: piscina sin nadie de seguridad libre
+            self._buscar(lugar, fijos, usado_fijo, base, decisiones, cotas, [etiquetas_lugar] + etiquetas_fijas)
+
+        paquetes = [p for *_, p in self._mejores]
+        if self.criterio == 'precio':
+            paquetes.sort(key=lambda p: (p['subtotal'], -p['puntos']))
+        else:
+            paquetes.sort(key=lambda p: (-p['puntos'], p['subtotal']))
+        return paquetes
+
+    # --- ARMADO DE DECISIONES ---
+    def _ordenar(self, opciones):
+        if self.criterio == 'precio':
+            opciones.sort(key=lambda o: (o.costo, -o.puntos))
+        else:
+            opciones.sort(key=lambda o: (-o.puntos, o.costo))
+        return opciones
+
+    def _decision(self, opciones):
+        """
+        (opciones, costo mínimo, puntos máximos): las cotas se calculan una sola
+        vez. Antes se etiqueta cada opción y se quitan las que exigen algo que
+        ningún recurso libre puede cubrir: con ellas ninguna hoja saldría válida.
+        """
+        motor = self.repo.reglas
+        for o in opciones:
+            o.etiquetas = (motor.etiquetas_personal(o.persona) if o.persona is not None
+                           else motor.etiquetas_item(o.item))
+            o.exige = self._exige(o.etiquetas)
+            o.choca = frozenset(x for e in o.etiquetas for x in motor.exclusiones.get(e, ()))
+        opciones = [o for o in opciones if o.exige <= self._cubrible()]
+        if not opciones:
+            return opciones, 0, 0
+        return opciones, min(o.costo for o in opciones), max(o.puntos for o in opciones)
+
+    def _decision_personal(self, categoria):
+        # La fecha es la misma para todos los lugares: se arma una vez por categoría
+        if categoria not in self._cache_personal:
+            _, fecha, h_ini, h_fin, _ = self._pedido
+            opciones = [
+                _Opcion(p['sueldo'], puntos_experiencia(p.get('experiencia')), persona=p)
+                for p in self.repo.personal_disponible(categoria, fecha, h_ini, h_fin)
+            ]
+            self._cache_personal[categoria] = self._decision(self._ordenar(opciones))
+        return self._cache_personal[categoria]
+
+    def _stock(self, item):
+        id_item = item['id_item']
+        if id_item not in self._cache_stock:
+            _, fecha, h_ini, h_fin, _ = self._pedido
+            self._cache_stock[id_item] = self.repo.stock_disponible(id_item, fecha=fecha, h_ini=h_ini, h_fin=h_fin)
+        return self._cache_stock[id_item]
+
+    def _decisiones_items(self, pedidos, invitados):
+        decisiones = []
+        for categoria, cantidad in pedidos.items():
+            cantidad = invitados if cantidad == 'invitados' else int(cantidad)
+            opciones = [
+                _Opcion(i['precio_unidad'] * cantidad, 0, item=i, cantidad=cantidad)
+                for i in self.repo.inventario_por_categoria(categoria)
+                if self._stock(i) >= cantidad
+            ]
+            if not opciones:
+                return None
+            opciones.sort(key=lambda o: o.costo)
+            decision = self._decision(opciones)
+            if not decision[0]:
+                return None
+            decisiones.append(decision)
+        return decisiones
+
+    def _mobiliario(self, invitados, usado):
+        """Sillas y mesas mínimas (iguales para cualquier lugar), al menor costo; anota lo tomado en 'usado'."""
+        muebles = self.repo.inventario_por_categoria("mobiliario")
+        sillas = _cubrir_cantidad([i for i in muebles if "silla" in i['nombre'].lower()],
+                                  int(invitados * 0.8), self._stock, usado)
+        mesas = _cubrir_cantidad([i for i in muebles if "mesa" in i['nombre'].lower()],
+                                 max(1, int(invitados / 10)), self._stock, usado)
+        if sillas is None or mesas is None:
+            return None
+        return sillas + mesas
+
+    # --- BRANCH AND BOUND ---
+    def _lleno(self):
+        return len(self._mejores) >= self._k
+
+    @staticmethod
+    def _cotas(decisiones):
+        """
+        Lo que falta desde cada decisión: costo mínimo, puntos máximos y qué
+        etiquetas todavía puede aportar alguna de las decisiones que siguen, con
+        lo menos que cuesta de más elegir ahí una opción que la tenga
+        (etiqueta -> recargo sobre el mínimo de su decisión).
+        """
+        n = len(decisiones)
+        min_resto = [0] * (n + 1)
+        max_resto = [0] * (n + 1)
+        aportan = [{}] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            opciones, minimo, maximo = decisiones[i]
+            min_resto[i] = min_resto[i + 1] + minimo
+            max_resto[i] = max_resto[i + 1] + maximo
+            recargos = dict(aportan[i + 1])
+            for o in opciones:
+                for e in o.etiquetas:
+                    if o.costo - minimo < recargos.get(e, float('inf')):
+                        recargos[e] = o.costo - minimo
+            aportan[i] = recargos
+        return min_resto, max_resto, aportan
+
+    def _buscar(self, lugar, fijos, usado_fijo, base, decisiones, cotas, etiquetas_base):
+        presupuesto = self._pedido[4]
+        n = len(decisiones)
+        min_resto, max_resto, aportan = cotas
+
+        elegidas = []
+        posiciones = []  # índice de cada elegida dentro de sus opciones
+        # Lo que ya tomó el paquete en armado: unidades por item y personas, y
+        # las etiquetas que tiene y las que exigen sus reglas (lugar y mobiliario incluidos)
+        usado = dict(usado_fijo)
+        personas = set()
+        presentes = Counter()
+        exigidas = Counter()
+        for etiquetas in etiquetas_base:
+            presentes.update(etiquetas)
+            exigidas.update(self._exige(etiquetas))
+
+        def rama(i, costo, puntos):
+            cota = costo + min_resto[i]
+            if cota > presupuesto or not self._puede_mejorar(cota, puntos + max_resto[i]):
+                return False
+            pendientes = {e for e, veces in exigidas.items() if veces and not presentes[e]}
+            extra = self._extra(pendientes, aportan[i])
+            if extra and (cota + extra > presupuesto
+                          or not self._puede_mejorar(cota + extra, puntos + max_resto[i])):
+                return True  # depende de las etiquetas, no del costo: no dice nada de las hermanas
+            if i == n:
+                self._hoja(lugar, fijos, elegidas, costo, puntos, usado, personas)
+                return True
+            descartar = None
+            # Cota de cada hija antes de tomarla: las opciones que aportan lo mismo
+            # de lo pendiente tienen el mismo extra y van ordenadas, así que en
+            # cuanto una no entra tampoco entran las que siguen (con sus puntos)
+            if pendientes:
+                cota_hijas = costo + min_resto[i + 1]
+                extras, fuera = {}, {}  # lo que aporta -> extra de la hija / puntos de la que no entró
+            opciones = decisiones[i][0]
+            # Una categoría pedida dos veces es la misma decisión repetida: se elige
+            # en orden creciente para no armar el mismo equipo en otro orden
+            desde = posiciones[-1] + 1 if i and decisiones[i] is decisiones[i - 1] else 0
+            for pos in range(desde, len(opciones)):
+                opcion = opciones[pos]
+                if descartar is not None and opcion.puntos == descartar:
+                    continue
+                if opcion.choca and any(presentes[e] for e in opcion.choca):
+                    continue  # regla 'excluye' con algo ya elegido (o con el lugar)
+                if pendientes:
+                    aporte = opcion.etiquetas & pendientes
+                    if aporte in fuera and (self.criterio == 'precio' or opcion.puntos == fuera[aporte]):
+                        continue
+                    if aporte not in extras:
+                        extras[aporte] = self._extra(pendientes - aporte, aportan[i + 1])
+                    cota_hija = cota_hijas + opcion.costo + extras[aporte]
+                    if cota_hija > presupuesto or not self._puede_mejorar(
+                            cota_hija, puntos + opcion.puntos + max_resto[i + 1]):
+                        fuera[aporte] = opcion.puntos
+                        continue
+                if not self._tomar(opcion, usado, personas):
+                    continue  # la persona ya está o el stock no alcanza con lo ya elegido
+                elegidas.append(opcion)
+                posiciones.append(pos)
+                presentes.update(opcion.etiquetas)
+                exigidas.update(opcion.exige)
+                sigue = rama(i + 1, costo + opcion.costo, puntos + opcion.puntos)
+                presentes.subtract(opcion.etiquetas)
+                exigidas.subtract(opcion.exige)
+                posiciones.pop()
+                elegidas.pop()
+                self._soltar(opcion, usado, personas)
+                if sigue:
+                    continue
+                # Las opciones van ordenadas: por precio, si esta ya no entra en la
+                # cota las siguientes (más caras) tampoco; por calidad, tampoco
+                # entran las que siguen con los mismos puntos (son más caras).
+                if self.criterio == 'precio':
+                    break
+                descartar = opcion.puntos
+            return True
+
+        rama(0, base, 0)
+
+    def _tomar(self, opcion, usado, personas):
+        """Suma la opción a lo tomado por el paquete si entra. Devuelve False si no."""
+        if opcion.persona is not None:
+            if opcion.persona['id_personal'] in personas:
+                return False
+            personas.add(opcion.persona['id_personal'])
+            return True
+        id_item = opcion.item['id_item']
+        if usado.get(id_item, 0) + opcion.cantidad > self._stock(opcion.item):
+            return False
+        usado[id_item] = usado.get(id_item, 0) + opcion.cantidad
+        return True
+
+    @staticmethod
+    def _soltar(opcion, usado, personas):
+        if opcion.persona is not None:
+            personas.discard(opcion.persona['id_personal'])
+        else:
+            usado[opcion.item['id_item']] -= opcion.cantidad
+
+    def _clave(self, costo, puntos):
+        """
+        Mayor es mejor; el heap (de mínimos) deja arriba al peor de los k guardados.
+        El costo va al centavo: una cota sumada en otro orden no rompe un empate.
+        """
+        costo = round(costo, 2)
+        if self.criterio == 'precio':
+            return (-costo, puntos)
+        return (puntos, -costo)
+
+    def _puede_mejorar(self, costo_min, puntos_max):
+        if not self._lleno():
+            return True
+        peor = self._mejores[0]
+        return self._clave(costo_min, puntos_max) > (peor[0], peor[1])
+
+    def _hoja(self, lugar, fijos, elegidas, costo, puntos, usado, personas):
+        invitados, _, _, _, presupuesto = self._pedido
+        motor = self.repo.reglas
+        personal = [o.persona for o in elegidas if o.persona]
+        items = list(fijos) + [(o.item, o.cantidad) for o in elegidas if o.item]
+        objs_pers = [Personal.desde_catalogo(p) for p in personal]
+        objs_items = [ItemReserva.desde_catalogo(i, c) for i, c in items]
+        conteo = motor.conteo(objs_pers, objs_items, lugar)
+        usado, personas = dict(usado), set(personas)
+
+        # Acompañantes obligatorios según las reglas 'requiere'. Solo suman costo:
+        # los puntos de experiencia cuentan el personal pedido, así la cota de
+        # puntos de la búsqueda sigue siendo válida.
+        for _ in range(RONDAS_ACOMPANANTES):
+            faltan = {req for etiqueta, reqs in motor.requisitos.items() if conteo[etiqueta]
+                      for req in reqs if not conteo[req]}
+            if not faltan:
+                break
+            for etiqueta in sorted(faltan):
+                acompanante = self._acompanante(etiqueta, usado, personas)
+                if acompanante is None:
+                    return
+                tipo, recurso = acompanante
+                if tipo == 'personal':
+                    personas.add(recurso['id_personal'])
+                    personal.append(recurso)
+                    objs_pers.append(Personal.desde_catalogo(recurso))
+                    costo += recurso['sueldo']
+                else:
+                    usado[recurso['id_item']] = usado.get(recurso['id_item'], 0) + 1
+                    items.append((recurso, 1))
+                    objs_items.append(ItemReserva.desde_catalogo(recurso, 1))
+                    costo += recurso['precio_unidad']
+            conteo = motor.conteo(objs_pers, objs_items, lugar)
+
+        if costo > presupuesto or not self._puede_mejorar(costo, puntos):
+            return
+        # Control final: todas las reglas, con el conteo ya calculado
+        if motor.evaluar(objs_pers, objs_items, lugar, invitados, conteo=conteo):
+            return
+
+        comision, impuestos, total = totales(costo)
+        paquete = {
+            'lugar': lugar,
+            'personal': personal,
+            'items': items,
+            'subtotal': costo,
+            'comision': comision,
+            'impuestos': impuestos,
+            'total_final': total,
+            'puntos': puntos,
+        }
+        clave = self._clave(costo, puntos)
+        entrada = (clave[0], clave[1], -next(self._orden), paquete)
+        if self._lleno():
+            heapq.heapreplace(self._mejores, entrada)
+        else:
+            heapq.heappush(self._mejores, entrada)
+
+    # --- ACOMPAÑANTES ---
+    def _candidatos(self, etiqueta):
+        """
+        Quienes pueden aportar la etiqueta, en orden de precio (se arman una vez
+        por etiqueta): (personal libre en la fecha, items con stock).
+        """
+        if etiqueta not in self._cache_acompanante:
+            _, fecha, h_ini, h_fin, _ = self._pedido
+            motor = self.repo.reglas
+            libres = [p for p in map(self.repo.persona, motor.por_etiqueta.get(('personal', etiqueta), []))
+                      if self.repo.persona_libre(p['id_personal'], fecha, h_ini, h_fin)]
+            con_stock = [i for i in map(self.repo.item, motor.por_etiqueta.get(('item', etiqueta), []))
+                         if self._stock(i) >= 1]
+            self._cache_acompanante[etiqueta] = (sorted(libres, key=lambda p: p['sueldo']),
+                                                 sorted(con_stock, key=lambda i: i['precio_unidad']))
+        return self._cache_acompanante[etiqueta]
+
+    def _costo_acompanante(self, etiqueta):
+        """Lo menos que cuesta agregar un acompañante con esa etiqueta (es cota: no mira lo ya tomado)."""
+        if etiqueta not in self._cache_costo:
+            libres, con_stock = self._candidatos(etiqueta)
+            costos = [p['sueldo'] for p in libres[:1]] + [i['precio_unidad'] for i in con_stock[:1]]
+            self._cache_costo[etiqueta] = min(costos)
+        return self._cache_costo[etiqueta]
+
+    def _extra(self, pendientes, recargos):
+        """
+        Lo menos que cuesta de más cubrir las etiquetas pendientes: si ninguna
+        decisión que sigue aporta una, un acompañante (cada uno se suma); si
+        alguna puede, lo menos entre acompañante y recargo (se toma el mayor).
+        """
+        extra = mayor = 0
+        for e in pendientes:
+            if e in recargos:
+                mayor = max(mayor, min(self._costo_acompanante(e), recargos[e]))
+            else:
+                extra += self._costo_acompanante(e)
+        return extra + mayor
+
+    def _exige(self, etiquetas):
+        """Etiquetas que piden las reglas 'requiere' de estas y que no están entre ellas."""
+        requisitos = self.repo.reglas.requisitos
+        return frozenset(r for e in etiquetas for r in requisitos.get(e, ())) - etiquetas
+
+    def _cubrible(self):
+        """
+        Etiquetas exigibles que algún recurso libre puede aportar, contando que ese
+        recurso a su vez tenga cubierto lo que exige (ej: si nadie aporta 'luces',
+        un técnico de iluminación no cubre nada). Se calcula una vez por pedido.
+        """
+        if self._cubribles is None:
+            motor = self.repo.reglas
+            exigibles = {r for reqs in motor.requisitos.values() for r in reqs}
+            aportes = {}
+            for etiqueta in exigibles:
+                libres, con_stock = self._candidatos(etiqueta)
+                aportes[etiqueta] = ({self._exige(motor.etiquetas_personal(p)) for p in libres}
+                                     | {self._exige(motor.etiquetas_item(i)) for i in con_stock})
+            cubribles = {e for e in exigibles if aportes[e]}
+            # Punto fijo: se sacan las que solo aportan recursos con exigencias sin cubrir
+            cambio = True
+            while cambio:
+                cambio = False
+                for etiqueta in list(cubribles):
+                    if not any(exige <= cubribles for exige in aportes[etiqueta]):
+                        cubribles.discard(etiqueta)
+                        cambio = True
+            self._cubribles = frozenset(cubribles)
+        return self._cubribles
+
+    def _acompanante(self, etiqueta, usado, personas):
+        """
+        El recurso más barato que aporta la etiqueta y que el paquete todavía no
+        tomó: primero personal libre en la fecha, si no un item al que le quede
+        stock. Devuelve ('personal'|'item', dict) o None.
+        """
+        libres, con_stock = self._candidatos(etiqueta)
+        for persona in libres:
+            if persona['id_personal'] not in personas:
+                return 'personal', persona
+        for item in con_stock:
+            if usado.get(item['id_item'], 0) < self._stock(item):
+                return 'item', item
+        return None
+
+
+@medido('cotizacion')
+def optimizar_paquetes(repo, invitados, fecha, h_ini, h_fin, presupuesto,
+                       preferencias=None, k=3, criterio='precio'):
+    """Atajo: los 'k' mejores paquetes para el pedido (ver OptimizadorPaquetes.optimizar)."""
+    return OptimizadorPaquetes(repo, criterio).optimizar(
+        invitados, fecha, h_ini, h_fin, presupuesto, preferencias, k)
+
+
+def paquete_a_cotizacion(paquete, cliente, fecha, h_ini, h_fin):
+    """Convierte un paquete en la cotización de siempre (build_cotizacion)."""
+    personal = [Personal.desde_catalogo(p) for p in paquete['personal']]
+    items = [ItemReserva.desde_catalogo(i, c) for i, c in paquete['items']]
+    return fg.build_cotizacion(cliente, paquete['lugar'], personal, items, fecha, h_ini, h_fin)
+
+
+def imprimir_paquetes(paquetes):
+    """Muestra los paquetes encontrados, uno por bloque."""
+    if not paquetes:
+        print("❌ No hay paquetes que cumplan todas las reglas dentro del presupuesto.")
+        return
+    for n, p in enumerate(paquetes, 1):
+        print(f"\n--- PAQUETE {n}: {p['lugar']['nombre']} | Subtotal ${p['subtotal']:,.2f} "
+              f"| Total ${p['total_final']:,.2f} | Experiencia {p['puntos']} ---")
+        for persona in p['personal']:
+            print(f"   👤 {persona['nombre']} ({persona['oficio']}) ${persona['sueldo']:,.2f}")
+        for item, cant in p['items']:
+            print(f"   📦 {item['nombre']} x{cant} ${item['precio_unidad'] * cant:,.2f}")
@@ -0,0 +1,14 @@
+"""
+Utilidades de terminal del planificador 'Raquel & Alba'.
+Va aparte de funciones_generales para que el menú principal pueda dibujarse
+sin cargar el resto del sistema (cotizaciones, reglas, índices...).
+"""
+import os
+
+
+def limpiar_pantalla():
+    # 'nt' es para Windows, 'posix' para Mac o Linux
+    if os.name == 'nt':
+        os.system('cls')
+    else:
+        os.system('clear')
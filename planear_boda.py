@@ -3,10 +3,14 @@ Módulo de registro y planificación de eventos para 'Raquel & Alba'.
 Este módulo gestiona el flujo principal de contratación de personal,
 selección de lugar y validación de presupuestos.
 """
-from datetime import datetime,timedelta
-import re
 import funciones_generales as fg
-from modulos import Cliente, Personal, ItemReserva
+from almacenamiento import ConflictoReserva
+from apartados import ITEM
+from cotizacion_viva import CotizacionViva
+from disponibilidad import PERSONAL
+import documentos
+from modulos import Cliente
+from repositorio import Repositorio
 
 def ejecutar_registro_boda():
     """
@@ -18,11 +22,9 @@ def ejecutar_registro_boda():
     print("   BIENVENIDO AL SISTEMA RAQUEL & ALBA PLANNER  ")
     print("=================================================\n")
 
-    # 1. CARGAR DATOS
-    lista_lugares = fg.ensure_file_exist('data/lugares.json', [])
-    lista_personal = fg.ensure_file_exist('data/personal.json', [])
-    lista_inventario = fg.ensure_file_exist('data/inventario.json', [])
-    lista_clientes = fg.ensure_file_exist("data/clientes.json", [])
+    # 1. CARGAR DATOS (una sola vez, con sus índices por ID y categoría)
+    repo = Repositorio()
+    lista_lugares = repo.lugares
 
     if not lista_lugares:
         print("❌ ERROR CRÍTICO: No se puede planear una boda sin lugares en la base de datos.")
@@ -40,11 +42,9 @@ def ejecutar_registro_boda():
     while True:
         try:
             id_client = int(input("\nIngrese ID del cliente (1000-10000): "))
-            if not 1000 <= id_client <= 10000:
-                print("⚠️ Error: El ID debe estar entre 1000 y 10000.")
-                continue
-            if any(c['id_cliente'] == id_client for c in lista_clientes):
-                print("❌ Este ID ya existe. Use uno diferente.")
+            error = fg.validar_id_cliente(id_client, repo)
+            if error:
+                print(error)
                 continue
             break # ID correcto, salimos de ESTE bucle
         except ValueError:
@@ -53,129 +53,43 @@ def ejecutar_registro_boda():
     # 2. VALIDAR NOMBRE
     while True:
         name_client = input("Ingrese nombre completo: ").strip()
-
-        if not name_client:
-            print("⚠️ El nombre no puede estar vacío.")
+        error = fg.validar_nombre_cliente(name_client)
+        if error:
+            print(error)
             continue
-
-        # Preparación para validaciones
-        palabras = name_client.lower().split()
-        solo_letras = name_client.replace(" ", "")
-
-        # A. Evitar palabras repetidas (ej: "pedro pedro pedro")
-        repetida = any(palabras.count(p) > 2 for p in palabras)
-
-        # B. Evitar "disparates" (Regex para 5 o más consonantes seguidas)
-        tiene_basura = re.search(r'[^aeiouáéíóúü\s]{5,}', name_client.lower())
-        letras_locas = re.search(r'(.)\1{3,}', name_client.lower())
-
-        # --- VALIDACIÓN ÚNICA (ORDENADA) ---
-        if len(name_client) < 8:
-            print("⚠️ Nombre demasiado corto (mín. 8 caracteres).")
-        elif not solo_letras.isalpha():
-            print("⚠️ Solo se permiten letras y espacios.")
-        elif repetida:
-            print("⚠️ Nombre inválido: demasiadas palabras repetidas.")
-        elif tiene_basura:
-            print("⚠️ El nombre parece inválido (letras aleatorias detectadas).")
-        elif letras_locas:
-            print("⚠️ El nombre contiene demasiadas letras repetidas seguidas.")
-        else:
-            # ÉXITO: Formateamos y salimos
-            name_client = name_client.title()
-            break
+        # ÉXITO: Formateamos y salimos
+        name_client = name_client.title()
+        break
     # # 3. VALIDAR CORREO
     while True:
         correo_temp = input("Ingrese correo (@gmail.com): ").lower().strip()
-
-        if " " in correo_temp:
-            print("❌ El correo no puede contener espacios.")
+        error = fg.validar_correo(correo_temp)
+        if error:
+            print(error)
             continue
-
-        if correo_temp.endswith("@gmail.com"):
-            usuario = correo_temp.split('@')[0]
-
-            # --- NUEVAS VALIDACIONES DE SEGURIDAD ---
-
-            # 1. Detectar símbolos repetidos (ej: "......" o "------")
-            simbolos_repetidos = re.search(r'[\._-]{2,}', usuario)
-
-            # 2. Detectar si empieza o termina con un símbolo (inválido en Gmail)
-            borde_invalido = (
-                usuario.startswith(('.', '-', '_')) or
-                usuario.endswith(('.', '-', '_'))
-            )
-
-            # 3. Detectar caracteres no permitidos ( puntos, guiones y guiones bajos)
-            caracteres_prohibidos = re.search(r'[^a-z0-9\._-]', usuario)
-
-            # 4. Tu validación de "basura" (consonantes seguidas)
-            es_basura = re.search(r'[^aeiou0-9]{5,}', usuario)
-
-            if len(usuario) < 4:
-                print("❌ El nombre de usuario del correo es muy corto (mín. 4 caracteres).")
-            elif simbolos_repetidos:
-                print("❌ El correo no puede tener puntos o guiones seguidos.")
-            elif borde_invalido:
-                print("❌ El correo no puede empezar ni terminar con símbolos.")
-            elif caracteres_prohibidos:
-                print("❌ El correo contiene caracteres no permitidos.")
-            elif es_basura:
-                print("❌ El correo parece generado aleatoriamente (basura).")
-            else:
-                # ÉXITO
-                break
-        else:
-            print("❌ Debe ser una dirección válida que termine en @gmail.com")
+        break
 # 4. VALIDAR INVITADOS (Con lógica de evento real)
     while True:
         try:
             invitados_val = int(input("¿Cuántos invitados espera? (30 - 350): "))
-            if invitados_val < 0:
-                print("\n❌ ERROR: El presupuesto no puede ser negativo.")
-                print("   Por favor, ingrese un monto real (sin signos de menos).")
-                continue
-
-            if invitados_val < 30:
-                print("⚠️ Lo sentimos. El mínimo aceptado para que la "
-                        "logística sea viable es de 30 personas.")
+            error = fg.validar_invitados(invitados_val)
+            if error:
+                print(error)
                 continue
-
-            if invitados_val > 350:
-                print("⚠️ Cantidad excedida. El límite de nuestros salones es 350 invitados.")
-                continue
-
             # Si llega aquí, es porque está entre 30 y 350
             break
 
         except ValueError:
             print("❌ Error: Ingrese un número entero (ej: 150).")
 
-    # 5. VALIDAR PRESUPUESTO
 # 5. VALIDAR PRESUPUESTO
     while True:
         try:
             presupuesto_val = float(input("¿Presupuesto máximo? (Mínimo $4000): "))
-
-            # 1. Filtro de números negativos (La muela de coherencia)
-            if presupuesto_val < 0:
-                print("\n❌ ERROR: El presupuesto no puede ser negativo.")
-                print("   Por favor, ingrese un monto real (sin signos de menos).")
-                continue
-
-            # 2. Filtro de presupuesto insuficiente
-            if presupuesto_val < 4000:
-                print("\n❌ PRESUPUESTO INSUFICIENTE: El mínimo para iniciar es de $4000.")
-                print("   Nuestros estándares de calidad requieren una inversión mayor.")
+            error = fg.validar_presupuesto(presupuesto_val)
+            if error:
+                print(error)
                 continue
-
-            # 3. Filtro de presupuesto exagerado (El límite de "billonarios")
-            if presupuesto_val > 1000000:
-                print("\n🧐 ¡WOW!: Ese es un presupuesto digno de la Realeza.")
-                print("   Por seguridad, el límite para cotizaciones automáticas es de $1,000,000.")
-                print("   Si es más rico que eso, contacte a Raquel directamente por teléfono. 😉")
-                continue
-
             # Si pasó todos los filtros anteriores, el dato es correcto
             break
 
@@ -184,103 +98,61 @@ def ejecutar_registro_boda():
 
     # AL FINAL: Creamos el objeto una sola vez
     cliente_actual = Cliente(id_client, name_client, correo_temp, invitados_val, presupuesto_val)
-    presupuesto_provisional = cliente_actual.presupuesto # variable temporal
+    # Lo que se va eligiendo queda apartado a nombre de este cliente (vence solo si se abandona)
+    dueno = f"cliente-{id_client}"
     fecha_boda = None
     input("\nPresione Enter para continuar con el registro de la fecha...")
     # --- PASO 2.1: REGISTRO DE FECHA ---
     while True:
         fecha_input = input("\nIngrese la fecha de la boda (DD/MM/AAAA): ")
-        hoy = datetime.now().date()
-        try:
-            fecha_boda = datetime.strptime(fecha_input, "%d/%m/%Y").date()
-            if fecha_boda < hoy:
-                print("❌ No puedes elegir una fecha pasada. ¡Planificamos el futuro!")
-                continue
-            # 2. Validar el límite de 2 años (Evita el año 2100)
-            limite_futuro = hoy + timedelta(days=730) # 2 años aprox.
-            if fecha_boda > limite_futuro:
-                print("⚠️ Error: No aceptamos reservas con más de 2 años de antelación.")
-                print(f"El límite máximo es: {limite_futuro.strftime('%d/%m/%Y')}")
-                continue
-            fecha_str = fecha_input
-            break # Fecha válida, pasamos a la hora
-        except ValueError:
-            print("⚠️ Formato incorrecto. Debe ser día/mes/año (ej: 15/05/2026)")
+        fecha_boda, error = fg.validar_fecha_evento(fecha_input)
+        if error:
+            print(error)
+            continue
+        fecha_str = fecha_input
+        break # Fecha válida, pasamos a la hora
 
     # --- PASO 2.2: REGISTRO DE HORARIOS ---
     print(f"\nDefina el horario para el {fecha_str} (Formato 24h, ej: 12:00 o 17:30):")
     while True:
-        # VALIDACIONES ESTRICTAS:
-        # 1. Debe tener exactamente 5 caracteres (00:00)
-        # 2. Debe tener un solo ':' en la posición 2
-        # 3. Solo debe haber un ':' en toda la cadena
         h_ini = input("Hora de inicio: ").strip()
-        if len(h_ini) == 5 and h_ini[2] == ":" and h_ini.count(":") == 1:
-            try:
-                t_ini = datetime.strptime(h_ini, "%H:%M")
-                break
-            except ValueError:
-                print("❌ Hora inexistente. Use el rango 00:00 - 23:59.")
-        else:
-            print("⚠️ Formato incorrecto. Use estrictamente HH:MM (5 caracteres y un solo ':').")
-            print("Ejemplo: Para las 3 de la tarde, escriba 15:00")
+        error = fg.validar_hora(h_ini)
+        if not error:
+            break
+        print(error)
 
     while True:
         h_fin = input("Hora de finalización (Formato HH:MM, ej. 21:30): ").strip()
-
-        if len(h_fin) == 5 and h_fin[2] == ":" and h_fin.count(":") == 1:
-            try:
-                t_ini = datetime.strptime(h_ini, "%H:%M")
-                t_fin = datetime.strptime(h_fin, "%H:%M")
-
-                # --- 1. AJUSTE DE MEDIA NOCHE ---
-                if t_fin < t_ini:
-                    t_fin = t_fin + timedelta(days=1)
-
-                # --- 2. CÁLCULO PARA VALIDAR ---
-                diferencia = t_fin - t_ini
-                total_segundos = diferencia.total_seconds()
-                segundos_minimos = 2 * 3600
-
-                # --- 3. VALIDACIONES ---
-                if t_fin == t_ini:
-                    print("❌ La hora de fin no puede ser igual a la de inicio.")
-                elif total_segundos < segundos_minimos:
-                    minutos_reales = total_segundos / 60
-                    print(f"❌ Duración insuficiente. Mínimo 2 horas "
-                          f"(Su evento dura: {minutos_reales:.0f} min).")
-                else:
-                    # SI ESTÁ BIEN, SALIMOS
-                    break
-
-            except ValueError:
-                print("❌ Hora inexistente (use rango 00:00 - 23:59).")
-        else:
-            print("⚠️ Formato incorrecto. Use HH:MM (ej. 20:00).")
-
+        # Valida formato, que no sea igual al inicio y el mínimo de 2 horas
+        # (si la hora de fin es menor, el evento cruza la medianoche)
+        error = fg.validar_horario(h_ini, h_fin)
+        if not error:
+            break
+        print(error)
         input("Presione Enter para reintentar...")
 
     # --- FUERA DEL BUCLE: AQUÍ HACEMOS EL CÁLCULO FINAL ---
-    diferencia_final = t_fin - t_ini
-    total_horas = diferencia_final.total_seconds() / 3600
-    horas = int(total_horas)
-    minutos = int((total_horas * 60) % 60)
+    total_minutos = fg.duracion_evento(h_ini, h_fin)
+    horas = int(total_minutos // 60)
+    minutos = int(total_minutos % 60)
 
     print("\n✅ Horario confirmado.")
     print(f"⏱️  Duración total: {horas}h {minutos}min")
     input("\nPresione Enter para continuar con la selección del lugar...")
 # --- PASO 3: SELECCIÓN DE LUGAR (Bucle único y limpio) ---
     lugar_elegido = None
-    presupuesto_provisional = cliente_actual.presupuesto
+    # Lleva subtotal, comisión y presupuesto restante al día en todo el armado
+    cotizacion_viva = CotizacionViva(cliente_actual, fecha_str, h_ini, h_fin)
 
     while lugar_elegido is None:
         fg.limpiar_pantalla()
         print(f"{'='*60}\n{'CATÁLOGO DE SALONES DISPONIBLES'.center(60)}\n{'='*60}")
         print(f"💰 Presupuesto disponible: ${cliente_actual.presupuesto:,.2f}\n")
 
-        # 1. OBTENER DISPONIBILIDAD REAL
-        lugares_libres, sugerencias = fg.get_lugares_disponibles(
-            fecha_str, lista_lugares, h_ini, h_fin, invitados_val
+        # 1. OBTENER DISPONIBILIDAD REAL (sin los que otro cliente tiene apartados;
+        #    si solo se tipeó mal un ID, la respuesta sale de la caché de consultas)
+        lugares_libres, sugerencias = repo.lugares_disponibles(
+            fecha_str, h_ini, h_fin, invitados_val, dueno
         )
 
         # 2. VALIDAR SI NO HAY OPCIONES
@@ -289,7 +161,8 @@ def ejecutar_registro_boda():
             if sugerencias:
                 print("\n💡 SUGERENCIAS EN OTRAS FECHAS:")
                 for sug in sugerencias:
-                    print(f"   -> '{sug['nombre']}' disponible el día {sug['fecha']}")
+                    print(f"   -> '{sug['nombre']}' disponible el día {sug['fecha']} "
+                          f"(${sug['precio']:,.2f})")
 
             print("\n¿Qué desea hacer?\n1. Cambiar fecha/invitados\n2. Cancelar")
             opc = input("Seleccione: ")
@@ -324,18 +197,27 @@ def ejecutar_registro_boda():
             if id_selec == 0:
                 return
 
-            # Buscamos el lugar seleccionado
-            seleccionado = fg.buscar_elemento_id(id_selec, lugares_libres, 'id_lugar')
+            # Buscamos el lugar seleccionado (solo vale si está libre en esta fecha)
+            seleccionado = repo.lugar(id_selec)
+            if seleccionado not in lugares_libres:
+                seleccionado = None
 
             if seleccionado:
                 # Validamos dinero
                 if fg.can_select_lugar(cliente_actual.presupuesto, seleccionado['precio']):
+                    # Queda apartado (no reservado) hasta confirmar la boda
+                    _, error = repo.apartar_lugar(dueno, seleccionado['id_lugar'], fecha_str, h_ini, h_fin)
+                    if error:
+                        print(f"❌ {error}")
+                        input("Presione Enter para elegir otro...")
+                        continue
                     lugar_elegido = seleccionado
-                    # RESTA REAL
-                    presupuesto_provisional -= lugar_elegido['precio']
+                    # La fecha pudo cambiar en el catálogo (sin lugares libres)
+                    cotizacion_viva.fecha = fecha_str
+                    cotizacion_viva.poner_lugar(lugar_elegido)
 
-                    print(f"✅ ¡'{lugar_elegido['nombre']}' reservado con éxito!")
-                    print(f"💵 Presupuesto restante: ${presupuesto_provisional:,.2f}")
+                    print(f"✅ ¡'{lugar_elegido['nombre']}' apartado con éxito!")
+                    print(f"💵 Presupuesto restante: ${cotizacion_viva.restante:,.2f}")
                     input("\nPresione Enter para continuar al personal...")
                 else:
                     costo_salon = seleccionado['precio']
@@ -353,10 +235,11 @@ def ejecutar_registro_boda():
 
 # --- PASO 4: RECURSOS (Bucle maestro de reintento) ---
     while True:
-        personal_contratado = []
-        servicios_elegidos = []
-        # El presupuesto se resetea al valor inicial menos el costo del lugar en cada reintento
-        presupuesto_provisional = cliente_actual.presupuesto - lugar_elegido['precio']
+        # Al reintentar se suelta lo apartado en la vuelta anterior (el lugar se mantiene)
+        repo.apartados.liberar(dueno, tipos=(PERSONAL, ITEM))
+        repo.apartados.renovar(dueno)
+        # Todo lo del paso 4 va en una ronda: si la validación final falla se deshace entera
+        cotizacion_viva.iniciar_ronda()
 
         # --- AVISO PREVENTIVO DE PISCINA ---
         tiene_piscina = (
@@ -374,9 +257,9 @@ def ejecutar_registro_boda():
         # --- 4.1: CONTRATACIÓN DE PERSONAL ---
         while True:
             fg.limpiar_pantalla()
-            equipo_nombres = [p.nombre for p in personal_contratado]
+            equipo_nombres = [p.nombre for p in cotizacion_viva.personal]
             print("="*60)
-            print(f"--- PASO 4: PERSONAL (Presupuesto: ${presupuesto_provisional:,.2f}) ---")
+            print(f"--- PASO 4: PERSONAL (Presupuesto: ${cotizacion_viva.restante:,.2f}) ---")
             print(f"Equipo actual: {', '.join(equipo_nombres) if equipo_nombres else 'Ninguno'}")
             print("="*60)
 
@@ -384,7 +267,7 @@ def ejecutar_registro_boda():
             tipo = input("¿Qué oficio busca? (o '0' para finalizar): ").lower().strip()
 
             if tipo == '0':
-                tiene_seguridad = any("seguridad" in p.oficio.lower() for p in personal_contratado)
+                tiene_seguridad = any("seguridad" in p.oficio.lower() for p in cotizacion_viva.personal)
                 if tiene_piscina and not tiene_seguridad:
                     print("\n❌ ERROR: El lugar tiene piscina. DEBE contratar Seguridad.")
                     input("Presione Enter para volver...")
@@ -396,7 +279,7 @@ def ejecutar_registro_boda():
                 input("Presione Enter...")
                 continue
 
-            pers_libres = fg.get_personal_disponible(tipo, lista_personal, fecha_str)
+            pers_libres = repo.personal_disponible(tipo, fecha_str, h_ini, h_fin, dueno)
             if not pers_libres:
                 print(f"\n❌ No hay personal de {tipo.upper()} disponible.")
                 input("Enter para buscar otro...")
@@ -407,16 +290,20 @@ def ejecutar_registro_boda():
                 id_p = int(input(f"\nID del {tipo} a contratar (0 para volver): "))
                 if id_p == 0:
                     continue
-                dict_p = fg.buscar_elemento_id(id_p, pers_libres, 'id_personal')
+                dict_p = repo.persona(id_p)
+                if dict_p not in pers_libres:
+                    dict_p = None
 
                 if dict_p:
-                    if any(p.id_personal == dict_p['id_personal'] for p in personal_contratado):
+                    if cotizacion_viva.tiene_persona(dict_p['id_personal']):
                         print("\n⚠️ Ya está en el equipo.")
-                    elif dict_p['sueldo'] > presupuesto_provisional:
+                    elif not cotizacion_viva.alcanza(dict_p['sueldo']):
                         print("\n❌ PRESUPUESTO INSUFICIENTE.")
+                    elif repo.apartar_persona(dueno, id_p, fecha_str, h_ini, h_fin)[1]:
+                        print("\n❌ Lo acaba de apartar otro cliente. Elija otro.")
                     else:
-                        presupuesto_provisional -= dict_p['sueldo']
-                        personal_contratado.append(Personal(dict_p['id_personal'], dict_p['nombre'], dict_p['oficio'], dict_p['sueldo'], dict_p.get('experiencia', 'Estándar')))
+                        repo.apartados.renovar(dueno)
+                        cotizacion_viva.agregar_personal(dict_p)
                         print(f"\n✅ {dict_p['nombre']} contratado.")
                 else:
                     print("\n❌ ID no válido.")
@@ -425,93 +312,77 @@ def ejecutar_registro_boda():
                 print("\n❌ Ingrese un ID numérico.")
 
         # --- 4.2: INVENTARIO CON VALIDACIÓN BLOQUEANTE ---
-        tiene_florista = any(p.oficio.lower() == "flores" for p in personal_contratado)
-        tiene_iluminador = any(p.oficio.lower() == "iluminacion" for p in personal_contratado)
-        tiene_dj = any("dj" in p.oficio.lower() for p in personal_contratado)
-
         categorias_inv = ["catering", "bebida", "postre", "mobiliario", "tecnologia", "decoracion"]
 
         for cat in categorias_inv:
             while True:
                 fg.limpiar_pantalla()
-                presupuesto_antes_de_cat = presupuesto_provisional
-                items_en_esta_ronda = []
+                apartados_ronda = []
 
                 print(f"{'='*60}\n{f'PASO 4: {cat.upper()}'.center(60)}\n{'='*60}")
-                print(f"💰 Presupuesto disponible: ${presupuesto_provisional:,.2f}")
+                print(f"💰 Presupuesto disponible: ${cotizacion_viva.restante:,.2f}")
 
-                items_categoria = [i for i in lista_inventario if i.get('categoria') == cat]
+                items_categoria = repo.inventario_por_categoria(cat)
                 if not items_categoria: break
+                # Lo que se elija en esta categoría se puede deshacer junto
+                cotizacion_viva.iniciar_ronda()
 
                 print(f"\n{'ID':<6} | {'PRODUCTO':<25} | {'PRECIO':<10} | {'STOCK'}")
                 print("-" * 60)
                 for item in items_categoria:
-                    print(f"{item['id_item']:<6} | {item['nombre']:<25} | ${item['precio_unidad']:<10.2f} | {item['cantidad']}")
+                    stock = repo.stock_disponible(item['id_item'], dueno, fecha_str, h_ini, h_fin)
+                    print(f"{item['id_item']:<6} | {item['nombre']:<25} | ${item['precio_unidad']:<10.2f} | {stock}")
 
                 while True:
                     op = input(f"\nID de {cat} (o '0' para finalizar categoría): ").strip()
                     if op == '0': break
                     try:
                         id_sel = int(op)
-                        seleccionado = fg.buscar_elemento_id(id_sel, items_categoria, 'id_item')
-                        if not seleccionado:
+                        seleccionado = repo.item(id_sel)
+                        if not seleccionado or seleccionado.get('categoria') != cat:
                             print("❌ ID no válido.")
                             continue
                         cant = int(input(f"¿Unidades de '{seleccionado['nombre']}'?: "))
-                        costo = seleccionado['precio_unidad'] * cant
-                        if seleccionado['cantidad'] < cant:
-                            print("❌ Stock insuficiente.")
-                        elif costo > presupuesto_provisional:
+                        if not cotizacion_viva.alcanza(seleccionado['precio_unidad'] * cant):
                             print("❌ Presupuesto insuficiente.")
+                            continue
+                        id_apartado, error = repo.apartar_item(dueno, id_sel, cant, fecha_str, h_ini, h_fin)
+                        if error:
+                            print(f"❌ {error}")
                         else:
-                            presupuesto_provisional -= costo
-                            items_en_esta_ronda.append(ItemReserva(seleccionado['id_item'], seleccionado['nombre'], seleccionado['precio_unidad'], cant))
+                            apartados_ronda.append(id_apartado)
+                            repo.apartados.renovar(dueno)
+                            cotizacion_viva.agregar_item(seleccionado, cant)
                             print(f"✅ Añadido: {seleccionado['nombre']} x{cant}")
                     except ValueError:
                         print("⚠️ Ingrese números válidos.")
 
                 # Validaciones de logística por categoría
-                cumple = True
-                servicios_totales_temp = servicios_elegidos + items_en_esta_ronda
-                nombres_bajos = [i.nombre.lower() for i in servicios_totales_temp]
-
-                if cat == "mobiliario":
-                    cant_sillas = sum(i.cantidad_requerida for i in servicios_totales_temp if "silla" in i.nombre.lower())
-                    cant_mesas = sum(i.cantidad_requerida for i in servicios_totales_temp if "mesa" in i.nombre.lower())
-                    sillas_min = int(cliente_actual.invitados * 0.8)
-                    if cant_sillas < sillas_min:
-                        print(f"\n❌ ERROR: Faltan sillas ({cant_sillas}/{sillas_min}).")
-                        cumple = False
-                    if cant_mesas <= 0:
-                        print("\n❌ ERROR: Falta seleccionar mesas.")
-                        cumple = False
-                elif cat == "tecnologia" and tiene_dj:
-                    if not any("sonido" in n or "altavoz" in n for n in nombres_bajos):
-                        print("\n❌ ERROR: Tiene DJ pero falta equipo de sonido.")
-                        cumple = False
-                elif cat == "decoracion":
-                    if tiene_florista and not any("flor" in n for n in nombres_bajos):
-                        print("\n❌ ERROR: Falta comprar flores para el florista.")
-                        cumple = False
-                    if tiene_iluminador and not any("luz" in n or "foco" in n for n in nombres_bajos):
-                        print("\n❌ ERROR: Falta iluminación para el especialista.")
-                        cumple = False
+                errores = fg.val_categoria(
+                    cat, cotizacion_viva.items, cotizacion_viva.personal, cliente_actual.invitados,
+                    repo.reglas
+                )
+                for error in errores:
+                    print(f"\n❌ ERROR: {error}")
+                cumple = not errores
 
                 if cumple:
-                    servicios_elegidos.extend(items_en_esta_ronda)
+                    cotizacion_viva.cerrar_ronda()
                     break
                 else:
-                    presupuesto_provisional = presupuesto_antes_de_cat
+                    cotizacion_viva.deshacer_ronda()
+                    for id_apartado in apartados_ronda:
+                        repo.apartados.soltar(id_apartado)
                     input("\n⚠️ Requisitos no cumplidos. Reintentando categoría...")
 
         # --- PASO 5: CÁLCULOS Y VALIDACIÓN FINAL ---
-        cotizacion = fg.build_cotizacion(
-            cliente_actual, lugar_elegido, personal_contratado,
-            servicios_elegidos, fecha_str, h_ini, h_fin
-        )
+        # Los totales ya están al día: no hace falta volver a sumar todo
+        cotizacion = cotizacion_viva.como_dict()
+        personal_contratado = cotizacion['personal_contratado']
+        servicios_elegidos = cotizacion['items_pedidos']
 
         es_valido, mensaje = fg.val_restricc(
-            personal_contratado, servicios_elegidos, lugar_elegido, invitados_val
+            personal_contratado, servicios_elegidos, lugar_elegido, invitados_val, repo.reglas
         )
 
         if not es_valido:
@@ -519,30 +390,36 @@ def ejecutar_registro_boda():
             print(f"❌ ATENCIÓN: {mensaje}")
             print("!"*60)
             input("Presione Enter para reiniciar la selección de recursos...")
+            cotizacion_viva.deshacer_ronda()
             continue # Reinicia el bucle maestro del Paso 4
         
         # Si llegamos aquí, la logística es válida
+        cotizacion_viva.cerrar_ronda()
         print("\n✅ Logística validada con éxito.")
-        confirmado = fg.approve_cotizacion(
-            cotizacion, lista_lugares, lista_personal, lista_inventario
-        )
+        confirmado = fg.approve_cotizacion(cotizacion, repo.apartados, dueno)
 
         if confirmado:
             # --- PROCESO DE GUARDADO ---
-            lista_clientes.append(cliente_actual.to_dict())
-            fg.procesar_confirmacion_boda(cotizacion, lista_lugares, lista_personal, lista_inventario)
-
-            fg.write_json('data/lugares.json', lista_lugares)
-            fg.write_json('data/personal.json', lista_personal)
-            fg.write_json('data/inventario.json', lista_inventario)
-            fg.write_json('data/clientes.json', lista_clientes)
-
-            fg.generar_ticket(
-                cliente_actual, lugar_elegido, personal_contratado,
-                servicios_elegidos, cotizacion['subtotal'], cotizacion['comision'],
-                cotizacion['total_final'], fecha_boda
-            )
-            fg.guardar_reserva_json(cotizacion)
+            try:
+                boda = repo.confirmar_reserva(cotizacion, cliente_actual.to_dict())
+            except ConflictoReserva as conflicto:
+                repo.apartados.liberar(dueno)
+                # Otro operador reservó algo de esta boda mientras se armaba
+                print("\n" + "!"*60)
+                print("❌ CONFLICTO: la boda NO se guardó porque cambiaron datos que usa:")
+                for detalle in conflicto.conflictos:
+                    print(f"   - {detalle}")
+                print("!"*60)
+                input("Presione Enter para volver al menú principal y reintentar con los datos actuales...")
+                return
+            # Ya está reservado de verdad: los apartados no hacen falta
+            repo.apartados.liberar(dueno)
+
+            # Ticket y factura propios de esta boda (con el número que le dio el backend al guardarla)
+            archivos = documentos.generar_documentos(repo, boda, cliente_actual.to_dict())
+            print("\n🧾 Documentos de la boda:")
+            for ruta in archivos:
+                print(f"   - {ruta}")
 
             print("\n" + "🎉" * 20)
             print("¡BODA REGISTRADA Y RESERVADA CON ÉXITO!".center(40))
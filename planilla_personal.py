@@ -0,0 +1,405 @@
+"""
+Planilla de personal para muchas bodas a la vez ('Raquel & Alba').
+En el asistente el personal se contrata de a uno y por boda, así que en los
+fines de semana con muchas bodas los mejores trabajadores se los lleva la
+primera que se arma y a alguna le termina faltando un rol obligatorio (por
+ejemplo seguridad en un salón con piscina). Acá se reparten todos de una vez.
+
+Cada boda pide sus roles:
+    - los de su lista 'roles' (categorías, pueden repetirse: ["fotografia", "fotografia"]),
+    - los que exigen las reglas del negocio por su lugar, sus items o el personal
+      ya elegido (motor_reglas: seguridad si hay piscina, barman si hay barra libre, ...).
+Cada rol es un puesto a cubrir, y el reparto es un flujo de costo mínimo:
+
+    fuente -> puesto (boda, rol) -> (trabajador, turno) -> sumidero
+
+con capacidad 1 en cada arco. Un turno es un grupo de bodas cuyos horarios
+(con sesiones, montaje y desmontaje) se encadenan pisándose: un trabajador
+hace a lo sumo una boda por turno, así nunca queda en dos a la vez. Como los
+turnos no comparten trabajadores-turno, cada uno se resuelve por separado.
+El flujo es máximo (se cubren todos los puestos que se puedan) y, entre los
+máximos, el de menor costo según el criterio:
+    'precio':  menor sueldo total; a igual sueldo, más experiencia.
+    'calidad': más experiencia; a igual experiencia, menor sueldo.
+"""
+import heapq
+import time
+from collections import defaultdict
+
+from bloques import bloques_de_cotizacion, intervalos_de
+from disponibilidad import PERSONAL
+from indice_personal import normalizar, puntos_experiencia
+from instrumentacion import medido
+from motor_reglas import ETIQUETAS
+
+CRITERIOS = ('precio', 'calidad')
+ROL_CATEGORIA = "categoria"
+ROL_ETIQUETA = "etiqueta"
+
+
+# --- FLUJO DE COSTO MÍNIMO ---
+class _Red:
+    """
+    Red con capacidades y costos (enteros, no negativos) resuelta por caminos
+    más cortos sucesivos con potenciales: un Dijkstra por fase y, en cada fase,
+    se empujan de una vez todos los caminos de costo reducido cero que se
+    encuentran sin repetir nodos (en el reparto muchos puestos tienen opciones
+    del mismo costo, así que las fases son muchas menos que los puestos).
+    Cada arco es una lista [destino, capacidad, costo, posición del arco inverso].
+    """
+    def __init__(self, nodos):
+        self.arcos = [[] for _ in range(nodos)]
+
+    def agregar(self, desde, hasta, capacidad, costo):
+        self.arcos[desde].append([hasta, capacidad, costo, len(self.arcos[hasta])])
+        self.arcos[hasta].append([desde, 0, -costo, len(self.arcos[desde]) - 1])
+
+    def flujo_minimo(self, fuente, sumidero):
+        """Devuelve (flujo, costo) del flujo máximo de menor costo."""
+        potencial = [0] * len(self.arcos)
+        flujo = costo = 0
+        while self._distancias(fuente, sumidero, potencial):
+            empujado, costo_fase = self._empujar(fuente, sumidero, potencial)
+            flujo += empujado
+            costo += costo_fase
+        return flujo, costo
+
+    def _distancias(self, fuente, sumidero, potencial):
+        """
+        Dijkstra con costos reducidos hasta sacar el sumidero de la cola. Suma a
+        cada potencial min(distancia, distancia al sumidero), que mantiene todos
+        los costos reducidos no negativos. False si el sumidero no es alcanzable.
+        """
+        n = len(self.arcos)
+        infinito = float('inf')
+        distancia = [infinito] * n
+        distancia[fuente] = 0
+        cola = [(0, fuente)]
+        while cola:
+            d, u = heapq.heappop(cola)
+            if d > distancia[u]:
+                continue
+            if u == sumidero:
+                break
+            pot_u = potencial[u]
+            for v, capacidad, costo, _ in self.arcos[u]:
+                if capacidad > 0:
+                    nueva = d + costo + pot_u - potencial[v]
+                    if nueva < distancia[v]:
+                        distancia[v] = nueva
+                        heapq.heappush(cola, (nueva, v))
+        tope = distancia[sumidero]
+        if tope == infinito:
+            return False
+        for v in range(n):
+            potencial[v] += min(distancia[v], tope)
+        return True
+
+    def _empujar(self, fuente, sumidero, potencial):
+        """Empuja una unidad por cada camino de costo reducido cero (sin repetir nodos en la fase)."""
+        visto = [False] * len(self.arcos)
+        visto[fuente] = True
+        siguiente = [0] * len(self.arcos)
+        pila, usados = [fuente], []
+        empujado = costo_total = 0
+        while pila:
+            u = pila[-1]
+            if u == sumidero:
+                for w, pos in usados:
+                    arco = self.arcos[w][pos]
+                    arco[1] -= 1
+                    self.arcos[arco[0]][arco[3]][1] += 1
+                    costo_total += arco[2]
+                empujado += 1
+                pila, usados = [fuente], []
+                continue
+            arcos, pos = self.arcos[u], siguiente[u]
+            while pos < len(arcos):
+                v, capacidad, costo, _ = arcos[pos]
+                if capacidad > 0 and not visto[v] and costo + potencial[u] - potencial[v] == 0:
+                    break
+                pos += 1
+            siguiente[u] = pos
+            if pos == len(arcos):
+                pila.pop()
+                if usados:
+                    usados.pop()
+                continue
+            v = arcos[pos][0]
+            if v != sumidero:
+                visto[v] = True
+            pila.append(v)
+            usados.append((u, pos))
+        return empujado, costo_total
+
+
+# --- ROLES DE CADA BODA ---
+class PlanillaPersonal:
+    """
+    Reparte el personal del catálogo entre un grupo de bodas.
+
+    Args:
+        repo (Repositorio): Catálogo, reglas y disponibilidad (lo ya reservado y
+            lo apartado por cotizaciones en curso cuenta como ocupado).
+        criterio (str): 'precio' o 'calidad' (ver arriba).
+    """
+    def __init__(self, repo, criterio='precio'):
+        if criterio not in CRITERIOS:
+            raise ValueError(f"Criterio desconocido: {criterio}")
+        self.repo = repo
+        self.criterio = criterio
+        self._candidatos = {}
+        # Etiquetas que solo puede aportar el personal (las que se vuelven roles)
+        self._etiquetas_personal = {etiqueta for etiqueta, tipos in ETIQUETAS.items() if set(tipos) == {'personal'}}
+
+    def candidatos(self, rol):
+        """Trabajadores que pueden cubrir el rol: (ROL_CATEGORIA, 'fotografia') o (ROL_ETIQUETA, 'seguridad')."""
+        if rol not in self._candidatos:
+            tipo, nombre = rol
+            if tipo == ROL_CATEGORIA:
+                personas = self.repo.personal_por_categoria(nombre)
+            else:
+                personas = [self.repo.persona(i) for i in self.repo.reglas.por_etiqueta.get(('personal', nombre), [])]
+            self._candidatos[rol] = personas
+        return self._candidatos[rol]
+
+    def _cubre(self, categoria, etiqueta):
+        """True si todos los de esa categoría aportan la etiqueta (pedir la categoría ya cumple la regla)."""
+        personas = self.candidatos((ROL_CATEGORIA, categoria))
+        return bool(personas) and all(etiqueta in self.repo.reglas.etiquetas_personal(p) for p in personas)
+
+    def _etiquetas_de(self, solicitud):
+        """Etiquetas que ya trae la boda: las de su lugar, sus items y el personal elegido."""
+        motor = self.repo.reglas
+        presentes = set()
+        lugar = self.repo.lugar(solicitud.get('id_lugar'))
+        if lugar is not None:
+            presentes |= motor.etiquetas_lugar(lugar)
+        for linea in solicitud.get('items', []):
+            item = self.repo.item(linea.get('id_item'))
+            if item is not None:
+                presentes |= motor.etiquetas_item(item)
+        for id_p in solicitud.get('personal', []):
+            persona = self.repo.persona(id_p)
+            if persona is not None:
+                presentes |= motor.etiquetas_personal(persona)
+        return presentes
+
+    def prohibidas(self, solicitud):
+        """Etiquetas que nadie asignado puede traer por una regla 'excluye' (ej: mariachi en el Palacio de Cristal)."""
+        presentes = self._etiquetas_de(solicitud)
+        prohibidas = set()
+        for regla in self.repo.reglas.reglas:
+            if regla['tipo'] == 'excluye':
+                if regla['si'] in presentes:
+                    prohibidas.add(regla['no'])
+                if regla['no'] in presentes:
+                    prohibidas.add(regla['si'])
+        return prohibidas
+
+    def roles_de(self, solicitud):
+        """
+        Roles a cubrir en una boda: su lista 'roles' más los que exigen las
+        reglas por su lugar, items y personal ya elegido (y que nada de lo
+        pedido cubre todavía).
+        """
+        motor = self.repo.reglas
+        roles = [(ROL_CATEGORIA, normalizar(c)) for c in solicitud.get('roles', [])]
+        presentes = self._etiquetas_de(solicitud)
+        for etiqueta in sorted(presentes):
+            for requisito in motor.requisitos.get(etiqueta, []):
+                if (requisito in presentes or requisito not in self._etiquetas_personal
+                        or any(self._cubre(nombre, requisito) for tipo, nombre in roles if tipo == ROL_CATEGORIA)
+                        or (ROL_ETIQUETA, requisito) in roles):
+                    continue
+                roles.append((ROL_ETIQUETA, requisito))
+        return roles
+
+    # --- REPARTO ---
+    def _costo(self, persona, escala):
+        """
+        Costo entero de un arco puesto -> trabajador (menor es mejor). 'escala'
+        supera a la suma del criterio secundario en todo el turno, así el total
+        compara primero por el criterio principal.
+        """
+        centavos = round(persona.get('sueldo', 0) * 100)
+        faltante = 3 - puntos_experiencia(persona.get('experiencia'))
+        if self.criterio == 'precio':
+            return centavos * escala + faltante
+        return faltante * escala + centavos
+
+    @staticmethod
+    def _turnos(bodas):
+        """
+        Agrupa las bodas (índices) cuyos intervalos se encadenan pisándose.
+        Devuelve una lista de turnos, cada uno la lista de sus bodas.
+        """
+        tramos = sorted((ini, fin, n) for n, b in enumerate(bodas) for ini, fin in b['intervalos'])
+        grupo_de = list(range(len(bodas)))
+
+        def raiz(n):
+            while grupo_de[n] != n:
+                grupo_de[n] = grupo_de[grupo_de[n]]
+                n = grupo_de[n]
+            return n
+
+        abierto = None  # (fin del grupo que sigue abierto, una boda de ese grupo)
+        for ini, fin, n in tramos:
+            if abierto is not None and ini < abierto[0]:
+                grupo_de[raiz(n)] = raiz(abierto[1])
+                abierto = (max(abierto[0], fin), abierto[1])
+            else:
+                abierto = (fin, n)
+        turnos = defaultdict(list)
+        for n in range(len(bodas)):
+            turnos[raiz(n)].append(n)
+        return list(turnos.values())
+
+    def _resolver_turno(self, bodas, turno):
+        """Arma y resuelve la red de un turno; anota lo asignado en cada boda."""
+        # El personal elegido a mano por alguna boda del turno ya está tomado en todo el turno
+        tomados = {id_p for n in turno for id_p in bodas[n]['personal']}
+        etiquetas = self.repo.reglas.etiquetas_personal
+        # Los puestos del mismo rol con los mismos trabajadores libres son
+        # intercambiables: van juntos en un solo nodo con tantas unidades como
+        # puestos. La disponibilidad se mira una vez por horario (muchas bodas
+        # del turno comparten el mismo) y no una vez por puesto.
+        grupos = {}   # (rol, ids libres) -> bodas de esos puestos, en orden
+        libre = {}
+        for n in turno:
+            boda = bodas[n]
+            horario = tuple(boda['intervalos'])
+            for rol in boda['roles']:
+                ids = []
+                for p in self.candidatos(rol):
+                    id_p = p['id_personal']
+                    if id_p in tomados or etiquetas(p) & boda['prohibidas']:
+                        continue
+                    if (id_p, horario) not in libre:
+                        libre[id_p, horario] = self._libre(id_p, boda)
+                    if libre[id_p, horario]:
+                        ids.append(id_p)
+                grupos.setdefault((rol, tuple(ids)), []).append(n)
+        if not grupos:
+            return
+
+        puestos = sum(len(ns) for ns in grupos.values())
+        personas = {id_p: self.repo.persona(id_p) for _, ids in grupos for id_p in ids}
+        if self.criterio == 'precio':
+            escala = 2 * puestos + 1
+        else:
+            escala = max((round(p.get('sueldo', 0) * 100) for p in personas.values()), default=0) * puestos + 1
+        costo = {id_p: self._costo(p, escala) for id_p, p in personas.items()}
+
+        claves = list(grupos)
+        nodo_de = {id_p: len(claves) + 1 + k for k, id_p in enumerate(sorted(personas))}
+        fuente, sumidero = 0, len(claves) + len(personas) + 1
+        red = _Red(sumidero + 1)
+        for k, (rol, ids) in enumerate(claves, 1):
+            red.agregar(fuente, k, len(grupos[rol, ids]), 0)
+            # Alcanza con los tantos más baratos como puestos haya en el turno: si el
+            # óptimo usara otro, alguno de esos quedaría libre y cambiarlo no empeora.
+            for id_p in sorted(ids, key=lambda i: (costo[i], i))[:puestos]:
+                red.agregar(k, nodo_de[id_p], 1, costo[id_p])
+        for id_p in personas:
+            red.agregar(nodo_de[id_p], sumidero, 1, 0)
+        red.flujo_minimo(fuente, sumidero)
+
+        por_nodo = {nodo: id_p for id_p, nodo in nodo_de.items()}
+        for k, (rol, ids) in enumerate(claves, 1):
+            elegidos = sorted((por_nodo[v] for v, capacidad, _, _ in red.arcos[k]
+                               if v in por_nodo and capacidad == 0), key=lambda i: (costo[i], i))
+            for pos, n in enumerate(grupos[rol, ids]):
+                if pos < len(elegidos):
+                    bodas[n]['asignados'].append((rol[1], personas[elegidos[pos]]))
+                else:
+                    bodas[n]['faltan'].append(rol[1])
+
+    def _libre(self, id_personal, boda):
+        """Como repo.persona_libre, pero con los intervalos de la boda ya calculados."""
+        recurso = (PERSONAL, id_personal)
+        if not all(self.repo.indice.libre_en(recurso, *iv) for iv in boda['intervalos']):
+            return False
+        return not len(self.repo.apartados) or self.repo.apartados.bloques_libres(recurso, boda['bloques'], None)
+
+    def planificar(self, solicitudes):
+        """
+        Args:
+            solicitudes (list): Solicitudes con el formato de api_reservas.py más
+                la lista opcional 'roles' (categorías a cubrir).
+
+        Returns:
+            tuple: (bodas, estadisticas). Cada boda es un dict con 'solicitud',
+            'asignados' ([(rol, trabajador)]), 'faltan' (roles sin cubrir) y
+            'error' (si la solicitud no se pudo leer; entonces no se planifica).
+        """
+        inicio = time.perf_counter()
+        bodas = []
+        for solicitud in solicitudes:
+            boda = {'solicitud': solicitud, 'asignados': [], 'faltan': [], 'error': "",
+                    'personal': list(solicitud.get('personal', [])), 'roles': [], 'intervalos': []}
+            try:
+                boda['bloques'] = bloques_de_cotizacion({
+                    'fecha': solicitud['fecha'], 'h_inicio': solicitud['h_inicio'], 'h_fin': solicitud['h_fin'],
+                    'sesiones': solicitud.get('sesiones') or [],
+                    'montaje': solicitud.get('montaje', 0), 'desmontaje': solicitud.get('desmontaje', 0)})
+                boda['intervalos'] = intervalos_de(boda['bloques'])
+                boda['roles'] = self.roles_de(solicitud)
+                boda['prohibidas'] = self.prohibidas(solicitud)
+            except (KeyError, TypeError, ValueError, AttributeError):
+                boda['error'] = "Fecha, horario o sesiones con formato incorrecto."
+            bodas.append(boda)
+
+        validas = [b for b in bodas if not b['error']]
+        turnos = self._turnos(validas)
+        for turno in turnos:
+            self._resolver_turno(validas, turno)
+
+        puestos = sum(len(b['roles']) for b in validas)
+        cubiertos = sum(len(b['asignados']) for b in validas)
+        estadisticas = {
+            'bodas': len(bodas), 'turnos': len(turnos), 'puestos': puestos,
+            'cubiertos': cubiertos, 'sin_cubrir': puestos - cubiertos,
+            'sueldos': sum(p['sueldo'] for b in validas for _, p in b['asignados']),
+            'segundos': time.perf_counter() - inicio,
+        }
+        for boda in bodas:
+            for llave in ('personal', 'roles', 'prohibidas', 'intervalos', 'bloques'):
+                boda.pop(llave, None)
+        return bodas, estadisticas
+
+
+@medido('cotizacion')
+def planificar_personal(repo, solicitudes, criterio='precio'):
+    """Atajo: reparte el personal entre las solicitudes (ver PlanillaPersonal.planificar)."""
+    return PlanillaPersonal(repo, criterio).planificar(solicitudes)
+
+
+def con_personal(boda):
+    """
+    La solicitud de la boda con el personal asignado agregado (sin 'roles'),
+    lista para confirmarla con api_reservas.
+    """
+    solicitud = {k: v for k, v in boda['solicitud'].items() if k != 'roles'}
+    solicitud['personal'] = list(solicitud.get('personal', [])) + [p['id_personal'] for _, p in boda['asignados']]
+    return solicitud
+
+
+def imprimir_planilla(bodas, estadisticas):
+    """Muestra el personal de cada boda y lo que quedó sin cubrir."""
+    for n, boda in enumerate(bodas, 1):
+        solicitud = boda['solicitud']
+        cliente = (solicitud.get('cliente') or {}).get('nombre', '¿?')
+        print(f"\n--- BODA {n}: {cliente} | {solicitud.get('fecha', '¿?')} "
+              f"{solicitud.get('h_inicio', '')}-{solicitud.get('h_fin', '')} ---")
+        if boda['error']:
+            print(f"   ❌ {boda['error']}")
+            continue
+        for rol, persona in boda['asignados']:
+            print(f"   👤 {rol}: {persona['nombre']} ({persona['oficio']}) ${persona['sueldo']:,.2f}")
+        for rol in boda['faltan']:
+            print(f"   ⚠️ {rol}: no hay nadie libre")
+    print("-" * 40)
+    print(f"Bodas: {estadisticas['bodas']} | Turnos: {estadisticas['turnos']} | Puestos cubiertos: "
+          f"{estadisticas['cubiertos']}/{estadisticas['puestos']} | Sueldos: ${estadisticas['sueldos']:,.2f}")
+    print(f"Tiempo: {estadisticas['segundos']:.2f}s")
@@ -0,0 +1,373 @@
+"""
+Repositorio de datos del planificador 'Raquel & Alba'.
+Carga una sola vez lugares, personal, inventario, clientes y reservas desde
+el backend de almacenamiento (JSON o SQLite) y mantiene índices por ID y por
+categoría, para que el asistente no tenga que recorrer listas enteras.
+
+Nada se carga al crear el Repositorio: cada colección y cada índice se arma
+la primera vez que se usa (una consulta de lugares no espera al historial
+de reservas ni al inventario).
+"""
+from contextlib import contextmanager
+from datetime import date
+from functools import cached_property
+from typing import List, Optional
+
+import funciones_generales as fg
+from almacenamiento import crear_almacenamiento
+from apartados import ITEM, GestorApartados
+from cache_consultas import CacheConsultas
+from bloques import (bloques_de_cotizacion, crear_bloque, dia_de_minuto, dias_de_intervalo, fecha_a_dia, intervalo,
+                     intervalos_de)
+from disponibilidad import LUGAR, PERSONAL, IndiceDisponibilidad
+from indice_personal import IndicePersonal, normalizar
+from instrumentacion import contar, medido
+from libro_stock import LibroStock
+from motor_reglas import MotorReglas
+from motor_sugerencias import DIAS_HORIZONTE
+from ocupacion import MatrizOcupacion
+
+
+class Repositorio:
+    """
+    Almacén en memoria de todas las bases de datos con sus índices.
+
+    Atributos:
+        lugares, personal, inventario, clientes, reservas (list): Los datos tal
+            cual están en los JSON (se siguen guardando en el mismo formato).
+        indice (IndiceDisponibilidad): Horarios ocupados de lugares y personal.
+        indice_personal (IndicePersonal): Personal por categoría y días ocupados.
+        libro (LibroStock): Unidades de cada item tomadas por las bodas, por día.
+        ocupacion (MatrizOcupacion): Ocupación por día de cada recurso (tablero y pronósticos).
+        reglas (MotorReglas): Reglas de negocio con el catálogo ya etiquetado.
+        apartados (GestorApartados): Lo que tienen apartado las cotizaciones en curso.
+        consultas (CacheConsultas): Respuestas recientes de lugares y personal libres.
+        almacenamiento (Almacenamiento): Backend donde se cargan y guardan los datos.
+    """
+    def __init__(self, carpeta='data', almacenamiento=None):
+        self.almacenamiento = almacenamiento or crear_almacenamiento(carpeta=carpeta)
+        self.apartados = GestorApartados()
+        self.consultas = CacheConsultas()
+
+    def precargar(self):
+        """Carga todo de una vez (ej: antes de atender el servidor o de medir)."""
+        for nombre in ('lugares', 'personal', 'inventario', 'clientes', 'reservas', 'indice', 'reglas',
+                       'indice_personal', 'libro', 'ocupacion', '_lugares_id', '_personal_id',
+                       '_items_id', '_clientes_id', '_items_cat'):
+            getattr(self, nombre)
+        return self
+
+    # --- COLECCIONES (se cargan la primera vez que se usan) ---
+    @cached_property
+    def lugares(self):
+        return self.almacenamiento.cargar_coleccion('lugares')
+
+    @cached_property
+    def personal(self):
+        return self.almacenamiento.cargar_coleccion('personal')
+
+    @cached_property
+    def inventario(self):
+        return self.almacenamiento.cargar_coleccion('inventario')
+
+    @cached_property
+    def clientes(self):
+        return self.almacenamiento.cargar_coleccion('clientes')
+
+    @cached_property
+    def reservas(self):
+        return self.almacenamiento.cargar_coleccion('reservas')
+
+    # --- ÍNDICES (también a demanda) ---
+    @cached_property
+    def indice(self):
+        # Armarlo es lo más caro del arranque: con la caché JSON vigente no hace falta ni leer el personal
+        return self.almacenamiento.cargar_derivado(
+            'indice', ('lugares', 'personal'),
+            lambda: IndiceDisponibilidad.desde_catalogo(self.lugares, self.personal))
+
+    @cached_property
+    def reglas(self):
+        return MotorReglas.desde_catalogo(self.lugares, self.personal, self.inventario)
+
+    @cached_property
+    def indice_personal(self):
+        return IndicePersonal(self.personal)
+
+    @cached_property
+    def libro(self):
+        return self.almacenamiento.cargar_derivado(
+            'libro_stock', ('inventario', 'reservas'),
+            lambda: LibroStock.desde_reservas(self.reservas, self.inventario))
+
+    @cached_property
+    def ocupacion(self):
+        return self.almacenamiento.cargar_derivado(
+            'ocupacion', ('lugares', 'personal', 'inventario', 'reservas'),
+            lambda: MatrizOcupacion.desde_catalogo(self.lugares, self.personal, self.inventario,
+                                                   self.reservas, self.indice))
+
+    @cached_property
+    def _lugares_id(self):
+        return {l['id_lugar']: l for l in self.lugares}
+
+    @cached_property
+    def _personal_id(self):
+        return {p['id_personal']: p for p in self.personal}
+
+    @cached_property
+    def _items_id(self):
+        return {i['id_item']: i for i in self.inventario}
+
+    @cached_property
+    def _clientes_id(self):
+        return {c['id_cliente']: c for c in self.clientes}
+
+    @cached_property
+    def _items_cat(self):
+        por_categoria = {}
+        for i in self.inventario:
+            por_categoria.setdefault(i.get('categoria'), []).append(i)
+        return por_categoria
+
+    # --- CONSULTAS ---
+    def lugar(self, id_lugar) -> Optional[dict]:
+        """Devuelve el lugar con ese ID o None."""
+        return self._lugares_id.get(id_lugar)
+
+    def persona(self, id_personal) -> Optional[dict]:
+        """Devuelve el trabajador con ese ID o None."""
+        return self._personal_id.get(id_personal)
+
+    def item(self, id_item) -> Optional[dict]:
+        """Devuelve el item de inventario con ese ID o None."""
+        return self._items_id.get(id_item)
+
+    def cliente(self, id_cliente) -> Optional[dict]:
+        """Devuelve el cliente con ese ID o None."""
+        return self._clientes_id.get(id_cliente)
+
+    def existe_cliente(self, id_cliente) -> bool:
+        """True si el ID de cliente ya está registrado."""
+        return id_cliente in self._clientes_id
+
+    def personal_por_categoria(self, categoria) -> List[dict]:
+        """Trabajadores de una categoría (sin acentos ni mayúsculas, ej: 'estetica')."""
+        return self.indice_personal.de_categoria(categoria)
+
+    @medido('disponibilidad')
+    def personal_disponible(self, categoria, fecha, h_ini=None, h_fin=None, dueno=None) -> List[dict]:
+        """
+        Trabajadores de la categoría libres en esa fecha (y horario, si se indica)
+        que además no estén apartados por otra cotización en curso.
+        """
+        categoria = normalizar(categoria)
+        dia = fecha_a_dia(fecha)
+        ultimo = dia_de_minuto(intervalo(fecha, h_ini, h_fin)[1] - 1) if h_ini and h_fin else dia
+        libres = self.consultas.obtener(
+            (CacheConsultas.PERSONAL, categoria, fecha, h_ini, h_fin),
+            lambda: self.indice_personal.disponibles(categoria, fecha, self.indice, h_ini, h_fin),
+            dia, ultimo)
+        if not len(self.apartados) or not (h_ini and h_fin):
+            return list(libres)
+        return [p for p in libres
+                if self.apartados.esta_libre((PERSONAL, p['id_personal']), fecha, h_ini, h_fin, dueno)]
+
+    @medido('disponibilidad')
+    def lugares_disponibles(self, fecha, h_ini, h_fin, invitados, dueno=None,
+                            dias_horizonte=DIAS_HORIZONTE, criterio='cercania'):
+        """
+        Lugares con capacidad libres en ese horario (sin los apartados por otro)
+        y, si no hay ninguno, las sugerencias en otras fechas.
+
+        Returns:
+            tuple: (lista de lugares, lista de sugerencias o None)
+        """
+        dia = fecha_a_dia(fecha)
+        libres, sugerencias = self.consultas.obtener(
+            (CacheConsultas.LUGARES, fecha, h_ini, h_fin, invitados, dias_horizonte, criterio),
+            lambda: fg.get_lugares_disponibles(fecha, self.lugares, h_ini, h_fin, invitados,
+                                               self.indice, dias_horizonte, criterio),
+            dia, dia_de_minuto(intervalo(fecha, h_ini, h_fin)[1] - 1) + dias_horizonte)
+        if len(self.apartados):
+            libres = [l for l in libres if self.apartados.esta_libre((LUGAR, l['id_lugar']), fecha, h_ini, h_fin, dueno)]
+        return list(libres), sugerencias
+
+    @medido('disponibilidad')
+    def lugar_libre(self, id_lugar, fecha, h_ini, h_fin, dueno=None, bloques=None) -> bool:
+        """
+        True si el lugar no está reservado ni apartado por otro en ese horario
+        (o en todos los 'bloques' de una boda con sesiones y montaje, ver bloques.py).
+        """
+        return self._libre((LUGAR, id_lugar), bloques or [crear_bloque(fecha, h_ini, h_fin)], dueno)
+
+    @medido('disponibilidad')
+    def persona_libre(self, id_personal, fecha, h_ini, h_fin, dueno=None, bloques=None) -> bool:
+        """True si el trabajador no está reservado ni apartado por otro en ese horario (o bloques)."""
+        return self._libre((PERSONAL, id_personal), bloques or [crear_bloque(fecha, h_ini, h_fin)], dueno)
+
+    def _libre(self, recurso, bloques, dueno):
+        return (self.indice.bloques_libres(recurso, bloques)
+                and self.apartados.bloques_libres(recurso, bloques, dueno))
+
+    def stock_disponible(self, id_item, dueno=None, fecha=None, h_ini=None, h_fin=None, bloques=None) -> int:
+        """
+        Unidades del item libres para una boda en ese horario (o 'bloques'):
+        las del inventario menos lo que ya tomaron otras bodas (lo que se
+        consume, para siempre; lo que se alquila, solo si coincide en algún día)
+        y lo apartado por otras cotizaciones. Sin fecha se mira el día de hoy.
+        """
+        item = self._items_id.get(id_item)
+        if item is None:
+            return 0
+        cantidad = item['cantidad']
+        dias = None if self.libro.es_consumible(id_item) else self._dias(fecha, h_ini, h_fin, bloques)
+        return (cantidad - self.libro.reservado(id_item, dias)
+                - self.apartados.cantidad_apartada((ITEM, id_item), dueno, dias))
+
+    @staticmethod
+    def _dias(fecha, h_ini, h_fin, bloques):
+        """Días ordinales de un horario o de unos bloques (hoy, si no hay ninguno)."""
+        if not bloques and fecha and h_ini and h_fin:
+            bloques = [crear_bloque(fecha, h_ini, h_fin)]
+        if bloques:
+            return sorted({dia for iv in intervalos_de(bloques) for dia in dias_de_intervalo(*iv)})
+        return [fecha_a_dia(fecha) if fecha else date.today().toordinal()]
+
+    def inventario_por_categoria(self, categoria) -> List[dict]:
+        """Items del inventario de una categoría (ej: 'mobiliario')."""
+        return self._items_cat.get(categoria, [])
+
+    # --- ESCRITURA ---
+    @medido('confirmacion')
+    def confirmar_reserva(self, cotizacion, cliente_dict, avisar=True):
+        """
+        Persiste la boda en el backend y, si se guardó, registra al cliente,
+        bloquea lugar, personal y stock en memoria y la agrega al historial.
+
+        Raises:
+            ConflictoReserva: Otro operador cambió algo que la boda usa; no se
+                guardó nada y la memoria queda como estaba.
+
+        Returns:
+            dict: La reserva tal como quedó guardada en el historial.
+        """
+        boda = fg.serializar_reserva(cotizacion)
+        self.almacenamiento.registrar_confirmacion(self, cotizacion, cliente_dict, boda)
+
+        self.clientes.append(cliente_dict)
+        self._clientes_id[cliente_dict['id_cliente']] = cliente_dict
+        fg.procesar_confirmacion_boda(
+            cotizacion, self.lugares, self.personal, self.libro, self.indice, avisar
+        )
+        self._actualizar_personal(cotizacion)
+        self._invalidar_consultas(cotizacion)
+        if 'ocupacion' in self.__dict__:  # si todavía no se armó, ya la va a incluir
+            self.ocupacion.registrar(cotizacion)
+        self.reservas.append(boda)
+        contar('reservas.confirmadas')
+        if avisar:
+            print("✅ Boda guardada en el historial de reservas.")
+        return boda
+
+    def recargar(self):
+        """Vuelve a leer todo del backend (por ejemplo tras un ConflictoReserva)."""
+        apartados, consultas = self.apartados, self.consultas
+        almacenamiento = self.almacenamiento
+        self.__dict__.clear()  # colecciones e índices se vuelven a cargar al usarlos
+        self.__init__(almacenamiento=almacenamiento)
+        self.apartados = apartados
+        self.consultas = consultas
+        consultas.limpiar()
+
+    # --- APARTADOS (cotizaciones en curso) ---
+    def apartar_lugar(self, dueno, id_lugar, fecha, h_ini, h_fin, bloques=None):
+        """Aparta el lugar si sigue libre. Devuelve (id_apartado, "") o (None, motivo)."""
+        bloques = bloques or [crear_bloque(fecha, h_ini, h_fin)]
+        if not self.indice.bloques_libres((LUGAR, id_lugar), bloques):
+            return None, "El lugar ya está reservado en ese horario."
+        return self.apartados.apartar(dueno, (LUGAR, id_lugar), bloques=bloques)
+
+    def apartar_persona(self, dueno, id_personal, fecha, h_ini, h_fin, bloques=None):
+        """Aparta al trabajador si sigue libre. Devuelve (id_apartado, "") o (None, motivo)."""
+        bloques = bloques or [crear_bloque(fecha, h_ini, h_fin)]
+        if not self.indice.bloques_libres((PERSONAL, id_personal), bloques):
+            return None, "El trabajador ya está reservado en ese horario."
+        return self.apartados.apartar(dueno, (PERSONAL, id_personal), bloques=bloques)
+
+    def apartar_item(self, dueno, id_item, cantidad, fecha=None, h_ini=None, h_fin=None, bloques=None):
+        """
+        Aparta unidades si alcanzan en ese horario (lo que se consume, sin
+        importar la fecha). Devuelve (id_apartado, "") o (None, motivo).
+        """
+        item = self._items_id.get(id_item)
+        if item is None:
+            return None, "El item no existe."
+        stock = item['cantidad']
+        if self.libro.es_consumible(id_item):
+            return self.apartados.apartar(dueno, (ITEM, id_item), cantidad=cantidad,
+                                          stock=stock - self.libro.reservado(id_item))
+        dias = self._dias(fecha, h_ini, h_fin, bloques)
+        bloques = bloques or ([crear_bloque(fecha, h_ini, h_fin)] if fecha and h_ini and h_fin else None)
+        return self.apartados.apartar(dueno, (ITEM, id_item), cantidad=cantidad,
+                                      stock=stock - self.libro.reservado(id_item, dias), bloques=bloques)
+
+    @medido('apartados')
+    def apartar_cotizacion(self, cotizacion, dueno):
+        """
+        Aparta de una vez todo lo que usa una cotización (por ejemplo la que
+        devuelve la API antes de que el cliente la confirme). Si algo no se
+        puede apartar no queda nada apartado.
+
+        Returns:
+            str: "" si quedó todo apartado o el motivo del primer recurso que falló.
+        """
+        fecha, h_ini, h_fin = cotizacion['fecha'], cotizacion['h_inicio'], cotizacion['h_fin']
+        horario = (fecha, h_ini, h_fin, bloques_de_cotizacion(cotizacion))
+        pedidos = [(cotizacion['nombre_lugar'], self.apartar_lugar, (cotizacion['id_lugar'],) + horario)]
+        pedidos += [(p.nombre, self.apartar_persona, (p.id_personal,) + horario)
+                    for p in cotizacion['personal_contratado']]
+        pedidos += [(i.nombre, self.apartar_item, (i.id_item_reserva, i.cantidad_requerida) + horario)
+                    for i in cotizacion['items_pedidos']]
+        tomados = []
+        for nombre, apartar, argumentos in pedidos:
+            id_apartado, error = apartar(dueno, *argumentos)
+            if error:
+                for id_tomado in tomados:
+                    self.apartados.soltar(id_tomado)
+                return f"'{nombre}': {error}"
+            tomados.append(id_apartado)
+        return ""
+
+    @contextmanager
+    def lote(self):
+        """
+        Agrupa muchas confirmaciones seguidas (carga masiva): el backend puede
+        dejar para el final lo que no hace falta escribir en cada una.
+        """
+        self.almacenamiento.iniciar_lote()
+        try:
+            yield self
+        finally:
+            self.almacenamiento.terminar_lote(self)
+
+    def _invalidar_consultas(self, cotizacion):
+        """Descarta solo las respuestas que pueden cambiar por el lugar y el personal de esta boda."""
+        dias = {dia for iv in intervalos_de(bloques_de_cotizacion(cotizacion)) for dia in dias_de_intervalo(*iv)}
+        lugar = self.lugar(cotizacion['id_lugar'])
+        if lugar is not None:
+            self.consultas.invalidar_lugar(lugar['capacidad'], dias)
+        categorias = set()
+        for p in cotizacion['personal_contratado']:
+            persona = self.persona(getattr(p, 'id_personal', None) or p.get('id_personal'))
+            if persona is not None:
+                categorias.add(IndicePersonal.categoria_de(persona))
+        for categoria in categorias:
+            self.consultas.invalidar_personal(categoria, dias)
+
+    def _actualizar_personal(self, cotizacion):
+        """Pone al día en el índice de personal los días ocupados de quienes trabajan en esta boda."""
+        for p in cotizacion['personal_contratado']:
+            persona = self.persona(getattr(p, 'id_personal', None) or p.get('id_personal'))
+            if persona is not None:
+                self.indice_personal.actualizar_ocupacion(persona)
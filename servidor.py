@@ -0,0 +1,399 @@
+"""
+Modo servidor del planificador 'Raquel & Alba'.
+Expone el catálogo y las cotizaciones como una API HTTP/JSON local (para
+una web o la herramienta del call-centre), hecha solo con asyncio:
+
+    GET    /lugares?fecha=15/05/2027&inicio=14:00&fin=20:00&invitados=100
+    GET    /personal?categoria=fotografia&fecha=15/05/2027&inicio=14:00&fin=20:00
+    GET    /inventario?categoria=mobiliario[&fecha=15/05/2027&inicio=18:00&fin=23:00]
+    POST   /cotizaciones        (solicitud de api_reservas.py; "apartar": true la aparta)
+    POST   /reservas            (solicitud; con "dueno" usa lo que ese dueño apartó)
+    DELETE /apartados/<dueno>
+    GET    /ocupacion?grupo=item&categoria=mobiliario[&desde=..&hasta=..&hoy=..&horizonte=180]
+    GET    /estado
+    GET    /diagnostico         (tiempos p50/p95/p99 con PLANNER_DIAGNOSTICO=1 y caché de consultas)
+
+Las lecturas se responden directo desde la memoria del Repositorio. Todo lo
+que cambia algo (apartar, confirmar, soltar) pasa por una cola a una única
+tarea escritora, así las escrituras quedan en orden de llegada y, como el
+bucle de eventos es uno solo, ninguna lectura ve una boda a medio guardar.
+"""
+import asyncio
+import json
+import secrets
+import time
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import api_reservas as api
+import funciones_generales as fg
+import instrumentacion
+import ocupacion
+from bloques import fecha_a_dia
+
+HOST = "127.0.0.1"
+PUERTO = 8080
+MAX_CUERPO = 1 << 20  # 1 MB por solicitud
+
+MOTIVOS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ErrorPeticion(Exception):
+    """Petición mal formada: se responde con ese código y mensaje."""
+    def __init__(self, codigo, mensaje):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+
+def _lugar_publico(l):
+    return {'id_lugar': l['id_lugar'], 'nombre': l['nombre'], 'capacidad': l['capacidad'],
+            'precio': l['precio'], 'servicios_incluidos': l.get('servicios_incluidos', [])}
+
+
+def _persona_publica(p):
+    return {'id_personal': p['id_personal'], 'nombre': p['nombre'], 'oficio': p.get('oficio'),
+            'categoria': p.get('categoria'), 'sueldo': p['sueldo'], 'experiencia': p.get('experiencia')}
+
+
+def _parametro(consulta, nombre, tipo=str):
+    try:
+        return tipo(consulta[nombre][0])
+    except (KeyError, IndexError):
+        raise ErrorPeticion(400, f"Falta el parámetro '{nombre}'.")
+    except ValueError:
+        raise ErrorPeticion(400, f"El parámetro '{nombre}' tiene formato incorrecto.")
+
+
+def _horario(consulta):
+    fecha = _parametro(consulta, 'fecha')
+    h_ini, h_fin = _parametro(consulta, 'inicio'), _parametro(consulta, 'fin')
+    _, error = fg.validar_fecha_evento(fecha)
+    error = error or fg.validar_horario(h_ini, h_fin)
+    if error:
+        raise ErrorPeticion(400, error.strip())
+    return fecha, h_ini, h_fin
+
+
+class ServidorPlanner:
+    """
+    Atributos:
+        repo (Repositorio): Estado en memoria que se consulta y se modifica.
+        estadisticas (dict): Peticiones atendidas, escrituras y errores.
+    """
+    def __init__(self, repo):
+        self.repo = repo
+        self.estadisticas = {'peticiones': 0, 'escrituras': 0, 'errores': 0, 'conexiones': 0}
+        self._cola = None
+        self._escritor = None
+        self._rutas = {
+            ('GET', 'lugares'): self.lugares,
+            ('GET', 'personal'): self.personal,
+            ('GET', 'inventario'): self.inventario,
+            ('GET', 'ocupacion'): self.ocupacion,
+            ('GET', 'estado'): self.estado,
+            ('GET', 'diagnostico'): self.diagnostico,
+            ('POST', 'cotizaciones'): self.cotizar,
+            ('POST', 'reservas'): self.reservar,
+            ('DELETE', 'apartados'): self.soltar_apartados,
+        }
+
+    # --- ESCRITOR ÚNICO ---
+    async def escribir(self, funcion, *argumentos):
+        """Encola un cambio para la tarea escritora y espera su resultado."""
+        futuro = asyncio.get_running_loop().create_future()
+        await self._cola.put((funcion, argumentos, futuro))
+        return await futuro
+
+    async def _escribir_en_orden(self):
+        while True:
+            funcion, argumentos, futuro = await self._cola.get()
+            # Se escribe aunque el cliente se haya desconectado: ya estaba en la cola
+            try:
+                resultado, error = funcion(*argumentos), None
+            except Exception as e:
+                resultado, error = None, e
+            self.estadisticas['escrituras'] += 1
+            if futuro.cancelled():
+                continue
+            if error is not None:
+                futuro.set_exception(error)
+            else:
+                futuro.set_result(resultado)
+
+    # --- RUTAS (cada una devuelve (código, datos)) ---
+    async def lugares(self, consulta, cuerpo, resto):
+        fecha, h_ini, h_fin = _horario(consulta)
+        invitados = _parametro(consulta, 'invitados', int)
+        dueno = consulta.get('dueno', [None])[0]
+        libres, sugerencias = self.repo.lugares_disponibles(fecha, h_ini, h_fin, invitados, dueno)
+        return 200, {'lugares': [_lugar_publico(l) for l in libres], 'sugerencias': sugerencias or []}
+
+    async def personal(self, consulta, cuerpo, resto):
+        categoria = _parametro(consulta, 'categoria')
+        fecha, h_ini, h_fin = _horario(consulta)
+        dueno = consulta.get('dueno', [None])[0]
+        libres = self.repo.personal_disponible(categoria, fecha, h_ini, h_fin, dueno)
+        return 200, {'personal': [_persona_publica(p) for p in libres]}
+
+    async def inventario(self, consulta, cuerpo, resto):
+        categoria = _parametro(consulta, 'categoria')
+        dueno = consulta.get('dueno', [None])[0]
+        # Sin horario: lo que queda libre hoy (lo alquilado vuelve después de cada boda)
+        horario = _horario(consulta) if 'fecha' in consulta else ()
+        items = [{'id_item': i['id_item'], 'nombre': i['nombre'], 'categoria': i.get('categoria'),
+                  'precio_unidad': i['precio_unidad'],
+                  'cantidad': self.repo.stock_disponible(i['id_item'], dueno, *horario)}
+                 for i in self.repo.inventario_por_categoria(categoria)]
+        return 200, {'items': items}
+
+    async def ocupacion(self, consulta, cuerpo, resto):
+        grupo = consulta.get('grupo', [ocupacion.LUGAR])[0]
+        if grupo not in (ocupacion.LUGAR, ocupacion.PERSONAL, ocupacion.ITEM):
+            raise ErrorPeticion(400, f"Grupo desconocido: '{grupo}'.")
+        dias = {}
+        for nombre in ('desde', 'hasta', 'hoy'):
+            try:
+                dias[nombre] = fecha_a_dia(consulta[nombre][0]) if nombre in consulta else None
+            except ValueError:
+                raise ErrorPeticion(400, f"El parámetro '{nombre}' tiene formato incorrecto.")
+        horizonte = _parametro(consulta, 'horizonte', int) if 'horizonte' in consulta else ocupacion.HORIZONTE
+        return 200, ocupacion.tablero(self.repo, grupo, consulta.get('categoria', [None])[0],
+                                      dias['desde'], dias['hasta'], dias['hoy'], horizonte)
+
+    async def estado(self, consulta, cuerpo, resto):
+        return 200, dict(self.estadisticas, en_cola=self._cola.qsize(),
+                         apartados=len(self.repo.apartados), reservas=len(self.repo.reservas))
+
+    async def diagnostico(self, consulta, cuerpo, resto):
+        return 200, dict(instrumentacion.resumen(), activa=instrumentacion.esta_activo(),
+                         consultas=self.repo.consultas.estadisticas())
+
+    async def cotizar(self, consulta, cuerpo, resto):
+        solicitud = self._solicitud(cuerpo)
+        dueno = solicitud.get('dueno')
+        if not solicitud.get('apartar'):
+            cotizacion, _, error = api.cotizar(solicitud, self.repo, dueno)
+            if error:
+                return 400, {'ok': False, 'error': error.strip()}
+            return 200, {'ok': True, 'cotizacion': fg.serializar_reserva(cotizacion)}
+        # Cotizar y apartar juntos en el escritor: nadie toma lo cotizado en el medio
+        return await self.escribir(self._cotizar_y_apartar, solicitud, dueno or secrets.token_hex(8))
+
+    def _cotizar_y_apartar(self, solicitud, dueno):
+        cotizacion, _, error = api.cotizar(solicitud, self.repo, dueno)
+        if error:
+            return 400, {'ok': False, 'error': error.strip()}
+        error = self.repo.apartar_cotizacion(cotizacion, dueno)
+        if error:
+            return 409, {'ok': False, 'error': error}
+        return 200, {'ok': True, 'dueno': dueno, 'vence_en': self.repo.apartados.ttl,
+                     'cotizacion': fg.serializar_reserva(cotizacion)}
+
+    async def reservar(self, consulta, cuerpo, resto):
+        solicitud = self._solicitud(cuerpo)
+        resultado = await self.escribir(api.reservar, solicitud, self.repo, solicitud.get('dueno'))
+        if resultado['ok']:
+            return 200, resultado
+        return (409 if 'conflictos' in resultado else 400), resultado
+
+    async def soltar_apartados(self, consulta, cuerpo, resto):
+        if not resto:
+            raise ErrorPeticion(404, "Indique el dueño: /apartados/<dueno>.")
+        await self.escribir(self.repo.apartados.liberar, resto)
+        return 200, {'ok': True}
+
+    @staticmethod
+    def _solicitud(cuerpo):
+        try:
+            solicitud = json.loads(cuerpo or b'{}')
+        except ValueError:
+            raise ErrorPeticion(400, "El cuerpo no es JSON válido.")
+        if not isinstance(solicitud, dict):
+            raise ErrorPeticion(400, "Se espera un objeto JSON con la solicitud.")
+        return solicitud
+
+    # --- HTTP ---
+    async def atender(self, lector, escritor):
+        """Una conexión: atiende peticiones mientras el cliente la mantenga abierta."""
+        self.estadisticas['conexiones'] += 1
+        try:
+            while True:
+                try:
+                    peticion = await _leer_peticion(lector)
+                except ErrorPeticion as error:
+                    await _responder(escritor, error.codigo, {'ok': False, 'error': str(error)}, False)
+                    break
+                if peticion is None:
+                    break
+                metodo, objetivo, cuerpo, seguir = peticion
+                codigo, datos = await self._despachar(metodo, objetivo, cuerpo)
+                await _responder(escritor, codigo, datos, seguir)
+                if not seguir:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _despachar(self, metodo, objetivo, cuerpo):
+        self.estadisticas['peticiones'] += 1
+        partes = urlsplit(objetivo)
+        ruta, _, resto = partes.path.strip('/').partition('/')
+        manejador = self._rutas.get((metodo, ruta))
+        try:
+            if manejador is None:
+                existe = any(r == ruta for _, r in self._rutas)
+                raise ErrorPeticion(405 if existe else 404, f"No existe {metodo} /{ruta}.")
+            return await manejador(parse_qs(partes.query), cuerpo, unquote(resto))
+        except ErrorPeticion as error:
+            self.estadisticas['errores'] += 1
+            return error.codigo, {'ok': False, 'error': str(error)}
+        except Exception as error:
+            self.estadisticas['errores'] += 1
+            print(f"❌ Error atendiendo {metodo} {objetivo}: {error!r}")
+            return 500, {'ok': False, 'error': "Error interno del servidor."}
+
+    async def iniciar(self, host=HOST, puerto=PUERTO):
+        """Arranca el escritor y el servidor (puerto 0 = uno libre). Devuelve el asyncio.Server."""
+        self._cola = asyncio.Queue()
+        self._escritor = asyncio.create_task(self._escribir_en_orden())
+        return await asyncio.start_server(self.atender, host, puerto)
+
+    async def detener(self, servidor):
+        servidor.close()
+        await servidor.wait_closed()
+        self._escritor.cancel()
+
+
+async def _leer_peticion(lector):
+    """Devuelve (método, objetivo, cuerpo, mantener_conexión) o None si el cliente cerró."""
+    linea = await lector.readline()
+    if not linea.strip():
+        return None
+    try:
+        metodo, objetivo, version = linea.decode('latin-1').split()
+    except ValueError:
+        raise ErrorPeticion(400, "Línea de petición inválida.")
+    cabeceras = {}
+    while True:
+        linea = await lector.readline()
+        if linea in (b'\r\n', b'\n', b''):
+            break
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        cabeceras[nombre.strip().lower()] = valor.strip()
+    try:
+        largo = int(cabeceras.get('content-length') or 0)
+    except ValueError:
+        raise ErrorPeticion(400, "Content-Length inválido.")
+    if largo > MAX_CUERPO:
+        raise ErrorPeticion(413, "La solicitud es demasiado grande.")
+    cuerpo = await lector.readexactly(largo) if largo else b''
+    conexion = cabeceras.get('connection', '').lower()
+    seguir = conexion == 'keep-alive' if version == 'HTTP/1.0' else conexion != 'close'
+    return metodo.upper(), objetivo, cuerpo, seguir
+
+
+async def _responder(escritor, codigo, datos, seguir):
+    cuerpo = json.dumps(datos, ensure_ascii=False).encode('utf-8')
+    cabecera = (f"HTTP/1.1 {codigo} {MOTIVOS.get(codigo, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(cuerpo)}\r\n"
+                f"Connection: {'keep-alive' if seguir else 'close'}\r\n\r\n")
+    escritor.write(cabecera.encode('latin-1') + cuerpo)
+    await escritor.drain()
+
+
+async def servir(repo, host=HOST, puerto=PUERTO):
+    """Atiende hasta que se interrumpa (Ctrl+C)."""
+    planner = ServidorPlanner(repo)
+    servidor = await planner.iniciar(host, puerto)
+    print(f"🌐 Servidor Raquel & Alba escuchando en http://{host}:{puerto} (Ctrl+C para salir)")
+    async with servidor:
+        await servidor.serve_forever()
+
+
+# --- CLIENTE DE PRUEBA DE CARGA ---
+async def _pedir(lector, escritor, metodo, ruta, datos=None):
+    cuerpo = json.dumps(datos).encode('utf-8') if datos is not None else b''
+    escritor.write((f"{metodo} {ruta} HTTP/1.1\r\nHost: planner\r\n"
+                    f"Content-Length: {len(cuerpo)}\r\n\r\n").encode('latin-1') + cuerpo)
+    await escritor.drain()
+    estado = await lector.readline()
+    largo = 0
+    while True:
+        linea = await lector.readline()
+        if linea in (b'\r\n', b''):
+            break
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        if nombre.lower() == 'content-length':
+            largo = int(valor)
+    await lector.readexactly(largo)
+    return int(estado.split()[1])
+
+
+async def _cliente_carga(host, puerto, rutas, cantidad, latencias, codigos):
+    """Un cliente con una conexión abierta que hace 'cantidad' peticiones seguidas."""
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    try:
+        for n in range(cantidad):
+            metodo, ruta, datos = rutas[n % len(rutas)]
+            inicio = time.perf_counter()
+            codigo = await _pedir(lector, escritor, metodo, ruta, datos)
+            latencias.append(time.perf_counter() - inicio)
+            codigos[codigo] = codigos.get(codigo, 0) + 1
+    finally:
+        escritor.close()
+
+
+def _percentil(ordenadas, p):
+    return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p))] if ordenadas else 0.0
+
+
+async def probar_carga(host=HOST, puerto=PUERTO, clientes=50, peticiones=2000, rutas=None):
+    """
+    Simula 'clientes' conexiones simultáneas (como la herramienta del call-centre)
+    repartiendo 'peticiones' entre consultas de lugares, personal, inventario y
+    cotizaciones sin apartar.
+
+    Returns:
+        dict: peticiones, segundos, por_segundo, p50_ms, p95_ms, p99_ms y códigos de respuesta.
+    """
+    if rutas is None:
+        horario = "fecha=15/05/2027&inicio=14:00&fin=20:00"
+        rutas = [
+            ('GET', f"/lugares?{horario}&invitados=100", None),
+            ('GET', f"/personal?categoria=fotografia&{horario}", None),
+            ('GET', "/inventario?categoria=mobiliario", None),
+            ('POST', "/cotizaciones", {
+                "cliente": {"id_cliente": 9999, "nombre": "Cliente De Prueba",
+                            "email": "clienteprueba@gmail.com", "invitados": 100, "presupuesto": 60000},
+                "fecha": "15/05/2027", "h_inicio": "14:00", "h_fin": "20:00", "id_lugar": 10,
+                "personal": [], "items": [{"id_item": 506, "cantidad": 80}, {"id_item": 508, "cantidad": 10}]}),
+        ]
+    latencias, codigos = [], {}
+    por_cliente = [peticiones // clientes + (1 if i < peticiones % clientes else 0) for i in range(clientes)]
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_cliente_carga(host, puerto, rutas, n, latencias, codigos)
+                           for n in por_cliente if n))
+    segundos = time.perf_counter() - inicio
+    latencias.sort()
+    return {
+        'peticiones': len(latencias),
+        'segundos': round(segundos, 3),
+        'por_segundo': round(len(latencias) / segundos, 1) if segundos else 0.0,
+        'p50_ms': round(_percentil(latencias, 0.50) * 1000, 2),
+        'p95_ms': round(_percentil(latencias, 0.95) * 1000, 2),
+        'p99_ms': round(_percentil(latencias, 0.99) * 1000, 2),
+        'codigos': codigos,
+    }
+
+
+async def probar_carga_local(repo, clientes=50, peticiones=2000):
+    """Levanta un servidor de prueba en un puerto libre, le aplica la carga y lo detiene."""
+    planner = ServidorPlanner(repo)
+    servidor = await planner.iniciar(HOST, 0)
+    puerto = servidor.sockets[0].getsockname()[1]
+    try:
+        return await probar_carga(HOST, puerto, clientes, peticiones)
+    finally:
+        await planner.detener(servidor)
@@ -0,0 +1,40 @@
+"""
+Piezas comunes de las pruebas: los módulos del planificador se importan desde
+la raíz del repositorio y cada prueba trabaja sobre su propia copia de data/
+(nunca sobre los JSON de verdad).
+"""
+import os
+import shutil
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+ARCHIVOS_DATOS = ('lugares', 'personal', 'inventario', 'clientes', 'reservas')
+
+
+@pytest.fixture
+def carpeta_datos(tmp_path, monkeypatch):
+    """Copia de los catálogos de data/ con el historial vacío; el directorio de trabajo es tmp_path."""
+    carpeta = tmp_path / 'data'
+    carpeta.mkdir()
+    for nombre in ARCHIVOS_DATOS:
+        shutil.copy(os.path.join(RAIZ, 'data', f'{nombre}.json'), carpeta)
+    (carpeta / 'reservas.json').write_text('[]', encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('PLANNER_CACHE', '0')
+    return str(carpeta)
+
+
+def solicitud(id_cliente, nombre, fecha="15/05/2027", id_lugar=10, sillas=80, mesas=10):
+    """Una boda de 100 invitados que pasa todas las reglas del catálogo de data/."""
+    usuario = nombre.replace(' ', '').lower()
+    return {
+        'cliente': {'id_cliente': id_cliente, 'nombre': nombre, 'email': f"{usuario}@gmail.com",
+                    'invitados': 100, 'presupuesto': 60000},
+        'fecha': fecha, 'h_inicio': "14:00", 'h_fin': "20:00", 'id_lugar': id_lugar,
+        'personal': [100],
+        'items': [{'id_item': 506, 'cantidad': sillas}, {'id_item': 508, 'cantidad': mesas}],
+    }
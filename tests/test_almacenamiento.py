@@ -0,0 +1,58 @@
+import pytest
+
+import api_reservas as api
+from almacenamiento import ConflictoReserva, crear_almacenamiento
+from repositorio import Repositorio
+
+from conftest import solicitud
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def abrir(request, carpeta_datos):
+    """Abre un Repositorio más (otro operador) sobre la misma carpeta y el backend de la prueba."""
+    return lambda: Repositorio(almacenamiento=crear_almacenamiento(request.param, carpeta_datos)).precargar()
+
+
+def _cotizar(repo, datos):
+    cotizacion, cliente, error = api.cotizar(datos, repo)
+    assert not error, error
+    cotizacion['estado'] = 'Aprobado'
+    return cotizacion, cliente.to_dict()
+
+
+def test_la_segunda_sesion_con_versiones_viejas_choca_y_no_guarda_nada(abrir):
+    a, b = abrir(), abrir()
+    ana = _cotizar(a, solicitud(3001, "Ana Perez Ruiz"))
+    # b cotiza el mismo lugar, fotógrafo y mobiliario antes de ver la boda de a
+    luis = _cotizar(b, solicitud(3002, "Luis Gomez Diaz"))
+    a.confirmar_reserva(*ana, avisar=False)
+
+    with pytest.raises(ConflictoReserva) as choque:
+        b.confirmar_reserva(*luis, avisar=False)
+    assert any('Jardin de los Cerezos' in c for c in choque.value.conflictos)
+
+    otro = abrir()
+    assert len(otro.reservas) == 1
+    assert not otro.existe_cliente(3002)
+
+
+def test_tras_recargar_la_sesion_ve_la_boda_del_otro(abrir):
+    a, b = abrir(), abrir()
+    assert api.reservar(solicitud(3001, "Ana Perez Ruiz"), a)['ok']
+
+    b.recargar()
+    mismo_dia = api.reservar(solicitud(3002, "Luis Gomez Diaz"), b)
+    assert not mismo_dia['ok']
+    otro_dia = api.reservar(solicitud(3002, "Luis Gomez Diaz", fecha="16/05/2027"), b)
+    assert otro_dia['ok'], otro_dia['error']
+
+    assert sorted(r['numero'] for r in abrir().reservas) == [1, 2]
+
+
+def test_reservar_informa_el_conflicto_sin_lanzar(abrir):
+    a, b = abrir(), abrir()
+    assert api.reservar(solicitud(3001, "Ana Perez Ruiz"), a)['ok']
+    resultado = api.reservar(solicitud(3002, "Luis Gomez Diaz"), b)
+    assert not resultado['ok']
+    assert resultado['error'].startswith("Conflicto")
+    assert resultado['conflictos']
@@ -0,0 +1,74 @@
+import pytest
+
+from apartados import ITEM, GestorApartados
+from disponibilidad import LUGAR
+
+JARDIN = (LUGAR, 10)
+SILLAS = (ITEM, 506)
+
+
+class Reloj:
+    """Reloj de mentira: solo avanza cuando la prueba lo pide."""
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self):
+        return self.ahora
+
+
+@pytest.fixture
+def reloj():
+    return Reloj()
+
+
+@pytest.fixture
+def gestor(reloj):
+    return GestorApartados(ttl=60, reloj=reloj)
+
+
+def test_el_lugar_apartado_queda_tomado_para_los_demas(gestor):
+    id_apartado, motivo = gestor.apartar('ana', JARDIN, "15/05/2027", "14:00", "20:00")
+    assert id_apartado and not motivo
+    assert not gestor.esta_libre(JARDIN, "15/05/2027", "18:00", "23:00", dueno='luis')
+    assert gestor.esta_libre(JARDIN, "15/05/2027", "18:00", "23:00", dueno='ana')
+    assert gestor.esta_libre(JARDIN, "16/05/2027", "14:00", "20:00", dueno='luis')
+    assert gestor.apartar('luis', JARDIN, "15/05/2027", "19:00", "23:00") == (
+        None, "Está apartado por otro cliente que está cotizando en este momento.")
+
+
+def test_el_apartado_vence_solo(gestor, reloj):
+    gestor.apartar('ana', JARDIN, "15/05/2027", "14:00", "20:00")
+    reloj.ahora += 59
+    assert not gestor.esta_libre(JARDIN, "15/05/2027", "14:00", "20:00", dueno='luis')
+    reloj.ahora += 1
+    # Aunque el barrendero no haya pasado, las consultas ya lo ignoran
+    assert gestor.esta_libre(JARDIN, "15/05/2027", "14:00", "20:00", dueno='luis')
+    assert gestor.de_dueno('ana') == []
+    assert gestor.apartar('luis', JARDIN, "15/05/2027", "14:00", "20:00")[0]
+
+
+def test_renovar_le_da_el_ttl_completo(gestor, reloj):
+    gestor.apartar('ana', JARDIN, "15/05/2027", "14:00", "20:00")
+    reloj.ahora += 50
+    gestor.renovar('ana')
+    reloj.ahora += 50
+    assert not gestor.esta_libre(JARDIN, "15/05/2027", "14:00", "20:00", dueno='luis')
+    reloj.ahora += 10
+    assert gestor.esta_libre(JARDIN, "15/05/2027", "14:00", "20:00", dueno='luis')
+
+
+def test_stock_apartado_vence_y_vuelve(gestor, reloj):
+    assert gestor.apartar('ana', SILLAS, cantidad=80, stock=100)[0]
+    assert gestor.apartar('luis', SILLAS, cantidad=30, stock=100) == (None, "Stock insuficiente: quedan 20 sin apartar.")
+    assert gestor.cantidad_apartada(SILLAS, dueno='luis') == 80
+    reloj.ahora += 60
+    assert gestor.cantidad_apartada(SILLAS, dueno='luis') == 0
+    assert gestor.apartar('luis', SILLAS, cantidad=30, stock=100)[0]
+
+
+def test_liberar_suelta_todo_lo_del_dueno(gestor):
+    gestor.apartar('ana', JARDIN, "15/05/2027", "14:00", "20:00")
+    gestor.apartar('ana', SILLAS, cantidad=80, stock=100)
+    gestor.liberar('ana')
+    assert len(gestor) == 0
+    assert gestor.esta_libre(JARDIN, "15/05/2027", "14:00", "20:00", dueno='luis')
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+import api_reservas as api
+from historial import nombre_cliente
+from repositorio import Repositorio
+
+from conftest import solicitud
+
+
+def _lote(*solicitudes):
+    return [json.dumps(s) for s in solicitudes]
+
+
+@pytest.fixture
+def lote_que_compite():
+    """Dos bodas por el mismo lugar y horario: la segunda llega después pero vale más."""
+    barata = solicitud(3001, "Ana Perez Ruiz", mesas=10)
+    cara = solicitud(3002, "Luis Gomez Diaz", mesas=30)
+    cara['personal'] = [109]  # otro fotógrafo: solo compiten por el lugar
+    return _lote(barata, cara)
+
+
+def test_por_llegada_gana_la_primera_linea(carpeta_datos, lote_que_compite):
+    repo = Repositorio(carpeta_datos)
+    resultados, estadisticas = api.procesar_lote(lote_que_compite, repo, orden='llegada')
+    assert [r['ok'] for r in resultados] == [True, False]
+    assert resultados[1]['error'].startswith("Conflicto")
+    assert estadisticas['confirmadas'] == 1
+    assert [nombre_cliente(r) for r in Repositorio(carpeta_datos).reservas] == ["Ana Perez Ruiz"]
+
+
+def test_por_valor_gana_la_mas_cara(carpeta_datos, lote_que_compite):
+    repo = Repositorio(carpeta_datos)
+    resultados, _ = api.procesar_lote(lote_que_compite, repo, orden='valor')
+    # Los resultados siguen saliendo en el orden del archivo
+    assert [r['linea'] for r in resultados] == [1, 2]
+    assert [r['ok'] for r in resultados] == [False, True]
+    assert [nombre_cliente(r) for r in Repositorio(carpeta_datos).reservas] == ["Luis Gomez Diaz"]
+
+
+def test_lote_sin_competencia_confirma_todo_y_marca_las_lineas_invalidas(carpeta_datos):
+    lineas = _lote(solicitud(3001, "Ana Perez Ruiz")) + ["{no es json"] + _lote(
+        solicitud(3002, "Luis Gomez Diaz", fecha="16/05/2027"))
+    resultados, estadisticas = api.procesar_lote(lineas, Repositorio(carpeta_datos))
+    assert [r['ok'] for r in resultados] == [True, False, True]
+    assert resultados[1] == {'ok': False, 'error': "Línea con JSON inválido.", 'linea': 2}
+    assert (estadisticas['confirmadas'], estadisticas['rechazadas']) == (2, 1)
+
+
+def test_orden_desconocido(carpeta_datos):
+    with pytest.raises(ValueError):
+        api.procesar_lote([], Repositorio(carpeta_datos), orden='azar')
+
+
+def test_cotizar_en_paralelo_da_lo_mismo_que_en_serie(carpeta_datos, monkeypatch):
+    repo = Repositorio(carpeta_datos)
+    quesos = solicitud(3001, "Ana Perez Ruiz")
+    quesos['items'].append({'id_item': 500, 'cantidad': 150})
+    assert api.reservar(quesos, repo)['ok']
+
+    # Quedan 32 unidades del item 500: la primera pide de más, la segunda entra
+    pedidos = []
+    for n, cantidad in enumerate((100, 30)):
+        pedido = solicitud(3002 + n, "Luis Gomez Diaz", fecha=f"{16 + n}/05/2027")
+        pedido['items'].append({'id_item': 500, 'cantidad': cantidad})
+        pedidos.append(pedido)
+
+    monkeypatch.setattr(api, 'MIN_POR_PROCESO', 1)
+    en_serie = api.cotizar_todas(pedidos, repo, procesos=1)
+    en_paralelo = api.cotizar_todas(pedidos, repo, procesos=2)
+
+    assert en_serie[0][2].startswith("Stock insuficiente") and "(32 disponibles)" in en_serie[0][2]
+    assert not en_serie[1][2]
+    def resumen(cotizadas):
+        return [(e, c and c['total_final']) for c, _, e in cotizadas]
+    assert resumen(en_paralelo) == resumen(en_serie)
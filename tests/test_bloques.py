@@ -0,0 +1,80 @@
+import random
+
+from bloques import Agenda
+
+
+def _cobertura(intervalos):
+    """Fusión ingenua de referencia: ordena todo y une los que se pisan o se tocan."""
+    tramos = []
+    for inicio, fin in sorted(intervalos):
+        if tramos and inicio <= tramos[-1][1]:
+            tramos[-1][1] = max(tramos[-1][1], fin)
+        else:
+            tramos.append([inicio, fin])
+    return [tuple(t) for t in tramos]
+
+
+def _cobertura_de(agenda):
+    return list(zip(agenda._inicios, agenda._fines))
+
+
+def test_agregar_fusiona_los_tramos_que_se_pisan_o_se_tocan():
+    agenda = Agenda()
+    agenda.agregar(100, 200)
+    agenda.agregar(300, 400)
+    agenda.agregar(500, 600)
+    assert _cobertura_de(agenda) == [(100, 200), (300, 400), (500, 600)]
+
+    agenda.agregar(150, 350)  # une los dos primeros
+    assert _cobertura_de(agenda) == [(100, 400), (500, 600)]
+    agenda.agregar(400, 500)  # se toca con ambos extremos
+    assert _cobertura_de(agenda) == [(100, 600)]
+    assert len(agenda) == 5
+
+
+def test_choca_no_cuenta_los_extremos():
+    agenda = Agenda()
+    agenda.agregar(100, 200)
+    assert agenda.choca(150, 160)
+    assert agenda.choca(50, 101)
+    assert not agenda.choca(200, 300)
+    assert not agenda.choca(0, 100)
+
+
+def test_carga_en_lote_sin_rearmar_queda_igual_que_de_a_uno():
+    rng = random.Random(1)
+    intervalos = [(inicio, inicio + rng.randrange(1, 80)) for inicio in
+                  (rng.randrange(2000) for _ in range(200))]
+    de_a_uno, en_lote = Agenda(), Agenda()
+    for inicio, fin in intervalos:
+        de_a_uno.agregar(inicio, fin)
+        en_lote.agregar(inicio, fin, rearmar=False)
+    en_lote.rearmar()
+    assert _cobertura_de(en_lote) == _cobertura_de(de_a_uno) == _cobertura(intervalos)
+
+
+def test_agregar_al_azar_coincide_con_la_fusion_ingenua():
+    rng = random.Random(7)
+    for _ in range(50):
+        agenda, agregados = Agenda(), []
+        for _ in range(40):
+            inicio = rng.randrange(1000)
+            agregados.append((inicio, inicio + rng.randrange(1, 60)))
+            agenda.agregar(*agregados[-1])
+            assert _cobertura_de(agenda) == _cobertura(agregados)
+        assert agenda.intervalos() == sorted(agregados)
+
+
+def test_desfases_libres_coincide_con_revisar_dia_por_dia():
+    rng = random.Random(3)
+    paso = 1440
+    for _ in range(100):
+        agenda = Agenda()
+        for _ in range(rng.randrange(30)):
+            inicio = rng.randrange(40 * paso)
+            agenda.agregar(inicio, inicio + rng.randrange(60, 2 * paso))
+        inicio = rng.randrange(paso)
+        fin = inicio + rng.randrange(60, paso)
+        cuantos = rng.randrange(1, 10)
+        esperado = [k for k in range(1, 31) if not agenda.choca(inicio + k * paso, fin + k * paso)][:cuantos]
+        assert agenda.desfases_libres(inicio, fin, paso, 30, cuantos) == esperado
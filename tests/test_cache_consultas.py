@@ -0,0 +1,79 @@
+import api_reservas as api
+from cache_consultas import CacheConsultas
+from repositorio import Repositorio
+
+from conftest import solicitud
+
+LUGARES, PERSONAL = CacheConsultas.LUGARES, CacheConsultas.PERSONAL
+
+
+def _guardar(cache, llave, primero, ultimo):
+    return cache.obtener(llave, lambda: llave, primero, ultimo)
+
+
+def test_recuerda_y_desaloja_la_menos_usada():
+    cache, calculos = CacheConsultas(maximo=2), []
+    calcular = lambda: calculos.append(1) or len(calculos)
+    assert cache.obtener('a', calcular, 0, 0) == 1
+    assert cache.obtener('a', calcular, 0, 0) == 1
+    cache.obtener('b', calcular, 0, 0)
+    cache.obtener('a', calcular, 0, 0)  # 'b' queda como la menos usada
+    cache.obtener('c', calcular, 0, 0)
+    assert len(cache) == 2 and cache.obtener('a', calcular, 0, 0) == 1
+    assert cache.obtener('b', calcular, 0, 0) == 4
+    assert cache.estadisticas()['desalojos'] == 2 and cache.aciertos == 3 and cache.fallos == 4
+
+
+def test_invalidar_lugar_solo_toca_capacidad_y_dias_afectados():
+    cache = CacheConsultas()
+    chica = (LUGARES, "f", "14:00", "20:00", 100, 0, 'cercania')
+    grande = (LUGARES, "f", "14:00", "20:00", 300, 0, 'cercania')
+    otro_dia = (LUGARES, "g", "14:00", "20:00", 100, 0, 'cercania')
+    personal = (PERSONAL, 'fotografia', "f", "14:00", "20:00")
+    for llave, dias in ((chica, (10, 40)), (grande, (10, 40)), (otro_dia, (50, 80)), (personal, (10, 10))):
+        _guardar(cache, llave, *dias)
+
+    # Un salón de 250 el día 20: no le cambia nada a quien busca para 300 invitados
+    cache.invalidar_lugar(250, {20})
+    assert chica not in cache._entradas
+    assert {grande, otro_dia, personal} <= set(cache._entradas)
+    assert cache.invalidadas == 1
+
+
+def test_invalidar_personal_incluye_las_busquedas_parciales():
+    cache = CacheConsultas()
+    llaves = [(PERSONAL, categoria, "f", None, None) for categoria in ('fotografia', 'foto', 'musica')]
+    for llave in llaves:
+        _guardar(cache, llave, 10, 10)
+    cache.invalidar_personal('fotografia', {10})
+    assert list(cache._entradas) == [llaves[2]]
+    cache.invalidar_personal('musica', {11})
+    assert len(cache) == 1
+
+
+CONSULTAS = [
+    lambda repo: repo.lugares_disponibles("15/05/2027", "14:00", "20:00", 100),
+    lambda repo: repo.lugares_disponibles("15/05/2028", "14:00", "20:00", 100),
+    lambda repo: repo.personal_disponible('fotografia', "15/05/2027", "14:00", "20:00"),
+    lambda repo: repo.personal_disponible('musica', "15/05/2027", "14:00", "20:00"),
+]
+
+
+def test_confirmar_una_boda_descarta_solo_lo_que_cambia(carpeta_datos):
+    repo = Repositorio(carpeta_datos)
+    for consulta in CONSULTAS:
+        consulta(repo)
+    assert len(repo.consultas) == 4
+
+    # Toma el lugar 10 y a la fotógrafa 100 el 15/05/2027
+    assert api.reservar(solicitud(3001, "Ana Perez Ruiz"), repo)['ok']
+    assert repo.consultas.invalidadas == 2
+    assert len(repo.consultas) == 2
+
+    # Lo que responde después (de la caché o recalculado) es lo mismo que de cero
+    fresco = Repositorio(carpeta_datos)
+    for consulta in CONSULTAS:
+        assert consulta(repo) == consulta(fresco)
+    assert repo.consultas.aciertos == 2
+    assert 10 not in [l['id_lugar'] for l in CONSULTAS[0](repo)[0]]
+    assert 100 not in [p['id_personal'] for p in CONSULTAS[2](repo)]
@@ -0,0 +1,81 @@
+import json
+
+import diario_reservas
+from diario_reservas import DiarioReservas
+
+
+def _diario(tmp_path):
+    return DiarioReservas(str(tmp_path / 'reservas.jsonl'), str(tmp_path / 'reservas.json'))
+
+
+def _lineas(ruta):
+    return ruta.read_text(encoding='utf-8').splitlines()
+
+
+def test_migra_el_snapshot_la_primera_vez(tmp_path):
+    (tmp_path / 'reservas.json').write_text(json.dumps([{'id': 1}, {'id': 2}]), encoding='utf-8')
+    diario = _diario(tmp_path)
+    assert list(diario.leer()) == [{'id': 1}, {'id': 2}]
+    assert len(_lineas(tmp_path / 'reservas.jsonl')) == 2
+
+
+def test_recorta_la_ultima_linea_cortada(tmp_path):
+    ruta = tmp_path / 'reservas.jsonl'
+    ruta.write_text('{"id": 1}\n{"id": 2}\n{"id": 3, "cli', encoding='utf-8')
+    diario = _diario(tmp_path)
+    assert ruta.read_text(encoding='utf-8') == '{"id": 1}\n{"id": 2}\n'
+    assert list(diario.leer()) == [{'id': 1}, {'id': 2}]
+
+    diario.agregar({'id': 3})
+    assert list(diario.leer()) == [{'id': 1}, {'id': 2}, {'id': 3}]
+
+
+def test_un_diario_sano_no_se_toca(tmp_path):
+    ruta = tmp_path / 'reservas.jsonl'
+    ruta.write_text('{"id": 1}\n', encoding='utf-8')
+    _diario(tmp_path)
+    assert ruta.read_text(encoding='utf-8') == '{"id": 1}\n'
+
+
+def test_leer_salta_las_lineas_danadas(tmp_path):
+    ruta = tmp_path / 'reservas.jsonl'
+    ruta.write_text('{"id": 1}\nbasura\n\n{"id": 2}\n', encoding='utf-8')
+    assert list(_diario(tmp_path).leer()) == [{'id': 1}, {'id': 2}]
+
+
+def test_compactar_limpia_el_diario_y_deja_el_snapshot(tmp_path):
+    ruta = tmp_path / 'reservas.jsonl'
+    ruta.write_text('{"id": 1}\nbasura\n{"id": 2}\n', encoding='utf-8')
+    diario = _diario(tmp_path)
+    diario.compactar()
+    assert _lineas(ruta) == ['{"id": 1}', '{"id": 2}']
+    assert json.loads((tmp_path / 'reservas.json').read_text(encoding='utf-8')) == [{'id': 1}, {'id': 2}]
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_agregar_compacta_solo_al_pasar_el_umbral(tmp_path, monkeypatch):
+    monkeypatch.setattr(diario_reservas, 'COMPACTAR_MIN', 3)
+    diario = _diario(tmp_path)
+    snapshot = tmp_path / 'reservas.json'
+    for n in range(1, 3):
+        diario.agregar({'id': n})
+    assert not snapshot.exists()
+
+    diario.agregar({'id': 3})
+    assert [r['id'] for r in json.loads(snapshot.read_text(encoding='utf-8'))] == [1, 2, 3]
+    assert list(diario.leer()) == [{'id': 1}, {'id': 2}, {'id': 3}]
+
+
+def test_sesiones_de_una_boda_tambien_compactan(tmp_path, monkeypatch):
+    # El asistente abre el diario, agrega una boda y termina: la cuenta de lo
+    # agregado desde la última compactación tiene que sobrevivir a la sesión
+    monkeypatch.setattr(diario_reservas, 'COMPACTAR_MIN', 3)
+    snapshot = tmp_path / 'reservas.json'
+    for n in range(1, 3):
+        _diario(tmp_path).agregar({'id': n})
+    assert not snapshot.exists()
+
+    _diario(tmp_path).agregar({'id': 3})
+    assert [r['id'] for r in json.loads(snapshot.read_text(encoding='utf-8'))] == [1, 2, 3]
+    _diario(tmp_path).agregar({'id': 4})
+    assert len(json.loads(snapshot.read_text(encoding='utf-8'))) == 3
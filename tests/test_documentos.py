@@ -0,0 +1,81 @@
+import json
+import os
+
+import pytest
+
+import api_reservas as api
+import documentos
+from repositorio import Repositorio
+
+from conftest import solicitud
+
+
+@pytest.fixture
+def repo(carpeta_datos):
+    repo = Repositorio(carpeta_datos)
+    assert api.reservar(solicitud(3001, "Ana Perez Ruiz"), repo)['ok']
+    assert api.reservar(solicitud(3002, "Luis Gomez Diaz", fecha="16/05/2027"), repo)['ok']
+    return repo
+
+
+def _huellas(carpeta):
+    return (carpeta / documentos.ARCHIVO_HUELLAS).read_text(encoding='utf-8').splitlines()
+
+
+def test_generar_documentos_anota_una_huella_por_boda(repo, tmp_path):
+    carpeta = tmp_path / 'tickets'
+    for reserva, id_cliente in zip(repo.reservas, (3001, 3002)):
+        rutas = documentos.generar_documentos(repo, reserva, repo.cliente(id_cliente), str(carpeta))
+        assert len(rutas) == 4
+        assert all(os.path.basename(ruta).startswith(f"{reserva['numero']:06d}_") for ruta in rutas)
+    assert [json.loads(linea)[0] for linea in _huellas(carpeta)] == [1, 2]
+
+
+def test_regenerar_saltea_las_bodas_que_no_cambiaron(repo, tmp_path):
+    carpeta = str(tmp_path / 'tickets')
+    primera = documentos.regenerar_historial(repo, carpeta, procesos=1)
+    assert (primera['generadas'], primera['omitidas']) == (2, 0)
+
+    segunda = documentos.regenerar_historial(repo, carpeta, procesos=1)
+    assert (segunda['generadas'], segunda['omitidas'], segunda['archivos']) == (0, 2, 0)
+
+    forzada = documentos.regenerar_historial(repo, carpeta, procesos=1, forzar=True)
+    assert forzada['generadas'] == 2
+
+
+def test_regenerar_vuelve_a_escribir_solo_la_boda_que_cambio(repo, carpeta_datos, tmp_path):
+    carpeta = tmp_path / 'tickets'
+    documentos.regenerar_historial(repo, str(carpeta), procesos=1)
+
+    # Otra sesión corrige el precio de la segunda boda en el diario
+    diario = tmp_path / 'data' / 'reservas.jsonl'
+    reservas = [json.loads(linea) for linea in diario.read_text(encoding='utf-8').splitlines()]
+    reservas[1]['total_final'] += 100
+    diario.write_text(''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in reservas), encoding='utf-8')
+
+    resultado = documentos.regenerar_historial(Repositorio(carpeta_datos), str(carpeta), procesos=1)
+    assert (resultado['generadas'], resultado['omitidas']) == (1, 1)
+
+
+def test_regenerar_repone_los_archivos_borrados(repo, tmp_path):
+    carpeta = tmp_path / 'tickets'
+    documentos.regenerar_historial(repo, str(carpeta), procesos=1)
+    next(carpeta.glob('000001_*.factura.html')).unlink()
+    resultado = documentos.regenerar_historial(repo, str(carpeta), procesos=1)
+    assert (resultado['generadas'], resultado['omitidas']) == (1, 1)
+    assert list(carpeta.glob('000001_*.factura.html'))
+
+
+def test_regenerar_compacta_las_huellas(repo, tmp_path):
+    carpeta = tmp_path / 'tickets'
+    for _ in range(3):
+        # Como lo hace el asistente: con el cliente que acaba de registrar
+        for reserva, id_cliente in zip(repo.reservas, (3001, 3002)):
+            documentos.generar_documentos(repo, reserva, repo.cliente(id_cliente), str(carpeta))
+    assert len(_huellas(carpeta)) == 6
+
+    with open(carpeta / documentos.ARCHIVO_HUELLAS, 'a', encoding='utf-8') as f:
+        f.write('[2, "cort')  # corte a mitad de una línea
+    resultado = documentos.regenerar_historial(repo, str(carpeta), procesos=1)
+    assert resultado['omitidas'] == 2
+    assert [json.loads(linea)[0] for linea in _huellas(carpeta)] == [1, 2]
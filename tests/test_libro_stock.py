@@ -0,0 +1,65 @@
+from bloques import fecha_a_dia
+from libro_stock import CONSUMIBLE, REUTILIZABLE, LibroStock
+
+SILLAS, QUESOS = 1, 2
+
+
+def _boda(fecha, sillas=0, quesos=0, **extra):
+    items = [{'id_item_reserva': SILLAS, 'cantidad_requerida': sillas},
+             {'id_item_reserva': QUESOS, 'cantidad_requerida': quesos}]
+    return {'fecha': fecha, 'h_inicio': "14:00", 'h_fin': "20:00", 'items_pedidos': items, **extra}
+
+
+def _libro():
+    return LibroStock({SILLAS: REUTILIZABLE, QUESOS: CONSUMIBLE})
+
+
+def test_reutilizable_solo_esta_en_uso_los_dias_de_la_boda():
+    libro = _libro()
+    libro.reservar(_boda("15/05/2027", sillas=40))
+    dia = fecha_a_dia("15/05/2027")
+    assert libro.en_uso(SILLAS, dia - 1) == 0
+    assert libro.en_uso(SILLAS, dia) == 40
+    assert libro.en_uso(SILLAS, dia + 1) == 0
+    assert libro.reservado(SILLAS, [dia]) == 40
+    assert libro.reservado(SILLAS, [dia + 30]) == 0
+
+
+def test_reutilizable_toma_el_maximo_entre_los_dias_pedidos():
+    libro = _libro()
+    libro.reservar(_boda("15/05/2027", sillas=40))
+    libro.reservar(_boda("15/05/2027", sillas=25))
+    libro.reservar(_boda("16/05/2027", sillas=10))
+    dia = fecha_a_dia("15/05/2027")
+    assert libro.en_uso(SILLAS, dia) == 65
+    assert libro.reservado(SILLAS, [dia, dia + 1]) == 65
+    assert libro.reservado(SILLAS, [dia + 1, dia + 2]) == 10
+
+
+def test_reutilizable_con_sesion_de_dos_dias_cubre_el_tramo_completo():
+    libro = _libro()
+    sesion = {'fecha': "16/05/2027", 'inicio': "22:00", 'fin': "02:00", 'fecha_fin': "17/05/2027"}
+    libro.reservar(_boda("15/05/2027", sillas=30, sesiones=[sesion]))
+    dia = fecha_a_dia("15/05/2027")
+    assert [libro.en_uso(SILLAS, d) for d in range(dia - 1, dia + 4)] == [0, 30, 30, 30, 0]
+
+
+def test_consumible_se_descuenta_desde_el_dia_de_la_boda_para_siempre():
+    libro = _libro()
+    libro.reservar(_boda("15/05/2027", quesos=50))
+    dia = fecha_a_dia("15/05/2027")
+    assert libro.en_uso(QUESOS, dia - 1) == 0
+    assert libro.en_uso(QUESOS, dia) == 50
+    assert libro.en_uso(QUESOS, dia + 365) == 50
+    # Lo consumido no vuelve: cuenta para cualquier día
+    assert libro.reservado(QUESOS) == 50
+    assert libro.reservado(QUESOS, [dia - 100]) == 50
+
+
+def test_desde_reservas_toma_el_tipo_del_inventario():
+    inventario = [{'id_item': SILLAS, 'categoria': 'mobiliario'}, {'id_item': QUESOS, 'categoria': 'catering'}]
+    libro = LibroStock.desde_reservas([_boda("15/05/2027", sillas=5, quesos=7)], inventario)
+    assert not libro.es_consumible(SILLAS)
+    assert libro.es_consumible(QUESOS)
+    assert libro.reservado(SILLAS, [fecha_a_dia("20/05/2027")]) == 0
+    assert libro.reservado(QUESOS) == 7
@@ -0,0 +1,93 @@
+import funciones_generales as fg
+from modulos import ItemReserva, Personal
+from motor_reglas import MotorReglas
+
+JARDIN = {'id_lugar': 10, 'nombre': "Jardin de los Cerezos", 'servicios_incluidos': ["Pergola de ceremonias"]}
+TERRAZA = {'id_lugar': 12, 'nombre': "Terraza del Sol", 'servicios_incluidos': ["Pista de baile sobre la piscina"]}
+PALACIO = {'id_lugar': 11, 'nombre': "Palacio de Cristal", 'servicios_incluidos': []}
+
+
+def _persona(id_personal, oficio, categoria):
+    return {'id_personal': id_personal, 'nombre': f"Persona {id_personal}", 'oficio': oficio,
+            'categoria': categoria, 'sueldo': 500}
+
+
+def _item(id_item, nombre, categoria):
+    return {'id_item': id_item, 'nombre': nombre, 'categoria': categoria, 'precio_unidad': 10.0}
+
+
+DJ = _persona(114, "DJ / Animador de Eventos", 'musica')
+MARIACHI = _persona(116, "Musica Regional / Mariachi", 'musica')
+ROCK = _persona(117, "Banda de Versatilidad / Rock", 'musica')
+FLORISTA = _persona(105, "Maestro Florista y Paisajista", 'flores')
+SILLAS = _item(506, "Sillas Crossback de Madera", 'mobiliario')
+MESAS = _item(508, "Mesas Crossback de Madera", 'mobiliario')
+SONIDO = _item(520, "Equipo de Sonido Profesional", 'tecnologia')
+FLORES = _item(514, "Centros de Mesa de Flores Estacionales", 'decoracion')
+
+
+def _motor():
+    return MotorReglas.desde_catalogo([JARDIN, TERRAZA, PALACIO], [DJ, MARIACHI, ROCK, FLORISTA],
+                                      [SILLAS, MESAS, SONIDO, FLORES])
+
+
+def _items(*pares):
+    return [ItemReserva.desde_catalogo(item, cantidad) for item, cantidad in pares]
+
+
+def _personal(*personas):
+    return [Personal.desde_catalogo(p) for p in personas]
+
+
+def test_etiqueta_el_catalogo_sin_tildes_ni_mayusculas():
+    motor = _motor()
+    assert motor.por_etiqueta[('personal', 'dj')] == [114]
+    assert motor.por_etiqueta[('item', 'flores')] == [514]
+    assert motor.por_etiqueta[('lugar', 'piscina')] == [12]
+    assert 'palacio_cristal' in motor.etiquetas_lugar(PALACIO)
+    # Lo que no está en el catálogo compilado se etiqueta igual a pedido
+    assert motor.etiquetas_personal({'oficio': "Técnico de ILUMINACIÓN"}) == {'iluminador'}
+
+
+def test_boda_completa_no_tiene_errores():
+    errores = _motor().evaluar(_personal(DJ), _items((SILLAS, 80), (MESAS, 10), (SONIDO, 1)), JARDIN, 100)
+    assert errores == []
+
+
+def test_devuelve_todas_las_reglas_incumplidas_de_una_vez():
+    errores = _motor().evaluar(_personal(DJ, FLORISTA), _items((SILLAS, 10)), TERRAZA, 100)
+    assert errores == [
+        "Mobiliario insuficiente: Tiene 10 sillas para 100 invitados (Mín. 80).",
+        "Mobiliario insuficiente: Tiene 0 mesas para 100 invitados (Mín. 10).",
+        "Tiene DJ pero falta equipo de sonido.",
+        "Falta comprar flores para el florista.",
+        "El lugar 'Terraza del Sol' tiene piscina y requiere personal de 'Seguridad'.",
+    ]
+
+
+def test_exclusiones():
+    motor = _motor()
+    muebles = _items((SILLAS, 80), (MESAS, 10), (SONIDO, 1))
+    assert motor.evaluar(_personal(MARIACHI), muebles, PALACIO, 100) == [
+        "No se permiten Mariachis en 'Palacio de Cristal' (el cristal satura el sonido por eco)."]
+    assert motor.evaluar(_personal(MARIACHI), muebles, JARDIN, 100) == []
+    assert motor.evaluar(_personal(DJ, ROCK), muebles, JARDIN, 100) == [
+        "No se puede contratar un DJ y una Banda de Rock en la misma boda."]
+    assert motor.exclusiones['banda_rock'] == {'dj'} and motor.exclusiones['dj'] == {'banda_rock'}
+
+
+def test_categoria_revisa_solo_sus_reglas():
+    motor = _motor()
+    personal, items = _personal(DJ, FLORISTA), _items((SILLAS, 10))
+    assert motor.evaluar(personal, items, None, 100, categoria='tecnologia') == [
+        "Tiene DJ pero falta equipo de sonido."]
+    assert fg.val_categoria('decoracion', items, personal, 100, motor) == [
+        "Falta comprar flores para el florista."]
+
+
+def test_val_restricc_junta_los_mensajes():
+    motor = _motor()
+    ok, mensaje = fg.val_restricc(_personal(DJ, FLORISTA), _items((SILLAS, 80), (MESAS, 10)), JARDIN, 100, motor)
+    assert not ok
+    assert mensaje == "Tiene DJ pero falta equipo de sonido.\nFalta comprar flores para el florista."
+    assert fg.val_restricc(_personal(DJ), _items((SILLAS, 80), (MESAS, 10), (SONIDO, 1)), JARDIN, 100, motor) == (True, "")
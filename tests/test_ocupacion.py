@@ -0,0 +1,52 @@
+from bloques import fecha_a_dia
+from ocupacion import MatrizOcupacion
+
+SILLAS, QUESOS = 1, 2
+INVENTARIO = [
+    {'id_item': SILLAS, 'nombre': "Sillas Tiffany", 'categoria': 'mobiliario', 'cantidad': 50},
+    {'id_item': QUESOS, 'nombre': "Tabla de Quesos", 'categoria': 'catering', 'cantidad': 100},
+]
+HOY = fecha_a_dia("01/05/2029")
+
+
+def _boda(fecha, sillas=0, quesos=0):
+    items = [{'id_item_reserva': SILLAS, 'cantidad_requerida': sillas},
+             {'id_item_reserva': QUESOS, 'cantidad_requerida': quesos}]
+    return {'fecha': fecha, 'h_inicio': "14:00", 'h_fin': "20:00", 'id_lugar': 10,
+            'personal_contratado': [], 'items_pedidos': items}
+
+
+def _matriz(reservas):
+    return MatrizOcupacion.desde_catalogo([], [], INVENTARIO, reservas)
+
+
+def test_alquiler_en_riesgo_los_dias_parecidos_a_los_llenos():
+    # Todos los sábados de mayo de 2028 se usaron las 50 sillas
+    sabados = [_boda(f"{dia:02d}/05/2028", sillas=50) for dia in (6, 13, 20, 27)]
+    quiebres = _matriz(sabados).quiebres_de_stock(INVENTARIO, HOY, horizonte=30)
+    riesgo, = quiebres['mobiliario']
+    assert riesgo['fecha'] == "05/05/2029"  # primer sábado de mayo
+    assert riesgo['dias_en_riesgo'] == 4 and riesgo['reservado'] == 0
+
+
+def test_consumible_se_acaba_segun_el_consumo_del_ultimo_anio():
+    # 73 quesos en el último año (0.2 por día) y 7 ya reservados para junio
+    matriz = _matriz([_boda("01/01/2029", quesos=73), _boda("10/06/2029", quesos=7)])
+    riesgo, = matriz.quiebres_de_stock(INVENTARIO, HOY)['catering']
+    assert (riesgo['restante'], riesgo['consumo_diario']) == (20, 0.2)
+    assert riesgo['dia'] == HOY + 100
+
+
+def test_pronostico_incremental_igual_al_de_armar_de_nuevo():
+    reservas = [_boda(f"{dia:02d}/{mes:02d}/2028", sillas=10 * (dia % 5 + 1), quesos=dia)
+                for mes in (4, 5, 6) for dia in range(1, 29, 3)]
+    reservas += [_boda("19/05/2029", sillas=45), _boda("02/06/2029", sillas=50, quesos=30)]
+    matriz = _matriz(reservas[::2])
+    matriz.quiebres_de_stock(INVENTARIO, HOY)  # deja armados los conteos hasta hoy
+
+    # Bodas que llegan después (pasadas y futuras) y otros 'hoy'
+    for reserva in reservas[1::2]:
+        matriz.registrar(reserva)
+    for hoy in (HOY, HOY - 40, HOY + 15):
+        esperado = _matriz(reservas).quiebres_de_stock(INVENTARIO, hoy)
+        assert matriz.quiebres_de_stock(INVENTARIO, hoy) == esperado
@@ -0,0 +1,69 @@
+import datetime
+import time
+
+import pytest
+
+from almacenamiento import AlmacenamientoMemoria
+from datos_sinteticos import generar_datos
+from optimizador_paquetes import optimizar_paquetes
+from repositorio import Repositorio
+
+FECHA = f"14/03/{datetime.date.today().year + 1}"
+
+
+def _repo(sin=None):
+    """Catálogo mediano como el del benchmark (50 lugares, 200 personas, 300 items)."""
+    datos = generar_datos(50, 200, 300, 500)
+    if sin:
+        datos['inventario'] = [i for i in datos['inventario'] if not i['nombre'].startswith(sin)]
+    return Repositorio(almacenamiento=AlmacenamientoMemoria(datos)).precargar()
+
+
+@pytest.fixture(scope='module')
+def repo():
+    return _repo()
+
+
+def _optimizar(repo, personal, items=None, criterio='precio'):
+    return optimizar_paquetes(repo, 120, FECHA, "14:00", "22:00", 10**6,
+                              {'personal': personal, 'items': items or {}}, k=3, criterio=criterio)
+
+
+def test_pedido_imposible_se_descarta_antes_de_buscar():
+    # El técnico de iluminación exige 'luces' y sin las lámparas ningún item
+    # del catálogo las aporta: no hay paquete posible
+    repo = _repo(sin="Lamparas")
+    inicio = time.perf_counter()
+    assert _optimizar(repo, ['fotografia', 'estetica', 'iluminacion']) == []
+    assert time.perf_counter() - inicio < 1
+
+
+def test_el_iluminador_lleva_sus_luces(repo):
+    paquetes = _optimizar(repo, ['fotografia', 'estetica', 'iluminacion'])
+    assert len(paquetes) == 3
+    for paquete in paquetes:
+        assert any('luces' in repo.reglas.etiquetas_item(item) for item, _ in paquete['items'])
+
+
+@pytest.mark.parametrize('criterio', ['precio', 'calidad'])
+def test_paquetes_con_acompanantes_cumplen_las_reglas(repo, criterio):
+    inicio = time.perf_counter()
+    paquetes = _optimizar(repo, ['fotografia', 'musica', 'barman', 'flores'],
+                          {'catering': 'invitados', 'bebida': 'invitados', 'decoracion': 4}, criterio)
+    assert time.perf_counter() - inicio < 2
+    assert len(paquetes) == 3
+
+    motor = repo.reglas
+    for paquete in paquetes:
+        # El florista pide flores: entran como decoración o como acompañante
+        assert any('flores' in motor.etiquetas_item(item) for item, _ in paquete['items'])
+        conteo = motor.conteo(paquete['personal'], [{'id_item': i['id_item'], 'cantidad_requerida': c}
+                                                    for i, c in paquete['items']], paquete['lugar'])
+        assert motor.evaluar([], [], paquete['lugar'], 120, conteo=conteo) == []
+
+    costos = [p['subtotal'] for p in paquetes]
+    if criterio == 'precio':
+        assert costos == sorted(costos)
+    else:
+        puntos = [p['puntos'] for p in paquetes]
+        assert puntos == sorted(puntos, reverse=True)
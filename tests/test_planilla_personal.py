@@ -0,0 +1,86 @@
+import itertools
+import random
+
+import api_reservas as api
+from planilla_personal import _Red, con_personal, planificar_personal
+from repositorio import Repositorio
+
+from conftest import solicitud
+
+NOMBRES = ["Ana Perez Ruiz", "Luis Gomez Diaz", "Eva Soto Lara", "Juan Ruiz Mora", "Sara Vega Cruz", "Pablo Rios Gil"]
+
+
+def _boda(id_cliente, fecha="15/05/2027", id_lugar=10, roles=("fotografia",), personal=()):
+    pedido = solicitud(id_cliente, NOMBRES[id_cliente % len(NOMBRES)], fecha, id_lugar)
+    pedido.update(personal=list(personal), roles=list(roles))
+    return pedido
+
+
+def _ids(boda):
+    return [p['id_personal'] for _, p in boda['asignados']]
+
+
+def _por_fuerza_bruta(costos):
+    """(puestos cubiertos, costo mínimo) probando todas las asignaciones; None = sin arco."""
+    filas, columnas = len(costos), len(costos[0])
+    mejor = (0, 0)
+    for cubiertos in range(min(filas, columnas), 0, -1):
+        for elegidas in itertools.combinations(range(filas), cubiertos):
+            for destinos in itertools.permutations(range(columnas), cubiertos):
+                arcos = [costos[f][c] for f, c in zip(elegidas, destinos)]
+                if None not in arcos and (cubiertos, -sum(arcos)) > (mejor[0], -mejor[1]):
+                    mejor = (cubiertos, sum(arcos))
+        if mejor[0]:
+            return mejor
+    return mejor
+
+
+def test_flujo_minimo_coincide_con_fuerza_bruta():
+    rng = random.Random(5)
+    for _ in range(300):
+        filas, columnas = rng.randrange(1, 5), rng.randrange(1, 5)
+        # Costos repetidos a propósito: las fases empujan varios caminos de costo cero
+        costos = [[rng.choice([None, 1, 2, 2, 5]) for _ in range(columnas)] for _ in range(filas)]
+        red = _Red(filas + columnas + 2)
+        sumidero = filas + columnas + 1
+        for f in range(filas):
+            red.agregar(0, 1 + f, 1, 0)
+            for c in range(columnas):
+                if costos[f][c] is not None:
+                    red.agregar(1 + f, 1 + filas + c, 1, costos[f][c])
+        for c in range(columnas):
+            red.agregar(1 + filas + c, sumidero, 1, 0)
+        assert red.flujo_minimo(0, sumidero) == _por_fuerza_bruta(costos)
+
+
+def test_bodas_que_se_pisan_no_comparten_trabajador(carpeta_datos):
+    repo = Repositorio(carpeta_datos)
+    pedidos = [_boda(3001, id_lugar=10), _boda(3002, id_lugar=11), _boda(3003, id_lugar=12, roles=()),
+               _boda(3004, fecha="16/05/2027")]
+    bodas, estadisticas = planificar_personal(repo, pedidos)
+    # Por precio: la junior (400) y después la senior (800); el otro día se repite la junior
+    assert sorted(_ids(bodas[0]) + _ids(bodas[1])) == [100, 109]
+    assert _ids(bodas[3]) == [109]
+    # La terraza tiene piscina: las reglas agregan seguridad aunque no la pida
+    assert [(rol, p['id_personal']) for rol, p in bodas[2]['asignados']] == [('seguridad', 106)]
+    assert estadisticas['turnos'] == 2 and estadisticas['puestos'] == estadisticas['cubiertos'] == 4
+
+    bodas, estadisticas = planificar_personal(repo, pedidos + [_boda(3005, id_lugar=12)])
+    # La única persona de seguridad ya cuida la otra piscina
+    assert bodas[4]['faltan'] == ['fotografia', 'seguridad'] and estadisticas['sin_cubrir'] == 2
+
+
+def test_criterio_reglas_y_lo_ya_reservado(carpeta_datos):
+    repo = Repositorio(carpeta_datos)
+    bodas, _ = planificar_personal(repo, [_boda(3001)], criterio='calidad')
+    assert _ids(bodas[0]) == [100]
+    # En el Palacio de Cristal no entran mariachis: el más barato de música no sirve
+    bodas, _ = planificar_personal(repo, [_boda(3002, id_lugar=11, roles=["musica"])])
+    assert _ids(bodas[0]) == [115]
+    # El personal elegido a mano y el de bodas confirmadas queda ocupado
+    bodas, _ = planificar_personal(repo, [_boda(3003, id_lugar=11, personal=[109]), _boda(3004)])
+    assert _ids(bodas[0]) == [100] and bodas[1]['faltan'] == ['fotografia']
+
+    assert api.reservar(con_personal(planificar_personal(repo, [_boda(3005)])[0][0]), repo)['ok']
+    bodas, _ = planificar_personal(repo, [_boda(3006, id_lugar=11)])
+    assert _ids(bodas[0]) == [100]
@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+from repositorio import Repositorio
+from servidor import HOST, ServidorPlanner
+
+from conftest import solicitud
+
+HORARIO = "fecha=15/05/2027&inicio=14:00&fin=20:00"
+
+
+async def _pedir(puerto, metodo, ruta, datos=None, cuerpo=None):
+    """Una petición en su propia conexión: devuelve (código, JSON de la respuesta)."""
+    lector, escritor = await asyncio.open_connection(HOST, puerto)
+    if cuerpo is None:
+        cuerpo = json.dumps(datos).encode('utf-8') if datos is not None else b''
+    escritor.write((f"{metodo} {ruta} HTTP/1.1\r\nHost: planner\r\nConnection: close\r\n"
+                    f"Content-Length: {len(cuerpo)}\r\n\r\n").encode('latin-1') + cuerpo)
+    await escritor.drain()
+    respuesta = await lector.read()
+    escritor.close()
+    cabecera, _, contenido = respuesta.partition(b'\r\n\r\n')
+    return int(cabecera.split()[1]), json.loads(contenido)
+
+
+def _con_servidor(carpeta_datos, prueba):
+    """Levanta el servidor en un puerto libre, corre prueba(puerto, planner) y lo detiene."""
+    async def correr():
+        planner = ServidorPlanner(Repositorio(carpeta_datos))
+        servidor = await planner.iniciar(HOST, 0)
+        try:
+            return await prueba(servidor.sockets[0].getsockname()[1], planner)
+        finally:
+            await planner.detener(servidor)
+    return asyncio.run(correr())
+
+
+def test_lecturas_y_errores_de_la_peticion(carpeta_datos):
+    async def prueba(puerto, planner):
+        codigo, datos = await _pedir(puerto, 'GET', f"/lugares?{HORARIO}&invitados=100")
+        assert codigo == 200 and 10 in [l['id_lugar'] for l in datos['lugares']]
+        codigo, datos = await _pedir(puerto, 'GET', "/inventario?categoria=mobiliario")
+        assert codigo == 200 and all(i['cantidad'] >= 0 for i in datos['items'])
+
+        assert (await _pedir(puerto, 'GET', f"/lugares?{HORARIO}"))[0] == 400
+        assert (await _pedir(puerto, 'GET', "/personal?categoria=fotografia&fecha=31/02/2027"
+                                            "&inicio=14:00&fin=20:00"))[0] == 400
+        assert (await _pedir(puerto, 'GET', "/nada"))[0] == 404
+        assert (await _pedir(puerto, 'DELETE', "/lugares"))[0] == 405
+        assert (await _pedir(puerto, 'POST', "/reservas", cuerpo=b'{no es json'))[0] == 400
+        assert (await _pedir(puerto, 'POST', "/reservas", datos=[1, 2]))[0] == 400
+        return planner.estadisticas
+
+    estadisticas = _con_servidor(carpeta_datos, prueba)
+    assert estadisticas['peticiones'] == 8 and estadisticas['errores'] == 6
+    assert estadisticas['escrituras'] == 0
+
+
+def test_reservas_simultaneas_por_el_mismo_lugar_se_escriben_en_orden(carpeta_datos):
+    async def prueba(puerto, planner):
+        respuestas = await asyncio.gather(*(
+            _pedir(puerto, 'POST', "/reservas", solicitud(4000 + n, nombre))
+            for n, nombre in enumerate(["Ana Perez Ruiz", "Luis Gomez Diaz", "Eva Soto Lara"])))
+        _, estado = await _pedir(puerto, 'GET', "/estado")
+        return sorted(respuestas, key=lambda r: r[0]), estado
+
+    respuestas, estado = _con_servidor(carpeta_datos, prueba)
+    # Las escrituras van de a una: la primera gana el lugar y las siguientes ya
+    # lo ven ocupado al cotizar, nunca una media boda guardada
+    assert [codigo for codigo, _ in respuestas] == [200, 400, 400]
+    assert all(not datos['ok'] and datos['error'] for _, datos in respuestas[1:])
+    assert estado['escrituras'] == 3 and estado['reservas'] == 1 and estado['en_cola'] == 0
+    assert len(Repositorio(carpeta_datos).reservas) == 1
+
+
+def test_apartar_esconde_el_lugar_hasta_soltarlo(carpeta_datos):
+    async def prueba(puerto, planner):
+        pedido = dict(solicitud(4100, "Ana Perez Ruiz"), apartar=True)
+        codigo, datos = await _pedir(puerto, 'POST', "/cotizaciones", pedido)
+        assert codigo == 200 and datos['ok']
+        dueno = datos['dueno']
+
+        ruta = f"/lugares?{HORARIO}&invitados=100"
+        _, para_otros = await _pedir(puerto, 'GET', ruta)
+        _, para_el_dueno = await _pedir(puerto, 'GET', f"{ruta}&dueno={dueno}")
+        assert 10 not in [l['id_lugar'] for l in para_otros['lugares']]
+        assert 10 in [l['id_lugar'] for l in para_el_dueno['lugares']]
+        # Otro cliente no puede apartar lo mismo
+        codigo, _ = await _pedir(puerto, 'POST', "/cotizaciones",
+                                 dict(solicitud(4101, "Luis Gomez Diaz"), apartar=True))
+        assert codigo != 200
+
+        assert (await _pedir(puerto, 'DELETE', f"/apartados/{dueno}"))[0] == 200
+        _, libres = await _pedir(puerto, 'GET', ruta)
+        assert 10 in [l['id_lugar'] for l in libres['lugares']]
+        assert (await _pedir(puerto, 'DELETE', "/apartados"))[0] == 404
+
+    _con_servidor(carpeta_datos, prueba)